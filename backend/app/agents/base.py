@@ -2,16 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
 import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
 from loguru import logger
 
-from backend.app.services.bedrock import CLAUDE_SONNET, converse_with_tools
+from backend.app.agents.context import DEFAULT_TOKEN_BUDGET, build_context_messages
+from backend.app.services.bedrock import (
+    CLAUDE_SONNET,
+    aconverse_stream_with_tools,
+    aconverse_with_tools,
+    converse_with_tools,
+)
+from backend.app.services.history import MessageRecord
+
+# Longest list kept per key in a tool result stored for follow-up context.
+_CONTEXT_MAX_LIST_ITEMS = 10
+
+# Worker threads shared by every sync agent's tool calls. A call that overruns
+# _tool_timeout() keeps its worker until it returns, so this bounds how many threads
+# hung tools can pin; per-round concurrency is capped separately by _max_parallel_tools().
+_TOOL_WORKERS = 32
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=_TOOL_WORKERS, thread_name_prefix="agent-tool")
+
+# Receives (event_name, data) progress events from a streaming agent run.
+EventSink = Callable[[str, dict[str, Any]], None]
 
 
 @dataclass
@@ -24,129 +50,475 @@ class AgentResult:
     error: str | None = None
     tool_trace: list[dict[str, Any]] | None = None
     chart_data: dict[str, Any] | None = None
+    # Compact successful tool results, stored with the answer so follow-up turns can
+    # reuse them (see agents/context.py). Not part of the API response.
+    tool_context: list[dict[str, Any]] | None = None
+
+
+@dataclass
+class _RunState:
+    """Mutable bookkeeping for one tool-use loop (shared by run and arun)."""
+
+    messages: list[dict[str, Any]]
+    tool_trace: list[dict[str, Any]] = field(default_factory=list)
+    tool_context: list[dict[str, Any]] = field(default_factory=list)
+    sql_statements: list[str] = field(default_factory=list)
+    total_rows: int = 0
+    chart_data: dict[str, Any] | None = None
+
+    def result(self, answer: str, error: str | None = None) -> AgentResult:
+        return AgentResult(
+            answer=answer,
+            sql_used="\n\n".join(self.sql_statements) or None,
+            rows_found=self.total_rows,
+            error=error,
+            tool_trace=self.tool_trace or None,
+            chart_data=self.chart_data,
+            tool_context=self.tool_context or None,
+        )
+
+
+class _ThinkingFilter:
+    """Incrementally drop <thinking>...</thinking> spans from streamed text."""
+
+    _OPEN = "<thinking>"
+    _CLOSE = "</thinking>"
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._inside = False
+
+    def feed(self, text: str) -> str:
+        self._pending += text
+        visible: list[str] = []
+        while True:
+            tag = self._CLOSE if self._inside else self._OPEN
+            index = self._pending.find(tag)
+            if index >= 0:
+                if not self._inside:
+                    visible.append(self._pending[:index])
+                self._pending = self._pending[index + len(tag) :]
+                self._inside = not self._inside
+                continue
+            # Hold back a trailing fragment that could be the start of the next tag.
+            keep = next(
+                (size for size in range(len(tag) - 1, 0, -1) if self._pending.endswith(tag[:size])),
+                0,
+            )
+            cut = len(self._pending) - keep
+            if not self._inside:
+                visible.append(self._pending[:cut])
+            self._pending = self._pending[cut:]
+            return "".join(visible)
+
+    def flush(self) -> str:
+        """Release a held-back fragment at the end of the text; an unclosed span is dropped."""
+        visible = "" if self._inside else self._pending
+        self._pending = ""
+        self._inside = False
+        return visible
 
 
 class BaseAgent(ABC):
     """Reusable Bedrock tool-use loop with small hooks per domain."""
 
-    def run(self, question: str) -> AgentResult:
-        """Run a Bedrock tool-use loop until the model returns a final answer."""
-        messages: list[dict[str, Any]] = [
-            {"role": "user", "content": [{"text": question}]},
-        ]
-        tool_trace: list[dict[str, Any]] = []
-        sql_statements: list[str] = []
-        total_rows = 0
-        chart_data: dict[str, Any] | None = None
+    def run(
+        self,
+        question: str,
+        *,
+        context: Sequence[MessageRecord] | None = None,
+    ) -> AgentResult:
+        """Run a Bedrock tool-use loop until the model returns a final answer.
+
+        ``context`` holds the conversation's recent stored messages (oldest first);
+        they are replayed within _context_token_budget() ahead of the question.
+        """
+        state = _RunState(messages=self._initial_messages(question, context))
 
         try:
             for _ in range(self._max_rounds()):
-                response = converse_with_tools(
-                    messages=messages,
-                    tools=self._get_tools(),
-                    system=self._get_system_prompt(),
-                    model_id=self._model_id(),
-                    max_tokens=self._max_tokens(),
-                    temperature=0.0,
-                )
+                response = converse_with_tools(**self._converse_kwargs(state.messages))
                 message = response["output"]["message"]
                 stop_reason = response.get("stopReason")
-                messages.append(message)
+                state.messages.append(message)
 
                 if stop_reason == "tool_use":
-                    tool_results: list[dict[str, Any]] = []
-                    tool_uses = [
-                        block["toolUse"]
-                        for block in message.get("content", [])
-                        if "toolUse" in block
-                    ]
-                    if not tool_uses:
-                        raise RuntimeError("Bedrock requested tool use without any tool blocks.")
-
-                    for tool_use in tool_uses:
-                        name = str(tool_use.get("name", ""))
-                        tool_input = tool_use.get("input") or {}
-                        tool_use_id = str(tool_use.get("toolUseId", ""))
-
-                        try:
-                            output = self._execute_tool(name, tool_input)
-                            sql = self._extract_sql(output)
-                            if sql:
-                                sql_statements.append(sql)
-                            total_rows += self._extract_row_count(output)
-                            extracted_chart = self._extract_chart_data(output)
-                            if extracted_chart is not None:
-                                chart_data = extracted_chart
-
-                            tool_trace.append(
-                                {
-                                    "tool": name,
-                                    "status": "success",
-                                    "input": tool_input,
-                                    "output_preview": self._preview_tool_output(output),
-                                }
-                            )
-                            tool_results.append(
-                                {
-                                    "toolResult": {
-                                        "toolUseId": tool_use_id,
-                                        "content": [{"json": self._tool_result_payload(output)}],
-                                        "status": "success",
-                                    }
-                                }
-                            )
-                        except Exception as exc:
-                            logger.warning(
-                                "{} tool failed | tool={} | error={}",
-                                self.__class__.__name__,
-                                name,
-                                exc,
-                            )
-                            tool_trace.append(
-                                {
-                                    "tool": name,
-                                    "status": "error",
-                                    "input": tool_input,
-                                    "error": str(exc),
-                                }
-                            )
-                            tool_results.append(
-                                {
-                                    "toolResult": {
-                                        "toolUseId": tool_use_id,
-                                        "content": [{"json": {"error": str(exc)}}],
-                                        "status": "error",
-                                    }
-                                }
-                            )
-
-                    messages.append({"role": "user", "content": tool_results})
+                    tool_results = self._run_tools(state, self._tool_uses(message))
+                    state.messages.append({"role": "user", "content": tool_results})
                     continue
 
-                answer = self._extract_text(message)
-                if answer:
-                    return AgentResult(
-                        answer=answer,
-                        sql_used="\n\n".join(sql_statements) or None,
-                        rows_found=total_rows,
-                        tool_trace=tool_trace or None,
-                        chart_data=chart_data,
-                    )
+                return self._final_result(state, message, stop_reason)
+
+            raise RuntimeError("Agent reached the tool-use round limit without a final answer.")
+
+        except Exception as exc:
+            logger.exception("{} error | question={!r}", self.__class__.__name__, question)
+            return state.result(self._error_answer(), error=str(exc))
+
+    async def arun(
+        self,
+        question: str,
+        *,
+        emit: EventSink | None = None,
+        context: Sequence[MessageRecord] | None = None,
+        first_round: tuple[dict[str, Any], str | None] | None = None,
+    ) -> AgentResult:
+        """Async run(): Bedrock rounds are awaited natively, tools via _aexecute_tool.
+
+        With ``emit``, each round uses ConverseStream and progress is reported as
+        ``preamble``, ``token``, ``tool_start``, ``tool_finish`` and ``chart`` events.
+        ``first_round`` is a result of afirst_round() for the same question and
+        context, used in place of the first Bedrock call.
+        """
+        state = _RunState(messages=self._initial_messages(question, context))
+
+        try:
+            for round_index in range(self._max_rounds()):
+                if round_index == 0 and first_round is not None:
+                    message, stop_reason = first_round
+                    if emit is not None:
+                        thinking = _ThinkingFilter()
+                        shown = [thinking.feed(self._message_text(message)) + thinking.flush()]
+                        self._emit_round_text(emit, shown, stop_reason)
+                elif emit is None:
+                    response = await aconverse_with_tools(**self._converse_kwargs(state.messages))
+                    message = response["output"]["message"]
+                    stop_reason = response.get("stopReason")
+                else:
+                    message, stop_reason = await self._astream_round(state.messages, emit)
+                state.messages.append(message)
+
+                if stop_reason == "tool_use":
+                    tool_results = await self._arun_tools(state, self._tool_uses(message), emit)
+                    state.messages.append({"role": "user", "content": tool_results})
+                    continue
 
-                raise RuntimeError(f"Bedrock returned stopReason={stop_reason!r} without text.")
+                return self._final_result(state, message, stop_reason)
 
             raise RuntimeError("Agent reached the tool-use round limit without a final answer.")
 
         except Exception as exc:
             logger.exception("{} error | question={!r}", self.__class__.__name__, question)
-            return AgentResult(
-                answer=self._error_answer(),
-                sql_used="\n\n".join(sql_statements) or None,
-                rows_found=total_rows,
-                error=str(exc),
-                tool_trace=tool_trace or None,
-                chart_data=chart_data,
+            return state.result(self._error_answer(), error=str(exc))
+
+    async def afirst_round(
+        self,
+        question: str,
+        *,
+        context: Sequence[MessageRecord] | None = None,
+    ) -> tuple[dict[str, Any], str | None]:
+        """Only the first Bedrock round of arun() (not streamed): (message, stop reason).
+
+        Lets the router start an agent speculatively and hand the round to arun()
+        once the question's route is confirmed.
+        """
+        messages = self._initial_messages(question, context)
+        response = await aconverse_with_tools(**self._converse_kwargs(messages))
+        return response["output"]["message"], response.get("stopReason")
+
+    def _initial_messages(
+        self,
+        question: str,
+        context: Sequence[MessageRecord] | None,
+    ) -> list[dict[str, Any]]:
+        if not context:
+            return [{"role": "user", "content": [{"text": question}]}]
+        return build_context_messages(
+            context,
+            question,
+            token_budget=self._context_token_budget(),
+        )
+
+    def _converse_kwargs(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "messages": messages,
+            "tools": self._get_tools(),
+            "system": self._get_system_prompt(),
+            "model_id": self._model_id(),
+            "max_tokens": self._max_tokens(),
+            "temperature": 0.0,
+        }
+
+    async def _astream_round(
+        self,
+        messages: list[dict[str, Any]],
+        emit: EventSink,
+    ) -> tuple[dict[str, Any], str | None]:
+        """Run one ConverseStream round, emitting visible text as ``token`` events.
+
+        Returns the reassembled assistant message and its stop reason.
+        """
+        blocks: dict[int, dict[str, Any]] = {}
+        tool_inputs: dict[int, list[str]] = {}
+        stop_reason: str | None = None
+        thinking = _ThinkingFilter()
+        shown: list[str] = []
+
+        async for event in aconverse_stream_with_tools(**self._converse_kwargs(messages)):
+            if "contentBlockStart" in event:
+                start = event["contentBlockStart"]
+                tool_use = start.get("start", {}).get("toolUse")
+                if tool_use:
+                    index = int(start.get("contentBlockIndex", 0))
+                    blocks[index] = {"toolUse": dict(tool_use)}
+                    tool_inputs[index] = []
+            elif "contentBlockDelta" in event:
+                delta_event = event["contentBlockDelta"]
+                index = int(delta_event.get("contentBlockIndex", 0))
+                delta = delta_event.get("delta", {})
+                if "text" in delta:
+                    block = blocks.setdefault(index, {"text": ""})
+                    block["text"] += delta["text"]
+                    visible = thinking.feed(delta["text"])
+                    if visible:
+                        shown.append(visible)
+                        emit("token", {"text": visible})
+                elif "toolUse" in delta:
+                    tool_inputs.setdefault(index, []).append(delta["toolUse"].get("input", ""))
+            elif "messageStop" in event:
+                stop_reason = event["messageStop"].get("stopReason")
+
+        for index, parts in tool_inputs.items():
+            raw_input = "".join(parts)
+            blocks[index]["toolUse"]["input"] = json.loads(raw_input) if raw_input else {}
+        message = {"role": "assistant", "content": [blocks[index] for index in sorted(blocks)]}
+        shown.append(thinking.flush())
+        self._emit_round_text(emit, shown, stop_reason)
+        return message, stop_reason
+
+    def _emit_round_text(
+        self,
+        emit: EventSink,
+        shown: list[str],
+        stop_reason: str | None,
+    ) -> None:
+        """Finish a round's ``token`` events once its stop reason is known.
+
+        ``shown`` is the visible text already streamed plus the filter's flushed
+        tail, which is sent now. Text in a round that goes on to call tools is a
+        preamble ("Let me look that up."), not part of the answer: a ``preamble``
+        event repeats it so clients can relabel or retract what they displayed.
+        """
+        if shown and shown[-1]:
+            emit("token", {"text": shown[-1]})
+        text = "".join(shown)
+        if text and stop_reason == "tool_use":
+            emit("preamble", {"text": text})
+
+    def _tool_uses(self, message: dict[str, Any]) -> list[dict[str, Any]]:
+        tool_uses = [block["toolUse"] for block in message.get("content", []) if "toolUse" in block]
+        if not tool_uses:
+            raise RuntimeError("Bedrock requested tool use without any tool blocks.")
+        return tool_uses
+
+    def _final_result(
+        self,
+        state: _RunState,
+        message: dict[str, Any],
+        stop_reason: str | None,
+    ) -> AgentResult:
+        answer = self._extract_text(message)
+        if answer:
+            return state.result(answer)
+        raise RuntimeError(f"Bedrock returned stopReason={stop_reason!r} without text.")
+
+    def _run_tools(
+        self,
+        state: _RunState,
+        tool_uses: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Execute one round's toolUse blocks concurrently; return toolResults in order.
+
+        At most _max_parallel_tools() calls run at once on the shared tool pool, each
+        in a copy of the caller's context (so count_bedrock_calls() sees them). The
+        _tool_timeout() budget starts when the round starts, so queued calls share
+        it; a call that overruns is reported as an error and its worker is abandoned.
+        """
+        timeout = self._tool_timeout()
+        deadline = time.monotonic() + timeout
+        slots = threading.BoundedSemaphore(max(1, self._max_parallel_tools()))
+        context = contextvars.copy_context()
+        futures: list[Future[Any] | None] = []
+        for tool_use in tool_uses:
+            if not slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                futures.append(None)
+                continue
+            future = _TOOL_EXECUTOR.submit(
+                context.copy().run,
+                self._execute_tool,
+                str(tool_use.get("name", "")),
+                tool_use.get("input") or {},
+            )
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        wait(
+            [future for future in futures if future is not None],
+            timeout=max(0.0, deadline - time.monotonic()),
+        )
+
+        tool_results = []
+        for tool_use, future in zip(tool_uses, futures, strict=True):
+            if future is None or not future.done():
+                if future is not None:
+                    future.cancel()
+                exc: BaseException | None = self._tool_timeout_error(tool_use, timeout)
+            else:
+                exc = future.exception()
+            if exc is not None:
+                tool_results.append(self._record_tool_error(state, tool_use, exc))
+            else:
+                tool_results.append(self._record_tool_success(state, tool_use, future.result()))
+        return tool_results
+
+    async def _arun_tools(
+        self,
+        state: _RunState,
+        tool_uses: list[dict[str, Any]],
+        emit: EventSink | None = None,
+    ) -> list[dict[str, Any]]:
+        """Async _run_tools(); ``emit`` receives tool_start/tool_finish as calls progress."""
+        timeout = self._tool_timeout()
+        semaphore = asyncio.Semaphore(self._max_parallel_tools())
+
+        async def execute(tool_use: dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self._aexecute_tool(
+                    str(tool_use.get("name", "")),
+                    tool_use.get("input") or {},
+                )
+
+        async def execute_with_timeout(tool_use: dict[str, Any]) -> Any:
+            try:
+                return await asyncio.wait_for(execute(tool_use), timeout)
+            except TimeoutError:
+                raise self._tool_timeout_error(tool_use, timeout) from None
+
+        async def execute_and_report(index: int, tool_use: dict[str, Any]) -> Any:
+            if emit is None:
+                return await execute_with_timeout(tool_use)
+            try:
+                output = await execute_with_timeout(tool_use)
+            except Exception as exc:
+                emit(
+                    "tool_finish",
+                    {
+                        "index": index,
+                        "tool": tool_use.get("name"),
+                        "status": "error",
+                        "error": str(exc),
+                    },
+                )
+                raise
+            emit(
+                "tool_finish",
+                {
+                    "index": index,
+                    "tool": tool_use.get("name"),
+                    "status": "success",
+                    "output_preview": self._preview_tool_output(output),
+                },
             )
+            chart = self._extract_chart_data(output)
+            if chart is not None:
+                emit("chart", chart)
+            return output
+
+        if emit is not None:
+            for index, tool_use in enumerate(tool_uses):
+                emit(
+                    "tool_start",
+                    {
+                        "index": index,
+                        "tool": tool_use.get("name"),
+                        "input": tool_use.get("input") or {},
+                    },
+                )
+        outcomes = await asyncio.gather(
+            *(execute_and_report(index, tool_use) for index, tool_use in enumerate(tool_uses)),
+            return_exceptions=True,
+        )
+        tool_results = []
+        for tool_use, outcome in zip(tool_uses, outcomes, strict=True):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                tool_results.append(self._record_tool_error(state, tool_use, outcome))
+            else:
+                tool_results.append(self._record_tool_success(state, tool_use, outcome))
+        return tool_results
+
+    def _tool_timeout_error(self, tool_use: dict[str, Any], timeout: float) -> TimeoutError:
+        return TimeoutError(f"{tool_use.get('name', '')} timed out after {timeout:g}s")
+
+    def _record_tool_success(
+        self,
+        state: _RunState,
+        tool_use: dict[str, Any],
+        output: Any,
+    ) -> dict[str, Any]:
+        name = str(tool_use.get("name", ""))
+        try:
+            sql = self._extract_sql(output)
+            if sql:
+                state.sql_statements.append(sql)
+            state.total_rows += self._extract_row_count(output)
+            extracted_chart = self._extract_chart_data(output)
+            if extracted_chart is not None:
+                state.chart_data = extracted_chart
+
+            state.tool_trace.append(
+                {
+                    "tool": name,
+                    "status": "success",
+                    "input": tool_use.get("input") or {},
+                    "output_preview": self._preview_tool_output(output),
+                }
+            )
+            state.tool_context.append(
+                {
+                    "tool": name,
+                    "input": self._json_safe(tool_use.get("input") or {}),
+                    "result": self._context_payload(output),
+                }
+            )
+            return {
+                "toolResult": {
+                    "toolUseId": str(tool_use.get("toolUseId", "")),
+                    "content": [{"json": self._tool_result_payload(output)}],
+                    "status": "success",
+                }
+            }
+        except Exception as exc:
+            return self._record_tool_error(state, tool_use, exc)
+
+    def _record_tool_error(
+        self,
+        state: _RunState,
+        tool_use: dict[str, Any],
+        exc: BaseException,
+    ) -> dict[str, Any]:
+        name = str(tool_use.get("name", ""))
+        logger.warning(
+            "{} tool failed | tool={} | error={}",
+            self.__class__.__name__,
+            name,
+            exc,
+        )
+        state.tool_trace.append(
+            {
+                "tool": name,
+                "status": "error",
+                "input": tool_use.get("input") or {},
+                "error": str(exc),
+            }
+        )
+        return {
+            "toolResult": {
+                "toolUseId": str(tool_use.get("toolUseId", "")),
+                "content": [{"json": {"error": str(exc)}}],
+                "status": "error",
+            }
+        }
 
     @abstractmethod
     def _get_system_prompt(self) -> str:
@@ -160,6 +532,10 @@ class BaseAgent(ABC):
     def _execute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
         """Execute one tool call and return a JSON-serializable result."""
 
+    async def _aexecute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        """Async tool hook; defaults to running _execute_tool in a worker thread."""
+        return await asyncio.to_thread(self._execute_tool, name, input_data)
+
     def _error_answer(self) -> str:
         """Default user-facing fallback when the tool loop fails."""
         return (
@@ -176,6 +552,26 @@ class BaseAgent(ABC):
     def _max_tokens(self) -> int:
         return 2048
 
+    def _max_parallel_tools(self) -> int:
+        """Cap on concurrent tool calls within one Bedrock round."""
+        return 4
+
+    def _tool_timeout(self) -> float:
+        """Seconds a round's tool calls may take before they are reported as errors."""
+        return 30.0
+
+    def _context_token_budget(self) -> int:
+        """Approximate tokens of prior turns replayed ahead of a follow-up question."""
+        return DEFAULT_TOKEN_BUDGET
+
+    def _message_text(self, message: dict[str, Any]) -> str:
+        """Raw text blocks of a Bedrock assistant message, as a stream would deliver them."""
+        return "".join(
+            block["text"]
+            for block in message.get("content", [])
+            if isinstance(block, dict) and block.get("text")
+        )
+
     def _extract_text(self, message: dict[str, Any]) -> str:
         """Join any text blocks from a Bedrock assistant message."""
         parts = [
@@ -215,6 +611,19 @@ class BaseAgent(ABC):
             preview[key] = value
         return self._json_safe(preview or output)
 
+    def _context_payload(self, output: Any) -> Any:
+        """Tool output kept for follow-up turns: no SQL or chart points, short row lists."""
+        if not isinstance(output, dict):
+            return self._json_safe(output)
+        payload: dict[str, Any] = {}
+        for key, value in output.items():
+            if key in {"sql", "chart_data", "tool"}:
+                continue
+            if isinstance(value, list | tuple) and len(value) > _CONTEXT_MAX_LIST_ITEMS:
+                value = list(value[-_CONTEXT_MAX_LIST_ITEMS:])
+            payload[key] = value
+        return self._json_safe(payload)
+
     def _extract_sql(self, output: Any) -> str | None:
         if isinstance(output, dict):
             sql = output.get("sql") or output.get("sql_used")
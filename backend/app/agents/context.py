@@ -0,0 +1,133 @@
+"""Token-budgeted conversation context for follow-up questions.
+
+A follow-up on an existing conversation ("and what about its volatility?") is sent
+to Bedrock with the earlier turns in front of it, so the model can resolve "its"
+and reuse data it already fetched instead of calling the same tools again.
+
+Recent turns are replayed verbatim: the user question, then the agent answer with
+the compact tool results recorded for that turn (``tool_context`` in the message
+metadata). Turns that no longer fit the token budget are folded into a one-line
+summary each, newest first, until the budget runs out; anything older is dropped.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.app.services.history import SENDER_AGENT, SENDER_USER, MessageRecord
+
+DEFAULT_TOKEN_BUDGET = 2500
+
+# Prior messages fetched per follow-up (user + agent message per turn).
+CONTEXT_MESSAGES = 12
+
+# Rough Claude tokenizer ratio for English text and JSON; close enough for budgeting.
+_CHARS_PER_TOKEN = 4
+
+_SUMMARY_QUESTION_CHARS = 160
+_SUMMARY_ANSWER_CHARS = 240
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round trip)."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class _Turn:
+    question: str
+    answer: str = ""
+    tool_context: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _pair_turns(records: Sequence[MessageRecord]) -> list[_Turn]:
+    """Group chronological messages into question/answer turns."""
+    turns: list[_Turn] = []
+    for record in records:
+        if record.sender == SENDER_USER:
+            turns.append(_Turn(question=record.message))
+        elif record.sender == SENDER_AGENT and turns and not turns[-1].answer:
+            turns[-1].answer = record.message
+            tool_context = (record.metadata or {}).get("tool_context")
+            if isinstance(tool_context, list):
+                turns[-1].tool_context = [e for e in tool_context if isinstance(e, dict)]
+    # A question without a stored answer (failed turn) adds nothing for the model.
+    return [turn for turn in turns if turn.answer]
+
+
+def _render_tool_context(entries: list[dict[str, Any]]) -> str:
+    if not entries:
+        return ""
+    lines = [
+        "<tool_results>",
+        "Data already retrieved for this answer. Reuse it instead of calling the tool "
+        "again unless fresher or different data is needed.",
+    ]
+    for entry in entries:
+        tool_input = json.dumps(entry.get("input") or {}, separators=(",", ":"), default=str)
+        result = json.dumps(entry.get("result"), separators=(",", ":"), default=str)
+        lines.append(f"- {entry.get('tool')}({tool_input}): {result}")
+    lines.append("</tool_results>")
+    return "\n".join(lines)
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def _summary_line(turn: _Turn) -> str:
+    question = _shorten(turn.question, _SUMMARY_QUESTION_CHARS)
+    answer = _shorten(turn.answer, _SUMMARY_ANSWER_CHARS)
+    return f"- Q: {question} A: {answer}"
+
+
+def build_context_messages(
+    records: Sequence[MessageRecord],
+    question: str,
+    *,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> list[dict[str, Any]]:
+    """Return Converse messages for ``question`` preceded by prior turns.
+
+    ``records`` are the conversation's recent messages, oldest first. The current
+    question is always included and does not count against ``token_budget``.
+    """
+    turns = _pair_turns(records)
+    verbatim: list[tuple[_Turn, str]] = []
+    used = 0
+    index = len(turns)
+    while index > 0:
+        turn = turns[index - 1]
+        tool_text = _render_tool_context(turn.tool_context)
+        cost = estimate_tokens(turn.question) + estimate_tokens(turn.answer)
+        cost += estimate_tokens(tool_text) if tool_text else 0
+        if used + cost > token_budget:
+            break
+        verbatim.insert(0, (turn, tool_text))
+        used += cost
+        index -= 1
+
+    summary_lines: list[str] = []
+    for turn in reversed(turns[:index]):
+        line = _summary_line(turn)
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        summary_lines.insert(0, line)
+        used += cost
+
+    messages: list[dict[str, Any]] = []
+    for turn, tool_text in verbatim:
+        answer_blocks = [{"text": tool_text}] if tool_text else []
+        messages.append({"role": "user", "content": [{"text": turn.question}]})
+        messages.append({"role": "assistant", "content": [*answer_blocks, {"text": turn.answer}]})
+    messages.append({"role": "user", "content": [{"text": question}]})
+
+    if summary_lines:
+        summary = "Earlier in this conversation:\n" + "\n".join(summary_lines)
+        messages[0]["content"].insert(0, {"text": summary})
+    return messages
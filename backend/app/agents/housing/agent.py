@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
 from typing import Any
 
 from backend.app.agents.base import BaseAgent
 from backend.app.agents.housing.prompts import SYSTEM_PROMPT
 from backend.app.services import live_apis
 from backend.app.services.live_apis import (
+    aget_fred_macro_snapshot,
+    get_census_cities_data,
     get_census_city_data,
     get_city_season_context,
     get_city_weather,
     get_fred_macro_snapshot,
+    get_fred_series_histories,
+    get_hud_fmr_for_cities,
     get_hud_fmr_for_city,
 )
 from backend.database.connect import db_cursor
@@ -24,6 +30,8 @@ _HOUSING_FRED_SERIES = {
     "gdp": ("GDP", "Gross Domestic Product"),
 }
 
+_MAX_BATCH_CITIES = 10
+
 
 class HousingAgent(BaseAgent):
     """Tool-use housing agent for city and real-estate questions."""
@@ -62,7 +70,8 @@ class HousingAgent(BaseAgent):
                     "name": "get_city_demographics",
                     "description": (
                         "Fetch Census ACS city-level demographics such as median "
-                        "home value, median gross rent, and median household income."
+                        "home value, median gross rent, and median household income. "
+                        "To compare several cities, pass them all in `cities` in one call."
                     ),
                     "inputSchema": {
                         "json": {
@@ -70,8 +79,12 @@ class HousingAgent(BaseAgent):
                             "properties": {
                                 "city": {"type": "string"},
                                 "state": {"type": "string"},
+                                "cities": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "description": "Several 'City, State' names to compare.",
+                                },
                             },
-                            "required": ["city"],
                         }
                     },
                 }
@@ -79,15 +92,22 @@ class HousingAgent(BaseAgent):
             {
                 "toolSpec": {
                     "name": "get_fair_market_rent",
-                    "description": "Fetch HUD Fair Market Rent data for a city/metro area.",
+                    "description": (
+                        "Fetch HUD Fair Market Rent data for a city/metro area. "
+                        "To compare several metros, pass them all in `cities` in one call."
+                    ),
                     "inputSchema": {
                         "json": {
                             "type": "object",
                             "properties": {
                                 "city": {"type": "string"},
                                 "state": {"type": "string"},
+                                "cities": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "description": "Several 'City, State' names to compare.",
+                                },
                             },
-                            "required": ["city"],
                         }
                     },
                 }
@@ -151,7 +171,14 @@ class HousingAgent(BaseAgent):
                                         "type": "string",
                                         "enum": list(_HOUSING_FRED_SERIES),
                                     },
-                                }
+                                },
+                                "history_years": {
+                                    "type": "integer",
+                                    "description": (
+                                        "Also return month-end history over this many "
+                                        "years (1-30) for trend questions."
+                                    ),
+                                },
                             },
                             "required": ["indicators"],
                         }
@@ -174,6 +201,11 @@ class HousingAgent(BaseAgent):
             raise ValueError(f"Unknown housing tool: {name}")
         return handler(input_data)
 
+    async def _aexecute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        if name == "get_economic_indicators":
+            return await self._atool_get_economic_indicators(input_data)
+        return await super()._aexecute_tool(name, input_data)
+
     def _error_answer(self) -> str:
         return (
             "I'm sorry, I ran into an issue retrieving housing data. "
@@ -226,6 +258,12 @@ LIMIT %s"""
         }
 
     def _tool_get_city_demographics(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        cities = input_data.get("cities")
+        if isinstance(cities, list) and cities:
+            return self._city_batch(
+                "get_city_demographics", "census_acs_1_year", cities, get_census_cities_data
+            )
+
         city, state = self._split_city_state(
             str(input_data.get("city", "")),
             self._optional_text(input_data.get("state")),
@@ -251,7 +289,34 @@ LIMIT %s"""
             **data,
         }
 
+    def _city_batch(
+        self,
+        tool: str,
+        source: str,
+        cities: list[Any],
+        fetch: Callable[[list[str]], list[dict | None]],
+    ) -> dict[str, Any]:
+        queries = []
+        for raw in cities[:_MAX_BATCH_CITIES]:
+            city, state = self._split_city_state(str(raw), None)
+            if city:
+                queries.append(self._city_label(city, state))
+        if not queries:
+            raise ValueError("cities must contain at least one city")
+
+        results = [
+            {"city": query, "found": bool(data), **(data or {})}
+            for query, data in zip(queries, fetch(queries), strict=True)
+        ]
+        return {"tool": tool, "source": source, "cities": results}
+
     def _tool_get_fair_market_rent(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        cities = input_data.get("cities")
+        if isinstance(cities, list) and cities:
+            return self._city_batch(
+                "get_fair_market_rent", "hud_fmr", cities, get_hud_fmr_for_cities
+            )
+
         city, state = self._split_city_state(
             str(input_data.get("city", "")),
             self._optional_text(input_data.get("state")),
@@ -333,13 +398,38 @@ LIMIT %s"""
         }
 
     def _tool_get_economic_indicators(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        indicators = self._requested_indicators(input_data)
+        series_ids = [_HOUSING_FRED_SERIES[item][0] for item in indicators]
+        payload = self._indicators_payload(indicators, get_fred_macro_snapshot(series_ids))
+        return self._with_indicator_history(payload, input_data)
+
+    async def _atool_get_economic_indicators(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        indicators = self._requested_indicators(input_data)
+        series_ids = [_HOUSING_FRED_SERIES[item][0] for item in indicators]
+        payload = self._indicators_payload(indicators, await aget_fred_macro_snapshot(series_ids))
+        return await asyncio.to_thread(self._with_indicator_history, payload, input_data)
+
+    def _requested_indicators(self, input_data: dict[str, Any]) -> list[str]:
         requested = input_data.get("indicators") or []
         indicators = [str(item) for item in requested if str(item) in _HOUSING_FRED_SERIES]
         if not indicators:
             raise ValueError("At least one valid indicator is required")
-
-        series_ids = [_HOUSING_FRED_SERIES[item][0] for item in indicators]
-        snapshot = get_fred_macro_snapshot(series_ids)
+        return indicators
+
+    def _with_indicator_history(
+        self, payload: dict[str, Any], input_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        if input_data.get("history_years") in (None, ""):
+            return payload
+        years = self._bounded_limit(input_data.get("history_years"), default=10, maximum=30)
+        series = payload["series"].values()
+        histories = get_fred_series_histories([item["series_id"] for item in series], years)
+        for item in series:
+            item["history"] = histories.get(item["series_id"], [])
+        payload["history_years"] = years
+        return payload
+
+    def _indicators_payload(self, indicators: list[str], snapshot: dict) -> dict[str, Any]:
         result: dict[str, Any] = {
             "tool": "get_economic_indicators",
             "source": "fred",
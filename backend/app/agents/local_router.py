@@ -0,0 +1,163 @@
+"""Local question classifier used by the router before it asks the LLM.
+
+A multinomial logistic regression over hashed n-gram features (words, word pairs
+and character 4-grams, so misspellings still share most features). Prediction is
+a handful of dictionary-free hash lookups and a 3-way softmax, in microseconds.
+
+The weights ship as a small ``.npz`` artifact next to this module; train or
+re-train it with ``backend/scripts/train_router.py``. The router only trusts a
+prediction whose probability reaches the artifact's threshold, which the training
+script calibrates to a local-accuracy target (``ROUTER_LOCAL_CONFIDENCE``
+overrides it), and escalates anything less certain to the Bedrock classifier.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+LABELS: tuple[str, ...] = ("housing", "market", "out_of_scope")
+N_FEATURES = 1 << 18
+DEFAULT_MODEL_PATH = Path(__file__).with_name("router_model.npz")
+DEFAULT_CONFIDENCE = 0.85
+
+_TOKEN_RE = re.compile(r"[a-z0-9&]+")
+_CHAR_GRAM = 4
+
+
+def featurize(text: str, n_features: int = N_FEATURES) -> np.ndarray:
+    """Hashed feature indices of ``text`` (unique, unweighted)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    grams = [f"w:{token}" for token in tokens]
+    grams += [f"b:{first} {second}" for first, second in pairwise(tokens)]
+    for token in tokens:
+        padded = f" {token} "
+        grams += [f"c:{padded[i : i + _CHAR_GRAM]}" for i in range(len(padded) - _CHAR_GRAM + 1)]
+    # crc32 rather than hash(): str hashes are salted per process.
+    indices = {zlib.crc32(gram.encode()) % n_features for gram in grams}
+    return np.fromiter(indices, dtype=np.int64, count=len(indices))
+
+
+@dataclass(frozen=True)
+class Prediction:
+    label: str
+    confidence: float
+
+
+class LocalRouterModel:
+    """Weights of the hashed-feature logistic regression (``n_features`` x labels)."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        threshold: float = DEFAULT_CONFIDENCE,
+    ) -> None:
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+
+    @property
+    def n_features(self) -> int:
+        return int(self.weights.shape[0])
+
+    def _logits(self, indices: np.ndarray) -> np.ndarray:
+        if not len(indices):
+            return self.bias.copy()
+        return self.weights[indices].sum(axis=0) / np.sqrt(len(indices)) + self.bias
+
+    def predict(self, question: str) -> Prediction:
+        logits = self._logits(featurize(question, self.n_features))
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return Prediction(label=LABELS[best], confidence=float(probs[best]))
+
+    @classmethod
+    def train(
+        cls,
+        examples: Sequence[tuple[str, str]],
+        *,
+        epochs: int = 30,
+        learning_rate: float = 1.0,
+        l2: float = 1e-3,
+        n_features: int = N_FEATURES,
+        seed: int = 0,
+    ) -> LocalRouterModel:
+        """Fit by per-example SGD on the softmax cross-entropy (sparse updates)."""
+        data = [(featurize(text, n_features), LABELS.index(label)) for text, label in examples]
+        model = cls(
+            np.zeros((n_features, len(LABELS)), dtype=np.float32),
+            np.zeros(len(LABELS), dtype=np.float32),
+        )
+        order = list(range(len(data)))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1.0 + epoch * 0.1)
+            for position in order:
+                indices, target = data[position]
+                logits = model._logits(indices)
+                probs = np.exp(logits - logits.max())
+                probs /= probs.sum()
+                probs[target] -= 1.0  # gradient of the loss w.r.t. the logits
+                if len(indices):
+                    scale = 1.0 / np.sqrt(len(indices))
+                    rows = model.weights[indices]
+                    model.weights[indices] = rows - rate * (probs * scale + l2 * rows)
+                model.bias -= rate * probs
+        return model
+
+    def save(self, path: Path | str) -> None:
+        """Store only the non-zero rows, compressed."""
+        used = np.flatnonzero(np.any(self.weights != 0, axis=1))
+        np.savez_compressed(
+            path,
+            n_features=np.array(self.n_features),
+            indices=used.astype(np.int32),
+            weights=self.weights[used].astype(np.float16),
+            bias=self.bias.astype(np.float32),
+            labels=np.array(LABELS),
+            threshold=np.array(self.threshold),
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> LocalRouterModel:
+        with np.load(path) as artifact:
+            if tuple(str(label) for label in artifact["labels"]) != LABELS:
+                raise ValueError(f"router model labels {artifact['labels']} != {LABELS}")
+            weights = np.zeros((int(artifact["n_features"]), len(LABELS)), dtype=np.float32)
+            weights[artifact["indices"]] = artifact["weights"].astype(np.float32)
+            threshold = (
+                float(artifact["threshold"]) if "threshold" in artifact else DEFAULT_CONFIDENCE
+            )
+            return cls(weights, artifact["bias"].astype(np.float32), threshold)
+
+
+@lru_cache(maxsize=1)
+def get_local_router() -> LocalRouterModel | None:
+    """The bundled model (``ROUTER_LOCAL_MODEL`` overrides the path); None if unusable."""
+    if os.getenv("ROUTER_LOCAL_ENABLED", "true").lower() == "false":
+        return None
+    path = os.getenv("ROUTER_LOCAL_MODEL") or DEFAULT_MODEL_PATH
+    try:
+        return LocalRouterModel.load(path)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("local router | model unavailable at {}: {}", path, exc)
+        return None
+
+
+def local_confidence_threshold(model: LocalRouterModel) -> float:
+    """``ROUTER_LOCAL_CONFIDENCE`` if set, else the threshold calibrated into the model."""
+    override = os.getenv("ROUTER_LOCAL_CONFIDENCE")
+    return float(override) if override else model.threshold
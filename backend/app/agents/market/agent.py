@@ -2,21 +2,35 @@
 
 from __future__ import annotations
 
-import math
+import asyncio
 import re
-from itertools import pairwise
 from typing import Any
 
+import numpy as np
+
 from backend.app.agents.base import BaseAgent
 from backend.app.agents.market.prompts import SYSTEM_PROMPT
 from backend.app.services.live_apis import (
+    afinnhub_analyst_recommendations,
+    afinnhub_company_profile,
+    afinnhub_quote,
+    aget_fred_macro_snapshot,
     finnhub_analyst_recommendations,
     finnhub_company_profile,
     finnhub_quote,
     finnhub_search_ticker,
     get_fred_macro_snapshot,
+    get_fred_series_histories,
+)
+from backend.app.services.ohlcv_metrics import (
+    OhlcvColumns,
+    PriceRange,
+    ohlcv_columns,
+    ohlcv_columns_by_ticker,
+    performance_metrics,
+    price_range,
 )
-from backend.app.services.stock_sync import ensure_stock_data_table, normalize_recommendation
+from backend.app.services.stock_sync import normalize_recommendation
 from backend.database.connect import db_cursor
 
 _MARKET_FRED_SERIES = {
@@ -33,7 +47,6 @@ _ANALYST_SIGNAL_FIELDS = {
     "sell": "sell_count",
     "strong_sell": "strong_sell_count",
 }
-_TRADING_DAYS_PER_YEAR = 252
 _MAX_OHLCV_ROWS = 2520
 
 
@@ -134,7 +147,14 @@ class MarketAgent(BaseAgent):
                                         "type": "string",
                                         "enum": list(_MARKET_FRED_SERIES),
                                     },
-                                }
+                                },
+                                "history_years": {
+                                    "type": "integer",
+                                    "description": (
+                                        "Also return month-end history over this many "
+                                        "years (1-30) for trend questions."
+                                    ),
+                                },
                             },
                             "required": ["indicators"],
                         }
@@ -256,6 +276,19 @@ class MarketAgent(BaseAgent):
             raise ValueError(f"Unknown market tool: {name}")
         return handler(input_data)
 
+    async def _aexecute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        # Live-API tools have native async clients; DB-backed tools use a worker thread.
+        async_handlers = {
+            "get_stock_quote": self._atool_get_stock_quote,
+            "get_company_profile": self._atool_get_company_profile,
+            "get_analyst_recommendations": self._atool_get_analyst_recommendations,
+            "get_economic_indicators": self._atool_get_economic_indicators,
+        }
+        handler = async_handlers.get(name)
+        if handler is None:
+            return await super()._aexecute_tool(name, input_data)
+        return await handler(input_data)
+
     def _error_answer(self) -> str:
         return (
             "I'm sorry, I ran into an issue retrieving market data. "
@@ -278,7 +311,13 @@ class MarketAgent(BaseAgent):
 
     def _tool_get_stock_quote(self, input_data: dict[str, Any]) -> dict[str, Any]:
         symbol = self._required_symbol(input_data)
-        quote = finnhub_quote(symbol)
+        return self._quote_payload(symbol, finnhub_quote(symbol))
+
+    async def _atool_get_stock_quote(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        symbol = self._required_symbol(input_data)
+        return self._quote_payload(symbol, await afinnhub_quote(symbol))
+
+    def _quote_payload(self, symbol: str, quote: dict[str, Any]) -> dict[str, Any]:
         return {
             "tool": "get_stock_quote",
             "symbol": symbol,
@@ -295,7 +334,13 @@ class MarketAgent(BaseAgent):
 
     def _tool_get_company_profile(self, input_data: dict[str, Any]) -> dict[str, Any]:
         symbol = self._required_symbol(input_data)
-        profile = finnhub_company_profile(symbol)
+        return self._profile_payload(symbol, finnhub_company_profile(symbol))
+
+    async def _atool_get_company_profile(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        symbol = self._required_symbol(input_data)
+        return self._profile_payload(symbol, await afinnhub_company_profile(symbol))
+
+    def _profile_payload(self, symbol: str, profile: dict[str, Any]) -> dict[str, Any]:
         market_cap = profile.get("marketCapitalization")
         return {
             "tool": "get_company_profile",
@@ -314,7 +359,19 @@ class MarketAgent(BaseAgent):
 
     def _tool_get_analyst_recommendations(self, input_data: dict[str, Any]) -> dict[str, Any]:
         symbol = self._required_symbol(input_data)
-        recs = finnhub_analyst_recommendations(symbol)
+        return self._recommendations_payload(symbol, finnhub_analyst_recommendations(symbol))
+
+    async def _atool_get_analyst_recommendations(
+        self,
+        input_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        symbol = self._required_symbol(input_data)
+        return self._recommendations_payload(
+            symbol,
+            await afinnhub_analyst_recommendations(symbol),
+        )
+
+    def _recommendations_payload(self, symbol: str, recs: list[dict]) -> dict[str, Any]:
         latest = recs[0] if recs else {}
         return {
             "tool": "get_analyst_recommendations",
@@ -332,13 +389,38 @@ class MarketAgent(BaseAgent):
         }
 
     def _tool_get_economic_indicators(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        indicators = self._requested_indicators(input_data)
+        series_ids = [_MARKET_FRED_SERIES[item][0] for item in indicators]
+        payload = self._indicators_payload(indicators, get_fred_macro_snapshot(series_ids))
+        return self._with_indicator_history(payload, input_data)
+
+    async def _atool_get_economic_indicators(self, input_data: dict[str, Any]) -> dict[str, Any]:
+        indicators = self._requested_indicators(input_data)
+        series_ids = [_MARKET_FRED_SERIES[item][0] for item in indicators]
+        payload = self._indicators_payload(indicators, await aget_fred_macro_snapshot(series_ids))
+        return await asyncio.to_thread(self._with_indicator_history, payload, input_data)
+
+    def _requested_indicators(self, input_data: dict[str, Any]) -> list[str]:
         requested = input_data.get("indicators") or []
         indicators = [str(item) for item in requested if str(item) in _MARKET_FRED_SERIES]
         if not indicators:
             raise ValueError("At least one valid indicator is required")
+        return indicators
 
-        series_ids = [_MARKET_FRED_SERIES[item][0] for item in indicators]
-        snapshot = get_fred_macro_snapshot(series_ids)
+    def _with_indicator_history(
+        self, payload: dict[str, Any], input_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        if input_data.get("history_years") in (None, ""):
+            return payload
+        years = self._bounded_limit(input_data.get("history_years"), default=10, maximum=30)
+        series = payload["series"].values()
+        histories = get_fred_series_histories([item["series_id"] for item in series], years)
+        for item in series:
+            item["history"] = histories.get(item["series_id"], [])
+        payload["history_years"] = years
+        return payload
+
+    def _indicators_payload(self, indicators: list[str], snapshot: dict) -> dict[str, Any]:
         result: dict[str, Any] = {
             "tool": "get_economic_indicators",
             "source": "fred",
@@ -356,8 +438,6 @@ class MarketAgent(BaseAgent):
         return result
 
     def _tool_screen_companies(self, input_data: dict[str, Any]) -> dict[str, Any]:
-        ensure_stock_data_table()
-
         sector = self._optional_text(input_data.get("sector"))
         industry = self._optional_text(input_data.get("industry"))
         analyst_signal = self._optional_text(input_data.get("analyst_signal"))
@@ -485,9 +565,9 @@ LIMIT %s"""
         )
         risk_free_rate_pct = self._to_float(input_data.get("risk_free_rate_pct"), default=4.0)
 
+        columns_by_symbol = self._fetch_ohlcv_columns(deduped_symbols, lookback_days=lookback_days)
         metrics: list[dict[str, Any]] = []
         for symbol in deduped_symbols:
-            payload = self._fetch_ohlcv_rows(symbol, lookback_days=lookback_days)
             metrics.append(
                 {
                     "symbol": symbol,
@@ -497,7 +577,7 @@ LIMIT %s"""
                         "dividends added and stock split factors applied when present."
                     ),
                     **self._compute_performance_metrics(
-                        payload["rows"],
+                        columns_by_symbol.get(symbol) or ohlcv_columns([]),
                         risk_free_rate_pct=risk_free_rate_pct,
                     ),
                 }
@@ -532,14 +612,8 @@ LIMIT %s"""
         self._ohlcv_columns_cache = columns
         return columns
 
-    def _fetch_ohlcv_rows(
-        self,
-        symbol: str,
-        *,
-        lookback_days: int = 90,
-        start_date: str | None = None,
-        end_date: str | None = None,
-    ) -> dict[str, Any]:
+    def _ohlcv_select_list(self) -> tuple[str, str, str]:
+        """Quoted ticker and date columns plus the normalized stock_ohlcv select list."""
         columns = self._stock_ohlcv_columns()
         required = {"ticker", "date", "open", "high", "low", "close", "volume"}
         missing = sorted(column for column in required if column not in columns)
@@ -574,6 +648,17 @@ LIMIT %s"""
 {volume_col} AS volume,
 {dividends_expr},
 {splits_expr}"""
+        return ticker_col, date_col, select_list
+
+    def _fetch_ohlcv_rows(
+        self,
+        symbol: str,
+        *,
+        lookback_days: int = 90,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> dict[str, Any]:
+        ticker_col, date_col, select_list = self._ohlcv_select_list()
 
         if start_date or end_date:
             where_clauses = [f"{ticker_col} = %s"]
@@ -619,20 +704,50 @@ ORDER BY trade_date ASC"""
             "rows": [dict(zip(columns_out, row, strict=False)) for row in rows],
         }
 
+    def _fetch_ohlcv_columns(
+        self,
+        symbols: list[str],
+        *,
+        lookback_days: int = 252,
+    ) -> dict[str, OhlcvColumns]:
+        """The latest ``lookback_days`` rows of each symbol as NumPy columns, in one query.
+
+        Prices come back as float8 so the driver builds floats rather than Decimals.
+        """
+        ticker_col, date_col, select_list = self._ohlcv_select_list()
+        sql = f"""\
+SELECT
+  ticker,
+  trade_date,
+  open::float8 AS open,
+  high::float8 AS high,
+  low::float8 AS low,
+  close::float8 AS close,
+  volume::float8 AS volume,
+  dividends::float8 AS dividends,
+  stock_splits::float8 AS stock_splits
+FROM (
+  SELECT
+    {select_list},
+    row_number() OVER (PARTITION BY {ticker_col} ORDER BY {date_col} DESC) AS recency
+  FROM stock_ohlcv
+  WHERE {ticker_col} = ANY(%s)
+) recent
+WHERE recency <= %s
+ORDER BY ticker, trade_date ASC"""
+        limit = min(max(lookback_days, 2), _MAX_OHLCV_ROWS)
+
+        with db_cursor() as cur:
+            rows, columns_out = self._safe_execute(sql, cur, (list(symbols), limit))
+
+        return ohlcv_columns_by_ticker(rows, columns_out)
+
     def _summarize_ohlcv_rows(self, rows: list[dict[str, Any]]) -> dict[str, Any]:
         if not rows:
             return {"found": False}
 
-        closes = [self._to_float(row.get("close")) for row in rows if row.get("close") is not None]
-        highs = [self._to_float(row.get("high")) for row in rows if row.get("high") is not None]
-        lows = [self._to_float(row.get("low")) for row in rows if row.get("low") is not None]
-        volumes = [
-            self._to_float(row.get("volume")) for row in rows if row.get("volume") is not None
-        ]
-        total_dividends = sum(self._to_float(row.get("dividends")) for row in rows)
-
-        first_close = closes[0] if closes else None
-        last_close = closes[-1] if closes else None
+        prices = price_range(ohlcv_columns(rows))
+        first_close, last_close = prices.first_close, prices.latest_close
         period_return_pct = None
         if first_close is not None and first_close != 0.0 and last_close is not None:
             period_return_pct = round(((last_close / first_close) - 1.0) * 100.0, 2)
@@ -643,10 +758,19 @@ ORDER BY trade_date ASC"""
             "end_date": rows[-1].get("trade_date"),
             "latest_close": round(last_close, 4) if last_close is not None else None,
             "period_return_pct": period_return_pct,
-            "highest_high": round(max(highs), 4) if highs else None,
-            "lowest_low": round(min(lows), 4) if lows else None,
-            "average_volume": round(sum(volumes) / len(volumes), 2) if volumes else None,
-            "total_dividends": round(total_dividends, 4),
+            **self._price_range_fields(prices),
+        }
+
+    def _price_range_fields(self, prices: PriceRange) -> dict[str, Any]:
+        return {
+            "highest_high": (
+                round(prices.highest_high, 4) if prices.highest_high is not None else None
+            ),
+            "lowest_low": round(prices.lowest_low, 4) if prices.lowest_low is not None else None,
+            "average_volume": (
+                round(prices.average_volume, 2) if prices.average_volume is not None else None
+            ),
+            "total_dividends": round(prices.total_dividends, 4),
         }
 
     def _build_ohlcv_chart_data(
@@ -708,109 +832,53 @@ ORDER BY trade_date ASC"""
 
     def _compute_performance_metrics(
         self,
-        rows: list[dict[str, Any]],
+        columns: OhlcvColumns,
         *,
         risk_free_rate_pct: float,
     ) -> dict[str, Any]:
-        if len(rows) < 2:
+        if len(columns) < 2:
             return {
-                "found": bool(rows),
+                "found": bool(len(columns)),
                 "metrics_available": False,
                 "reason": "Not enough OHLCV rows to calculate returns.",
             }
 
-        returns: list[float] = []
-        total_dividends = 0.0
-        split_events = 0
-
-        for previous, current in pairwise(rows):
-            previous_close = self._to_float(previous.get("close"))
-            current_close = self._to_float(current.get("close"))
-            dividend = self._to_float(current.get("dividends"))
-            split_factor = self._to_float(current.get("stock_splits"), default=1.0)
-
-            if previous_close <= 0 or current_close <= 0:
-                continue
-
-            if split_factor not in (0.0, 1.0):
-                split_events += 1
-
-            total_dividends += dividend
-            adjusted_previous_close = (
-                previous_close / split_factor if split_factor not in (0.0, 1.0) else previous_close
-            )
-            if adjusted_previous_close <= 0:
-                continue
-            returns.append(((current_close + dividend) / adjusted_previous_close) - 1.0)
-
-        if not returns:
+        performance = performance_metrics(columns, risk_free_rate_pct=risk_free_rate_pct)
+        if performance is None:
             return {
                 "found": True,
                 "metrics_available": False,
                 "reason": "No valid close-to-close return observations were available.",
             }
 
-        mean_daily_return = sum(returns) / len(returns)
-        variance = (
-            sum((value - mean_daily_return) ** 2 for value in returns) / (len(returns) - 1)
-            if len(returns) > 1
-            else 0.0
-        )
-        daily_volatility = math.sqrt(max(variance, 0.0))
-        rf_daily = (risk_free_rate_pct / 100.0) / _TRADING_DAYS_PER_YEAR
-        sharpe_ratio = None
-        if daily_volatility > 0:
-            sharpe_ratio = ((mean_daily_return - rf_daily) / daily_volatility) * math.sqrt(
-                _TRADING_DAYS_PER_YEAR
-            )
-
-        cumulative_growth = 1.0
-        peak = 1.0
-        max_drawdown = 0.0
-        for daily_return in returns:
-            cumulative_growth *= 1.0 + daily_return
-            peak = max(peak, cumulative_growth)
-            max_drawdown = min(max_drawdown, (cumulative_growth / peak) - 1.0)
-
-        annualized_return = None
-        if cumulative_growth > 0:
-            annualized_return = cumulative_growth ** (_TRADING_DAYS_PER_YEAR / len(returns)) - 1.0
-
-        highs = [self._to_float(row.get("high")) for row in rows if row.get("high") is not None]
-        lows = [self._to_float(row.get("low")) for row in rows if row.get("low") is not None]
-        volumes = [
-            self._to_float(row.get("volume")) for row in rows if row.get("volume") is not None
-        ]
-        latest_close = self._to_float(rows[-1].get("close"))
+        prices = price_range(columns)
+        latest_close = float(np.nan_to_num(columns.close[-1], nan=0.0))
 
         return {
             "found": True,
             "metrics_available": True,
-            "start_date": rows[0].get("trade_date"),
-            "end_date": rows[-1].get("trade_date"),
-            "observations": len(rows),
-            "return_observations": len(returns),
+            "start_date": columns.trade_dates[0],
+            "end_date": columns.trade_dates[-1],
+            "observations": len(columns),
+            "return_observations": performance.return_observations,
             "latest_close": round(latest_close, 4),
-            "total_return_pct": round((cumulative_growth - 1.0) * 100.0, 2),
+            "total_return_pct": round(performance.total_return * 100.0, 2),
             "annualized_return_pct": (
-                round(annualized_return * 100.0, 2) if annualized_return is not None else None
-            ),
-            "annualized_volatility_pct": round(
-                daily_volatility * math.sqrt(_TRADING_DAYS_PER_YEAR) * 100.0,
-                2,
+                round(performance.annualized_return * 100.0, 2)
+                if performance.annualized_return is not None
+                else None
             ),
-            "sharpe_ratio": round(sharpe_ratio, 3) if sharpe_ratio is not None else None,
-            "max_drawdown_pct": round(max_drawdown * 100.0, 2),
-            "average_daily_return_pct": round(mean_daily_return * 100.0, 3),
-            "positive_days_pct": round(
-                (sum(value > 0 for value in returns) / len(returns)) * 100.0,
-                2,
+            "annualized_volatility_pct": round(performance.annualized_volatility * 100.0, 2),
+            "sharpe_ratio": (
+                round(performance.sharpe_ratio, 3) if performance.sharpe_ratio is not None else None
             ),
-            "highest_high": round(max(highs), 4) if highs else None,
-            "lowest_low": round(min(lows), 4) if lows else None,
-            "average_volume": round(sum(volumes) / len(volumes), 2) if volumes else None,
-            "total_dividends": round(total_dividends, 4),
-            "stock_split_events": split_events,
+            "max_drawdown_pct": round(performance.max_drawdown * 100.0, 2),
+            "average_daily_return_pct": round(performance.mean_daily_return * 100.0, 3),
+            "positive_days_pct": round(performance.positive_day_ratio * 100.0, 2),
+            **self._price_range_fields(prices),
+            # Dividends on the days that produced a return, as before.
+            "total_dividends": round(performance.total_dividends, 4),
+            "stock_split_events": performance.split_events,
         }
 
     def _required_symbol(self, input_data: dict[str, Any]) -> str:
@@ -6,25 +6,44 @@ domains before dispatching to the appropriate specialist agent:
   HOUSING → HousingAgent  (real estate, cities, rent, home values, mortgages)
   MARKET  → MarketAgent   (stocks, companies, economy, GDP, unemployment)
   OUT_OF_SCOPE → unsupported for this product
+
+Obvious questions are routed by keyword overrides; the rest go to the local
+hashed n-gram classifier (agents/local_router.py), and only predictions below
+its confidence threshold are escalated to Titan.
 """
 
 from __future__ import annotations
 
-import difflib
+import asyncio
 import re
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
 
 from loguru import logger
 
-from backend.app.agents.base import AgentResult
+from backend.app.agents.base import AgentResult, BaseAgent, EventSink
 from backend.app.agents.housing.agent import HousingAgent
+from backend.app.agents.local_router import get_local_router, local_confidence_threshold
 from backend.app.agents.market.agent import MarketAgent
-from backend.app.services.bedrock import TITAN_TEXT_LITE, invoke_claude
+from backend.app.agents.speculation import get_speculation_budget
+from backend.app.services.bedrock import (
+    TITAN_TEXT_LITE,
+    ainvoke_claude,
+    count_bedrock_calls,
+    invoke_claude,
+)
+from backend.app.services.history import SENDER_AGENT, SENDER_USER, MessageRecord
+from backend.app.services.keywords import KeywordSet, TypoIndex, edit_distance
 
 # ---------------------------------------------------------------------------
 # Singleton agents
 # ---------------------------------------------------------------------------
 _housing_agent = HousingAgent()
 _market_agent = MarketAgent()
+_AGENTS: dict[str, BaseAgent] = {"housing": _housing_agent, "market": _market_agent}
 
 # ---------------------------------------------------------------------------
 # Titan classifier prompt
@@ -217,10 +236,110 @@ _TYPO_CORRECTION_WORDS = {
     if len(word) >= 4
 }
 
+_HOUSING_FALLBACK_KW = {
+    "housing",
+    "home value",
+    "home values",
+    "home price",
+    "home prices",
+    "median price",
+    "median home",
+    "rent",
+    "rental",
+    "apartment",
+    "real estate",
+    "housing inventory",
+    "inventory",
+    "listing",
+    "zillow",
+    "property",
+    "fair market rent",
+    "hud",
+    "city",
+    "neighborhood",
+    "philly",
+    "mortgage",
+    "weather",
+    "forecast",
+    "temperature",
+    "climate",
+    "season",
+    "rain",
+    "snow",
+    "precipitation",
+}
+_MARKET_FALLBACK_KW = {
+    "stock",
+    "company",
+    "companies",
+    "invest",
+    "gdp",
+    "earnings",
+    "share price",
+    "analyst",
+    "recommendation",
+    "recommendations",
+    "rating",
+    "ratings",
+    "strong buy",
+    "buy rating",
+    "buy ratings",
+    "sector",
+    "s&p",
+    "nasdaq",
+    "dow",
+    "portfolio",
+    "dividend",
+    "dividends",
+    "market cap",
+    "ipo",
+    "trading",
+    "price history",
+    "historical price",
+    "historical prices",
+    "ohlcv",
+    "return",
+    "returns",
+    "volatility",
+    "sharpe",
+    "drawdown",
+    "max drawdown",
+    "risk-adjusted",
+    "risk adjusted",
+    "unemployment",
+    "inflation",
+    "cpi",
+    "interest rate",
+    "interest rates",
+}
+_MARKET_METRIC_TERMS = {
+    "graph",
+    "chart",
+    "plot",
+    "change",
+    "price",
+    "high",
+    "low",
+    "open",
+    "close",
+    "return",
+    "returns",
+    "volatility",
+    "sharpe",
+    "ratio",
+    "history",
+    "historical",
+    "drawdown",
+    "quote",
+}
 
-def _contains_keyword(text: str, keyword: str) -> bool:
-    """Match whole words/phrases so short keywords don't hit unrelated words."""
-    return re.search(rf"\b{re.escape(keyword)}\b", text) is not None
+# Compiled once at import: one regex per keyword set, one deletion index for typos.
+_MARKET_OVERRIDE = KeywordSet(_MARKET_OVERRIDE_KW)
+_HOUSING_OVERRIDE = KeywordSet(_HOUSING_OVERRIDE_KW)
+_HOUSING_FALLBACK = KeywordSet(_HOUSING_FALLBACK_KW)
+_MARKET_FALLBACK = KeywordSet(_MARKET_FALLBACK_KW)
+_MARKET_METRIC = KeywordSet(_MARKET_METRIC_TERMS)
+_TYPO_INDEX = TypoIndex(_TYPO_CORRECTION_WORDS)
 
 
 def _collapse_repeated_letters(value: str) -> str:
@@ -228,33 +347,31 @@ def _collapse_repeated_letters(value: str) -> str:
     return _REPEATED_LETTER_RE.sub(lambda match: match.group(1) * 2, value)
 
 
+@lru_cache(maxsize=8192)
+def _typo_replacement(word: str) -> str | None:
+    """Vocabulary word that lowercase ``word`` is an obvious misspelling of, if any."""
+    if word in _TYPO_INDEX:
+        return None
+    replacement = _TYPO_INDEX.closest(word)
+    if replacement is None or abs(len(replacement) - len(word)) > 1:
+        return None
+    if sorted(word) == sorted(replacement):
+        return replacement
+    if word[0] != replacement[0] or word[-1] != replacement[-1]:
+        return None
+    # Two edits turn too many short words into other words (recat -> rent).
+    if len(word) <= 5 and edit_distance(word, replacement) > 1:
+        return None
+    return replacement
+
+
 def _correct_domain_typos(text: str) -> str:
     """Correct obvious domain-specific typos such as stcko -> stock."""
 
-    def is_confident_typo(word: str, replacement: str) -> bool:
-        if abs(len(replacement) - len(word)) > 1:
-            return False
-        if "".join(sorted(word)) == "".join(sorted(replacement)):
-            return True
-        return word[0] == replacement[0] and word[-1] == replacement[-1]
-
     def replace(match: re.Match[str]) -> str:
         word = match.group(0)
-        lower = word.lower()
-        if lower in _TYPO_CORRECTION_WORDS:
-            return word
-
-        suggestions = difflib.get_close_matches(
-            lower,
-            sorted(_TYPO_CORRECTION_WORDS),
-            n=1,
-            cutoff=0.6,
-        )
-        if not suggestions:
-            return word
-
-        replacement = suggestions[0]
-        if not is_confident_typo(lower, replacement):
+        replacement = _typo_replacement(word.lower())
+        if replacement is None:
             return word
         if word.isupper():
             return replacement.upper()
@@ -276,38 +393,21 @@ def _normalize_question_text(question: str) -> str:
     return " ".join(normalized.split())
 
 
+def question_key(question: str) -> str:
+    """Key for matching duplicate questions: normalized, case-folded, no end punctuation."""
+    return _normalize_question_text(question).casefold().rstrip("?!. ")
+
+
 def _looks_like_market_time_series(question: str) -> bool:
     """Catch messy time-series market questions like 'appleshigh over 90 days'."""
-    metric_terms = {
-        "graph",
-        "chart",
-        "plot",
-        "change",
-        "price",
-        "high",
-        "low",
-        "open",
-        "close",
-        "return",
-        "returns",
-        "volatility",
-        "sharpe",
-        "ratio",
-        "history",
-        "historical",
-        "drawdown",
-        "quote",
-    }
-    return _TIME_WINDOW_RE.search(question) is not None and any(
-        _contains_keyword(question, term) for term in metric_terms
-    )
+    return _TIME_WINDOW_RE.search(question) is not None and _MARKET_METRIC.search(question)
 
 
 def _keyword_override(question: str) -> str | None:
     """Deterministically route obvious questions before calling Titan."""
     q = _normalize_question_text(question).lower()
-    market_hits = sum(_contains_keyword(q, keyword) for keyword in _MARKET_OVERRIDE_KW)
-    housing_hits = sum(_contains_keyword(q, keyword) for keyword in _HOUSING_OVERRIDE_KW)
+    market_hits = _MARKET_OVERRIDE.search(q)
+    housing_hits = _HOUSING_OVERRIDE.search(q)
 
     if market_hits and not housing_hits:
         return "market"
@@ -318,6 +418,23 @@ def _keyword_override(question: str) -> str | None:
     return None
 
 
+def _local_prediction(normalized_question: str) -> str | None:
+    """Label from the local classifier when it is confident enough, else None."""
+    model = get_local_router()
+    if model is None:
+        return None
+    prediction = model.predict(normalized_question)
+    if prediction.confidence < local_confidence_threshold(model):
+        return None
+    logger.debug(
+        "Router | local label={!r} confidence={:.3f} | normalized={!r}",
+        prediction.label,
+        prediction.confidence,
+        normalized_question,
+    )
+    return prediction.label
+
+
 def classify_question(question: str) -> str:
     """Classify a question as 'housing', 'market', or 'out_of_scope'.
 
@@ -334,6 +451,9 @@ def classify_question(question: str) -> str:
             normalized_question,
         )
         return override
+    local = _local_prediction(normalized_question)
+    if local is not None:
+        return local
 
     try:
         response = invoke_claude(
@@ -343,130 +463,247 @@ def classify_question(question: str) -> str:
             max_tokens=8,
             temperature=0.0,
         )
-        label = response.strip().upper()
-        if "HOUSING" in label:
-            return "housing"
-        if "MARKET" in label:
-            return "market"
-        if "OUT_OF_SCOPE" in label:
-            return "out_of_scope"
-        # Fallback heuristic if Titan gives an unexpected answer
-        logger.warning("Titan classifier returned unexpected label: {!r}, using heuristic", label)
+        return _parse_classifier_label(response, normalized_question)
+    except Exception as exc:
+        logger.warning("Titan classifier failed ({}), using keyword fallback", exc)
         return _keyword_fallback(normalized_question)
+
+
+async def aclassify_question(question: str) -> str:
+    """Async classify_question(); the LLM call does not occupy a worker thread."""
+    normalized_question = _normalize_question_text(question)
+    label = _fast_label(question, normalized_question)
+    if label is not None:
+        return label
+    return await _aclassify_with_llm(normalized_question)
+
+
+def _fast_label(question: str, normalized_question: str) -> str | None:
+    """Label from the keyword overrides or a confident local prediction, if any."""
+    override = _keyword_override(normalized_question)
+    if override is not None:
+        logger.debug(
+            "Router | keyword override={!r} | question={!r} | normalized={!r}",
+            override,
+            question,
+            normalized_question,
+        )
+        return override
+    return _local_prediction(normalized_question)
+
+
+async def _aclassify_with_llm(normalized_question: str) -> str:
+    try:
+        response = await ainvoke_claude(
+            prompt=normalized_question,
+            system=_CLASSIFY_SYSTEM,
+            model_id=TITAN_TEXT_LITE,
+            max_tokens=8,
+            temperature=0.0,
+        )
+        return _parse_classifier_label(response, normalized_question)
     except Exception as exc:
         logger.warning("Titan classifier failed ({}), using keyword fallback", exc)
         return _keyword_fallback(normalized_question)
 
 
+def _parse_classifier_label(response: str, normalized_question: str) -> str:
+    label = response.strip().upper()
+    if "HOUSING" in label:
+        return "housing"
+    if "MARKET" in label:
+        return "market"
+    if "OUT_OF_SCOPE" in label:
+        return "out_of_scope"
+    # Fallback heuristic if Titan gives an unexpected answer
+    logger.warning("Titan classifier returned unexpected label: {!r}, using heuristic", label)
+    return _keyword_fallback(normalized_question)
+
+
 def _keyword_fallback(question: str) -> str:
     """Simple keyword heuristic when Titan is unavailable."""
     q = question.lower()
-    housing_kw = {
-        "housing",
-        "home value",
-        "home values",
-        "home price",
-        "home prices",
-        "median price",
-        "median home",
-        "rent",
-        "rental",
-        "apartment",
-        "real estate",
-        "housing inventory",
-        "inventory",
-        "listing",
-        "zillow",
-        "property",
-        "fair market rent",
-        "hud",
-        "city",
-        "neighborhood",
-        "philly",
-        "mortgage",
-        "weather",
-        "forecast",
-        "temperature",
-        "climate",
-        "season",
-        "rain",
-        "snow",
-        "precipitation",
-    }
-    market_kw = {
-        "stock",
-        "company",
-        "companies",
-        "invest",
-        "gdp",
-        "earnings",
-        "share price",
-        "analyst",
-        "recommendation",
-        "recommendations",
-        "rating",
-        "ratings",
-        "strong buy",
-        "buy rating",
-        "buy ratings",
-        "sector",
-        "s&p",
-        "nasdaq",
-        "dow",
-        "portfolio",
-        "dividend",
-        "dividends",
-        "market cap",
-        "ipo",
-        "trading",
-        "price history",
-        "historical price",
-        "historical prices",
-        "ohlcv",
-        "return",
-        "returns",
-        "volatility",
-        "sharpe",
-        "drawdown",
-        "max drawdown",
-        "risk-adjusted",
-        "risk adjusted",
-        "unemployment",
-        "inflation",
-        "cpi",
-        "interest rate",
-        "interest rates",
-    }
-    if any(_contains_keyword(q, kw) for kw in housing_kw):
+    if _HOUSING_FALLBACK.search(q):
         return "housing"
-    if any(_contains_keyword(q, kw) for kw in market_kw):
+    if _MARKET_FALLBACK.search(q):
         return "market"
     return "out_of_scope"
 
 
-def route_question(question: str) -> tuple[str | None, AgentResult]:
+def _previous_agent_type(context: Sequence[MessageRecord]) -> str | None:
+    """Agent that answered the latest turn of the conversation, when recorded."""
+    for record in reversed(context):
+        if record.sender == SENDER_AGENT:
+            agent_type = (record.metadata or {}).get("agent_type")
+            return agent_type if agent_type in _AGENTS else None
+    return None
+
+
+def _context_label(question: str, context: Sequence[MessageRecord] | None) -> str | None:
+    """Route a follow-up ("what about Dallas?") to the agent of the previous turn.
+
+    A follow-up the keyword overrides place on their own ("and AAPL's price?") is
+    routed as usual, so the user can change topic mid-conversation.
+    """
+    if not context or _keyword_override(_normalize_question_text(question)) is not None:
+        return None
+    return _previous_agent_type(context)
+
+
+def _routing_text(question: str, context: Sequence[MessageRecord] | None) -> str:
+    """Text to classify: a follow-up is read together with the previous user question.
+
+    Used when the previous turn's agent is unknown (turns stored before it was recorded).
+    """
+    previous = next(
+        (record.message for record in reversed(context or ()) if record.sender == SENDER_USER),
+        None,
+    )
+    return f"{previous}\n{question}" if previous else question
+
+
+def _effective_question(question: str) -> str:
+    """Append the normalized reading when it differs from what the user typed."""
+    normalized_question = _normalize_question_text(question)
+    if normalized_question == question.strip():
+        return question
+    return f"{question}\n\nInterpret obvious misspellings or merged words as: {normalized_question}"
+
+
+def route_question(
+    question: str,
+    *,
+    context: Sequence[MessageRecord] | None = None,
+) -> tuple[str | None, AgentResult]:
     """Classify a question and run the appropriate agent.
 
+    ``context`` (prior messages of the conversation) is passed through to the agent,
+    and a follow-up goes to the agent of the previous turn (see _context_label()).
+
     Returns:
         Tuple of (agent_type, AgentResult).
     """
-    normalized_question = _normalize_question_text(question)
-    effective_question = (
-        question
-        if normalized_question == question.strip()
-        else (
-            f"{question}\n\n"
-            f"Interpret obvious misspellings or merged words as: {normalized_question}"
-        )
+    effective_question = _effective_question(question)
+    agent_type = _context_label(question, context) or classify_question(
+        _routing_text(question, context)
     )
-    agent_type = classify_question(question)
     logger.info("Router | classified={!r} | question={!r}", agent_type, question)
 
     if agent_type == "market":
-        result = _market_agent.run(effective_question)
+        result = _market_agent.run(effective_question, context=context)
         return agent_type, result
     if agent_type == "housing":
-        result = _housing_agent.run(effective_question)
+        result = _housing_agent.run(effective_question, context=context)
         return agent_type, result
 
     return None, AgentResult(answer=_OUT_OF_SCOPE_ANSWER)
+
+
+@dataclass
+class _Routing:
+    agent_type: str
+    first_round: tuple[dict[str, Any], str | None] | None = None
+    wasted_calls: int = 0
+
+
+async def _aroute_speculatively(
+    question: str,
+    effective_question: str,
+    context: Sequence[MessageRecord] | None,
+) -> _Routing:
+    """Classify the question; when that needs Titan, speculate on the likely agent.
+
+    The first Bedrock round of the agent predicted by _keyword_fallback() runs
+    concurrently with the classifier (within the speculation budget). It is kept
+    when the classifier agrees and cancelled otherwise. A follow-up goes to the
+    agent of the previous turn, or is classified with the previous question.
+    """
+    label = _context_label(question, context)
+    if label is not None:
+        return _Routing(label)
+    routing_text = _routing_text(question, context)
+    normalized_question = _normalize_question_text(routing_text)
+    label = _fast_label(routing_text, normalized_question)
+    if label is not None:
+        return _Routing(label)
+
+    predicted = _keyword_fallback(normalized_question)
+    agent = _AGENTS.get(predicted)
+    budget = get_speculation_budget()
+    if agent is None or not budget.try_start():
+        return _Routing(await _aclassify_with_llm(normalized_question))
+
+    started = time.perf_counter()
+    speculative_calls = [0]
+
+    async def first_round() -> tuple[tuple[dict[str, Any], str | None], float]:
+        with count_bedrock_calls() as counter:
+            try:
+                result = await agent.afirst_round(effective_question, context=context)
+            finally:
+                speculative_calls[0] = counter[0]
+        return result, time.perf_counter() - started
+
+    speculation = asyncio.create_task(first_round())
+    routing = _Routing(predicted)
+    try:
+        routing.agent_type = await _aclassify_with_llm(normalized_question)
+        classified_seconds = time.perf_counter() - started
+        if routing.agent_type != predicted:
+            logger.info(
+                "Router | speculation miss predicted={!r} classified={!r}",
+                predicted,
+                routing.agent_type,
+            )
+            return routing
+        try:
+            routing.first_round, round_seconds = await speculation
+        except Exception as exc:
+            logger.warning("Router | speculative first round failed: {}", exc)
+            return routing
+        saved = min(classified_seconds, round_seconds)
+        budget.record_hit(saved)
+        logger.info("Router | speculation hit agent={!r} saved={:.3f}s", predicted, saved)
+        return routing
+    finally:
+        if routing.first_round is None:
+            speculation.cancel()
+            # A call cancelled mid-flight is counted (and billed) all the same.
+            await asyncio.wait([speculation])
+            routing.wasted_calls = speculative_calls[0]
+            budget.record_miss(routing.wasted_calls)
+
+
+async def aroute_question(
+    question: str,
+    *,
+    emit: EventSink | None = None,
+    context: Sequence[MessageRecord] | None = None,
+) -> tuple[str | None, AgentResult]:
+    """Async route_question() used by the /api/chat handlers.
+
+    With ``emit``, the routing decision is reported as a ``route`` event and the
+    agent streams its progress through the same sink.
+    ``context`` (prior messages of the conversation) is passed through to the agent.
+    Questions that need the Titan classifier may start their agent speculatively
+    (agents/speculation.py).
+    """
+    effective_question = _effective_question(question)
+    with count_bedrock_calls() as calls:
+        routing = await _aroute_speculatively(question, effective_question, context)
+        agent_type = routing.agent_type
+        logger.info("Router | classified={!r} | question={!r}", agent_type, question)
+        resolved = agent_type if agent_type in _AGENTS else None
+        if emit is not None:
+            emit("route", {"agent_type": resolved})
+
+        result = AgentResult(answer=_OUT_OF_SCOPE_ANSWER)
+        if resolved is not None:
+            result = await _AGENTS[resolved].arun(
+                effective_question,
+                emit=emit,
+                context=context,
+                first_round=routing.first_round,
+            )
+    get_speculation_budget().record_routed_calls(calls[0] - routing.wasted_calls)
+    return resolved, result
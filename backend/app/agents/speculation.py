@@ -0,0 +1,131 @@
+"""Budget and metrics for speculative agent execution during routing.
+
+When a question needs the Titan classifier, the router can start the first
+Bedrock round of the agent that ``_keyword_fallback`` predicts while the
+classifier call is in flight. A confirmed prediction hands that round to the
+agent and saves up to the classifier's latency; a wrong one is cancelled and its
+call is wasted spend.
+
+Wasted calls are capped at ``budget`` (a fraction) of the Bedrock calls made by
+routed questions: a speculation starts only if it could fail without pushing
+wasted calls past the cap, so the extra spend never exceeds it.
+
+Configuration (environment):
+    ROUTER_SPECULATION_ENABLED  'true' turns speculation on (default false)
+    ROUTER_SPECULATION_BUDGET   max extra Bedrock calls as a fraction (default 0.1)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+
+DEFAULT_BUDGET = 0.1
+
+
+@dataclass(frozen=True)
+class SpeculationStats:
+    enabled: bool
+    budget: float
+    started: int
+    hits: int
+    misses: int
+    skipped_budget: int
+    in_flight: int
+    routed_calls: int
+    wasted_calls: int
+    extra_spend: float
+    hit_rate: float
+    saved_seconds: float
+
+
+class SpeculationBudget:
+    """Admission control and counters for speculative first rounds."""
+
+    def __init__(self, *, enabled: bool = False, budget: float = DEFAULT_BUDGET) -> None:
+        self.enabled = enabled
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._started = 0
+        self._hits = 0
+        self._misses = 0
+        self._skipped = 0
+        self._in_flight = 0
+        self._routed_calls = 0
+        self._wasted_calls = 0
+        self._saved_seconds = 0.0
+
+    def try_start(self) -> bool:
+        """Reserve one speculative call; False when disabled or over budget.
+
+        Every speculation in flight is assumed to be wasted, so the cap holds
+        even if all of them miss.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._wasted_calls + self._in_flight + 1 > self.budget * self._routed_calls:
+                self._skipped += 1
+                return False
+            self._started += 1
+            self._in_flight += 1
+            return True
+
+    def record_hit(self, saved_seconds: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._hits += 1
+            self._saved_seconds += max(saved_seconds, 0.0)
+
+    def record_miss(self, wasted_calls: int) -> None:
+        """A discarded speculation and the Bedrock calls it had already made."""
+        with self._lock:
+            self._in_flight -= 1
+            self._misses += 1
+            self._wasted_calls += wasted_calls
+
+    def record_routed_calls(self, calls: int) -> None:
+        """Bedrock calls spent answering one routed question (the spend baseline)."""
+        with self._lock:
+            self._routed_calls += calls
+
+    def stats(self) -> SpeculationStats:
+        with self._lock:
+            finished = self._hits + self._misses
+            return SpeculationStats(
+                enabled=self.enabled,
+                budget=self.budget,
+                started=self._started,
+                hits=self._hits,
+                misses=self._misses,
+                skipped_budget=self._skipped,
+                in_flight=self._in_flight,
+                routed_calls=self._routed_calls,
+                wasted_calls=self._wasted_calls,
+                extra_spend=(
+                    round(self._wasted_calls / self._routed_calls, 4) if self._routed_calls else 0.0
+                ),
+                hit_rate=round(self._hits / finished, 4) if finished else 0.0,
+                saved_seconds=round(self._saved_seconds, 3),
+            )
+
+
+_budget: SpeculationBudget | None = None
+
+
+def get_speculation_budget() -> SpeculationBudget:
+    """Process-wide budget configured from ROUTER_SPECULATION_*."""
+    global _budget
+    if _budget is None:
+        _budget = SpeculationBudget(
+            enabled=os.getenv("ROUTER_SPECULATION_ENABLED", "false").lower() == "true",
+            budget=float(os.getenv("ROUTER_SPECULATION_BUDGET", str(DEFAULT_BUDGET))),
+        )
+    return _budget
+
+
+def set_speculation_budget(budget: SpeculationBudget | None) -> None:
+    """Replace the process-wide budget (tests, custom wiring)."""
+    global _budget
+    _budget = budget
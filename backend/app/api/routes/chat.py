@@ -3,26 +3,51 @@
 POST /api/chat           →  Titan classifier auto-routes to the right agent
 POST /api/chat/housing   →  HousingAgent (direct)
 POST /api/chat/market    →  MarketAgent (direct)
+POST /api/chat/stream    →  unified routing, streamed as server-sent events
 
 All endpoints:
  - Accept a ChatRequest body
- - Run the agent pipeline
- - If the user is authenticated, persist the turn to stored_chats / stored_messages
- - Return a ChatResponse (includes conversation_id so the frontend can continue the thread)
+ - Run the agent pipeline on the event loop (async Bedrock / httpx / asyncpg), so
+   concurrent chats are bounded by upstream latency rather than threadpool size
+ - Replay recent turns of ``conversation_id`` (authenticated users only) as agent
+   context, including the tool results they already fetched
+ - Coalesce identical fresh questions that are in flight at the same time onto one
+   execution (each user's turn is still persisted separately)
+ - Answer fresh questions (no ``conversation_id``) from the semantic answer cache
+   when a near-identical one was answered recently, skipping routing and tools
+ - If the user is authenticated, queue the turn for write-behind persistence to
+   stored_chats / stored_messages (only a new chat's id is fetched before responding)
+ - Return a ChatResponse (includes conversation_id so the frontend can continue the thread);
+   the stream endpoint sends it as its final ``done`` event and persists after closing
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, replace
+from datetime import UTC, datetime
+from typing import Any
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from loguru import logger
+from starlette.background import BackgroundTask
 
+from backend.app.agents.base import AgentResult, EventSink
+from backend.app.agents.context import CONTEXT_MESSAGES
 from backend.app.agents.housing.agent import HousingAgent
 from backend.app.agents.market.agent import MarketAgent
-from backend.app.agents.router import route_question
+from backend.app.agents.router import aroute_question, question_key
 from backend.app.api.schemas import ChatRequest, ChatResponse
 from backend.app.middleware.auth import get_current_user_id
 from backend.app.services import history as hist
-from backend.app.services.history import SENDER_AGENT, SENDER_USER
+from backend.app.services.answer_cache import get_answer_cache
+from backend.app.services.coalesce import question_flight
+from backend.app.services.history import MessageRecord, TurnRecord
+from backend.app.services.history_writer import get_history_writer
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -36,48 +61,153 @@ _market_agent = MarketAgent()
 # ---------------------------------------------------------------------------
 
 
-def _persist_turn(
+async def _persist_turn(
     user_id: int,
     agent_type: str | None,
     question: str,
     chat_request_conv_id: int | None,
-    answer: str,
-    sql_used: str | None,
-    rows_found: int,
-    error: str | None,
-    tool_trace: list[dict] | None,
-    chart_data: dict | None,
+    result: AgentResult,
+    asked_at: datetime,
+    *,
+    reserved_chat_id: int | None = None,
 ) -> int:
-    """Save a user + agent message pair and return the chat_id."""
-    if chat_request_conv_id is not None:
+    """Queue a user + agent message pair for persistence and return the chat_id.
+
+    A new chat only costs one round trip here (reserving its id, unless the caller
+    already did); the chat row and both messages are written later in a single
+    transaction by the history writer.
+    """
+    new_chat = chat_request_conv_id is None
+    if not new_chat:
         chat_id = chat_request_conv_id
+    elif reserved_chat_id is not None:
+        chat_id = reserved_chat_id
     else:
-        title = question[:60] + ("…" if len(question) > 60 else "")
-        chat_id = hist.create_chat(user_id, agent_type, title=title)
-
-    hist.save_message(chat_id, SENDER_USER, question)
-    hist.save_message(
-        chat_id,
-        SENDER_AGENT,
-        answer,
-        metadata={
-            "sql_used": sql_used,
-            "rows_found": rows_found,
-            "error": error,
-            "tool_trace": tool_trace,
-            "chart_data": chart_data,
-        },
+        chat_id = await hist.areserve_chat_id()
+
+    get_history_writer().submit(
+        TurnRecord(
+            user_id=user_id,
+            chat_id=chat_id,
+            question=question,
+            answer=result.answer,
+            metadata={
+                "sql_used": result.sql_used,
+                "rows_found": result.rows_found,
+                "error": result.error,
+                "tool_trace": result.tool_trace,
+                "chart_data": result.chart_data,
+                "tool_context": result.tool_context,
+                "agent_type": agent_type,
+            },
+            asked_at=asked_at,
+            answered_at=datetime.now(UTC),
+            new_chat=new_chat,
+            agent_type=agent_type,
+            title=_chat_title(question) if new_chat else None,
+        )
     )
     return chat_id
 
 
+async def _load_context(
+    user_id: int | None,
+    conversation_id: int | None,
+) -> list[MessageRecord] | None:
+    """Recent messages of the user's conversation, or None for a fresh chat.
+
+    A turn answered moments ago may still be queued in the history writer and is
+    then missing here; the follow-up just runs with a little less context.
+    """
+    if user_id is None or conversation_id is None:
+        return None
+    try:
+        return await hist.aget_recent_messages_for_context(
+            conversation_id, user_id, n=CONTEXT_MESSAGES
+        )
+    except Exception as exc:
+        logger.warning("history context load failed | chat={}: {}", conversation_id, exc)
+        return None
+
+
+async def _answer(
+    body: ChatRequest,
+    run: Callable[[], Awaitable[tuple[str | None, AgentResult]]],
+    *,
+    agent_type: str | None = None,
+    emit: EventSink | None = None,
+) -> tuple[str | None, AgentResult]:
+    """Answer a question without repeating work other requests already do or did.
+
+    Follow-ups on a conversation always ``run``, since their answer depends on the
+    earlier turns. A fresh question joins an identical in-flight one (same
+    ``question_key`` and ``agent_type`` scope), else is served from the answer cache,
+    else runs and is cached. ``agent_type`` scopes the direct agent endpoints. When
+    the answer was not produced by this request's own run, ``emit`` receives the
+    route / chart / token events the run would have sent.
+    """
+    if body.conversation_id is not None:
+        return await run()
+
+    key = f"{agent_type or 'auto'}:{question_key(body.question)}"
+    (resolved, result), shared = await question_flight.run(
+        key, lambda: _cached_or_run(body, run, agent_type=agent_type, emit=emit)
+    )
+    if shared:
+        if emit is not None:
+            _replay(emit, resolved, result)
+        result = replace(result)  # each request gets its own copy
+    return resolved, result
+
+
+async def _cached_or_run(
+    body: ChatRequest,
+    run: Callable[[], Awaitable[tuple[str | None, AgentResult]]],
+    *,
+    agent_type: str | None,
+    emit: EventSink | None,
+) -> tuple[str | None, AgentResult]:
+    cache = get_answer_cache()
+    if not cache.enabled:
+        return await run()
+
+    lookup = await cache.lookup(body.question, agent_type=agent_type)
+    if lookup.hit is not None:
+        cached = AgentResult(**lookup.hit.response)
+        if emit is not None:
+            _replay(emit, lookup.hit.agent_type, cached)
+        return lookup.hit.agent_type, cached
+
+    started = time.perf_counter()
+    resolved, result = await run()
+    cache.store_later(lookup, resolved, asdict(result), time.perf_counter() - started)
+    return resolved, result
+
+
+def _replay(emit: EventSink, agent_type: str | None, result: AgentResult) -> None:
+    """Send the events of a finished answer to a streaming client."""
+    emit("route", {"agent_type": agent_type})
+    if result.chart_data is not None:
+        emit("chart", result.chart_data)
+    emit("token", {"text": result.answer})
+
+
+def _chat_title(question: str) -> str:
+    return question[:60] + ("…" if len(question) > 60 else "")
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 # ---------------------------------------------------------------------------
 # Unified endpoint — Titan Text Lite auto-classifies and routes
 # ---------------------------------------------------------------------------
 
 
 @router.post("", response_model=ChatResponse)
-def unified_chat(
+async def unified_chat(
     body: ChatRequest,
     user_id: int | None = Depends(get_current_user_id),
 ) -> ChatResponse:
@@ -93,22 +223,22 @@ def unified_chat(
     - "What is the current unemployment rate?"
     """
     logger.info("POST /chat (unified) | user={} question={!r}", user_id, body.question)
-    agent_type, result = route_question(body.question)
+    asked_at = datetime.now(UTC)
+    context = await _load_context(user_id, body.conversation_id)
+    agent_type, result = await _answer(
+        body, lambda: aroute_question(body.question, context=context)
+    )
 
     chat_id: int | None = None
     if user_id is not None:
         try:
-            chat_id = _persist_turn(
+            chat_id = await _persist_turn(
                 user_id=user_id,
                 agent_type=agent_type,
                 question=body.question,
                 chat_request_conv_id=body.conversation_id,
-                answer=result.answer,
-                sql_used=result.sql_used,
-                rows_found=result.rows_found,
-                error=result.error,
-                tool_trace=result.tool_trace,
-                chart_data=result.chart_data,
+                result=result,
+                asked_at=asked_at,
             )
         except Exception as exc:
             logger.warning("history save failed (unified/{}): {}", agent_type, exc)
@@ -131,28 +261,30 @@ def unified_chat(
 
 
 @router.post("/housing", response_model=ChatResponse)
-def housing_chat(
+async def housing_chat(
     body: ChatRequest,
     user_id: int | None = Depends(get_current_user_id),
 ) -> ChatResponse:
     """Send a message directly to the Housing & City Agent."""
     logger.info("POST /chat/housing | user={} question={!r}", user_id, body.question)
-    result = _housing_agent.run(body.question)
+    asked_at = datetime.now(UTC)
+    context = await _load_context(user_id, body.conversation_id)
+
+    async def run() -> tuple[str, AgentResult]:
+        return "housing", await _housing_agent.arun(body.question, context=context)
+
+    _, result = await _answer(body, run, agent_type="housing")
 
     chat_id: int | None = None
     if user_id is not None:
         try:
-            chat_id = _persist_turn(
+            chat_id = await _persist_turn(
                 user_id=user_id,
                 agent_type="housing",
                 question=body.question,
                 chat_request_conv_id=body.conversation_id,
-                answer=result.answer,
-                sql_used=result.sql_used,
-                rows_found=result.rows_found,
-                error=result.error,
-                tool_trace=result.tool_trace,
-                chart_data=result.chart_data,
+                result=result,
+                asked_at=asked_at,
             )
         except Exception as exc:
             logger.warning("history save failed (housing): {}", exc)
@@ -175,28 +307,30 @@ def housing_chat(
 
 
 @router.post("/market", response_model=ChatResponse)
-def market_chat(
+async def market_chat(
     body: ChatRequest,
     user_id: int | None = Depends(get_current_user_id),
 ) -> ChatResponse:
     """Send a message directly to the Stock & Market Agent."""
     logger.info("POST /chat/market | user={} question={!r}", user_id, body.question)
-    result = _market_agent.run(body.question)
+    asked_at = datetime.now(UTC)
+    context = await _load_context(user_id, body.conversation_id)
+
+    async def run() -> tuple[str, AgentResult]:
+        return "market", await _market_agent.arun(body.question, context=context)
+
+    _, result = await _answer(body, run, agent_type="market")
 
     chat_id: int | None = None
     if user_id is not None:
         try:
-            chat_id = _persist_turn(
+            chat_id = await _persist_turn(
                 user_id=user_id,
                 agent_type="market",
                 question=body.question,
                 chat_request_conv_id=body.conversation_id,
-                answer=result.answer,
-                sql_used=result.sql_used,
-                rows_found=result.rows_found,
-                error=result.error,
-                tool_trace=result.tool_trace,
-                chart_data=result.chart_data,
+                result=result,
+                asked_at=asked_at,
             )
         except Exception as exc:
             logger.warning("history save failed (market): {}", exc)
@@ -211,3 +345,108 @@ def market_chat(
         tool_trace=result.tool_trace,
         chart_data=result.chart_data,
     )
+
+
+# ---------------------------------------------------------------------------
+# Streaming endpoint (unified routing, server-sent events)
+# ---------------------------------------------------------------------------
+
+
+@router.post("/stream")
+async def stream_chat(
+    body: ChatRequest,
+    user_id: int | None = Depends(get_current_user_id),
+) -> StreamingResponse:
+    """Stream a unified chat turn as server-sent events.
+
+    Events, in order of arrival:
+    - ``route``: ``{"agent_type": "housing" | "market" | null}``
+    - ``tool_start``: ``{"index", "tool", "input"}``, once per toolUse block
+    - ``tool_finish``: ``{"index", "tool", "status", "output_preview" | "error"}``
+    - ``chart``: chart_data, as soon as a tool returns one
+    - ``token``: ``{"text"}``, model text as Bedrock streams it
+    - ``preamble``: ``{"text"}``, the round's ``token`` text so far, sent when that
+      round stops to call tools: it was a preamble, not part of the answer
+    - ``done``: the full ChatResponse; its ``answer`` is authoritative
+
+    A new chat's id is reserved while the agent runs so ``done`` can carry it;
+    the turn is queued for persistence after the stream closes.
+    """
+    logger.info("POST /chat/stream | user={} question={!r}", user_id, body.question)
+    asked_at = datetime.now(UTC)
+    events: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+    turn: dict[str, Any] = {}
+
+    def emit(event: str, data: dict[str, Any]) -> None:
+        events.put_nowait((event, data))
+
+    async def stream() -> AsyncIterator[str]:
+        context = await _load_context(user_id, body.conversation_id)
+        task = asyncio.create_task(
+            _answer(
+                body,
+                lambda: aroute_question(body.question, emit=emit, context=context),
+                emit=emit,
+            )
+        )
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        chat_task: asyncio.Task[int] | None = None
+        try:
+            while (item := await events.get()) is not None:
+                event, data = item
+                if event == "route" and user_id is not None and body.conversation_id is None:
+                    chat_task = asyncio.create_task(hist.areserve_chat_id())
+                yield _sse(event, data)
+
+            try:
+                agent_type, result = task.result()
+            except Exception as exc:
+                logger.exception("chat stream failed | question={!r}", body.question)
+                yield _sse("error", {"error": str(exc)})
+                return
+
+            chat_id = body.conversation_id
+            if chat_task is not None:
+                try:
+                    chat_id = await chat_task
+                except Exception as exc:
+                    logger.warning("history chat id reservation failed (stream): {}", exc)
+            turn.update(agent_type=agent_type, chat_id=chat_id, result=result)
+            response = ChatResponse(
+                answer=result.answer,
+                agent_type=agent_type,
+                conversation_id=chat_id,
+                rows_found=result.rows_found,
+                sql_used=result.sql_used,
+                error=result.error,
+                tool_trace=result.tool_trace,
+                chart_data=result.chart_data,
+            )
+            yield _sse("done", response.model_dump())
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def persist() -> None:
+        if user_id is None or "result" not in turn:
+            return
+        result = turn["result"]
+        try:
+            await _persist_turn(
+                user_id=user_id,
+                agent_type=turn["agent_type"],
+                question=body.question,
+                chat_request_conv_id=body.conversation_id,
+                result=result,
+                asked_at=asked_at,
+                reserved_chat_id=turn["chat_id"],
+            )
+        except Exception as exc:
+            logger.warning("history save failed (stream/{}): {}", turn["agent_type"], exc)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(persist),
+    )
@@ -1,9 +1,20 @@
-"""Health check endpoint."""
+"""Health check endpoints."""
 
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from fastapi import APIRouter
 
+from backend.app.agents.speculation import get_speculation_budget
+from backend.app.services.answer_cache import get_answer_cache
+from backend.app.services.cache import cache_stats
+from backend.app.services.coalesce import question_flight
+from backend.app.services.forecast_prefetch import get_forecast_prefetcher
+from backend.app.services.gazetteer import get_gazetteer
+from backend.app.services.history_writer import get_history_writer
+from backend.database.connect import pool_stats
+
 router = APIRouter(tags=["health"])
 
 
@@ -11,3 +22,55 @@ router = APIRouter(tags=["health"])
 def health_check() -> dict[str, str]:
     """Returns 200 OK. Used by load balancers and monitoring."""
     return {"status": "ok"}
+
+
+@router.get("/health/db-pool")
+def db_pool_health() -> dict[str, dict]:
+    """Connection-pool metrics (size, idle, in-use, waits, recycles) per database."""
+    return {name: asdict(stats) for name, stats in pool_stats().items()}
+
+
+@router.get("/health/live-api-cache")
+def live_api_cache_health() -> dict[str, dict]:
+    """Live-API response cache: size, evictions, and hit/miss counters per endpoint."""
+    stats = cache_stats()
+    return {
+        "backend": stats["backend"],
+        "namespaces": {name: asdict(item) for name, item in stats["namespaces"].items()},
+    }
+
+
+@router.get("/health/history-writer")
+def history_writer_health() -> dict[str, int | bool]:
+    """Chat-history write-behind queue: depth, batches written, spooled and dropped turns."""
+    return asdict(get_history_writer().stats())
+
+
+@router.get("/health/answer-cache")
+def answer_cache_health() -> dict[str, int | float | bool]:
+    """Semantic answer cache: lookups, hit rate, lookup latency and agent time saved."""
+    return asdict(get_answer_cache().stats())
+
+
+@router.get("/health/chat-coalescing")
+def chat_coalescing_health() -> dict[str, int]:
+    """Identical in-flight questions: shared executions and the Bedrock calls they saved."""
+    return asdict(question_flight.stats())
+
+
+@router.get("/health/router-speculation")
+def router_speculation_health() -> dict[str, int | float | bool]:
+    """Speculative agent starts: hit ratio, latency saved and extra Bedrock spend."""
+    return asdict(get_speculation_budget().stats())
+
+
+@router.get("/health/gazetteer")
+def gazetteer_health() -> dict[str, int | bool]:
+    """Offline place index: size, local hits, geocoder fallbacks and answers written back."""
+    return asdict(get_gazetteer().stats())
+
+
+@router.get("/health/weather-prefetch")
+def weather_prefetch_health() -> dict[str, int | bool]:
+    """Forecast prefetcher: grid cells tracked, refresh cycles, cells prefetched and failed."""
+    return asdict(get_forecast_prefetcher().stats())
@@ -3,17 +3,32 @@
 All endpoints require authentication (Bearer JWT).
 
 GET  /api/history/chats                     — list the user's chat sessions
-GET  /api/history/chats/{chat_id}/messages  — get all messages in a chat
+GET  /api/history/chats/{chat_id}/messages  — get a page of messages in a chat
+GET  /api/history/chats/{chat_id}/messages/{message_id}/details
+                                            — one message's tool_trace / chart_data
 PATCH /api/history/chats/{chat_id}/title    — rename a chat
+
+Both list endpoints use keyset pagination: pass the opaque ``before`` / ``after``
+cursor from a previous page. The chat list returns them in the ``X-Page-Before``
+and ``X-Page-After`` response headers (the body stays a plain array); the message
+thread returns them as ``before`` / ``after`` fields.
+
+``?view=summary`` on the message thread leaves the heavy ``tool_trace`` and
+``chart_data`` out of each message's metadata (flagging them as ``has_tool_trace`` /
+``has_chart_data``); load them per message from the ``details`` endpoint when a
+trace or chart is expanded.
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from backend.app.api.schemas import (
     ChatHistoryResponse,
     ChatSummaryResponse,
+    MessageDetailResponse,
     MessageResponse,
     UpdateChatTitleRequest,
 )
@@ -25,16 +40,28 @@ router = APIRouter(prefix="/history", tags=["history"])
 
 @router.get("/chats", response_model=list[ChatSummaryResponse])
 def list_chats(
+    response: Response,
     limit: int = 20,
+    before: str | None = None,
+    after: str | None = None,
     user_id: int = Depends(require_user_id),
 ) -> list[ChatSummaryResponse]:
-    """Return the authenticated user's chat sessions, newest first.
+    """Return one page of the authenticated user's chat sessions, newest first.
 
     Query params:
-        limit — max sessions to return (default 20, max 100)
+        limit  — max sessions to return (default 20, max 100)
+        before — cursor from ``X-Page-Before``: sessions older than the last page
+        after  — cursor from ``X-Page-After``: sessions newer than the last page
     """
-    limit = min(limit, 100)
-    chats = hist.get_user_chats(user_id, limit=limit)
+    limit = max(1, min(limit, 100))
+    try:
+        page = hist.get_user_chats(user_id, limit=limit, before=before, after=after)
+    except hist.InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.before:
+        response.headers["X-Page-Before"] = page.before
+    if page.after:
+        response.headers["X-Page-After"] = page.after
     return [
         ChatSummaryResponse(
             id=c.id,
@@ -42,16 +69,24 @@ def list_chats(
             title=c.title,
             created_at=c.created_at,
         )
-        for c in chats
+        for c in page.items
     ]
 
 
 @router.get("/chats/{chat_id}/messages", response_model=ChatHistoryResponse)
 def get_chat_messages(
     chat_id: int,
+    limit: int = 100,
+    before: str | None = None,
+    after: str | None = None,
+    view: Literal["full", "summary"] = "full",
     user_id: int = Depends(require_user_id),
 ) -> ChatHistoryResponse:
-    """Return all messages in a specific chat session.
+    """Return one page of messages in a chat session, oldest first.
+
+    Without a cursor this is the latest ``limit`` messages (default 100, max 500);
+    follow ``before`` for older messages and ``after`` for newer ones.
+    ``view=summary`` returns only the small metadata keys (see module docstring).
 
     Returns 404 if the chat doesn't exist or belongs to a different user.
     """
@@ -59,7 +94,11 @@ def get_chat_messages(
     if chat is None:
         raise HTTPException(status_code=404, detail="Chat not found")
 
-    messages = hist.get_chat_messages(chat_id)
+    limit = max(1, min(limit, 500))
+    try:
+        page = hist.get_chat_messages(chat_id, limit=limit, before=before, after=after, view=view)
+    except hist.InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return ChatHistoryResponse(
         chat_id=chat.id,
         agent_type=chat.agent_type,
@@ -72,11 +111,36 @@ def get_chat_messages(
                 metadata=m.metadata,
                 created_at=m.created_at,
             )
-            for m in messages
+            for m in page.items
         ],
+        before=page.before,
+        after=page.after,
     )
 
 
+@router.get(
+    "/chats/{chat_id}/messages/{message_id}/details",
+    response_model=MessageDetailResponse,
+)
+def get_message_details(
+    chat_id: int,
+    message_id: int,
+    user_id: int = Depends(require_user_id),
+) -> MessageDetailResponse:
+    """Return the tool trace and chart data of one message.
+
+    Returns 404 if the chat doesn't exist, belongs to a different user, or has no
+    such message.
+    """
+    if hist.get_chat_by_id(chat_id, user_id) is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    details = hist.get_message_details(chat_id, message_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return MessageDetailResponse(id=message_id, **details)
+
+
 @router.patch("/chats/{chat_id}/title", response_model=dict)
 def rename_chat(
     chat_id: int,
@@ -67,12 +67,23 @@ class MessageResponse(BaseModel):
 
 
 class ChatHistoryResponse(BaseModel):
-    """Full thread returned by GET /api/history/chats/{chat_id}/messages."""
+    """One page of a thread returned by GET /api/history/chats/{chat_id}/messages."""
 
     chat_id: int
     agent_type: str | None = None
     title: str | None = None
     messages: list[MessageResponse]
+    # Keyset cursors: pass as ?before= / ?after= for the adjacent page (null = none).
+    before: str | None = None
+    after: str | None = None
+
+
+class MessageDetailResponse(BaseModel):
+    """Heavy metadata of one message, fetched lazily after a ``view=summary`` listing."""
+
+    id: int
+    tool_trace: list[dict] | None = None
+    chart_data: dict | None = None
 
 
 class UpdateChatTitleRequest(BaseModel):
@@ -5,11 +5,21 @@ Start the server:
 
 Endpoints:
     GET   /health                                    — health check
+    GET   /health/db-pool                            — DB connection-pool metrics
+    GET   /health/live-api-cache                     — live-API response-cache metrics
+    GET   /health/history-writer                     — chat-history write-behind queue metrics
+    GET   /health/answer-cache                       — semantic answer-cache hit rate and savings
+    GET   /health/chat-coalescing                    — duplicate in-flight questions coalesced
+    GET   /health/router-speculation                 — speculative agent starts while routing
+    GET   /health/gazetteer                          — offline place index hits and fallbacks
+    GET   /health/weather-prefetch                   — forecast-cache prefetch of popular cities
     POST  /api/chat                                  — Unified agent (auto-routes)
     POST  /api/chat/housing                          — Housing & City Agent
     POST  /api/chat/market                           — Stock & Market Agent
-    GET   /api/history/chats                         — list user's chat sessions
-    GET   /api/history/chats/{id}/messages           — full message thread
+    POST  /api/chat/stream                           — Unified agent, server-sent events
+    GET   /api/history/chats                         — list user's chat sessions (paged)
+    GET   /api/history/chats/{id}/messages           — message thread (paged)
+    GET   /api/history/chats/{id}/messages/{mid}/details — one message's trace / chart
     PATCH /api/history/chats/{id}/title              — rename a chat
 
 Interactive docs (dev only):
@@ -19,6 +29,7 @@ Interactive docs (dev only):
 
 from __future__ import annotations
 
+import asyncio
 import os
 from pathlib import Path
 
@@ -33,6 +44,11 @@ from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 from loguru import logger  # noqa: E402
 
 from backend.app.api.routes import chat, health, history  # noqa: E402
+from backend.app.services import bedrock, live_apis  # noqa: E402
+from backend.app.services.forecast_prefetch import get_forecast_prefetcher  # noqa: E402
+from backend.app.services.history_writer import get_history_writer  # noqa: E402
+from backend.database.connect import close_async_pools, close_pools  # noqa: E402
+from backend.database.migrate import run_migrations  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # App
@@ -62,6 +78,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Page-Before", "X-Page-After"],
 )
 
 # ---------------------------------------------------------------------------
@@ -78,8 +95,27 @@ app.include_router(history.router, prefix="/api")
 @app.on_event("startup")
 async def on_startup() -> None:
     logger.info("Virtual Economist API v{} starting up...", app.version)
+    # Schema changes run here (and in deploy.sh), never on the request path.
+    # Set DB_MIGRATE_ON_STARTUP=false when deploys run migrations separately.
+    if os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() != "false":
+        try:
+            await asyncio.to_thread(run_migrations)
+        except Exception as exc:
+            logger.error("db migrate | startup migration failed: {}", exc)
+    # Builds the Bedrock HTTP clients and resolves AWS credentials before the first request.
+    await bedrock.awarm_up()
+    # Starts the chat-history write-behind worker, replaying any spool left behind.
+    get_history_writer().start()
+    # Refetches the most-asked cities' forecasts after each Open-Meteo model update.
+    get_forecast_prefetcher().start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     logger.info("Virtual Economist API shutting down.")
+    await get_forecast_prefetcher().aclose()
+    await get_history_writer().aclose()
+    await bedrock.aclose_clients()
+    await live_apis.aclose_clients()
+    close_pools()
+    await close_async_pools()
@@ -0,0 +1,338 @@
+"""Semantic answer cache for chat questions.
+
+Each answered question is embedded with Titan and stored in ``answer_cache``
+(pgvector, HNSW cosine index; see migration 5). A new question is embedded and
+looked up by cosine similarity; when the nearest unexpired answer scores at least
+``threshold`` it is returned as-is, skipping routing and the agent's tool loop.
+
+Questions that differ only in their subject ("median rent in Austin" / "...in
+Dallas", an AAPL / MSFT quote) embed almost identically, so similarity alone
+would serve one city's or ticker's numbers for another. A hit must also have the
+same ``question_slots``: the question's content words (places, tickers, company
+names, indicators) and numbers, with filler words dropped and a state code after
+a comma ("Austin, TX") spelled out. Paraphrases that change only the filler
+still hit.
+
+Entries expire according to the data behind them: the shortest lifetime of the
+tools the agent called (a live quote goes stale in a minute, census figures in a
+week). Answers that errored, or that followed earlier turns of a conversation, are
+never stored.
+
+Configuration (environment):
+    ANSWER_CACHE_ENABLED    'false' disables lookups and stores (default true)
+    ANSWER_CACHE_THRESHOLD  minimum cosine similarity for a hit (default 0.95)
+    ANSWER_CACHE_QUOTE_TTL  lifetime of answers built on a live quote (default 60s)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from backend.app.services.bedrock import aembed_text
+from backend.app.services.live_apis import _STATE_ABBR_TO_FIPS, _STATE_FIPS_TO_NAME
+from backend.database.connect import async_db_connection
+
+DEFAULT_THRESHOLD = 0.95
+
+_HOUR = 3600.0
+_DAY = 24 * _HOUR
+
+# Answer lifetime (seconds) by the tool whose data it quotes.
+SOURCE_TTLS: dict[str, float] = {
+    # market
+    "get_stock_quote": float(os.getenv("ANSWER_CACHE_QUOTE_TTL", "60")),
+    "search_ticker": 7 * _DAY,
+    "get_company_profile": _DAY,
+    "get_analyst_recommendations": 12 * _HOUR,
+    "get_economic_indicators": 6 * _HOUR,
+    "screen_companies": _DAY,
+    "get_historical_ohlcv": 12 * _HOUR,
+    "analyze_stock_performance": 12 * _HOUR,
+    # housing
+    "search_housing_inventory": _DAY,
+    "get_city_demographics": 7 * _DAY,
+    "get_fair_market_rent": 7 * _DAY,
+    "get_city_weather": 30 * 60.0,
+    "get_city_season": 7 * _DAY,
+}
+# Tools missing from SOURCE_TTLS, and answers that used no tool at all.
+_UNKNOWN_SOURCE_TTL = 300.0
+_NO_SOURCE_TTL = _DAY
+
+# Expired rows are deleted once every this many stores.
+_PURGE_EVERY = 100
+
+Embed = Callable[[str], Awaitable[list[float]]]
+
+# Words that carry no subject: a question's slots are what remains.
+_FILLER_WORDS = frozenset(
+    """
+    a about all an and any are as at be been can could current currently did do does
+    for from get give going has have how i in into is it its know latest let like look
+    me my now of on please right show some tell than that the their there these this
+    to today up us was we were what whats which will with would you your
+    """.split()
+)
+# "Austin, TX": a state code after a comma (a bare "OR" or "IN" is a word).
+_STATE_CODE_RE = re.compile(r"(?<=,)\s*([A-Z]{2})\b")
+_SLOT_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)*|[^\W\d_]+")
+
+
+def answer_ttl(sources: Iterable[str]) -> float:
+    """Lifetime of an answer built from ``sources`` (tool names): the shortest one."""
+    ttls = [SOURCE_TTLS.get(source, _UNKNOWN_SOURCE_TTL) for source in sources]
+    return min(ttls, default=_NO_SOURCE_TTL)
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(f"{value:.7g}" for value in embedding) + "]"
+
+
+def _spell_state(match: re.Match[str]) -> str:
+    fips = _STATE_ABBR_TO_FIPS.get(match.group(1), "")
+    return " " + _STATE_FIPS_TO_NAME.get(fips, match.group(1))
+
+
+def _slot_token(token: str) -> str:
+    if token[0].isdigit():
+        number = float(token.replace(",", ""))
+        return str(int(number)) if number.is_integer() else repr(number)
+    return token
+
+
+def question_slots(question: str) -> str:
+    """Canonical subject of a question: its sorted content words and numbers.
+
+    "What's the median rent in Austin, TX?" → "austin median rent texas".
+    """
+    text = _STATE_CODE_RE.sub(_spell_state, question)
+    text = re.sub(r"(?i)(\w)['\u2019]s\b", r"\1", text).casefold()
+    tokens = {_slot_token(token) for token in _SLOT_TOKEN_RE.findall(text)}
+    return " ".join(sorted(tokens - _FILLER_WORDS))
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    agent_type: str
+    response: dict[str, Any]  # the stored AgentResult fields
+    similarity: float
+    answer_seconds: float  # how long the original answer took to produce
+
+
+@dataclass
+class AnswerLookup:
+    """Outcome of one lookup; a miss keeps the embedding so store() can reuse it."""
+
+    question: str
+    slots: str = ""
+    hit: CachedAnswer | None = None
+    embedding: list[float] | None = None
+    started: float = field(default_factory=time.perf_counter)
+
+
+@dataclass(frozen=True)
+class AnswerCacheStats:
+    enabled: bool
+    threshold: float
+    lookups: int
+    hits: int
+    misses: int
+    errors: int
+    stores: int
+    hit_rate: float
+    avg_lookup_ms: float
+    saved_seconds: float
+
+
+class AnswerCache:
+    """pgvector-backed question → answer cache with per-source expiry."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        threshold: float = DEFAULT_THRESHOLD,
+        embed: Embed | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.threshold = threshold
+        self._embed = embed
+        self._lock = threading.Lock()
+        self._tasks: set[asyncio.Task[bool]] = set()
+        self._lookups = 0
+        self._hits = 0
+        self._errors = 0
+        self._stores = 0
+        self._lookup_seconds = 0.0
+        self._saved_seconds = 0.0
+
+    async def lookup(self, question: str, *, agent_type: str | None = None) -> AnswerLookup:
+        """Return the closest unexpired answer above the threshold with the same slots.
+
+        ``agent_type`` restricts the search to one agent's answers (direct agent
+        endpoints); None searches all of them (the unified, auto-routed endpoint).
+        Errors count as misses.
+        """
+        lookup = AnswerLookup(question=question.strip(), slots=question_slots(question))
+        try:
+            lookup.embedding = await (self._embed or aembed_text)(lookup.question)
+            async with async_db_connection() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT id, agent_type, response, latency_ms,
+                           1 - (embedding <=> $1::vector) AS similarity
+                    FROM answer_cache
+                    WHERE expires_at > now()
+                      AND question_slots = $2
+                      AND ($3::text IS NULL OR agent_type = $3)
+                    ORDER BY embedding <=> $1::vector
+                    LIMIT 1
+                    """,
+                    _vector_literal(lookup.embedding),
+                    lookup.slots,
+                    agent_type,
+                )
+                if row is not None and row["similarity"] >= self.threshold:
+                    await conn.execute(
+                        "UPDATE answer_cache SET hits = hits + 1 WHERE id = $1", row["id"]
+                    )
+                    response = row["response"]
+                    lookup.hit = CachedAnswer(
+                        agent_type=row["agent_type"],
+                        response=response if isinstance(response, dict) else json.loads(response),
+                        similarity=float(row["similarity"]),
+                        answer_seconds=float(row["latency_ms"]) / 1000.0,
+                    )
+        except Exception as exc:
+            logger.warning("answer cache | lookup failed: {}", exc)
+            with self._lock:
+                self._errors += 1
+
+        elapsed = time.perf_counter() - lookup.started
+        with self._lock:
+            self._lookups += 1
+            self._lookup_seconds += elapsed
+            if lookup.hit is not None:
+                self._hits += 1
+                self._saved_seconds += max(lookup.hit.answer_seconds - elapsed, 0.0)
+        if lookup.hit is not None:
+            logger.info(
+                "answer cache | hit agent={} similarity={:.3f} question={!r}",
+                lookup.hit.agent_type,
+                lookup.hit.similarity,
+                lookup.question,
+            )
+        return lookup
+
+    async def store(
+        self,
+        lookup: AnswerLookup,
+        agent_type: str | None,
+        response: dict[str, Any],
+        elapsed: float,
+    ) -> bool:
+        """Cache ``response`` (AgentResult fields) for the looked-up question.
+
+        Returns whether it was stored.
+        """
+        if lookup.embedding is None or agent_type is None or response.get("error"):
+            return False
+        trace = response.get("tool_trace") or []
+        if any(entry.get("status") == "error" for entry in trace):
+            return False
+        sources = sorted({str(entry.get("tool", "")) for entry in trace})
+        ttl = answer_ttl(sources)
+        try:
+            async with async_db_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO answer_cache
+                        (agent_type, question, question_slots, embedding, response, sources,
+                         latency_ms, expires_at)
+                    VALUES ($1, $2, $3, $4::vector, $5::jsonb, $6::text[], $7,
+                            now() + make_interval(secs => $8))
+                    """,
+                    agent_type,
+                    lookup.question,
+                    lookup.slots,
+                    _vector_literal(lookup.embedding),
+                    json.dumps(response, default=str),
+                    sources,
+                    elapsed * 1000.0,
+                    ttl,
+                )
+                with self._lock:
+                    self._stores += 1
+                    purge = self._stores % _PURGE_EVERY == 0
+                if purge:
+                    await conn.execute("DELETE FROM answer_cache WHERE expires_at <= now()")
+        except Exception as exc:
+            logger.warning("answer cache | store failed: {}", exc)
+            with self._lock:
+                self._errors += 1
+            return False
+        return True
+
+    def store_later(
+        self,
+        lookup: AnswerLookup,
+        agent_type: str | None,
+        response: dict[str, Any],
+        elapsed: float,
+    ) -> None:
+        """Schedule store() without delaying the response."""
+        task = asyncio.get_running_loop().create_task(
+            self.store(lookup, agent_type, response, elapsed)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> AnswerCacheStats:
+        with self._lock:
+            misses = self._lookups - self._hits
+            return AnswerCacheStats(
+                enabled=self.enabled,
+                threshold=self.threshold,
+                lookups=self._lookups,
+                hits=self._hits,
+                misses=misses,
+                errors=self._errors,
+                stores=self._stores,
+                hit_rate=round(self._hits / self._lookups, 4) if self._lookups else 0.0,
+                avg_lookup_ms=(
+                    round(self._lookup_seconds / self._lookups * 1000.0, 2)
+                    if self._lookups
+                    else 0.0
+                ),
+                saved_seconds=round(self._saved_seconds, 3),
+            )
+
+
+_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide cache configured from ANSWER_CACHE_*."""
+    global _cache
+    if _cache is None:
+        _cache = AnswerCache(
+            enabled=os.getenv("ANSWER_CACHE_ENABLED", "true").lower() != "false",
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", str(DEFAULT_THRESHOLD))),
+        )
+    return _cache
+
+
+def set_answer_cache(cache: AnswerCache | None) -> None:
+    """Replace the process-wide cache (tests, custom wiring)."""
+    global _cache
+    _cache = cache
@@ -0,0 +1,501 @@
+"""TTL response cache for external API wrappers.
+
+``ttl_cached(namespace, ttl)`` decorates a sync or async function whose return
+value is JSON-serializable:
+
+  - entries are stored as JSON bytes, so each hit returns a fresh copy and the
+    LRU bound is the real payload size (``LIVE_API_CACHE_MAX_BYTES``)
+  - ``ttl`` is seconds, or a callable taking the wrapped function's arguments
+    (async callables are awaited by async wrappers); ``<= 0`` skips storing
+  - concurrent misses for one key are single-flighted: one caller fetches,
+    the rest wait for its result (or its exception)
+  - per-namespace hit/miss/coalesced counters via :func:`cache_stats`
+  - ``wrapper.cache_clear()`` drops the namespace, like ``functools.lru_cache``
+
+Sync and async twins that share a namespace share entries.
+
+Backends (``LIVE_API_CACHE_BACKEND``):
+  - ``memory`` (default): per-process LRU
+  - ``sqlite``: one WAL-mode SQLite file (``LIVE_API_CACHE_PATH``) shared by
+    every uvicorn worker and script on the host, so each entry is fetched once;
+    async wrappers read and write it in a worker thread, since a locked database
+    can block for up to the 5 s busy timeout
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SQLITE_PATH = Path(tempfile.gettempdir()) / "virtual_economist_live_api_cache.sqlite3"
+
+
+class CacheBackend(Protocol):
+    """Storage for encoded cache entries."""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, payload: bytes, ttl: float) -> None: ...
+
+    def clear(self, prefix: str = "") -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU bounded by total payload bytes."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= self._clock():
+                self._drop(key)
+                self._expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes, ttl: float) -> None:
+        if len(payload) > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self._clock() + ttl, payload)
+            self._bytes += len(payload)
+            while self._bytes > self._max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._drop(key)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _drop(self, key: str) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+
+class SqliteCache:
+    """Cross-process cache in one SQLite file; every worker on the host shares it.
+
+    Expiry uses wall-clock time. The byte bound is enforced every
+    ``prune_every`` writes by dropping expired rows, then the least recently
+    read ones; read times are refreshed at most once a minute per entry.
+    """
+
+    _TOUCH_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_SQLITE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        clock: Callable[[], float] = time.time,
+        prune_every: int = 64,
+    ) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._prune_every = prune_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key         TEXT PRIMARY KEY,
+                    payload     BLOB NOT NULL,
+                    size        INTEGER NOT NULL,
+                    expires_at  REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_entries_accessed_at "
+                "ON cache_entries (accessed_at)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        conn = self._connection()
+        now = self._clock()
+        row = conn.execute(
+            "SELECT payload, expires_at, accessed_at FROM cache_entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        payload, expires_at, accessed_at = row
+        if expires_at <= now:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?",
+                (key, now),
+            )
+            with self._lock:
+                self._expirations += 1
+            return None
+        if now - accessed_at >= self._TOUCH_INTERVAL:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return bytes(payload)
+
+    def set(self, key: str, payload: bytes, ttl: float) -> None:
+        if len(payload) > self._max_bytes:
+            return
+        now = self._clock()
+        self._connection().execute(
+            """
+            INSERT INTO cache_entries (key, payload, size, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                payload = excluded.payload,
+                size = excluded.size,
+                expires_at = excluded.expires_at,
+                accessed_at = excluded.accessed_at
+            """,
+            (key, payload, len(payload), now + ttl, now),
+        )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self._prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired entries, then least recently read ones beyond max_bytes."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?",
+                (self._clock(),),
+            ).rowcount
+            evicted = conn.execute(
+                """
+                DELETE FROM cache_entries WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS kept
+                        FROM cache_entries
+                    )
+                    WHERE kept > ?
+                )
+                """,
+                (self._max_bytes,),
+            ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._expirations += expired
+            self._evictions += evicted
+
+    def clear(self, prefix: str = "") -> None:
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+
+    def stats(self) -> dict[str, int]:
+        entries, size = (
+            self._connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries")
+            .fetchone()
+        )
+        with self._lock:
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self._max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+@dataclass
+class _Counters:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    stores: int = 0
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of one namespace's counters."""
+
+    hits: int
+    misses: int
+    coalesced: int
+    stores: int
+    hit_rate: float
+
+
+class _Flight:
+    """One in-progress sync fetch that other threads can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.payload: bytes | None = None
+        self.error: BaseException | None = None
+
+
+_backend: CacheBackend | None = None
+_backend_lock = threading.Lock()
+_counters: dict[str, _Counters] = {}
+_counters_lock = threading.Lock()
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_async_flights: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Future[bytes]]
+] = weakref.WeakKeyDictionary()
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _backend_from_env()
+        return _backend
+
+
+def _backend_from_env() -> CacheBackend:
+    max_bytes = int(os.getenv("LIVE_API_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+    kind = os.getenv("LIVE_API_CACHE_BACKEND", "memory").strip().lower()
+    if kind == "sqlite":
+        path = os.getenv("LIVE_API_CACHE_PATH") or DEFAULT_SQLITE_PATH
+        return SqliteCache(path, max_bytes)
+    if kind != "memory":
+        raise ValueError(f"Unknown LIVE_API_CACHE_BACKEND: {kind!r}")
+    return MemoryCache(max_bytes)
+
+
+def set_backend(backend: CacheBackend | None) -> None:
+    """Swap the process-wide backend (``None`` restores the default on next use)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def clear_cache() -> None:
+    """Drop all entries (shared ones too, for the sqlite backend) and reset counters."""
+    get_backend().clear()
+    with _counters_lock:
+        _counters.clear()
+
+
+def cache_stats() -> dict[str, Any]:
+    """Backend size/eviction stats plus per-namespace counters."""
+    with _counters_lock:
+        namespaces = {
+            name: CacheStats(
+                hits=counters.hits,
+                misses=counters.misses,
+                coalesced=counters.coalesced,
+                stores=counters.stores,
+                hit_rate=round(counters.hits / max(1, counters.hits + counters.misses), 4),
+            )
+            for name, counters in sorted(_counters.items())
+        }
+    return {"backend": get_backend().stats(), "namespaces": namespaces}
+
+
+def _count(namespace: str, field: str) -> None:
+    with _counters_lock:
+        counters = _counters.setdefault(namespace, _Counters())
+        setattr(counters, field, getattr(counters, field) + 1)
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _decode(payload: bytes) -> Any:
+    return json.loads(payload)
+
+
+def ttl_cached(namespace: str, ttl: float | Callable[..., Any]) -> Callable:
+    """Cache a JSON-returning function under ``namespace`` (see module docstring)."""
+
+    def decorate(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def make_key(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return f"{namespace}:{json.dumps(list(bound.arguments.values()), default=str)}"
+
+        def lookup(key: str) -> bytes | None:
+            payload = get_backend().get(key)
+            _count(namespace, "hits" if payload is not None else "misses")
+            return payload
+
+        def clear_namespace() -> None:
+            get_backend().clear(f"{namespace}:")
+
+        def store(key: str, payload: bytes, seconds: float) -> None:
+            if seconds > 0:
+                get_backend().set(key, payload, seconds)
+                _count(namespace, "stores")
+
+        if inspect.iscoroutinefunction(func):
+
+            async def alookup(key: str) -> bytes | None:
+                backend = get_backend()
+                if not isinstance(backend, SqliteCache):
+                    return lookup(key)
+                payload = await asyncio.to_thread(backend.get, key)
+                _count(namespace, "hits" if payload is not None else "misses")
+                return payload
+
+            async def astore(key: str, payload: bytes, seconds: float) -> None:
+                backend = get_backend()
+                if not isinstance(backend, SqliteCache):
+                    store(key, payload, seconds)
+                elif seconds > 0:
+                    await asyncio.to_thread(backend.set, key, payload, seconds)
+                    _count(namespace, "stores")
+
+            async def resolve_ttl(args: tuple, kwargs: dict) -> float:
+                if not callable(ttl):
+                    return float(ttl)
+                seconds = ttl(*args, **kwargs)
+                if inspect.isawaitable(seconds):
+                    seconds = await seconds
+                return float(seconds)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = make_key(args, kwargs)
+                payload = await alookup(key)
+                if payload is not None:
+                    return _decode(payload)
+
+                flights = _async_flights.setdefault(asyncio.get_running_loop(), {})
+                flight = flights.get(key)
+                if flight is not None:
+                    _count(namespace, "coalesced")
+                    await asyncio.wait([flight])
+                    if flight.cancelled():
+                        return await async_wrapper(*args, **kwargs)
+                    return _decode(flight.result())
+
+                flight = asyncio.get_running_loop().create_future()
+                flights[key] = flight
+                try:
+                    value = await func(*args, **kwargs)
+                    payload = _encode(value)
+                    await astore(key, payload, await resolve_ttl(args, kwargs))
+                    flight.set_result(payload)
+                    return value
+                except asyncio.CancelledError:
+                    flight.cancel()
+                    raise
+                except BaseException as exc:
+                    flight.set_exception(exc)
+                    flight.exception()  # mark retrieved when nobody is waiting
+                    raise
+                finally:
+                    flights.pop(key, None)
+
+            async_wrapper.cache_clear = clear_namespace  # type: ignore[attr-defined]
+            return async_wrapper
+
+        def resolve_sync_ttl(args: tuple, kwargs: dict) -> float:
+            return float(ttl(*args, **kwargs) if callable(ttl) else ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(args, kwargs)
+            payload = lookup(key)
+            if payload is not None:
+                return _decode(payload)
+
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = _Flight()
+            assert flight is not None
+
+            if not leader:
+                _count(namespace, "coalesced")
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                assert flight.payload is not None
+                return _decode(flight.payload)
+
+            try:
+                value = func(*args, **kwargs)
+                flight.payload = _encode(value)
+                store(key, flight.payload, resolve_sync_ttl(args, kwargs))
+                return value
+            except BaseException as exc:
+                flight.error = exc
+                raise
+            finally:
+                with _flights_lock:
+                    _flights.pop(key, None)
+                flight.done.set()
+
+        wrapper.cache_clear = clear_namespace  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate
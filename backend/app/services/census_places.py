@@ -0,0 +1,211 @@
+"""Local index of Census ACS place estimates (``census_places``, migration 6).
+
+Every place in every state is bulk-loaded from the ACS 1-year API by
+``refresh_census_places`` (run periodically by ``scripts/sync_reference_data.py``)
+and keyed by a normalized place name: "Philadelphia city, Pennsylvania" is stored
+under ``philadelphia``. A city question then becomes an indexed point query
+instead of downloading and scanning the whole state, and several cities are
+resolved together in one query.
+
+Lookups try, in order: the exact normalized name, the name without a trailing
+place type ("New York City" → ``new york``), and names that start with it
+("Nashville" → ``nashville davidson``); ties go to the most populous place.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from loguru import logger
+
+from backend.app.services.live_apis import _STATE_FIPS, _census_rows
+from backend.database.connect import db_cursor
+
+ACS_YEAR = 2022
+ACS_VARIABLES = "NAME,B25077_001E,B25064_001E,B19013_001E,B01003_001E"
+
+# State downloads in flight during a refresh (the Census API is rate limited per key).
+_REFRESH_CONCURRENCY = 4
+
+_PLACE_TYPE_RE = re.compile(
+    r"\s+(?:city and borough|consolidated government|metropolitan government|"
+    r"unified government|metro government|urban county|municipality|borough|village|"
+    r"town|city|cdp)$"
+)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(value: str) -> str:
+    return _NON_ALNUM_RE.sub(" ", value.lower()).strip()
+
+
+def place_key(name: str) -> str:
+    """Index key of a Census place NAME ("Boise City city, Idaho" → ``boise city``)."""
+    place = name.rsplit(",", 1)[0] if "," in name else name
+    place = re.sub(r"\s*\(balance\)", "", place.lower()).strip()
+    return _normalize(_PLACE_TYPE_RE.sub("", place))
+
+
+def _query_keys(city: str) -> tuple[str, str]:
+    """Exact key of a user-typed city, plus the key without a trailing place type."""
+    key = _normalize(city)
+    return key, _normalize(_PLACE_TYPE_RE.sub("", key))
+
+
+@dataclass(frozen=True)
+class CensusPlace:
+    state_fips: str
+    place_fips: str
+    name: str
+    median_home_value: str | None
+    median_gross_rent: str | None
+    median_household_income: str | None
+    population: int | None = None
+
+    def snapshot(self) -> dict:
+        """Same shape as ``live_apis.census_city_snapshot``."""
+        return {
+            "place_name": self.name,
+            "median_home_value": self.median_home_value,
+            "median_gross_rent": self.median_gross_rent,
+            "median_household_income": self.median_household_income,
+        }
+
+
+def parse_place_rows(rows: list[list[str]]) -> list[CensusPlace]:
+    """Turn a Census API response (header row first) into places."""
+    if len(rows) < 2:
+        return []
+    index = {column: position for position, column in enumerate(rows[0])}
+
+    def value(row: list[str], column: str) -> str | None:
+        position = index.get(column)
+        return row[position] if position is not None and position < len(row) else None
+
+    places = []
+    for row in rows[1:]:
+        population = value(row, "B01003_001E")
+        places.append(
+            CensusPlace(
+                state_fips=str(value(row, "state") or ""),
+                place_fips=str(value(row, "place") or ""),
+                name=str(value(row, "NAME") or ""),
+                median_home_value=value(row, "B25077_001E"),
+                median_gross_rent=value(row, "B25064_001E"),
+                median_household_income=value(row, "B19013_001E"),
+                population=int(population) if population and population.isdigit() else None,
+            )
+        )
+    return [place for place in places if place.state_fips and place.place_fips and place.name]
+
+
+def lookup_places(queries: Sequence[tuple[str, str]]) -> list[CensusPlace | None]:
+    """Resolve ``(city, state_fips)`` pairs in one query; ``state_fips`` may be ''."""
+    if not queries:
+        return []
+    keys = [_query_keys(city) for city, _ in queries]
+    # Each candidate set is an index probe on place_key: the exact key, the alternate key,
+    # and "key <suffix>" as a byte range (' ' and '!' are adjacent), which text_pattern_ops
+    # can scan where a LIKE pattern built per row could not.
+    with db_cursor() as cur:
+        cur.execute(
+            """
+            SELECT DISTINCT ON (q.idx)
+                   q.idx, p.state_fips, p.place_fips, p.name, p.median_home_value,
+                   p.median_gross_rent, p.median_household_income, p.population
+            FROM unnest(%s::int[], %s::text[], %s::text[], %s::text[])
+                 AS q(idx, key, alt_key, state_fips)
+            CROSS JOIN LATERAL (
+                SELECT c.*, 0 AS rank FROM census_places c WHERE c.place_key = q.key
+                UNION ALL
+                SELECT c.*, 1 FROM census_places c
+                WHERE c.place_key = q.alt_key AND q.alt_key <> q.key
+                UNION ALL
+                SELECT c.*, 2 FROM census_places c
+                WHERE c.place_key ~>=~ (q.key || ' ') AND c.place_key ~<~ (q.key || '!')
+            ) p
+            WHERE q.key <> '' AND (q.state_fips = '' OR p.state_fips = q.state_fips)
+            ORDER BY q.idx, p.rank, p.population DESC NULLS LAST
+            """,
+            (
+                list(range(len(queries))),
+                [key for key, _ in keys],
+                [alt_key for _, alt_key in keys],
+                [state_fips or "" for _, state_fips in queries],
+            ),
+        )
+        rows = cur.fetchall()
+    found: list[CensusPlace | None] = [None] * len(queries)
+    for idx, *fields in rows:
+        found[idx] = CensusPlace(*fields)
+    return found
+
+
+def _copy_rows(places: Iterable[CensusPlace], year: int) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for place in places:
+        writer.writerow(
+            [
+                place.state_fips,
+                place.place_fips,
+                place.name,
+                place_key(place.name),
+                place.median_home_value or "",
+                place.median_gross_rent or "",
+                place.median_household_income or "",
+                "" if place.population is None else place.population,
+                year,
+            ]
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def store_state_places(state_fips: str, places: list[CensusPlace], year: int = ACS_YEAR) -> int:
+    """Replace one state's rows in a single transaction."""
+    with db_cursor() as cur:
+        cur.execute("DELETE FROM census_places WHERE state_fips = %s;", (state_fips,))
+        cur.copy_expert(
+            """
+            COPY census_places (state_fips, place_fips, name, place_key, median_home_value,
+                                median_gross_rent, median_household_income, population,
+                                acs_year)
+            FROM STDIN WITH (FORMAT csv)
+            """,
+            _copy_rows(places, year),
+        )
+    return len(places)
+
+
+def refresh_census_places(
+    state_fips: Iterable[str] | None = None,
+    *,
+    key: str = "",
+    year: int = ACS_YEAR,
+) -> dict[str, int]:
+    """Download and store every place of each state (default: all); returns rows per state.
+
+    A state whose download fails keeps its previous rows.
+    """
+    states = sorted(set(state_fips or _STATE_FIPS.values()))
+
+    def refresh(state: str) -> int:
+        rows = _census_rows(state, key=key, variables=ACS_VARIABLES, year=year)
+        return store_state_places(state, parse_place_rows(rows), year)
+
+    loaded: dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=_REFRESH_CONCURRENCY) as pool:
+        futures = {state: pool.submit(refresh, state) for state in states}
+        for state, future in futures.items():
+            try:
+                loaded[state] = future.result()
+            except Exception as exc:
+                logger.warning("census places | refresh failed state={}: {}", state, exc)
+    logger.info("census places | refreshed states={} places={}", len(loaded), sum(loaded.values()))
+    return loaded
@@ -0,0 +1,103 @@
+"""Single-flight coalescing of identical in-flight chat questions.
+
+When many users ask the same question at once (a market headline breaks), the
+first request runs it and the concurrent duplicates await that one execution and
+share its result instead of each classifying the question and running the agent
+loop. Nothing is cached: once the execution finishes, the next request runs anew.
+
+The leader's Bedrock calls are counted (``bedrock.count_bedrock_calls``), so the
+number of calls the followers did not make is reported by :meth:`SingleFlight.stats`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from loguru import logger
+
+from backend.app.services.bedrock import count_bedrock_calls
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class FlightStats:
+    executions: int
+    coalesced: int
+    in_flight: int
+    bedrock_calls: int
+    bedrock_calls_saved: int
+
+
+class SingleFlight(Generic[T]):
+    """Run one execution per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Future[tuple[T, int]]]
+        ] = weakref.WeakKeyDictionary()
+        self._executions = 0
+        self._coalesced = 0
+        self._bedrock_calls = 0
+        self._bedrock_calls_saved = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller ran it.
+
+        A leader's exception is re-raised to its followers. If the leader is
+        cancelled (its client went away), each follower retries on its own.
+        """
+        loop = asyncio.get_running_loop()
+        flights = self._flights.setdefault(loop, {})
+        flight = flights.get(key)
+        if flight is not None:
+            await asyncio.wait([flight])
+            if flight.cancelled():
+                return await self.run(key, func)
+            value, calls = flight.result()
+            with self._lock:
+                self._coalesced += 1
+                self._bedrock_calls_saved += calls
+            logger.debug("single flight | {} coalesced key={!r} calls={}", self.name, key, calls)
+            return value, True
+
+        flight = loop.create_future()
+        flights[key] = flight
+        try:
+            with count_bedrock_calls() as counter:
+                value = await func()
+            with self._lock:
+                self._executions += 1
+                self._bedrock_calls += counter[0]
+            flight.set_result((value, counter[0]))
+            return value, False
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            flight.exception()  # mark retrieved when nobody is waiting
+            raise
+        finally:
+            flights.pop(key, None)
+
+    def stats(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(
+                executions=self._executions,
+                coalesced=self._coalesced,
+                in_flight=sum(len(flights) for flights in list(self._flights.values())),
+                bedrock_calls=self._bedrock_calls,
+                bedrock_calls_saved=self._bedrock_calls_saved,
+            )
+
+
+# Shared by the chat routes; keyed on agent scope + normalized question.
+question_flight: SingleFlight = SingleFlight("chat_question")
@@ -0,0 +1,173 @@
+"""Background refresh of the most-asked cities' weather forecasts.
+
+``get_city_weather`` records each forecast grid cell it serves. After every
+Open-Meteo model update (when the cached forecasts expire, see
+``live_apis.seconds_until_forecast_update``), one task per event loop refetches
+the ``top_n`` cells with the most recent demand. The next question about a
+popular city is then a cache hit instead of waiting on Open-Meteo. Demand decays
+by half each cycle, so cities that stop being asked about drop out of the set.
+
+With the sqlite cache backend every worker shares the refreshed entries; each
+worker waits a random few seconds past the update so they rarely refetch the
+same cell concurrently.
+
+Configuration (environment):
+    WEATHER_PREFETCH_ENABLED  'false' disables the background task (default true)
+    WEATHER_PREFETCH_TOP_N    grid cells refreshed per model update (default 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from backend.app.services import live_apis
+
+DEFAULT_TOP_N = 20
+
+# Forecast fetches in flight during one refresh.
+_CONCURRENCY = 4
+_MAX_JITTER = 30.0
+_DECAY = 0.5
+_MIN_DEMAND = 0.25
+
+Cell = tuple[float, float, str]
+
+
+@dataclass(frozen=True)
+class PrefetchStats:
+    enabled: bool
+    top_n: int
+    tracked_cells: int
+    cycles: int
+    prefetched: int
+    failed: int
+
+
+def _fetch_forecast(latitude: float, longitude: float, timezone: str) -> object:
+    return live_apis.cached_weather_forecast(
+        latitude, longitude, timezone=timezone, days=live_apis.FORECAST_CACHE_DAYS
+    )
+
+
+class ForecastPrefetcher:
+    """Demand counter per forecast grid cell plus the task that keeps the top cells warm."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        top_n: int = DEFAULT_TOP_N,
+        fetch: Callable[[float, float, str], object] = _fetch_forecast,
+    ) -> None:
+        self.enabled = enabled
+        self.top_n = top_n
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._demand: dict[Cell, float] = {}
+        self._task: asyncio.Task | None = None
+        self._cycles = 0
+        self._prefetched = 0
+        self._failed = 0
+
+    def record(self, latitude: float, longitude: float, timezone: str) -> None:
+        """Count one weather question for the cell containing these coordinates."""
+        cell = (*live_apis.forecast_bucket(latitude, longitude), timezone or "auto")
+        with self._lock:
+            self._demand[cell] = self._demand.get(cell, 0.0) + 1.0
+
+    def top(self) -> list[Cell]:
+        with self._lock:
+            ranked = sorted(self._demand.items(), key=lambda item: item[1], reverse=True)
+        return [cell for cell, _ in ranked[: self.top_n]]
+
+    async def refresh(self) -> int:
+        """Refetch the top cells now, then decay demand; returns cells refreshed."""
+        cells = self.top()
+        semaphore = asyncio.Semaphore(_CONCURRENCY)
+
+        async def fetch(cell: Cell) -> bool:
+            async with semaphore:
+                try:
+                    await asyncio.to_thread(self._fetch, *cell)
+                    return True
+                except Exception as exc:
+                    logger.warning("forecast prefetch | cell={} failed: {}", cell, exc)
+                    return False
+
+        results = await asyncio.gather(*(fetch(cell) for cell in cells))
+        with self._lock:
+            self._demand = {
+                cell: count * _DECAY
+                for cell, count in self._demand.items()
+                if count * _DECAY >= _MIN_DEMAND
+            }
+            self._cycles += 1
+            self._prefetched += sum(results)
+            self._failed += len(results) - sum(results)
+        return sum(results)
+
+    def start(self) -> None:
+        """Start the refresh task on the running loop (idempotent; no-op when disabled)."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="forecast-prefetch")
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            delay = live_apis.seconds_until_forecast_update() + random.uniform(1.0, _MAX_JITTER)
+            await asyncio.sleep(delay)
+            try:
+                refreshed = await self.refresh()
+            except Exception as exc:
+                logger.warning("forecast prefetch | cycle failed: {}", exc)
+                continue
+            if refreshed:
+                logger.info("forecast prefetch | refreshed cells={}", refreshed)
+
+    def stats(self) -> PrefetchStats:
+        with self._lock:
+            return PrefetchStats(
+                enabled=self.enabled,
+                top_n=self.top_n,
+                tracked_cells=len(self._demand),
+                cycles=self._cycles,
+                prefetched=self._prefetched,
+                failed=self._failed,
+            )
+
+
+_prefetcher: ForecastPrefetcher | None = None
+
+
+def get_forecast_prefetcher() -> ForecastPrefetcher:
+    """Process-wide prefetcher configured from WEATHER_PREFETCH_*."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = ForecastPrefetcher(
+            enabled=os.getenv("WEATHER_PREFETCH_ENABLED", "true").lower() != "false",
+            top_n=int(os.getenv("WEATHER_PREFETCH_TOP_N", str(DEFAULT_TOP_N))),
+        )
+    return _prefetcher
+
+
+def set_forecast_prefetcher(prefetcher: ForecastPrefetcher | None) -> None:
+    """Replace the process-wide prefetcher (tests, custom wiring)."""
+    global _prefetcher
+    _prefetcher = prefetcher
@@ -0,0 +1,168 @@
+"""Local store of FRED observations (``fred_observations``, migration 8).
+
+``sync_fred_series`` (run by ``scripts/sync_reference_data.py --datasets fred``)
+fetches each series' full history once. After that it only fetches from the
+last stored date onward (``observation_start``), so a sync is one small request
+per series. The last date is refetched to pick up revisions. Every sync records
+``fresh_until``, the start of the series' next scheduled release (the same
+schedule the live-API cache uses). Until then the store answers for the series.
+
+``live_apis.get_fred_macro_snapshot`` reads the latest values from here and
+fetches only the series that are missing or stale, concurrently.
+``live_apis.get_fred_series_history`` serves multi-year history (10 years of
+MORTGAGE30US) from the same rows.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+from loguru import logger
+
+from backend.app.services.live_apis import (
+    DEFAULT_FRED_SERIES,
+    _fred_series_ttl,
+    fred_observations_since,
+)
+from backend.database.connect import async_db_connection, db_cursor
+
+# Series synced concurrently (FRED allows 120 requests/minute per key).
+_SYNC_CONCURRENCY = 4
+
+_LATEST_SQL = """
+    SELECT s.series_id, o.date, o.value
+    FROM fred_series_sync s
+    CROSS JOIN LATERAL (
+        SELECT date, value
+        FROM fred_observations
+        WHERE series_id = s.series_id AND value <> '.'
+        ORDER BY date DESC
+        LIMIT 1
+    ) o
+    WHERE s.series_id = ANY({series}) AND s.fresh_until > now()
+"""
+
+
+def latest_observations(series_ids: Sequence[str]) -> dict[str, dict]:
+    """Latest non-missing observation of each fresh stored series, keyed by series ID."""
+    with db_cursor() as cur:
+        cur.execute(_LATEST_SQL.format(series="%s"), (list(series_ids),))
+        rows = cur.fetchall()
+    return {series_id: {"date": day.isoformat(), "value": value} for series_id, day, value in rows}
+
+
+async def alatest_observations(series_ids: Sequence[str]) -> dict[str, dict]:
+    """Async twin of latest_observations()."""
+    async with async_db_connection() as conn:
+        rows = await conn.fetch(_LATEST_SQL.format(series="$1::text[]"), list(series_ids))
+    return {
+        row["series_id"]: {"date": row["date"].isoformat(), "value": row["value"]} for row in rows
+    }
+
+
+def month_end_history(series_id: str, start: str) -> list[dict] | None:
+    """Last observation of each month since ``start``; None unless the series is fresh here."""
+    with db_cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM fred_series_sync WHERE series_id = %s AND fresh_until > now();",
+            (series_id,),
+        )
+        if cur.fetchone() is None:
+            return None
+        cur.execute(
+            """
+            SELECT DISTINCT ON (date_trunc('month', date)) date, value
+            FROM fred_observations
+            WHERE series_id = %s AND date >= %s AND value <> '.'
+            ORDER BY date_trunc('month', date), date DESC
+            """,
+            (series_id, start),
+        )
+        rows = cur.fetchall()
+    return [{"date": day.isoformat(), "value": value} for day, value in rows]
+
+
+def _copy_rows(series_id: str, observations: Iterable[dict]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for observation in observations:
+        writer.writerow([series_id, observation["date"], observation["value"]])
+    buffer.seek(0)
+    return buffer
+
+
+def store_observations(series_id: str, observations: list[dict], fresh_for: float) -> int:
+    """Upsert observations and mark the series fresh for ``fresh_for`` seconds."""
+    fresh_until = datetime.now(UTC) + timedelta(seconds=fresh_for)
+    last = max((observation["date"] for observation in observations), default=None)
+    with db_cursor() as cur:
+        if observations:
+            cur.execute(
+                """
+                CREATE TEMP TABLE fred_observations_stage (series_id TEXT, date DATE, value TEXT)
+                ON COMMIT DROP;
+                """
+            )
+            cur.copy_expert(
+                "COPY fred_observations_stage FROM STDIN WITH (FORMAT csv)",
+                _copy_rows(series_id, observations),
+            )
+            cur.execute(
+                """
+                INSERT INTO fred_observations (series_id, date, value)
+                SELECT series_id, date, value FROM fred_observations_stage
+                ON CONFLICT (series_id, date) DO UPDATE SET value = EXCLUDED.value;
+                """
+            )
+        cur.execute(
+            """
+            INSERT INTO fred_series_sync (series_id, last_observation, synced_at, fresh_until)
+            VALUES (%s, %s, now(), %s)
+            ON CONFLICT (series_id) DO UPDATE
+            SET last_observation = GREATEST(
+                    fred_series_sync.last_observation, EXCLUDED.last_observation
+                ),
+                synced_at = EXCLUDED.synced_at,
+                fresh_until = EXCLUDED.fresh_until;
+            """,
+            (series_id, last, fresh_until),
+        )
+    return len(observations)
+
+
+def _last_stored_date(series_id: str) -> str | None:
+    with db_cursor() as cur:
+        cur.execute(
+            "SELECT last_observation FROM fred_series_sync WHERE series_id = %s;", (series_id,)
+        )
+        row = cur.fetchone()
+    return row[0].isoformat() if row and row[0] else None
+
+
+def sync_series(series_id: str) -> int:
+    """Fetch what is new since the last stored date (full history the first time)."""
+    start = _last_stored_date(series_id)
+    observations = fred_observations_since(series_id, start)
+    return store_observations(series_id, observations, _fred_series_ttl(series_id))
+
+
+def sync_fred_series(series_ids: Iterable[str] | None = None) -> dict[str, int]:
+    """Incrementally sync each series (default: the agents' series); returns rows per series.
+
+    A series whose fetch fails keeps its rows and goes stale at its old ``fresh_until``.
+    """
+    ids = list(dict.fromkeys(series_ids or DEFAULT_FRED_SERIES))
+    synced: dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=_SYNC_CONCURRENCY) as pool:
+        futures = {series_id: pool.submit(sync_series, series_id) for series_id in ids}
+        for series_id, future in futures.items():
+            try:
+                synced[series_id] = future.result()
+            except Exception as exc:
+                logger.warning("fred store | sync failed series={}: {}", series_id, exc)
+    logger.info("fred store | synced series={} rows={}", len(synced), sum(synced.values()))
+    return synced
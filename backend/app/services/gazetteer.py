@@ -0,0 +1,302 @@
+"""Offline gazetteer of U.S. places for the weather and season tools.
+
+Resolving a city to coordinates and a timezone used to be one Open-Meteo
+geocoding request per tool call. ``build_gazetteer`` now turns the GeoNames
+``cities1000`` dump into a fixed-width NumPy record array sorted by normalized
+name (``places.npy``) plus a small ``meta.json``. ``scripts/sync_reference_data.py
+--datasets places`` runs it. The array is opened with ``mmap_mode="r"``, so every
+worker shares the same page-cache copy, and a lookup is a binary search over the
+name column.
+
+Candidates are places named exactly like the query or starting with it, limited
+to the requested state. They are shaped like Open-Meteo results and ranked with
+the same ``_score_weather_geocode_result`` scoring; ties go to the larger
+population. Queries the gazetteer cannot answer go to Open-Meteo. Its answer is
+appended to ``overlay.jsonl`` next to the index, which is consulted before the
+network on later lookups, by this and every other worker. The overlay works
+without the index: until ``places.npy`` has been built, every new city costs one
+Open-Meteo request and repeats are answered from the overlay.
+
+Configuration (environment):
+    GAZETTEER_PATH   index directory (default backend/data/us_places)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from backend.app.services.live_apis import (
+    _STATE_ABBR_TO_FIPS,
+    _STATE_FIPS,
+    _STATE_FIPS_TO_NAME,
+    _normalize_place_text,
+    _score_weather_geocode_result,
+)
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).resolve().parents[2] / "data" / "us_places"
+
+_KEY_BYTES = 40
+_NAME_BYTES = 48
+# Prefix matches considered per lookup ("san" alone would otherwise rank hundreds).
+_MAX_PREFIX_CANDIDATES = 64
+
+PLACE_DTYPE = np.dtype(
+    [
+        ("key", f"S{_KEY_BYTES}"),
+        ("name", f"S{_NAME_BYTES}"),
+        ("state_fips", "u1"),
+        ("latitude", "f4"),
+        ("longitude", "f4"),
+        ("population", "u4"),
+        ("timezone", "u2"),
+        ("feature_code", "S6"),
+    ]
+)
+
+
+def _key_bytes(value: str) -> bytes:
+    return _normalize_place_text(value).encode()[:_KEY_BYTES]
+
+
+def _overlay_key(city_name: str, state_name: str) -> str:
+    return f"{_normalize_place_text(city_name)}|{_normalize_place_text(state_name)}"
+
+
+def parse_geonames(lines: Iterable[str]) -> Iterator[dict]:
+    """U.S. populated places from a GeoNames dump (``cities1000.txt`` or ``US.txt``)."""
+    for line in lines:
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) < 18 or fields[8] != "US" or fields[6] != "P":
+            continue
+        state_fips = _STATE_ABBR_TO_FIPS.get(fields[10])
+        if not state_fips:
+            continue
+        yield {
+            "name": fields[1],
+            "ascii_name": fields[2],
+            "state_fips": int(state_fips),
+            "latitude": float(fields[4]),
+            "longitude": float(fields[5]),
+            "population": int(fields[14] or 0),
+            "timezone": fields[17],
+            "feature_code": fields[7],
+        }
+
+
+def build_gazetteer(places: Iterable[dict], path: Path | str) -> int:
+    """Write the index for ``places`` (``parse_geonames`` rows) to ``path``.
+
+    Files are replaced atomically; running workers keep their current mapping.
+    ``overlay.jsonl`` is left as is.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    timezones: dict[str, int] = {}
+    records = []
+    for place in places:
+        tz = timezones.setdefault(place["timezone"], len(timezones))
+        keys = {_key_bytes(place["name"]), _key_bytes(place.get("ascii_name") or place["name"])}
+        for key in keys - {b""}:
+            records.append(
+                (
+                    key,
+                    place["name"].encode()[:_NAME_BYTES],
+                    place["state_fips"],
+                    place["latitude"],
+                    place["longitude"],
+                    place["population"],
+                    tz,
+                    place["feature_code"].encode()[:6],
+                )
+            )
+    array = np.array(records, dtype=PLACE_DTYPE)
+    # By name, then most populous first, so equal scores keep population order.
+    array = array[np.lexsort((-array["population"].astype(np.int64), array["key"]))]
+
+    with open(path / "places.npy.tmp", "wb") as handle:
+        np.save(handle, array)
+    meta = {"timezones": list(timezones), "places": len(array)}
+    (path / "meta.json.tmp").write_text(json.dumps(meta))
+    os.replace(path / "places.npy.tmp", path / "places.npy")
+    os.replace(path / "meta.json.tmp", path / "meta.json")
+    return len(array)
+
+
+@dataclass(frozen=True)
+class GazetteerStats:
+    loaded: bool
+    places: int
+    overlay_entries: int
+    hits: int
+    overlay_hits: int
+    misses: int
+    written_back: int
+
+
+class Gazetteer:
+    """Memory-mapped place index plus the write-back overlay of geocoder answers."""
+
+    def __init__(self, path: Path | str | None) -> None:
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._places: np.ndarray | None = None
+        self._timezones: list[str] = []
+        self._overlay: dict[str, dict] = {}
+        self._overlay_size = 0
+        self._hits = 0
+        self._overlay_hits = 0
+        self._misses = 0
+        self._written_back = 0
+        if self.path is not None and (self.path / "places.npy").exists():
+            try:
+                self._places = np.load(self.path / "places.npy", mmap_mode="r")
+                self._timezones = json.loads((self.path / "meta.json").read_text())["timezones"]
+            except Exception as exc:
+                logger.warning("gazetteer | failed to load path={}: {}", self.path, exc)
+                self._places = None
+        elif self.path is not None:
+            logger.info("gazetteer | no index at path={}; using overlay and geocoder", self.path)
+
+    @property
+    def loaded(self) -> bool:
+        return self._places is not None
+
+    def _result(self, row: np.void) -> dict:
+        state_name = _STATE_FIPS_TO_NAME.get(f"{int(row['state_fips']):02d}", "")
+        return {
+            "name": row["name"].decode(),
+            "admin1": state_name,
+            "country_code": "US",
+            "latitude": round(float(row["latitude"]), 5),
+            "longitude": round(float(row["longitude"]), 5),
+            "timezone": self._timezones[int(row["timezone"])],
+            "feature_code": row["feature_code"].decode(),
+            "population": int(row["population"]),
+        }
+
+    def candidates(self, city_name: str, state_name: str = "") -> list[dict]:
+        """Places named ``city_name`` or starting with it, in ``state_name`` if given."""
+        if self._places is None:
+            return []
+        key = _key_bytes(city_name)
+        if not key:
+            return []
+        keys = self._places["key"]
+        start = int(np.searchsorted(keys, key, side="left"))
+        exact_end = int(np.searchsorted(keys, key, side="right"))
+        prefix_end = int(np.searchsorted(keys, key + b" \xff", side="right"))
+        prefix_end = min(prefix_end, exact_end + _MAX_PREFIX_CANDIDATES)
+        rows = self._places[start:prefix_end]
+        state_fips = _STATE_FIPS.get(state_name.strip(), "")
+        if state_fips:
+            rows = rows[rows["state_fips"] == int(state_fips)]
+        return [self._result(row) for row in rows]
+
+    def lookup(self, city_name: str, state_name: str = "") -> dict | None:
+        """Best local match for a city, or None when only the geocoder can answer."""
+        ranked = sorted(
+            self.candidates(city_name, state_name),
+            key=lambda item: _score_weather_geocode_result(city_name, state_name, item),
+            reverse=True,
+        )
+        if ranked:
+            with self._lock:
+                self._hits += 1
+            return ranked[0]
+        remembered = self._overlay_entries().get(_overlay_key(city_name, state_name))
+        with self._lock:
+            if remembered is not None:
+                self._overlay_hits += 1
+            else:
+                self._misses += 1
+        return remembered
+
+    def remember(self, city_name: str, state_name: str, result: dict) -> None:
+        """Record a geocoder answer so the next lookup for this query stays local."""
+        if self.path is None:
+            return
+        key = _overlay_key(city_name, state_name)
+        line = (json.dumps({"query": key, "result": result}) + "\n").encode()
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            # One short O_APPEND write per entry: safe with several workers appending.
+            with open(self.path / "overlay.jsonl", "ab") as handle:
+                start = handle.tell()
+                handle.write(line)
+                handle.flush()
+                end = handle.tell()
+        except OSError as exc:
+            logger.warning("gazetteer | overlay write failed: {}", exc)
+            return
+        with self._lock:
+            self._overlay[key] = result
+            self._written_back += 1
+            # Our own line needs no re-read unless another worker's lines landed around it.
+            if start == self._overlay_size and end == start + len(line):
+                self._overlay_size = end
+
+    def _overlay_entries(self) -> dict[str, dict]:
+        """Overlay entries, reading only lines other workers appended since the last call."""
+        if self.path is None:
+            return self._overlay
+        try:
+            size = (self.path / "overlay.jsonl").stat().st_size
+        except OSError:
+            return self._overlay
+        with self._lock:
+            if size == self._overlay_size:
+                return self._overlay
+            if size < self._overlay_size:
+                # Truncated or replaced: start over from the top.
+                self._overlay = {}
+                self._overlay_size = 0
+            with open(self.path / "overlay.jsonl", "rb") as handle:
+                handle.seek(self._overlay_size)
+                chunk = handle.read(size - self._overlay_size)
+            # A line still being written by another worker is picked up next time.
+            complete = chunk[: chunk.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._overlay[entry["query"]] = entry["result"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+            self._overlay_size += len(complete)
+            return self._overlay
+
+    def stats(self) -> GazetteerStats:
+        with self._lock:
+            return GazetteerStats(
+                loaded=self.loaded,
+                places=0 if self._places is None else len(self._places),
+                overlay_entries=len(self._overlay),
+                hits=self._hits,
+                overlay_hits=self._overlay_hits,
+                misses=self._misses,
+                written_back=self._written_back,
+            )
+
+
+_gazetteer: Gazetteer | None = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer loaded from GAZETTEER_PATH."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(os.getenv("GAZETTEER_PATH") or DEFAULT_GAZETTEER_PATH)
+    return _gazetteer
+
+
+def set_gazetteer(gazetteer: Gazetteer | None) -> None:
+    """Replace the process-wide gazetteer (tests, custom wiring)."""
+    global _gazetteer
+    _gazetteer = gazetteer
@@ -2,7 +2,9 @@
 
 CRUD layer for stored_chats and stored_messages.
 All functions use the db_cursor() context manager from connect.py so
-connections are properly managed (commit / rollback / close).
+connections are properly managed (commit / rollback / close).  The ``a``-prefixed
+variants are used by the asyncio request path and go through asyncpg instead.
+Table DDL lives in backend/database/migrate.py and runs at startup, not here.
 
 Sender encoding (stored_messages.sender is an INT column per schema):
     SENDER_USER  = 0  — message typed by the human user
@@ -11,14 +13,16 @@ Sender encoding (stored_messages.sender is an INT column per schema):
 
 from __future__ import annotations
 
+import base64
+import binascii
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from functools import lru_cache
+from typing import Generic, TypeVar
 
 from loguru import logger
 
-from backend.database.connect import db_cursor
+from backend.database.connect import async_db_connection, db_cursor
 
 # ---------------------------------------------------------------------------
 # Sender constants  (match the INT CHECK constraint in the schema)
@@ -27,109 +31,6 @@ SENDER_USER: int = 0
 SENDER_AGENT: int = 1
 
 
-@lru_cache(maxsize=1)
-def ensure_history_schema() -> None:
-    """Repair older history tables so the current API can persist chats safely."""
-    with db_cursor() as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS stored_chats (
-                id SERIAL PRIMARY KEY,
-                user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                agent_type TEXT CHECK (agent_type IN ('housing', 'market')),
-                title TEXT
-            )
-            """
-        )
-        cur.execute("ALTER TABLE stored_chats ADD COLUMN IF NOT EXISTS agent_type TEXT")
-        cur.execute("ALTER TABLE stored_chats ADD COLUMN IF NOT EXISTS title TEXT")
-        cur.execute(
-            """
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1
-                    FROM information_schema.columns
-                    WHERE table_name = 'stored_chats' AND column_name = 'users_id'
-                ) THEN
-                    ALTER TABLE stored_chats ALTER COLUMN users_id DROP NOT NULL;
-                END IF;
-            END
-            $$;
-            """
-        )
-        cur.execute("CREATE SEQUENCE IF NOT EXISTS stored_chats_id_seq")
-        cur.execute(
-            """
-            SELECT setval(
-                'stored_chats_id_seq',
-                COALESCE((SELECT MAX(id) FROM stored_chats), 0) + 1,
-                false
-            )
-            """
-        )
-        cur.execute(
-            "ALTER TABLE stored_chats ALTER COLUMN id SET DEFAULT nextval('stored_chats_id_seq')"
-        )
-        cur.execute(
-            "ALTER TABLE stored_chats ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP"
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS stored_messages (
-                id SERIAL PRIMARY KEY,
-                chat_id INT NOT NULL REFERENCES stored_chats(id) ON DELETE CASCADE,
-                sender INT NOT NULL CHECK (sender IN (0, 1)),
-                message TEXT NOT NULL,
-                metadata JSONB NOT NULL DEFAULT '{}',
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
-        cur.execute(
-            """
-            ALTER TABLE stored_messages
-            ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'
-            """
-        )
-        cur.execute(
-            """
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1
-                    FROM information_schema.columns
-                    WHERE table_name = 'stored_messages' AND column_name = 'embedding'
-                ) THEN
-                    ALTER TABLE stored_messages ALTER COLUMN embedding DROP NOT NULL;
-                END IF;
-            END
-            $$;
-            """
-        )
-        cur.execute("CREATE SEQUENCE IF NOT EXISTS stored_messages_id_seq")
-        cur.execute(
-            """
-            SELECT setval(
-                'stored_messages_id_seq',
-                COALESCE((SELECT MAX(id) FROM stored_messages), 0) + 1,
-                false
-            )
-            """
-        )
-        cur.execute(
-            """
-            ALTER TABLE stored_messages
-            ALTER COLUMN id SET DEFAULT nextval('stored_messages_id_seq')
-            """
-        )
-        cur.execute(
-            "ALTER TABLE stored_messages ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP"
-        )
-    logger.debug("history | ensured schema compatibility")
-
-
 # ---------------------------------------------------------------------------
 # Data-transfer objects
 # ---------------------------------------------------------------------------
@@ -155,6 +56,101 @@ class MessageRecord:
     created_at: datetime
 
 
+@dataclass
+class TurnRecord:
+    """One chat turn (question + answer) queued for write-behind persistence.
+
+    ``new_chat`` turns also insert their stored_chats row, using the id reserved
+    by areserve_chat_id() while the request was in flight.
+    """
+
+    user_id: int
+    chat_id: int
+    question: str
+    answer: str
+    metadata: dict
+    asked_at: datetime
+    answered_at: datetime
+    new_chat: bool = False
+    agent_type: str | None = None
+    title: str | None = None
+    attempts: int = 0  # failed integrity-checked writes (see history_writer)
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """One keyset page. Cursors are opaque tokens; None means no rows that way."""
+
+    items: list[T] = field(default_factory=list)
+    before: str | None = None  # pass as ``before=`` to get the adjacent older rows
+    after: str | None = None  # pass as ``after=`` to get the adjacent newer rows
+
+
+# ---------------------------------------------------------------------------
+# Keyset pagination
+#
+# Pages are ordered by (created_at, id) and seek with a row comparison, which the
+# (user_id, created_at, id) / (chat_id, created_at, id) indexes (migration 4)
+# answer with one index range scan, so page N costs the same as page 1.
+# ---------------------------------------------------------------------------
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a malformed pagination cursor (or both before and after)."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError(f"invalid cursor: {token!r}") from exc
+
+
+def _fetch_keyset_page(
+    select_sql: str,
+    params: tuple,
+    limit: int,
+    before: str | None,
+    after: str | None,
+) -> tuple[list[tuple], bool, bool]:
+    """Run ``select_sql`` (ending in a WHERE clause) as one keyset page.
+
+    Returns rows in ascending (created_at, id) order and whether older / newer
+    rows exist beyond them. Without a cursor the newest ``limit`` rows are read.
+    """
+    if before and after:
+        raise InvalidCursorError("pass either before or after, not both")
+    if after:
+        sql = (
+            f"{select_sql} AND (created_at, id) > (%s, %s) ORDER BY created_at ASC, id ASC LIMIT %s"
+        )
+        params = (*params, *decode_cursor(after), limit + 1)
+    else:
+        seek = " AND (created_at, id) < (%s, %s)" if before else ""
+        sql = f"{select_sql}{seek} ORDER BY created_at DESC, id DESC LIMIT %s"
+        params = (*params, *(decode_cursor(before) if before else ()), limit + 1)
+
+    with db_cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after:
+        return rows, True, has_more
+    return rows[::-1], has_more, before is not None
+
+
 # ---------------------------------------------------------------------------
 # Chat (session) operations
 # ---------------------------------------------------------------------------
@@ -171,7 +167,6 @@ def create_chat(user_id: int, agent_type: str | None = None, title: str | None =
     Returns:
         The new chat's integer ID.
     """
-    ensure_history_schema()
     with db_cursor() as cur:
         cur.execute(
             """
@@ -187,31 +182,36 @@ def create_chat(user_id: int, agent_type: str | None = None, title: str | None =
     return chat_id
 
 
-def get_user_chats(user_id: int, limit: int = 20) -> list[ChatSummary]:
-    """Return a user's chat sessions, most recent first.
+def get_user_chats(
+    user_id: int,
+    limit: int = 20,
+    *,
+    before: str | None = None,
+    after: str | None = None,
+) -> Page[ChatSummary]:
+    """Return one page of a user's chat sessions, most recent first.
 
     Args:
         user_id: The authenticated user's ID.
         limit:   Max number of sessions to return (default 20).
+        before:  Cursor from a previous page — return the sessions older than it.
+        after:   Cursor from a previous page — return the sessions newer than it.
 
     Returns:
-        List of ChatSummary ordered by created_at DESC.
+        Page of ChatSummary ordered by created_at DESC, with neighbouring cursors.
     """
-    ensure_history_schema()
-    with db_cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, user_id, agent_type, title, created_at
-            FROM stored_chats
-            WHERE user_id = %s
-            ORDER BY created_at DESC
-            LIMIT %s
-            """,
-            (user_id, limit),
-        )
-        rows = cur.fetchall()
-
-    return [
+    rows, has_older, has_newer = _fetch_keyset_page(
+        """
+        SELECT id, user_id, agent_type, title, created_at
+        FROM stored_chats
+        WHERE user_id = %s
+        """,
+        (user_id,),
+        limit,
+        before,
+        after,
+    )
+    chats = [
         ChatSummary(
             id=r[0],
             user_id=r[1],
@@ -219,8 +219,13 @@ def get_user_chats(user_id: int, limit: int = 20) -> list[ChatSummary]:
             title=r[3],
             created_at=r[4],
         )
-        for r in rows
+        for r in reversed(rows)
     ]
+    return Page(
+        items=chats,
+        before=encode_cursor(chats[-1].created_at, chats[-1].id) if chats and has_older else None,
+        after=encode_cursor(chats[0].created_at, chats[0].id) if chats and has_newer else None,
+    )
 
 
 def get_chat_by_id(chat_id: int, user_id: int) -> ChatSummary | None:
@@ -228,7 +233,6 @@ def get_chat_by_id(chat_id: int, user_id: int) -> ChatSummary | None:
 
     Returns None if not found or the chat belongs to a different user.
     """
-    ensure_history_schema()
     with db_cursor() as cur:
         cur.execute(
             """
@@ -253,7 +257,6 @@ def get_chat_by_id(chat_id: int, user_id: int) -> ChatSummary | None:
 
 def update_chat_title(chat_id: int, user_id: int, title: str) -> bool:
     """Update the display title for a chat.  Returns True if updated."""
-    ensure_history_schema()
     with db_cursor() as cur:
         cur.execute(
             """
@@ -288,7 +291,6 @@ def save_message(
     Returns:
         The new message's integer ID.
     """
-    ensure_history_schema()
     with db_cursor() as cur:
         cur.execute(
             """
@@ -304,31 +306,169 @@ def save_message(
     return msg_id
 
 
-def get_chat_messages(chat_id: int, limit: int = 100) -> list[MessageRecord]:
-    """Return all messages for a chat in chronological (oldest-first) order.
+async def acreate_chat(
+    user_id: int,
+    agent_type: str | None = None,
+    title: str | None = None,
+) -> int:
+    """Async create_chat() for the asyncio request path."""
+    async with async_db_connection() as conn:
+        chat_id: int = await conn.fetchval(
+            """
+            INSERT INTO stored_chats (user_id, agent_type, title)
+            VALUES ($1, $2, $3)
+            RETURNING id
+            """,
+            user_id,
+            agent_type,
+            title,
+        )
+    logger.debug("history | created chat id={} user={}", chat_id, user_id)
+    return chat_id
+
+
+async def asave_message(
+    chat_id: int,
+    sender: int,
+    message: str,
+    metadata: dict | None = None,
+) -> int:
+    """Async save_message() for the asyncio request path."""
+    async with async_db_connection() as conn:
+        msg_id: int = await conn.fetchval(
+            """
+            INSERT INTO stored_messages (chat_id, sender, message, metadata)
+            VALUES ($1, $2, $3, $4::jsonb)
+            RETURNING id
+            """,
+            chat_id,
+            sender,
+            message,
+            json.dumps(metadata or {}),
+        )
+    logger.debug("history | saved message id={} chat={} sender={}", msg_id, chat_id, sender)
+    return msg_id
+
+
+async def areserve_chat_id() -> int:
+    """Allocate a stored_chats id without writing the row (see asave_turns)."""
+    async with async_db_connection() as conn:
+        chat_id: int = await conn.fetchval("SELECT nextval('stored_chats_id_seq')")
+    return chat_id
+
+
+# One statement per batch: new chat rows, then a user + agent message per turn.
+# Data-modifying CTEs share the statement, and the FK check on stored_messages
+# runs at statement end, so new chats and their first messages land together.
+_SAVE_TURNS_SQL = """
+WITH turns AS (
+    SELECT *
+    FROM unnest(
+        $1::int[], $2::int[], $3::bool[], $4::text[], $5::text[],
+        $6::text[], $7::text[], $8::jsonb[], $9::timestamptz[], $10::timestamptz[]
+    ) AS t(
+        user_id, chat_id, new_chat, agent_type, title,
+        question, answer, metadata, asked_at, answered_at
+    )
+),
+new_chats AS (
+    INSERT INTO stored_chats (id, user_id, agent_type, title, created_at)
+    SELECT chat_id, user_id, agent_type, title, asked_at
+    FROM turns
+    WHERE new_chat
+    ON CONFLICT (id) DO NOTHING
+)
+INSERT INTO stored_messages (chat_id, sender, message, metadata, created_at)
+SELECT t.chat_id, m.sender, m.message, m.metadata, m.created_at
+FROM turns AS t
+CROSS JOIN LATERAL (
+    VALUES
+        (0, t.question, '{}'::jsonb, t.asked_at),  -- SENDER_USER
+        (1, t.answer, t.metadata, t.answered_at)  -- SENDER_AGENT
+) AS m(sender, message, metadata, created_at)
+"""
+
+
+async def asave_turns(turns: list[TurnRecord]) -> None:
+    """Persist whole turns (optional new chat + both messages) in one round trip.
+
+    Messages keep the request's own timestamps, so turns replayed later from the
+    write-behind spool still sort where they happened.
+    """
+    if not turns:
+        return
+    async with async_db_connection() as conn:
+        await conn.execute(
+            _SAVE_TURNS_SQL,
+            [t.user_id for t in turns],
+            [t.chat_id for t in turns],
+            [t.new_chat for t in turns],
+            [t.agent_type for t in turns],
+            [t.title for t in turns],
+            [t.question for t in turns],
+            [t.answer for t in turns],
+            [json.dumps(t.metadata) for t in turns],
+            [t.asked_at for t in turns],
+            [t.answered_at for t in turns],
+        )
+    logger.debug("history | saved turns={} chats={}", len(turns), {t.chat_id for t in turns})
+
+
+# Metadata projections for get_chat_messages(view=...). "summary" keeps only the
+# small keys (plus flags for the heavy ones) so the JSONB trace and chart points are
+# neither sent over the wire nor decoded; get_message_details() fetches them lazily.
+_MESSAGE_METADATA_SQL: dict[str, str] = {
+    "full": "metadata",
+    "summary": """
+        jsonb_strip_nulls(jsonb_build_object(
+            'sql_used', metadata->'sql_used',
+            'rows_found', metadata->'rows_found',
+            'error', metadata->'error',
+            'has_tool_trace', jsonb_typeof(metadata->'tool_trace') = 'array',
+            'has_chart_data', jsonb_typeof(metadata->'chart_data') = 'object'
+        ))
+    """,
+}
+MESSAGE_DETAIL_PARTS: tuple[str, ...] = ("tool_trace", "chart_data")
+
+
+def get_chat_messages(
+    chat_id: int,
+    limit: int = 100,
+    *,
+    before: str | None = None,
+    after: str | None = None,
+    view: str = "full",
+) -> Page[MessageRecord]:
+    """Return one page of a chat's messages in chronological (oldest-first) order.
 
     Args:
         chat_id: The chat session ID.
         limit:   Max number of messages to return (default 100).
+        before:  Cursor from a previous page — return the messages just before it.
+        after:   Cursor from a previous page — return the messages just after it.
+        view:    'full' (entire metadata) or 'summary' (sql_used, rows_found, error
+                 and has_tool_trace / has_chart_data flags, projected in SQL).
 
     Returns:
-        List of MessageRecord ordered by created_at ASC.
+        Page of MessageRecord ordered by created_at ASC. Without a cursor this is
+        the latest ``limit`` messages; ``page.before`` pages back through older ones.
     """
-    ensure_history_schema()
-    with db_cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, chat_id, sender, message, metadata, created_at
-            FROM stored_messages
-            WHERE chat_id = %s
-            ORDER BY created_at ASC
-            LIMIT %s
-            """,
-            (chat_id, limit),
-        )
-        rows = cur.fetchall()
-
-    return [
+    metadata_sql = _MESSAGE_METADATA_SQL.get(view)
+    if metadata_sql is None:
+        raise ValueError(f"unknown message view: {view!r}")
+    rows, has_older, has_newer = _fetch_keyset_page(
+        f"""
+        SELECT id, chat_id, sender, message, {metadata_sql}, created_at
+        FROM stored_messages
+        WHERE chat_id = %s
+        """,
+        (chat_id,),
+        limit,
+        before,
+        after,
+    )
+    messages = [
         MessageRecord(
             id=r[0],
             chat_id=r[1],
@@ -341,6 +481,41 @@ def get_chat_messages(chat_id: int, limit: int = 100) -> list[MessageRecord]:
         )
         for r in rows
     ]
+    first, last = (messages[0], messages[-1]) if messages else (None, None)
+    return Page(
+        items=messages,
+        before=encode_cursor(first.created_at, first.id) if first and has_older else None,
+        after=encode_cursor(last.created_at, last.id) if last and has_newer else None,
+    )
+
+
+def get_message_details(
+    chat_id: int,
+    message_id: int,
+    parts: tuple[str, ...] = MESSAGE_DETAIL_PARTS,
+) -> dict | None:
+    """Return the heavy metadata keys (tool_trace, chart_data) of one message.
+
+    Only the requested ``parts`` are extracted in SQL. Returns None when the message
+    does not exist in that chat.
+    """
+    unknown = set(parts) - set(MESSAGE_DETAIL_PARTS)
+    if unknown or not parts:
+        raise ValueError(f"unknown message detail parts: {sorted(unknown) or parts}")
+    columns = ", ".join(f"metadata->'{part}'" for part in parts)
+    with db_cursor() as cur:
+        cur.execute(
+            f"SELECT {columns} FROM stored_messages WHERE id = %s AND chat_id = %s",
+            (message_id, chat_id),
+        )
+        row = cur.fetchone()
+
+    if row is None:
+        return None
+    return {
+        part: json.loads(value) if isinstance(value, str) else value
+        for part, value in zip(parts, row, strict=True)
+    }
 
 
 def get_recent_messages_for_context(chat_id: int, n: int = 6) -> list[MessageRecord]:
@@ -348,14 +523,13 @@ def get_recent_messages_for_context(chat_id: int, n: int = 6) -> list[MessageRec
 
     Returned in chronological order (oldest first) so they read naturally.
     """
-    ensure_history_schema()
     with db_cursor() as cur:
         cur.execute(
             """
             SELECT id, chat_id, sender, message, metadata, created_at
             FROM stored_messages
             WHERE chat_id = %s
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT %s
             """,
             (chat_id, n),
@@ -375,3 +549,51 @@ def get_recent_messages_for_context(chat_id: int, n: int = 6) -> list[MessageRec
         for r in rows
     ]
     return list(reversed(records))  # oldest → newest
+
+
+async def aget_recent_messages_for_context(
+    chat_id: int,
+    user_id: int,
+    n: int = 12,
+) -> list[MessageRecord]:
+    """Async get_recent_messages_for_context() for the agents' follow-up context.
+
+    Only returns messages of a chat owned by ``user_id``, and projects just the
+    ``tool_context`` (the compact tool results an agent reuses) and ``agent_type``
+    (which agent answered, for routing follow-ups) metadata keys, not the trace or
+    chart data. Chronological order.
+    """
+    async with async_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT m.id, m.chat_id, m.sender, m.message,
+                   jsonb_build_object(
+                       'tool_context', m.metadata->'tool_context',
+                       'agent_type', m.metadata->'agent_type'
+                   ),
+                   m.created_at
+            FROM stored_messages m
+            JOIN stored_chats c ON c.id = m.chat_id
+            WHERE m.chat_id = $1 AND c.user_id = $2
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT $3
+            """,
+            chat_id,
+            user_id,
+            n,
+        )
+
+    records = [
+        MessageRecord(
+            id=r[0],
+            chat_id=r[1],
+            sender=r[2],
+            sender_label="user" if r[2] == SENDER_USER else "agent",
+            message=r[3],
+            # asyncpg returns JSONB as text unless a codec is registered
+            metadata=r[4] if isinstance(r[4], dict) else json.loads(r[4] or "{}"),
+            created_at=r[5],
+        )
+        for r in rows
+    ]
+    return list(reversed(records))
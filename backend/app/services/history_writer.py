@@ -0,0 +1,376 @@
+"""Write-behind persistence for chat turns.
+
+Chat endpoints hand finished turns to ``get_history_writer().submit()`` and return
+without waiting for the database. A single worker task per event loop drains the
+bounded queue and writes whatever has accumulated (up to ``batch_size`` turns) in
+one ``history.asave_turns`` transaction.
+
+When the queue is full or a write fails, turns are appended to a JSONL spool file
+(fsync'd) instead of being dropped, and replayed whenever the queue is idle (at
+most every ``retry_interval`` seconds after a failure) until the database accepts
+them. The spool is also replayed at startup, so turns
+survive a restart. Delivery is at-least-once: a crash mid-replay can re-insert
+messages from the batch that was in flight.
+
+Every uvicorn worker on the host shares the spool path. Appends, the hand-off
+to ``.replay`` and its removal hold an ``flock`` on ``<spool>.lock``, and a
+replay holds ``<spool>.replay.lock`` from claim to finish, so exactly one worker
+replays a given batch and no append can land in a file that was already read.
+
+Configuration (environment):
+    HISTORY_WRITER_MAX_QUEUE   queued turns before spilling to the spool (default 1000)
+    HISTORY_WRITER_BATCH_SIZE  max turns per transaction (default 50)
+    HISTORY_SPOOL_PATH         spool file (default <tmp>/virtual-economist/history_spool.jsonl)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import asyncpg
+from loguru import logger
+
+from backend.app.services import history as hist
+from backend.app.services.history import TurnRecord
+
+DEFAULT_MAX_QUEUE = 1000
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_RETRY_INTERVAL = 5.0
+DEFAULT_SPOOL_PATH = Path(tempfile.gettempdir()) / "virtual-economist" / "history_spool.jsonl"
+
+# A turn that keeps violating a constraint (e.g. its chat was deleted) is retried this
+# many times (an out-of-order replay can briefly precede its chat row), then dropped.
+_MAX_INTEGRITY_ATTEMPTS = 3
+
+SaveTurns = Callable[[list[TurnRecord]], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class WriterStats:
+    queued: int
+    submitted: int
+    written: int
+    batches: int
+    spooled: int
+    replayed: int
+    dropped: int
+    spool_pending: bool
+
+
+def _turn_to_json(turn: TurnRecord) -> str:
+    data = asdict(turn)
+    data["asked_at"] = turn.asked_at.isoformat()
+    data["answered_at"] = turn.answered_at.isoformat()
+    return json.dumps(data, default=str)
+
+
+def _turn_from_json(line: str) -> TurnRecord:
+    data = json.loads(line)
+    data["asked_at"] = datetime.fromisoformat(data["asked_at"])
+    data["answered_at"] = datetime.fromisoformat(data["answered_at"])
+    return TurnRecord(**data)
+
+
+class HistoryWriter:
+    """Bounded asyncio write-behind queue with a durable JSONL fallback spool."""
+
+    def __init__(
+        self,
+        save: SaveTurns | None = None,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        spool_path: Path | str = DEFAULT_SPOOL_PATH,
+    ) -> None:
+        self._save = save
+        self._max_queue = max_queue
+        self._batch_size = max(batch_size, 1)
+        self._retry_interval = retry_interval
+        self.spool_path = Path(spool_path)
+        self._spool_lock = threading.Lock()
+        self._queue: asyncio.Queue[TurnRecord] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._next_replay = 0.0
+
+        self._submitted = 0
+        self._written = 0
+        self._batches = 0
+        self._spooled = 0
+        self._replayed = 0
+        self._dropped = 0
+
+    # -- public API ---------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker on the running loop (idempotent; submit() calls it)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        if self._queue is not None:
+            # Leftovers from a previous (closed) loop go to the spool, not the floor.
+            stranded = self._drain_nowait()
+            if stranded:
+                self._spool(stranded)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._task = loop.create_task(self._run(), name="history-writer")
+
+    def submit(self, turn: TurnRecord) -> None:
+        """Queue a turn without blocking; spills to the spool when the queue is full."""
+        self.start()
+        assert self._queue is not None
+        self._submitted += 1
+        try:
+            self._queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            logger.warning("history writer | queue full ({}), spooling turn", self._max_queue)
+            self._spool([turn])
+
+    async def flush(self) -> None:
+        """Wait until every turn submitted so far was written or spooled."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Drain the queue (up to ``timeout``), then spool anything left and stop."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except TimeoutError:
+            logger.warning("history writer | shutdown flush timed out, spooling the rest")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        stranded = self._drain_nowait()
+        if stranded:
+            self._spool(stranded)
+        self._task = None
+
+    def stats(self) -> WriterStats:
+        return WriterStats(
+            queued=self._queue.qsize() if self._queue is not None else 0,
+            submitted=self._submitted,
+            written=self._written,
+            batches=self._batches,
+            spooled=self._spooled,
+            replayed=self._replayed,
+            dropped=self._dropped,
+            spool_pending=self._spool_pending(),
+        )
+
+    # -- worker -------------------------------------------------------------
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            # Replay only when idle: after a queue overflow the queued turns are older.
+            if queue.empty() and self._spool_pending() and time.monotonic() >= self._next_replay:
+                await self._replay_spool()
+            try:
+                timeout = self._retry_interval if self._spool_pending() else None
+                first = await asyncio.wait_for(queue.get(), timeout)
+            except TimeoutError:
+                continue
+            batch = [first]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                retry = await self._write(batch)
+            except Exception as exc:
+                logger.warning(
+                    "history writer | write failed ({} turns), spooling: {}", len(batch), exc
+                )
+                self._next_replay = time.monotonic() + self._retry_interval
+                retry = batch
+            try:
+                if retry:
+                    await asyncio.to_thread(self._spool, retry)
+            except OSError as exc:
+                logger.error(
+                    "history writer | spool write failed, lost {} turns: {}", len(retry), exc
+                )
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, turns: list[TurnRecord]) -> list[TurnRecord]:
+        """Write ``turns`` and return the constraint-rejected ones to retry later.
+
+        Transient failures (connection, timeout) propagate so the caller can spool
+        the whole batch.
+        """
+        save = self._save or hist.asave_turns
+        try:
+            await save(turns)
+        except asyncpg.IntegrityConstraintViolationError as exc:
+            if len(turns) > 1:
+                # Isolate the offending turn(s) so the rest of the batch still lands.
+                retry: list[TurnRecord] = []
+                for turn in turns:
+                    retry.extend(await self._write([turn]))
+                return retry
+            turn = turns[0]
+            turn.attempts += 1
+            if turn.attempts >= _MAX_INTEGRITY_ATTEMPTS:
+                self._dropped += 1
+                logger.error(
+                    "history writer | dropping turn chat={} user={}: {}",
+                    turn.chat_id,
+                    turn.user_id,
+                    exc,
+                )
+                return []
+            self._next_replay = time.monotonic() + self._retry_interval
+            return [turn]
+        self._written += len(turns)
+        self._batches += 1
+        return []
+
+    # -- spool --------------------------------------------------------------
+
+    @property
+    def _replay_path(self) -> Path:
+        return self.spool_path.with_suffix(self.spool_path.suffix + ".replay")
+
+    def _lock_path(self, suffix: str) -> Path:
+        return self.spool_path.with_suffix(self.spool_path.suffix + suffix)
+
+    @contextmanager
+    def _spool_locked(self) -> Iterator[None]:
+        """Exclusive access to the spool files, across threads and processes."""
+        with self._spool_lock:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock_path(".lock").open("a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                yield
+
+    def _try_lock_replay(self) -> int | None:
+        """Descriptor holding the replay lock, or None while another writer replays."""
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._lock_path(".replay.lock"), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _spool_pending(self) -> bool:
+        return self.spool_path.exists() or self._replay_path.exists()
+
+    def _spool(self, turns: list[TurnRecord]) -> None:
+        lines = "".join(_turn_to_json(turn) + "\n" for turn in turns)
+        with self._spool_locked(), self.spool_path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._spooled += len(turns)
+
+    def _claim_spool(self) -> list[TurnRecord]:
+        """Move the spool aside (so new spills start a fresh file) and load it.
+
+        The caller must hold the replay lock.
+        """
+        with self._spool_locked():
+            # A .replay left by a crash mid-replay is retried before newer spills.
+            if not self._replay_path.exists():
+                if not self.spool_path.exists():
+                    return []
+                self.spool_path.replace(self._replay_path)
+            text = self._replay_path.read_text(encoding="utf-8")
+        turns: list[TurnRecord] = []
+        for line in text.splitlines():
+            try:
+                turns.append(_turn_from_json(line))
+            except (ValueError, TypeError, KeyError):
+                logger.warning("history writer | skipping unreadable spool line")
+        return turns
+
+    async def _replay_spool(self) -> None:
+        replay_lock = await asyncio.to_thread(self._try_lock_replay)
+        if replay_lock is None:
+            # Another worker is replaying; look again after the retry interval.
+            self._next_replay = time.monotonic() + self._retry_interval
+            return
+        try:
+            await self._replay_claimed()
+        finally:
+            os.close(replay_lock)
+
+    async def _replay_claimed(self) -> None:
+        turns = await asyncio.to_thread(self._claim_spool)
+        retry: list[TurnRecord] = []
+        for start in range(0, len(turns), self._batch_size):
+            batch = turns[start : start + self._batch_size]
+            try:
+                retry.extend(await self._write(batch))
+            except Exception as exc:
+                logger.warning("history writer | spool replay failed, will retry: {}", exc)
+                self._next_replay = time.monotonic() + self._retry_interval
+                retry.extend(turns[start:])
+                break
+        self._replayed += len(turns) - len(retry)
+        await asyncio.to_thread(self._finish_replay, retry)
+        if turns:
+            logger.info(
+                "history writer | replayed spool turns={} remaining={}",
+                len(turns) - len(retry),
+                len(retry),
+            )
+
+    def _finish_replay(self, retry: list[TurnRecord]) -> None:
+        if retry:
+            self._spool(retry)
+            self._spooled -= len(retry)  # re-spooled, not newly spooled
+        with self._spool_locked():
+            self._replay_path.unlink(missing_ok=True)
+
+    def _drain_nowait(self) -> list[TurnRecord]:
+        stranded: list[TurnRecord] = []
+        while self._queue is not None:
+            try:
+                stranded.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return stranded
+
+
+_writer: HistoryWriter | None = None
+
+
+def get_history_writer() -> HistoryWriter:
+    """Process-wide writer configured from HISTORY_WRITER_* / HISTORY_SPOOL_PATH."""
+    global _writer
+    if _writer is None:
+        _writer = HistoryWriter(
+            max_queue=int(os.getenv("HISTORY_WRITER_MAX_QUEUE", str(DEFAULT_MAX_QUEUE))),
+            batch_size=int(os.getenv("HISTORY_WRITER_BATCH_SIZE", str(DEFAULT_BATCH_SIZE))),
+            spool_path=os.getenv("HISTORY_SPOOL_PATH") or DEFAULT_SPOOL_PATH,
+        )
+    return _writer
+
+
+def set_history_writer(writer: HistoryWriter | None) -> None:
+    """Replace the process-wide writer (tests, custom wiring)."""
+    global _writer
+    _writer = writer
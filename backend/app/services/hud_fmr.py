@@ -0,0 +1,299 @@
+"""Local HUD Fair Market Rent table (``hud_fmr`` + ``hud_metro_aliases``, migration 7).
+
+``refresh_hud_fmr`` bulk-loads one fiscal year of FMRs for every metro area
+from HUD's per-state endpoint (run periodically by
+``scripts/sync_reference_data.py``). Each metro is also indexed under its
+normalized name, every principal city in it, and its CBSA code, once per state
+it spans. That index is the city → CBSA crosswalk. "Portland-Vancouver-Hillsboro,
+OR-WA MSA" is stored under ``portland``, ``vancouver``, ``hillsboro`` (OR and WA),
+and ``38900``.
+
+A city question is then one indexed lookup with no HUD call. When a city-only
+name maps to several metros ("Portland" is also in Portland-South Portland, ME),
+the metro whose principal city is the most populous place (``census_places``)
+wins. After that, the metro where the city is listed first wins.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from loguru import logger
+
+from backend.app.services.census_places import _normalize, _query_keys
+from backend.app.services.live_apis import _STATE_ABBR_TO_FIPS, hud_state_fmr_data
+from backend.database.connect import db_cursor
+
+HUD_FMR_YEAR = 2024
+
+# State downloads in flight during a refresh.
+_REFRESH_CONCURRENCY = 4
+
+_METRO_NAME_RE = re.compile(r"^(?P<cities>[^,]+),\s*(?P<states>[A-Z]{2}(?:-[A-Z]{2})*)\b")
+_CBSA_RE = re.compile(r"METRO(\d{5})")
+
+
+def metro_aliases(metro_name: str, entity_id: str = "") -> list[tuple[str, str, int]]:
+    """Index entries ``(alias_key, state_fips, position)`` for one HUD metro name.
+
+    ``position`` is where the city appears among the metro's principal cities
+    (0 = first-named); the whole name and the CBSA code are at position 0.
+    """
+    match = _METRO_NAME_RE.match(metro_name.strip())
+    if match:
+        cities = match["cities"]
+        states = [
+            _STATE_ABBR_TO_FIPS[abbr]
+            for abbr in match["states"].split("-")
+            if abbr in _STATE_ABBR_TO_FIPS
+        ]
+    else:
+        cities, states = metro_name.split(",")[0], []
+
+    positions: dict[str, int] = {_normalize(cities): 0}
+    for pieces in (cities.split("--"), re.split(r"-+|/", cities)):
+        for position, piece in enumerate(pieces):
+            key = _normalize(piece)
+            if key and position < positions.get(key, position + 1):
+                positions[key] = position
+
+    aliases = [
+        (key, state_fips, position)
+        for key, position in positions.items()
+        if key
+        for state_fips in states or [""]
+    ]
+    cbsa = _CBSA_RE.search(entity_id)
+    if cbsa:
+        aliases.append((cbsa.group(1), "", 0))
+    return aliases
+
+
+def best_metro(city_name: str, state_fips: str, metros: list[dict]) -> dict | None:
+    """Pick the metro for a city from HUD's live metro list (no population data).
+
+    Used when the local table is unavailable: prefers an exact principal-city
+    match in the requested state, then the earliest-listed city, and only then a
+    plain substring match on the metro name.
+    """
+    key, alt_key = _query_keys(city_name)
+    if not key:
+        return None
+    best: dict | None = None
+    best_rank: tuple[bool, int] | None = None
+    for metro in metros:
+        name = str(metro.get("metro_name", metro.get("area_name", "")))
+        entity_id = str(metro.get("cbsa_code") or metro.get("code") or "")
+        for alias, alias_state, position in metro_aliases(name, entity_id):
+            if alias not in (key, alt_key):
+                continue
+            if state_fips and alias_state not in (state_fips, ""):
+                continue
+            rank = (alias != key, position)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = metro, rank
+    if best is not None:
+        return best
+    for metro in metros:
+        if key in _normalize(str(metro.get("metro_name", metro.get("area_name", "")))):
+            return metro
+    return None
+
+
+def _int_or_none(value: object) -> int | None:
+    try:
+        return int(float(str(value).replace(",", "")))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class FairMarketRent:
+    entity_id: str
+    cbsa_code: str | None
+    metro_name: str
+    year: int
+    fmr_0br: int | None
+    fmr_1br: int | None
+    fmr_2br: int | None
+    fmr_3br: int | None
+    fmr_4br: int | None
+
+    def snapshot(self) -> dict:
+        """Same shape as ``live_apis.get_hud_fmr_for_city``, plus the CBSA code."""
+        return {
+            "metro_name": self.metro_name,
+            "cbsa_code": self.cbsa_code,
+            "year": self.year,
+            "fmr_0br": self.fmr_0br,
+            "fmr_1br": self.fmr_1br,
+            "fmr_2br": self.fmr_2br,
+            "fmr_3br": self.fmr_3br,
+            "fmr_4br": self.fmr_4br,
+        }
+
+
+def parse_state_metros(payload: dict, year: int = HUD_FMR_YEAR) -> list[FairMarketRent]:
+    """Metro-area rows of a HUD ``fmr/statedata`` response."""
+    data = payload.get("data", payload)
+    year = _int_or_none(data.get("year")) or year
+    rents = []
+    for row in data.get("metroareas") or []:
+        entity_id = str(row.get("code") or "")
+        name = str(row.get("metro_name") or row.get("area_name") or "")
+        if not entity_id or not name:
+            continue
+        cbsa = _CBSA_RE.search(entity_id)
+        rents.append(
+            FairMarketRent(
+                entity_id=entity_id,
+                cbsa_code=cbsa.group(1) if cbsa else None,
+                metro_name=name,
+                year=year,
+                fmr_0br=_int_or_none(row.get("Efficiency")),
+                fmr_1br=_int_or_none(row.get("One-Bedroom")),
+                fmr_2br=_int_or_none(row.get("Two-Bedroom")),
+                fmr_3br=_int_or_none(row.get("Three-Bedroom")),
+                fmr_4br=_int_or_none(row.get("Four-Bedroom")),
+            )
+        )
+    return rents
+
+
+def lookup_fair_market_rents(
+    queries: Sequence[tuple[str, str]],
+    year: int | None = None,
+) -> list[FairMarketRent | None]:
+    """Resolve ``(city, state_fips)`` pairs in one query (latest year unless ``year``)."""
+    if not queries:
+        return []
+    keys = [_query_keys(city) for city, _ in queries]
+    with db_cursor() as cur:
+        cur.execute(
+            """
+            SELECT DISTINCT ON (q.idx)
+                   q.idx, f.entity_id, f.cbsa_code, f.metro_name, f.year,
+                   f.fmr_0br, f.fmr_1br, f.fmr_2br, f.fmr_3br, f.fmr_4br
+            FROM unnest(%s::int[], %s::text[], %s::text[], %s::text[])
+                 AS q(idx, key, alt_key, state_fips)
+            JOIN hud_metro_aliases a
+              ON a.alias_key IN (q.key, q.alt_key)
+             AND (q.state_fips = '' OR a.state_fips IN (q.state_fips, ''))
+            JOIN LATERAL (
+                SELECT *
+                FROM hud_fmr
+                WHERE hud_fmr.entity_id = a.entity_id
+                  AND (%s::int IS NULL OR hud_fmr.year = %s::int)
+                ORDER BY hud_fmr.year DESC
+                LIMIT 1
+            ) f ON true
+            LEFT JOIN census_places p
+              ON p.state_fips = a.state_fips AND p.place_key = a.alias_key
+            WHERE q.key <> ''
+            ORDER BY q.idx,
+                     a.alias_key = q.key DESC,
+                     p.population DESC NULLS LAST,
+                     a.position,
+                     f.entity_id
+            """,
+            (
+                list(range(len(queries))),
+                [key for key, _ in keys],
+                [alt_key for _, alt_key in keys],
+                [state_fips or "" for _, state_fips in queries],
+                year,
+                year,
+            ),
+        )
+        rows = cur.fetchall()
+    found: list[FairMarketRent | None] = [None] * len(queries)
+    for idx, *fields in rows:
+        found[idx] = FairMarketRent(*fields)
+    return found
+
+
+def _csv_buffer(rows: Iterable[Sequence[object]]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+def store_fair_market_rents(rents: list[FairMarketRent]) -> int:
+    """Replace these metros' rows for their year and rebuild their aliases, in one transaction."""
+    if not rents:
+        return 0
+    entity_ids = [rent.entity_id for rent in rents]
+    with db_cursor() as cur:
+        cur.execute(
+            "DELETE FROM hud_fmr WHERE year = %s AND entity_id = ANY(%s);",
+            (rents[0].year, entity_ids),
+        )
+        cur.copy_expert(
+            """
+            COPY hud_fmr (entity_id, cbsa_code, metro_name, year,
+                          fmr_0br, fmr_1br, fmr_2br, fmr_3br, fmr_4br)
+            FROM STDIN WITH (FORMAT csv)
+            """,
+            _csv_buffer(
+                (
+                    rent.entity_id,
+                    rent.cbsa_code,
+                    rent.metro_name,
+                    rent.year,
+                    rent.fmr_0br,
+                    rent.fmr_1br,
+                    rent.fmr_2br,
+                    rent.fmr_3br,
+                    rent.fmr_4br,
+                )
+                for rent in rents
+            ),
+        )
+        cur.execute("DELETE FROM hud_metro_aliases WHERE entity_id = ANY(%s);", (entity_ids,))
+        cur.copy_expert(
+            """
+            COPY hud_metro_aliases (alias_key, state_fips, entity_id, position)
+            FROM STDIN WITH (FORMAT csv)
+            """,
+            _csv_buffer(
+                (alias, state_fips, rent.entity_id, position)
+                for rent in rents
+                for alias, state_fips, position in metro_aliases(rent.metro_name, rent.entity_id)
+            ),
+        )
+    return len(rents)
+
+
+def refresh_hud_fmr(
+    states: Iterable[str] | None = None,
+    *,
+    year: int = HUD_FMR_YEAR,
+) -> int:
+    """Download one year of metro FMRs for each state (default: all) and store them.
+
+    Metros spanning several states are listed by each and stored once. A state
+    whose download fails is skipped; its metros keep their previous rows.
+    """
+    abbrs = sorted(set(states or _STATE_ABBR_TO_FIPS))
+    by_entity: dict[str, FairMarketRent] = {}
+    with ThreadPoolExecutor(max_workers=_REFRESH_CONCURRENCY) as pool:
+        futures = {abbr: pool.submit(hud_state_fmr_data, abbr, year) for abbr in abbrs}
+        for abbr, future in futures.items():
+            try:
+                rents = parse_state_metros(future.result(), year)
+            except Exception as exc:
+                logger.warning("hud fmr | refresh failed state={}: {}", abbr, exc)
+                continue
+            for rent in rents:
+                by_entity.setdefault(rent.entity_id, rent)
+    stored = store_fair_market_rents(list(by_entity.values()))
+    logger.info("hud fmr | refreshed year={} metros={}", year, stored)
+    return stored
@@ -0,0 +1,122 @@
+"""Precompiled keyword matching and indexed typo lookup for question routing.
+
+``KeywordSet`` compiles a keyword list into one regex whose alternation is
+factored into a prefix trie (``stock(?:s| price| chart)?``), so testing a
+question against dozens of keywords is a single scan by the regex engine instead
+of one pattern per keyword. A search tries every alternative at every position,
+so it matches exactly when some keyword would match on its own.
+
+``TypoIndex`` is a SymSpell-style deletion index over a vocabulary: every word
+is stored under each string obtained by deleting up to ``max_deletes`` of its
+characters. The candidates for a misspelling are the words sharing one of its
+own deletion variants, found with a few dictionary lookups instead of comparing
+the token against the whole vocabulary.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from collections.abc import Iterable
+from itertools import combinations
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for ``words``, factored on shared prefixes."""
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a word
+
+    def render(node: dict[str, dict]) -> str:
+        optional = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            if len(branches) == 1 and len(body) > 1:
+                body = f"(?:{body})"
+            return body + "?"
+        return body
+
+    return render(trie)
+
+
+class KeywordSet:
+    """Match any of ``keywords`` as whole words/phrases in lowercase text."""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords = frozenset(keywords)
+        if not self.keywords:
+            raise ValueError("KeywordSet needs at least one keyword")
+        self.pattern = re.compile(rf"\b(?:{_trie_pattern(self.keywords)})\b")
+
+    def search(self, text: str) -> bool:
+        return self.pattern.search(text) is not None
+
+
+def _deletes(word: str, max_deletes: int) -> set[str]:
+    variants = {word}
+    for count in range(1, min(max_deletes, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), count):
+            variants.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = char_a != char_b
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class TypoIndex:
+    """Deletion index for finding the closest vocabulary word to a misspelling."""
+
+    def __init__(self, vocabulary: Iterable[str], *, max_deletes: int = 2) -> None:
+        self.vocabulary = frozenset(vocabulary)
+        self.max_deletes = max_deletes
+        self._index: dict[str, set[str]] = {}
+        for word in self.vocabulary:
+            for variant in _deletes(word, max_deletes):
+                self._index.setdefault(variant, set()).add(word)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.vocabulary
+
+    def candidates(self, word: str) -> set[str]:
+        found: set[str] = set()
+        for variant in _deletes(word, self.max_deletes):
+            found |= self._index.get(variant, set())
+        return found
+
+    def closest(self, word: str, cutoff: float = 0.6) -> str | None:
+        """Best candidate by difflib similarity ratio, if it reaches ``cutoff``.
+
+        Ranked like ``difflib.get_close_matches(word, vocabulary, n=1)``, but only
+        over indexed candidates within ``max_deletes`` edits of ``word``.
+        """
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        best: tuple[float, str] | None = None
+        for candidate in self.candidates(word):
+            if edit_distance(word, candidate) > self.max_deletes:
+                continue
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, candidate) > best):
+                best = (score, candidate)
+        return best[1] if best else None
@@ -2,20 +2,36 @@
 
 Provides thin wrappers around:
   - Finnhub       (real-time stock data, analyst ratings)
-  - FRED          (Federal Reserve economic data)
+  - FRED          (Federal Reserve economic data; snapshots and history are served
+                  from the local ``fred_observations`` store, see services/fred_store.py)
   - Alpha Vantage (macro indicators: GDP, CPI, unemployment)
-  - Census Bureau (ACS 1-year: home value, rent, income by city)
-  - HUD           (Fair Market Rents by metro area)
-  - Open-Meteo    (city weather + forecast)
+  - Census Bureau (ACS 1-year: home value, rent, income by city; served from the
+                  local ``census_places`` index, see services/census_places.py)
+  - HUD           (Fair Market Rents by metro area; served from the local
+                  ``hud_fmr`` table, see services/hud_fmr.py)
+  - Open-Meteo    (city weather + forecast; cities are resolved from the offline
+                  gazetteer first, see services/gazetteer.py, and forecasts are
+                  cached per grid cell until the next model run)
+
+Finnhub, FRED and Alpha Vantage responses, ticker searches, the HUD metro list
+and city→state inferences go through the TTL cache in
+``backend.app.services.cache`` (see the ``_*_TTL`` constants below); with the
+sqlite backend, entries are shared by all workers and scripts on the host.
 """
 
 from __future__ import annotations
 
+import asyncio
 import difflib
 import json
 import os
 import re
-from datetime import date, datetime
+import time
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
@@ -25,6 +41,8 @@ import tenacity
 from dotenv import load_dotenv
 from loguru import logger
 
+from backend.app.services.cache import ttl_cached
+
 # Load backend/.env even when this module is imported outside FastAPI startup.
 _ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
 load_dotenv(_ENV_PATH)
@@ -46,6 +64,47 @@ def _http_client() -> httpx.Client:
     return httpx.Client(timeout=12.0, follow_redirects=True)
 
 
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _async_http_client() -> httpx.AsyncClient:
+    """Async twin of _http_client(), one per running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(timeout=12.0, follow_redirects=True)
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    """Close the running loop's AsyncClient (call on application shutdown)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# Response-cache lifetimes (seconds). FRED series live until their next release.
+_QUOTE_TTL = float(os.getenv("LIVE_API_QUOTE_TTL", "15"))
+_PROFILE_TTL = 24 * 3600.0
+_RECOMMENDATIONS_TTL = 12 * 3600.0
+_ALPHA_VANTAGE_TTL = 24 * 3600.0
+_FRED_RELEASE_DAY_TTL = 3600.0
+_FRED_FALLBACK_TTL = 6 * 3600.0
+_FRED_MAX_TTL = 7 * 24 * 3600.0
+_FRED_TZ = ZoneInfo("America/New_York")
+_TICKER_SEARCH_TTL = 7 * 24 * 3600.0
+_STATE_INFERENCE_TTL = 7 * 24 * 3600.0
+_HUD_METRO_LIST_TTL = 24 * 3600.0
+# Open-Meteo refreshes its U.S. models hourly; a run is served a few minutes after the hour.
+_OPEN_METEO_UPDATE_INTERVAL = 3600.0
+_OPEN_METEO_PUBLISH_LAG = 300.0
+# Forecasts are cached for the full 7 days and sliced; cities share a 0.1 degree cell (~11 km).
+FORECAST_CACHE_DAYS = 7
+_FORECAST_GRID_DEGREES = 0.1
+
 # Retry decorator — retry on transient network errors only (not 4xx)
 _http_retry = tenacity.retry(
     retry=tenacity.retry_if_exception_type((httpx.TransportError, httpx.TimeoutException)),
@@ -274,11 +333,29 @@ def _score_finnhub_result(company: str, result: dict) -> int:
     return score
 
 
+# Optional blocking throttle called before every sync Finnhub request; batch jobs
+# (stock sync) install one to stay under the plan's calls/minute.
+_finnhub_throttle: Callable[[], None] | None = None
+
+
+@contextmanager
+def finnhub_throttle(acquire: Callable[[], None]) -> Iterator[None]:
+    """Call ``acquire()`` before each sync Finnhub request while the block runs."""
+    global _finnhub_throttle
+    previous, _finnhub_throttle = _finnhub_throttle, acquire
+    try:
+        yield
+    finally:
+        _finnhub_throttle = previous
+
+
 def _finnhub_get(path: str, **params) -> dict | list:
     key = os.getenv("FINNHUB_API_KEY", "")
     if not key:
         logger.error("FINNHUB_API_KEY is not set in environment!")
         raise RuntimeError("FINNHUB_API_KEY not set")
+    if _finnhub_throttle is not None:
+        _finnhub_throttle()
     url = f"https://finnhub.io/api/v1{path}"
     logger.debug("Finnhub GET {} params={}", path, dict(params))
     resp = _http_client().get(url, params={"token": key, **params})
@@ -291,7 +368,19 @@ def _finnhub_get(path: str, **params) -> dict | list:
     return resp.json()
 
 
-@lru_cache(maxsize=256)
+async def _afinnhub_get(path: str, **params) -> dict | list:
+    key = os.getenv("FINNHUB_API_KEY", "")
+    if not key:
+        logger.error("FINNHUB_API_KEY is not set in environment!")
+        raise RuntimeError("FINNHUB_API_KEY not set")
+    url = f"https://finnhub.io/api/v1{path}"
+    logger.debug("Finnhub async GET {} params={}", path, dict(params))
+    resp = await _async_http_client().get(url, params={"token": key, **params})
+    resp.raise_for_status()
+    return resp.json()
+
+
+@ttl_cached("finnhub_search_ticker", ttl=_TICKER_SEARCH_TTL)
 @_http_retry
 def finnhub_search_ticker(company: str) -> str:
     """Return best-match ticker symbol for a company name."""
@@ -319,24 +408,48 @@ def finnhub_search_ticker(company: str) -> str:
     return best_symbol
 
 
+@ttl_cached("finnhub_quote", ttl=_QUOTE_TTL)
 @_http_retry
 def finnhub_quote(symbol: str) -> dict:
     data = _finnhub_get("/quote", symbol=symbol)
     return data if isinstance(data, dict) else {}
 
 
+@ttl_cached("finnhub_company_profile", ttl=_PROFILE_TTL)
 @_http_retry
 def finnhub_company_profile(symbol: str) -> dict:
     data = _finnhub_get("/stock/profile2", symbol=symbol)
     return data if isinstance(data, dict) else {}
 
 
+@ttl_cached("finnhub_analyst_recommendations", ttl=_RECOMMENDATIONS_TTL)
 @_http_retry
 def finnhub_analyst_recommendations(symbol: str) -> list[dict]:
     data = _finnhub_get("/stock/recommendation", symbol=symbol)
     return data[:3] if isinstance(data, list) else []
 
 
+@ttl_cached("finnhub_quote", ttl=_QUOTE_TTL)
+@_http_retry
+async def afinnhub_quote(symbol: str) -> dict:
+    data = await _afinnhub_get("/quote", symbol=symbol)
+    return data if isinstance(data, dict) else {}
+
+
+@ttl_cached("finnhub_company_profile", ttl=_PROFILE_TTL)
+@_http_retry
+async def afinnhub_company_profile(symbol: str) -> dict:
+    data = await _afinnhub_get("/stock/profile2", symbol=symbol)
+    return data if isinstance(data, dict) else {}
+
+
+@ttl_cached("finnhub_analyst_recommendations", ttl=_RECOMMENDATIONS_TTL)
+@_http_retry
+async def afinnhub_analyst_recommendations(symbol: str) -> list[dict]:
+    data = await _afinnhub_get("/stock/recommendation", symbol=symbol)
+    return data[:3] if isinstance(data, list) else []
+
+
 def get_finnhub_company_data(company: str, *, include_analyst_data: bool = False) -> dict:
     """Return merged dict with quote, profile, and analyst data for a company."""
     try:
@@ -375,39 +488,280 @@ def get_finnhub_company_data(company: str, *, include_analyst_data: bool = False
 # ---------------------------------------------------------------------------
 
 
-@_http_retry
-def fred_series(series_id: str, limit: int = 5) -> list[dict]:
-    """Fetch the most recent observations for a FRED series."""
+_FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+# FRED's per-request observation cap; one request returns any series' full history.
+_FRED_MAX_LIMIT = 100_000
+
+DEFAULT_FRED_SERIES = ("MORTGAGE30US", "UNRATE", "CPIAUCSL", "FEDFUNDS", "GDP")
+
+
+def _fred_params(series_id: str, limit: int) -> dict:
+    key = os.getenv("FRED_API_KEY", "")
+    if not key:
+        raise RuntimeError("FRED_API_KEY not set")
+    return {
+        "series_id": series_id,
+        "api_key": key,
+        "file_type": "json",
+        "limit": limit,
+        "sort_order": "desc",
+    }
+
+
+def _fred_get(path: str, **params) -> dict:
     key = os.getenv("FRED_API_KEY", "")
     if not key:
         raise RuntimeError("FRED_API_KEY not set")
     resp = _http_client().get(
-        "https://api.stlouisfed.org/fred/series/observations",
-        params={
-            "series_id": series_id,
-            "api_key": key,
-            "file_type": "json",
-            "limit": limit,
-            "sort_order": "desc",
-        },
+        f"https://api.stlouisfed.org/fred{path}",
+        params={"api_key": key, "file_type": "json", **params},
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _afred_get(path: str, **params) -> dict:
+    key = os.getenv("FRED_API_KEY", "")
+    if not key:
+        raise RuntimeError("FRED_API_KEY not set")
+    resp = await _async_http_client().get(
+        f"https://api.stlouisfed.org/fred{path}",
+        params={"api_key": key, "file_type": "json", **params},
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _release_dates_params(today: str) -> dict:
+    return {
+        "realtime_start": today,
+        "include_release_dates_with_no_data": "true",
+        "sort_order": "asc",
+        "limit": 1,
+    }
+
+
+def _first_release_date(data: dict) -> str | None:
+    dates = data.get("release_dates") or []
+    return str(dates[0]["date"]) if dates else None
+
+
+@ttl_cached("fred_next_release", ttl=24 * 3600.0)
+@_http_retry
+def _fred_next_release_date(series_id: str, today: str) -> str | None:
+    """Next scheduled release (YYYY-MM-DD, on or after ``today``) for a series."""
+    releases = _fred_get("/series/release", series_id=series_id).get("releases") or []
+    if not releases:
+        return None
+    dates = _fred_get(
+        "/release/dates",
+        release_id=releases[0]["id"],
+        **_release_dates_params(today),
+    )
+    return _first_release_date(dates)
+
+
+@ttl_cached("fred_next_release", ttl=24 * 3600.0)
+@_http_retry
+async def _afred_next_release_date(series_id: str, today: str) -> str | None:
+    """Async twin of _fred_next_release_date()."""
+    releases = (await _afred_get("/series/release", series_id=series_id)).get("releases") or []
+    if not releases:
+        return None
+    dates = await _afred_get(
+        "/release/dates",
+        release_id=releases[0]["id"],
+        **_release_dates_params(today),
+    )
+    return _first_release_date(dates)
+
+
+def _ttl_until_release(release_date: str | None, now: datetime) -> float:
+    """Seconds until the start (US/Eastern) of the next release day.
+
+    On the release day itself entries are kept for _FRED_RELEASE_DAY_TTL, since
+    the publication time within the day varies by release.
+    """
+    if not release_date:
+        return _FRED_FALLBACK_TTL
+    release_start = datetime.combine(
+        date.fromisoformat(release_date),
+        datetime.min.time(),
+        tzinfo=_FRED_TZ,
+    )
+    if release_start <= now:
+        return _FRED_RELEASE_DAY_TTL
+    return min((release_start - now).total_seconds(), _FRED_MAX_TTL)
+
+
+def _fred_series_ttl(series_id: str, limit: int = 5) -> float:
+    now = datetime.now(_FRED_TZ)
+    try:
+        release_date = _fred_next_release_date(series_id, now.date().isoformat())
+    except Exception as exc:
+        logger.warning("FRED release lookup failed | series={} | error={}", series_id, exc)
+        release_date = None
+    return _ttl_until_release(release_date, now)
+
+
+async def _afred_series_ttl(series_id: str, limit: int = 5) -> float:
+    now = datetime.now(_FRED_TZ)
+    try:
+        release_date = await _afred_next_release_date(series_id, now.date().isoformat())
+    except Exception as exc:
+        logger.warning("FRED release lookup failed | series={} | error={}", series_id, exc)
+        release_date = None
+    return _ttl_until_release(release_date, now)
+
+
+@ttl_cached("fred_series", ttl=_fred_series_ttl)
+@_http_retry
+def fred_series(series_id: str, limit: int = 5) -> list[dict]:
+    """Fetch the most recent observations for a FRED series."""
+    resp = _http_client().get(_FRED_OBSERVATIONS_URL, params=_fred_params(series_id, limit))
+    resp.raise_for_status()
+    observations = resp.json().get("observations", [])
+    return [{"date": o["date"], "value": o["value"]} for o in observations]
+
+
+@ttl_cached("fred_series", ttl=_afred_series_ttl)
+@_http_retry
+async def afred_series(series_id: str, limit: int = 5) -> list[dict]:
+    """Async twin of fred_series()."""
+    resp = await _async_http_client().get(
+        _FRED_OBSERVATIONS_URL,
+        params=_fred_params(series_id, limit),
     )
     resp.raise_for_status()
     observations = resp.json().get("observations", [])
     return [{"date": o["date"], "value": o["value"]} for o in observations]
 
 
+@_http_retry
+def fred_observations_since(series_id: str, observation_start: str | None = None) -> list[dict]:
+    """Every observation from ``observation_start`` (whole series when None), oldest first."""
+    params = {**_fred_params(series_id, _FRED_MAX_LIMIT), "sort_order": "asc"}
+    if observation_start:
+        params["observation_start"] = observation_start
+    resp = _http_client().get(_FRED_OBSERVATIONS_URL, params=params)
+    resp.raise_for_status()
+    observations = resp.json().get("observations", [])
+    return [{"date": o["date"], "value": o["value"]} for o in observations]
+
+
+def _month_end(observations: list[dict]) -> list[dict]:
+    by_month = {o["date"][:7]: o for o in observations if o["value"] != "."}
+    return list(by_month.values())
+
+
+def _fred_history_ttl(series_id: str, observation_start: str) -> float:
+    return _fred_series_ttl(series_id)
+
+
+@ttl_cached("fred_history", ttl=_fred_history_ttl)
+def _live_fred_history(series_id: str, observation_start: str) -> list[dict]:
+    return _month_end(fred_observations_since(series_id, observation_start))
+
+
+def get_fred_series_history(series_id: str, years: int = 10) -> list[dict]:
+    """Month-end observations of a series over the last ``years``, oldest first.
+
+    Served from the local FRED store when it holds the series; otherwise fetched
+    from FRED (and cached until the series' next release).
+    """
+    start = (date.today() - timedelta(days=round(365.25 * years))).replace(day=1).isoformat()
+    from backend.app.services import fred_store
+
+    try:
+        stored = fred_store.month_end_history(series_id, start)
+    except Exception as exc:
+        logger.warning("FRED store unavailable, fetching history: {}", exc)
+        stored = None
+    if stored is not None:
+        return stored
+    return _live_fred_history(series_id, start)
+
+
+def get_fred_series_histories(series_ids: list[str], years: int = 10) -> dict[str, list[dict]]:
+    """get_fred_series_history() for several series, fetched concurrently."""
+    if not series_ids:
+        return {}
+
+    def history(series_id: str) -> list[dict]:
+        try:
+            return get_fred_series_history(series_id, years)
+        except Exception:
+            logger.warning("FRED history fetch failed: {}", series_id)
+            return []
+
+    with ThreadPoolExecutor(max_workers=len(series_ids)) as pool:
+        return dict(zip(series_ids, pool.map(history, series_ids), strict=True))
+
+
+def _latest_fred_observation(series_id: str) -> dict | None:
+    try:
+        observations = fred_series(series_id, limit=1)
+    except Exception:
+        logger.warning("FRED series fetch failed: {}", series_id)
+        return None
+    return observations[0] if observations else None
+
+
 def get_fred_macro_snapshot(series_keys: list[str] | None = None) -> dict:
-    """Return the latest observation for each FRED series ID."""
+    """Return the latest observation for each FRED series ID.
+
+    Series the local FRED store holds fresh are read from it; the rest are
+    fetched from FRED concurrently.
+    """
     if series_keys is None:
-        series_keys = ["MORTGAGE30US", "UNRATE", "CPIAUCSL", "FEDFUNDS", "GDP"]
+        series_keys = list(DEFAULT_FRED_SERIES)
+    from backend.app.services import fred_store
+
+    try:
+        stored = fred_store.latest_observations(series_keys)
+    except Exception as exc:
+        logger.warning("FRED store unavailable, fetching snapshot: {}", exc)
+        stored = {}
+    missing = [sid for sid in series_keys if sid not in stored]
+    fetched: dict[str, dict | None] = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            fetched = dict(zip(missing, pool.map(_latest_fred_observation, missing), strict=True))
     result: dict[str, dict] = {}
     for sid in series_keys:
-        try:
-            obs = fred_series(sid, limit=1)
-            if obs:
-                result[sid] = obs[0]
-        except Exception:
+        observation = stored.get(sid) or fetched.get(sid)
+        if observation:
+            result[sid] = observation
+    return result
+
+
+async def aget_fred_macro_snapshot(series_keys: list[str] | None = None) -> dict:
+    """Async get_fred_macro_snapshot(); missing series are fetched concurrently."""
+    if series_keys is None:
+        series_keys = list(DEFAULT_FRED_SERIES)
+    from backend.app.services import fred_store
+
+    try:
+        stored = await fred_store.alatest_observations(series_keys)
+    except Exception as exc:
+        logger.warning("FRED store unavailable, fetching snapshot: {}", exc)
+        stored = {}
+    missing = [sid for sid in series_keys if sid not in stored]
+    fetched = await asyncio.gather(
+        *(afred_series(sid, limit=1) for sid in missing),
+        return_exceptions=True,
+    )
+    result: dict[str, dict] = {}
+    live = dict(zip(missing, fetched, strict=True))
+    for sid in series_keys:
+        if sid in stored:
+            result[sid] = stored[sid]
+            continue
+        obs = live[sid]
+        if isinstance(obs, BaseException):
             logger.warning("FRED series fetch failed: {}", sid)
+        elif obs:
+            result[sid] = obs[0]
     return result
 
 
@@ -416,6 +770,7 @@ def get_fred_macro_snapshot(series_keys: list[str] | None = None) -> dict:
 # ---------------------------------------------------------------------------
 
 
+@ttl_cached("alpha_vantage_indicator", ttl=_ALPHA_VANTAGE_TTL)
 @_http_retry
 def alpha_vantage_indicator(indicator: str, interval: str = "annual") -> list[dict]:
     """Fetch a macro indicator. indicator = 'REAL_GDP', 'CPI', 'UNEMPLOYMENT', etc."""
@@ -559,22 +914,28 @@ def normalize_city_alias(city: str) -> str:
     return _CITY_ALIASES.get(cleaned.lower(), cleaned)
 
 
-def _parse_city_state(city: str) -> tuple[str, str]:
-    """Split 'Austin, Texas' → ('Austin', '48').  Returns (city, '') on failure."""
+def _split_city_state(city: str) -> tuple[str, str]:
+    """Split 'Austin, Texas' → ('Austin', '48') without inferring a missing state."""
     parts = [p.strip() for p in city.split(",")]
     if len(parts) < 2:
-        city_name = normalize_city_alias(city.strip())
-        state_fips = _infer_state_fips_from_housing_db(city_name)
-        if not state_fips:
-            state_fips = _infer_state_fips_from_weather_geocode(city_name)
-        return city_name, state_fips
+        return normalize_city_alias(city.strip()), ""
     city_name = normalize_city_alias(parts[0])
     state_raw = parts[1].strip()
     fips = _STATE_FIPS.get(state_raw) or _STATE_ABBR_TO_FIPS.get(state_raw.upper(), "")
     return city_name, fips
 
 
-@lru_cache(maxsize=256)
+def _parse_city_state(city: str) -> tuple[str, str]:
+    """Split 'Austin, Texas' → ('Austin', '48').  Returns (city, '') on failure."""
+    city_name, fips = _split_city_state(city)
+    if "," not in city:
+        fips = _infer_state_fips_from_housing_db(city_name)
+        if not fips:
+            fips = _infer_state_fips_from_weather_geocode(city_name)
+    return city_name, fips
+
+
+@ttl_cached("state_fips_from_housing_db", ttl=_STATE_INFERENCE_TTL)
 def _infer_state_fips_from_housing_db(city_name: str) -> str:
     """Use the housing table to resolve a city-only query when it maps to one state."""
     from backend.database.connect import db_cursor
@@ -608,11 +969,11 @@ def _infer_state_fips_from_housing_db(city_name: str) -> str:
     return ""
 
 
-@lru_cache(maxsize=256)
+@ttl_cached("state_fips_from_weather_geocode", ttl=_STATE_INFERENCE_TTL)
 def _infer_state_fips_from_weather_geocode(city_name: str) -> str:
     """Use Open-Meteo geocoding as a fallback when DB-based city-state inference fails."""
     try:
-        location = _open_meteo_geocode_city_result(city_name, "")
+        location = _geocode_city_result(city_name, "")
     except Exception:
         logger.warning("Weather geocode state inference failed for city={!r}", city_name)
         return ""
@@ -624,11 +985,17 @@ def _infer_state_fips_from_weather_geocode(city_name: str) -> str:
     return _STATE_FIPS.get(state_name) or _STATE_ABBR_TO_FIPS.get(state_name.upper(), "")
 
 
-def _census_rows(state_fips: str, key: str = "") -> list[list[str]]:
+def _census_rows(
+    state_fips: str,
+    key: str = "",
+    *,
+    variables: str = "NAME,B25077_001E,B25064_001E,B19013_001E",
+    year: int = 2022,
+) -> list[list[str]]:
     """Fetch ACS rows, retrying without an API key if the configured key is invalid."""
-    url = "https://api.census.gov/data/2022/acs/acs1"
+    url = f"https://api.census.gov/data/{year}/acs/acs1"
     base_params = {
-        "get": "NAME,B25077_001E,B25064_001E,B19013_001E",
+        "get": variables,
         "for": "place:*",
         "in": f"state:{state_fips}",
     }
@@ -663,9 +1030,32 @@ def _census_rows(state_fips: str, key: str = "") -> list[list[str]]:
     return []
 
 
-@_http_retry
+def _indexed_census_snapshots(cities: list[str]) -> list[dict | None]:
+    """Snapshots from the local place index (census_places); None where it has no match."""
+    from backend.app.services import census_places
+
+    try:
+        places = census_places.lookup_places([_split_city_state(city) for city in cities])
+    except Exception as exc:
+        logger.warning("Census place index unavailable, using the live API: {}", exc)
+        return [None] * len(cities)
+    return [place.snapshot() if place is not None else None for place in places]
+
+
 def census_city_snapshot(city: str) -> dict | None:
-    """Return ACS 1-year median home value, rent, and income for a city/place."""
+    """Return ACS 1-year median home value, rent, and income for a city/place.
+
+    Served from the local place index; cities it does not know fall back to
+    downloading the state's places from the Census API.
+    """
+    indexed = _indexed_census_snapshots([city])[0]
+    if indexed is not None:
+        return indexed
+    return _live_census_city_snapshot(city)
+
+
+@_http_retry
+def _live_census_city_snapshot(city: str) -> dict | None:
     key = os.getenv("CENSUS_API_KEY", "")
     city_name, state_fips = _parse_city_state(city)
     if not state_fips:
@@ -699,12 +1089,25 @@ def get_census_city_data(city: str) -> dict:
         return {}
 
 
+def get_census_cities_data(cities: list[str]) -> list[dict]:
+    """get_census_city_data() for several cities, resolved in one index lookup."""
+    results = []
+    for city, snapshot in zip(cities, _indexed_census_snapshots(cities), strict=True):
+        if snapshot is None:
+            try:
+                snapshot = _live_census_city_snapshot(city)
+            except Exception:
+                logger.warning("Census data fetch failed for city={!r}", city)
+        results.append(snapshot or {})
+    return results
+
+
 # ---------------------------------------------------------------------------
 # HUD — Fair Market Rents by metro area
 # ---------------------------------------------------------------------------
 
 
-@lru_cache(maxsize=1)
+@ttl_cached("hud_metro_list", ttl=_HUD_METRO_LIST_TTL)
 def _hud_metro_list() -> list[dict]:
     token = os.getenv("HUD_API_TOKEN", "")
     headers = {"Authorization": f"Bearer {token}"} if token else {}
@@ -729,38 +1132,78 @@ def hud_fmr_data(entity_id: str, year: int = 2024) -> dict:
     return resp.json()
 
 
-def get_hud_fmr_for_city(city: str) -> dict | None:
-    """Fuzzy-match a city name to a HUD metro area and return its FMR data."""
+@_http_retry
+def hud_state_fmr_data(state_abbr: str, year: int = 2024) -> dict:
+    """FMRs of every metro area and county in one state (bulk load for hud_fmr)."""
+    token = os.getenv("HUD_API_TOKEN", "")
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    resp = _http_client().get(
+        f"https://www.huduser.gov/hudapi/public/fmr/statedata/{state_abbr}",
+        headers=headers,
+        params={"year": year},
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _indexed_hud_fmrs(cities: list[str]) -> list[dict | None]:
+    """FMRs from the local HUD table (hud_fmr); None where no metro matches."""
+    from backend.app.services import hud_fmr
+
     try:
-        metros = _hud_metro_list()
-        city_lower = city.split(",")[0].lower().strip()
-        best = None
-        for m in metros:
-            name = m.get("metro_name", m.get("area_name", "")).lower()
-            if city_lower in name:
-                best = m
-                break
-        if not best:
-            return None
-        entity_id = best.get("cbsa_code") or best.get("entity_id") or best.get("code")
-        if not entity_id:
-            return None
-        fmr = hud_fmr_data(str(entity_id))
-        data = fmr.get("data", {})
-        basic = data.get("basicdata", [{}])
-        row = basic[0] if isinstance(basic, list) and basic else (basic or {})
-        return {
-            "metro_name": best.get("metro_name", ""),
-            "year": fmr.get("year"),
-            "fmr_0br": row.get("Efficiency"),
-            "fmr_1br": row.get("One-Bedroom"),
-            "fmr_2br": row.get("Two-Bedroom"),
-            "fmr_3br": row.get("Three-Bedroom"),
-            "fmr_4br": row.get("Four-Bedroom"),
-        }
-    except Exception:
-        logger.warning("HUD FMR fetch failed for city={!r}", city)
+        rents = hud_fmr.lookup_fair_market_rents([_split_city_state(city) for city in cities])
+    except Exception as exc:
+        logger.warning("HUD FMR index unavailable, using the live API: {}", exc)
+        return [None] * len(cities)
+    return [rent.snapshot() if rent is not None else None for rent in rents]
+
+
+def _live_hud_fmr_for_city(city: str) -> dict | None:
+    """Resolve a city against HUD's metro list and fetch that metro's FMRs."""
+    from backend.app.services.hud_fmr import best_metro
+
+    city_name, state_fips = _split_city_state(city)
+    best = best_metro(city_name, state_fips, _hud_metro_list())
+    if not best:
+        return None
+    entity_id = best.get("cbsa_code") or best.get("entity_id") or best.get("code")
+    if not entity_id:
         return None
+    fmr = hud_fmr_data(str(entity_id))
+    data = fmr.get("data", {})
+    basic = data.get("basicdata", [{}])
+    row = basic[0] if isinstance(basic, list) and basic else (basic or {})
+    return {
+        "metro_name": best.get("metro_name", ""),
+        "year": fmr.get("year"),
+        "fmr_0br": row.get("Efficiency"),
+        "fmr_1br": row.get("One-Bedroom"),
+        "fmr_2br": row.get("Two-Bedroom"),
+        "fmr_3br": row.get("Three-Bedroom"),
+        "fmr_4br": row.get("Four-Bedroom"),
+    }
+
+
+def get_hud_fmr_for_city(city: str) -> dict | None:
+    """Resolve a city to its HUD metro area and return the area's Fair Market Rents.
+
+    Served from the local hud_fmr table; when it has no match (or is not loaded)
+    the metro is resolved against HUD's live metro list instead.
+    """
+    return get_hud_fmr_for_cities([city])[0]
+
+
+def get_hud_fmr_for_cities(cities: list[str]) -> list[dict | None]:
+    """get_hud_fmr_for_city() for several cities, resolved in one index lookup."""
+    results: list[dict | None] = []
+    for city, rent in zip(cities, _indexed_hud_fmrs(cities), strict=True):
+        if rent is None:
+            try:
+                rent = _live_hud_fmr_for_city(city)
+            except Exception:
+                logger.warning("HUD FMR fetch failed for city={!r}", city)
+        results.append(rent)
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -855,12 +1298,26 @@ def _open_meteo_geocode_city_result(query_city: str, state_name: str) -> dict |
     return ranked[0] if ranked else None
 
 
+def _geocode_city_result(query_city: str, state_name: str) -> dict | None:
+    """Resolve a city from the offline gazetteer, geocoding (and recording) misses."""
+    from backend.app.services.gazetteer import get_gazetteer
+
+    gazetteer = get_gazetteer()
+    location = gazetteer.lookup(query_city, state_name)
+    if location is not None:
+        return location
+    location = _open_meteo_geocode_city_result(query_city, state_name)
+    if location is not None:
+        gazetteer.remember(query_city, state_name, location)
+    return location
+
+
 @_http_retry
 def open_meteo_geocode_city(city: str) -> dict | None:
-    """Resolve a U.S. city string to one Open-Meteo geocoding result."""
+    """Resolve a U.S. city string to one geocoding result (gazetteer, then Open-Meteo)."""
     query_city, state_fips = _parse_city_state(city)
     state_name = _STATE_FIPS_TO_NAME.get(state_fips, "")
-    return _open_meteo_geocode_city_result(query_city, state_name)
+    return _geocode_city_result(query_city, state_name)
 
 
 @_http_retry
@@ -897,6 +1354,67 @@ def open_meteo_weather_forecast(
     return resp.json()
 
 
+def _record_forecast_demand(latitude: float, longitude: float, timezone: str) -> None:
+    from backend.app.services.forecast_prefetch import get_forecast_prefetcher
+
+    get_forecast_prefetcher().record(latitude, longitude, timezone)
+
+
+def forecast_bucket(latitude: float, longitude: float) -> tuple[float, float]:
+    """Snap coordinates to the forecast-cache grid; nearby cities share one entry."""
+    step = _FORECAST_GRID_DEGREES
+    return round(round(latitude / step) * step, 4), round(round(longitude / step) * step, 4)
+
+
+def seconds_until_forecast_update(now: float | None = None) -> float:
+    """Seconds until Open-Meteo publishes its next model run."""
+    now = time.time() if now is None else now
+    elapsed = (now - _OPEN_METEO_PUBLISH_LAG) % _OPEN_METEO_UPDATE_INTERVAL
+    return _OPEN_METEO_UPDATE_INTERVAL - elapsed
+
+
+def _forecast_ttl(latitude: float, longitude: float, timezone: str, days: int) -> float:
+    return seconds_until_forecast_update()
+
+
+@ttl_cached("open_meteo_forecast", ttl=_forecast_ttl)
+def _cached_forecast(latitude: float, longitude: float, timezone: str, days: int) -> dict:
+    return open_meteo_weather_forecast(latitude, longitude, timezone=timezone, days=days)
+
+
+def _slice_forecast(forecast: dict, days: int) -> dict:
+    daily = forecast.get("daily") if isinstance(forecast, dict) else None
+    if not isinstance(daily, dict):
+        return forecast
+    return {
+        **forecast,
+        "daily": {
+            name: values[:days] if isinstance(values, list) else values
+            for name, values in daily.items()
+        },
+    }
+
+
+def cached_weather_forecast(
+    latitude: float,
+    longitude: float,
+    *,
+    timezone: str = "auto",
+    days: int = 5,
+) -> dict:
+    """open_meteo_weather_forecast() through the forecast cache.
+
+    Entries are keyed on the grid cell, timezone and ``FORECAST_CACHE_DAYS``, and
+    expire when the next model run is published; any shorter ``days`` is a slice
+    of the cached response.
+    """
+    cell_latitude, cell_longitude = forecast_bucket(latitude, longitude)
+    forecast = _cached_forecast(
+        cell_latitude, cell_longitude, timezone or "auto", FORECAST_CACHE_DAYS
+    )
+    return _slice_forecast(forecast, max(1, min(days, FORECAST_CACHE_DAYS)))
+
+
 def get_city_weather(city: str, *, days: int = 5) -> dict | None:
     """Return current weather + daily forecast for a U.S. city."""
     try:
@@ -907,12 +1425,13 @@ def get_city_weather(city: str, *, days: int = 5) -> dict | None:
         latitude = float(location["latitude"])
         longitude = float(location["longitude"])
         timezone = str(location.get("timezone") or "auto")
-        forecast = open_meteo_weather_forecast(
+        forecast = cached_weather_forecast(
             latitude,
             longitude,
             timezone=timezone,
             days=days,
         )
+        _record_forecast_demand(latitude, longitude, timezone)
 
         current = forecast.get("current", {}) if isinstance(forecast, dict) else {}
         daily = forecast.get("daily", {}) if isinstance(forecast, dict) else {}
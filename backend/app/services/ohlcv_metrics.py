@@ -0,0 +1,225 @@
+"""Columnar OHLCV metrics for the market agent's performance tools.
+
+The market agent used to turn every ``stock_ohlcv`` row into a dict and walk
+the rows in pairs, computing returns, variance, drawdown, highs, lows and
+volumes in separate Python loops. Here a query result becomes one float64 array
+per column (``ohlcv_columns_by_ticker``), and each metric is a single NumPy pass
+over those arrays. ``analyze_stock_performance`` on ten years of five tickers
+runs about 7x faster (``scripts/bench_ohlcv_metrics.py``).
+
+Missing values are NaN. The metrics treat them as the agent always has:
+a pair with a missing close gives no return, a missing dividend is 0, and a missing split
+factor is 1. Results match the row-by-row implementation to within 1e-9.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+_PRICE_FIELDS = ("open", "high", "low", "close", "volume", "dividends", "stock_splits")
+
+
+def _float_or_nan(value: Any) -> float:
+    if value in (None, ""):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _floats(values: Sequence[Any]) -> np.ndarray:
+    """float64 array of DB values (Decimal, int, float, None); unparseable values are NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter(map(_float_or_nan, values), dtype=np.float64, count=len(values))
+
+
+@dataclass(frozen=True)
+class OhlcvColumns:
+    """One ticker's daily rows in date order, one array per column."""
+
+    trade_dates: Sequence[Any]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    dividends: np.ndarray
+    stock_splits: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+def _columns(data: dict[str, Sequence[Any]], count: int) -> OhlcvColumns:
+    arrays = {
+        field: _floats(data[field]) if field in data else np.full(count, np.nan)
+        for field in _PRICE_FIELDS
+    }
+    return OhlcvColumns(trade_dates=list(data.get("trade_date") or [None] * count), **arrays)
+
+
+def ohlcv_columns(rows: Sequence[dict[str, Any]]) -> OhlcvColumns:
+    """Columns of row dicts as returned by ``MarketAgent._fetch_ohlcv_rows``."""
+    data = {field: [row.get(field) for row in rows] for field in ("trade_date", *_PRICE_FIELDS)}
+    return _columns(data, len(rows))
+
+
+def ohlcv_columns_by_ticker(
+    records: Iterable[Sequence[Any]],
+    names: Sequence[str],
+) -> dict[str, OhlcvColumns]:
+    """Split a cursor result ordered by ticker, then date, into columns per ticker."""
+    transposed = list(zip(*records, strict=True))
+    if not transposed:
+        return {}
+    data = dict(zip(names, transposed, strict=True))
+    tickers = np.asarray(data.pop("ticker"), dtype=object)
+    whole = _columns(data, len(tickers))
+    starts = [0, *(np.flatnonzero(tickers[1:] != tickers[:-1]) + 1).tolist()]
+    ends = [*starts[1:], len(tickers)]
+    return {
+        str(tickers[start]): OhlcvColumns(
+            trade_dates=whole.trade_dates[start:end],
+            **{field: getattr(whole, field)[start:end] for field in _PRICE_FIELDS},
+        )
+        for start, end in zip(starts, ends, strict=True)
+    }
+
+
+@dataclass(frozen=True)
+class AdjustedReturns:
+    """Close-to-close returns with dividends added and split factors applied."""
+
+    returns: np.ndarray
+    total_dividends: float
+    split_events: int
+
+
+def adjusted_returns(columns: OhlcvColumns) -> AdjustedReturns:
+    """Daily returns ``(close + dividend) / (previous close / split) - 1``.
+
+    Pairs where either close is missing or not positive are skipped; only the
+    kept pairs count towards dividends and split events.
+    """
+    previous, current = columns.close[:-1], columns.close[1:]
+    dividends = np.nan_to_num(columns.dividends[1:], nan=0.0)
+    splits = np.nan_to_num(columns.stock_splits[1:], nan=1.0)
+
+    priced = (previous > 0) & (current > 0)
+    split_day = priced & (splits != 0.0) & (splits != 1.0)
+    adjusted_previous = np.divide(previous, splits, out=previous.copy(), where=split_day)
+    valid = priced & (adjusted_previous > 0)
+
+    return AdjustedReturns(
+        returns=(current[valid] + dividends[valid]) / adjusted_previous[valid] - 1.0,
+        total_dividends=float(dividends[priced].sum()),
+        split_events=int(split_day.sum()),
+    )
+
+
+@dataclass(frozen=True)
+class PerformanceMetrics:
+    """Unrounded risk/return figures for one ticker (rates are fractions, not percent)."""
+
+    return_observations: int
+    mean_daily_return: float
+    daily_volatility: float
+    annualized_volatility: float
+    sharpe_ratio: float | None
+    total_return: float
+    annualized_return: float | None
+    max_drawdown: float
+    positive_day_ratio: float
+    total_dividends: float
+    split_events: int
+
+
+def performance_metrics(
+    columns: OhlcvColumns,
+    *,
+    risk_free_rate_pct: float,
+) -> PerformanceMetrics | None:
+    """Risk/return metrics of the adjusted daily returns; None without any returns."""
+    adjusted = adjusted_returns(columns)
+    returns = adjusted.returns
+    count = len(returns)
+    if not count:
+        return None
+
+    mean_daily_return = float(returns.mean())
+    variance = float(returns.var(ddof=1)) if count > 1 else 0.0
+    daily_volatility = float(np.sqrt(max(variance, 0.0)))
+    rf_daily = (risk_free_rate_pct / 100.0) / TRADING_DAYS_PER_YEAR
+    sharpe_ratio = None
+    if daily_volatility > 0:
+        sharpe_ratio = ((mean_daily_return - rf_daily) / daily_volatility) * float(
+            np.sqrt(TRADING_DAYS_PER_YEAR)
+        )
+
+    growth = np.cumprod(1.0 + returns)
+    # The running peak starts at the initial 1.0, as if the series began at its high.
+    peak = np.maximum.accumulate(np.maximum(growth, 1.0))
+    max_drawdown = min(0.0, float((growth / peak - 1.0).min()))
+    cumulative_growth = float(growth[-1])
+    annualized_return = None
+    if cumulative_growth > 0:
+        annualized_return = cumulative_growth ** (TRADING_DAYS_PER_YEAR / count) - 1.0
+
+    return PerformanceMetrics(
+        return_observations=count,
+        mean_daily_return=mean_daily_return,
+        daily_volatility=daily_volatility,
+        annualized_volatility=daily_volatility * float(np.sqrt(TRADING_DAYS_PER_YEAR)),
+        sharpe_ratio=sharpe_ratio,
+        total_return=cumulative_growth - 1.0,
+        annualized_return=annualized_return,
+        max_drawdown=max_drawdown,
+        positive_day_ratio=float(np.count_nonzero(returns > 0)) / count,
+        total_dividends=adjusted.total_dividends,
+        split_events=adjusted.split_events,
+    )
+
+
+@dataclass(frozen=True)
+class PriceRange:
+    """Extremes and averages over the rows that have each value."""
+
+    first_close: float | None
+    latest_close: float | None
+    highest_high: float | None
+    lowest_low: float | None
+    average_volume: float | None
+    total_dividends: float
+
+
+def _first_last(values: np.ndarray) -> tuple[float | None, float | None]:
+    present = np.flatnonzero(~np.isnan(values))
+    if not len(present):
+        return None, None
+    return float(values[present[0]]), float(values[present[-1]])
+
+
+def _nan_reduce(values: np.ndarray, reduce: Any) -> float | None:
+    present = values[~np.isnan(values)]
+    return float(reduce(present)) if len(present) else None
+
+
+def price_range(columns: OhlcvColumns) -> PriceRange:
+    first_close, latest_close = _first_last(columns.close)
+    return PriceRange(
+        first_close=first_close,
+        latest_close=latest_close,
+        highest_high=_nan_reduce(columns.high, np.max),
+        lowest_low=_nan_reduce(columns.low, np.min),
+        average_volume=_nan_reduce(columns.volume, np.mean),
+        total_dividends=float(np.nansum(columns.dividends)),
+    )
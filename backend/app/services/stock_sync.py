@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+import csv
+import io
 import json
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 
+import httpx
 from loguru import logger
-from psycopg2.extras import Json
 
 from backend.app.services.bedrock import embed_text
 from backend.app.services.live_apis import (
     finnhub_analyst_recommendations,
     finnhub_company_profile,
+    finnhub_throttle,
 )
 from backend.database.connect import db_cursor
 
@@ -39,6 +49,18 @@ DEFAULT_STARTER_TICKERS: list[str] = [
     "UNH",
 ]
 
+# Finnhub free tier: 60 calls/minute. Each snapshot costs up to two calls.
+DEFAULT_RATE_PER_MINUTE = 60.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_CHECKPOINT_PATH = Path(tempfile.gettempdir()) / "stock_sync_checkpoint.jsonl"
+
+# Rows per COPY into the staging table; bounds the CSV buffer held in memory.
+_COPY_BATCH_SIZE = 1000
+
+# 429 handling: attempts per ticker and the fallback pause when Retry-After is absent.
+_MAX_RATE_LIMIT_ATTEMPTS = 5
+_DEFAULT_RETRY_AFTER = 5.0
+
 _RECOMMENDATION_ORDER = [
     ("strongBuy", "Strong Buy"),
     ("buy", "Buy"),
@@ -130,97 +152,200 @@ def build_snapshot(symbol: str, *, with_embeddings: bool = False) -> StockSnapsh
     return StockSnapshot(ticker=symbol, metadata=metadata, embedding=embedding)
 
 
-def ensure_stock_data_table() -> None:
-    """Normalize stock_data so sync inserts work with the current app schema."""
-    with db_cursor() as cur:
-        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS stock_data (
-                id SERIAL PRIMARY KEY,
-                embedding vector(1536),
-                metadata JSONB NOT NULL DEFAULT '{}',
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                stored_messages_id INT REFERENCES stored_messages(id) ON DELETE SET NULL
-            );
-            """
-        )
-        cur.execute("ALTER TABLE stock_data ADD COLUMN IF NOT EXISTS embedding vector(1536);")
-        cur.execute(
-            "ALTER TABLE stock_data ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}';"
-        )
-        cur.execute(
-            "ALTER TABLE stock_data "
-            "ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;"
-        )
-        cur.execute(
-            "ALTER TABLE stock_data "
-            "ADD COLUMN IF NOT EXISTS stored_messages_id INT "
-            "REFERENCES stored_messages(id) ON DELETE SET NULL;"
-        )
-        cur.execute("CREATE SEQUENCE IF NOT EXISTS stock_data_id_seq;")
-        cur.execute(
-            """
-            SELECT setval(
-                'stock_data_id_seq',
-                COALESCE((SELECT MAX(id) FROM stock_data), 0) + 1,
-                false
-            );
-            """
-        )
-        cur.execute("ALTER SEQUENCE stock_data_id_seq OWNED BY stock_data.id;")
-        cur.execute(
-            "ALTER TABLE stock_data ALTER COLUMN id SET DEFAULT nextval('stock_data_id_seq');"
-        )
-        cur.execute("ALTER TABLE stock_data ALTER COLUMN embedding DROP NOT NULL;")
-        cur.execute("ALTER TABLE stock_data ALTER COLUMN metadata SET DEFAULT '{}';")
-        cur.execute("ALTER TABLE stock_data ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;")
-        cur.execute("ALTER TABLE stock_data ALTER COLUMN stored_messages_id DROP NOT NULL;")
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_stock_data_name_trgm
-            ON stock_data USING gin ((metadata->>'name') gin_trgm_ops);
-            """
+def _copy_rows(snapshots: list[StockSnapshot]) -> io.StringIO:
+    """Render snapshots as CSV for ``COPY stock_data_stage FROM STDIN``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for snapshot in snapshots:
+        writer.writerow(
+            [
+                json.dumps(snapshot.embedding) if snapshot.embedding is not None else "",
+                json.dumps(snapshot.metadata),
+            ]
         )
+    buffer.seek(0)
+    return buffer
+
+
+def persist_snapshots(snapshots: list[StockSnapshot], *, truncate: bool = False) -> int:
+    """Upsert snapshots into stock_data in one transaction.
+
+    Rows are streamed with ``COPY`` into a temporary staging table in batches of
+    ``_COPY_BATCH_SIZE``, then merged with a single ``INSERT ... ON CONFLICT``
+    on the unique ``ticker`` column. A later snapshot for the same ticker wins.
+    """
+    if not snapshots:
+        return 0
+
+    latest = list({snapshot.ticker: snapshot for snapshot in snapshots}.values())
+    with db_cursor() as cur:
+        if truncate:
+            cur.execute("TRUNCATE TABLE stock_data RESTART IDENTITY;")
         cur.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_stock_data_sector
-            ON stock_data ((metadata->>'sector'));
+            CREATE TEMP TABLE stock_data_stage (embedding TEXT, metadata JSONB NOT NULL)
+            ON COMMIT DROP;
             """
         )
+        for start in range(0, len(latest), _COPY_BATCH_SIZE):
+            cur.copy_expert(
+                "COPY stock_data_stage (embedding, metadata) FROM STDIN WITH (FORMAT csv)",
+                _copy_rows(latest[start : start + _COPY_BATCH_SIZE]),
+            )
         cur.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_stock_data_recommendation
-            ON stock_data ((metadata->>'recommendation'));
+            INSERT INTO stock_data (embedding, metadata, stored_messages_id)
+            SELECT NULLIF(embedding, '')::vector, metadata, NULL
+            FROM stock_data_stage
+            ON CONFLICT (ticker) DO UPDATE
+            SET embedding = EXCLUDED.embedding,
+                metadata = EXCLUDED.metadata,
+                created_at = CURRENT_TIMESTAMP;
             """
         )
+    return len(latest)
 
 
-def persist_snapshots(snapshots: list[StockSnapshot], *, truncate: bool = False) -> int:
-    """Write snapshots into stock_data."""
-    if not snapshots:
-        return 0
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate_per_minute``, holding ``capacity`` tokens.
 
-    ensure_stock_data_table()
-    with db_cursor() as cur:
-        if truncate:
-            cur.execute("TRUNCATE TABLE stock_data RESTART IDENTITY;")
-        for snapshot in snapshots:
-            cur.execute(
-                "DELETE FROM stock_data WHERE metadata->>'ticker' = %s;",
-                (snapshot.ticker,),
+    ``pause()`` empties the bucket and blocks every caller until the pause ends, so
+    one 429 backs off all workers rather than just the one that saw it.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        *,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self._rate = rate_per_minute / 60.0
+        self._capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def acquire(self) -> None:
+        """Block until one token is available, then take it."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                # During a pause _updated sits at the pause end, so nothing accrues.
+                elapsed = max(now - self._updated, 0.0)
+                self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+                self._updated = max(self._updated, now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (e.g. a 429 Retry-After)."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+def _retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Parse Retry-After as delta-seconds or an HTTP date; fall back to ``default``."""
+    value = response.headers.get("Retry-After", "").strip()
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max((retry_at - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def _build_snapshot_with_backoff(
+    ticker: str,
+    bucket: TokenBucket,
+    *,
+    with_embeddings: bool,
+) -> StockSnapshot | None:
+    """``build_snapshot`` that pauses the shared bucket and retries on HTTP 429."""
+    for attempt in range(1, _MAX_RATE_LIMIT_ATTEMPTS + 1):
+        try:
+            return build_snapshot(ticker, with_embeddings=with_embeddings)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 429 or attempt == _MAX_RATE_LIMIT_ATTEMPTS:
+                raise
+            delay = _retry_after_seconds(
+                exc.response, default=_DEFAULT_RETRY_AFTER * 2 ** (attempt - 1)
             )
-            cur.execute(
-                """
-                INSERT INTO stock_data (embedding, metadata, stored_messages_id)
-                VALUES (%s, %s, NULL)
-                """,
-                (
-                    json.dumps(snapshot.embedding) if snapshot.embedding is not None else None,
-                    Json(snapshot.metadata),
-                ),
+            logger.warning(
+                "Finnhub rate limited | ticker={} attempt={} retry_after={:.1f}s",
+                ticker,
+                attempt,
+                delay,
             )
-    return len(snapshots)
+            bucket.pause(delay)
+    return None
+
+
+class _Checkpoint:
+    """Append-only JSONL record of finished tickers and their snapshots.
+
+    Tickers whose fetch raised are not recorded, so a resumed run retries them.
+    """
+
+    def __init__(self, path: Path, *, resume: bool, with_embeddings: bool) -> None:
+        self.path = path
+        self.with_embeddings = with_embeddings
+        self.done: dict[str, StockSnapshot | None] = {}
+        self._lock = threading.Lock()
+        if resume and path.exists():
+            self._load()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("", encoding="utf-8")
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from an interrupted write
+                # Snapshots fetched without embeddings are refetched when they are wanted.
+                if self.with_embeddings and not entry.get("with_embeddings"):
+                    continue
+                snapshot = entry.get("snapshot")
+                self.done[entry["ticker"]] = StockSnapshot(**snapshot) if snapshot else None
+
+    def record(self, ticker: str, snapshot: StockSnapshot | None) -> None:
+        line = json.dumps(
+            {
+                "ticker": ticker,
+                "with_embeddings": self.with_embeddings,
+                "snapshot": asdict(snapshot) if snapshot is not None else None,
+            }
+        )
+        with self._lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+        self.done[ticker] = snapshot
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
 
 
 def sync_stock_data(
@@ -228,27 +353,69 @@ def sync_stock_data(
     *,
     with_embeddings: bool = False,
     truncate: bool = False,
-    delay_seconds: float = 1.0,
+    rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    resume: bool = False,
+    checkpoint_path: Path | str = DEFAULT_CHECKPOINT_PATH,
 ) -> int:
-    """Fetch and persist stock snapshots for the provided ticker list."""
-    snapshots: list[StockSnapshot] = []
+    """Fetch and persist stock snapshots for the provided ticker list.
+
+    Fetches run on ``concurrency`` threads while every Finnhub call draws from a
+    shared token bucket, so the run proceeds at ``rate_per_minute`` calls. Each
+    finished ticker is appended to ``checkpoint_path``; with ``resume=True`` those
+    tickers are skipped and their saved snapshots are persisted with the new ones.
+    """
     unique_tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
-    unique_tickers = [
-        ticker for i, ticker in enumerate(unique_tickers) if ticker not in unique_tickers[:i]
-    ]
+    unique_tickers = list(dict.fromkeys(unique_tickers))
 
-    for index, ticker in enumerate(unique_tickers):
-        try:
-            snapshot = build_snapshot(ticker, with_embeddings=with_embeddings)
+    checkpoint = _Checkpoint(Path(checkpoint_path), resume=resume, with_embeddings=with_embeddings)
+    pending = [ticker for ticker in unique_tickers if ticker not in checkpoint.done]
+    if resume:
+        logger.info(
+            "Resuming stock sync | done={} pending={}",
+            len(unique_tickers) - len(pending),
+            len(pending),
+        )
+
+    bucket = TokenBucket(rate_per_minute, capacity=min(concurrency, rate_per_minute))
+    failed = 0
+    with (
+        finnhub_throttle(bucket.acquire),
+        ThreadPoolExecutor(
+            max_workers=max(concurrency, 1), thread_name_prefix="stock-sync"
+        ) as pool,
+    ):
+        futures = {
+            pool.submit(
+                _build_snapshot_with_backoff, ticker, bucket, with_embeddings=with_embeddings
+            ): ticker
+            for ticker in pending
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                snapshot = future.result()
+            except Exception as exc:
+                failed += 1
+                logger.warning("Stock snapshot fetch failed for {}: {}", ticker, exc)
+                continue
+            checkpoint.record(ticker, snapshot)
             if snapshot is not None:
-                snapshots.append(snapshot)
                 logger.info("Prepared stock snapshot for {}", ticker)
-        except Exception as exc:
-            logger.warning("Stock snapshot fetch failed for {}: {}", ticker, exc)
-
-        if delay_seconds > 0 and index < len(unique_tickers) - 1:
-            time.sleep(delay_seconds)
 
+    snapshots = [
+        snapshot
+        for ticker in unique_tickers
+        if (snapshot := checkpoint.done.get(ticker)) is not None
+    ]
     written = persist_snapshots(snapshots, truncate=truncate)
     logger.info("Persisted {} stock snapshots", written)
+    if failed:
+        logger.warning(
+            "Stock sync incomplete | failed={} checkpoint={} (rerun with --resume)",
+            failed,
+            checkpoint.path,
+        )
+    else:
+        checkpoint.remove()
     return written
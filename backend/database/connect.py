@@ -1,17 +1,24 @@
 # backend/database/db.py
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from collections.abc import Iterator
-from contextlib import contextmanager
+import ssl
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
-from functools import lru_cache
-from typing import Final
+from functools import lru_cache, partial
+from typing import Any, Final
 
+import asyncpg
 import boto3
 import psycopg2
 from dotenv import load_dotenv
+from loguru import logger
 from psycopg2.extensions import connection as PGConnection
 from psycopg2.extensions import cursor as PGCursor
 
@@ -23,6 +30,14 @@ DEFAULT_SSLROOTCERT: Final[str] = "certs/global-bundle.pem"
 DEFAULT_PORT: Final[int] = 5432
 DEFAULT_REGION: Final[str] = "us-east-1"
 DEFAULT_DB_SECRET_ID: Final[str] = "ards-password"
+DEFAULT_SECRET_TTL: Final[float] = 3600.0
+
+# Connection pool defaults (override with DB_POOL_* environment variables)
+DEFAULT_POOL_MAX_SIZE: Final[int] = 10
+DEFAULT_POOL_ACQUIRE_TIMEOUT: Final[float] = 10.0
+DEFAULT_POOL_MAX_LIFETIME: Final[float] = 1800.0
+DEFAULT_POOL_MAX_IDLE: Final[float] = 300.0
+DEFAULT_POOL_HEALTHCHECK_AFTER: Final[float] = 30.0
 
 
 @dataclass(frozen=True)
@@ -69,11 +84,16 @@ def load_db_config() -> DBConfig:
 
 
 @lru_cache(maxsize=1)
-def _get_db_password(secret_arn: str, region: str) -> str:
+def get_db_config() -> DBConfig:
     """
-    Resolve the DB password from Secrets Manager.
-    Cache lasts for process lifetime; restart process to refresh.
+    Process-wide DBConfig resolved once from the environment.
+    Call ``get_db_config.cache_clear()`` after changing DB_* variables at runtime.
     """
+    return load_db_config()
+
+
+def _fetch_db_password(secret_arn: str, region: str) -> str:
+    """Resolve the DB password from Secrets Manager (one network round trip)."""
     sm = boto3.client("secretsmanager", region_name=region)
     secret_str = sm.get_secret_value(SecretId=secret_arn)["SecretString"]
     secret = json.loads(secret_str)
@@ -84,14 +104,64 @@ def _get_db_password(secret_arn: str, region: str) -> str:
     return password
 
 
-def get_conn(cfg: DBConfig | None = None) -> PGConnection:
+class _CredentialCache:
     """
-    Create a new psycopg2 connection.
-    For a web app, switch to a connection pool (psycopg_pool / SQLAlchemy) soon.
+    TTL cache for resolved DB passwords, keyed by (secret_arn, region).
+
+    Passing ``stale`` forces a refresh only if the cached value still equals the
+    rejected password, so a burst of auth failures after a rotation triggers a
+    single Secrets Manager call rather than one per connection attempt.
     """
-    cfg = cfg or load_db_config()
-    password = _get_db_password(cfg.secret_arn, cfg.region)
 
+    def __init__(
+        self,
+        fetch: Callable[[str, str], str],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[str, float]] = {}
+
+    def get(self, secret_arn: str, region: str, *, stale: str | None = None) -> str:
+        key = (secret_arn, region)
+        ttl = float(_env("DB_SECRET_TTL", str(DEFAULT_SECRET_TTL)))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                password, fetched_at = cached
+                fresh = self._clock() - fetched_at < ttl
+                if fresh and (stale is None or password != stale):
+                    return password
+            password = self._fetch(secret_arn, region)
+            self._entries[key] = (password, self._clock())
+            logger.debug("db credentials | fetched secret (refresh={})", stale is not None)
+            return password
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_credentials = _CredentialCache(lambda arn, region: _fetch_db_password(arn, region))
+
+
+def _get_db_password(secret_arn: str, region: str, *, stale: str | None = None) -> str:
+    """
+    Resolve the DB password, served from a TTL cache (DB_SECRET_TTL seconds).
+    Pass the rejected password as ``stale`` to force one refresh after rotation.
+    """
+    return _credentials.get(secret_arn, region, stale=stale)
+
+
+def _is_auth_failure(exc: psycopg2.OperationalError) -> bool:
+    if getattr(exc, "pgcode", None) in {"28P01", "28000"}:
+        return True
+    return "password authentication failed" in str(exc).lower()
+
+
+def _connect(cfg: DBConfig, password: str) -> PGConnection:
     return psycopg2.connect(
         host=cfg.host,
         port=cfg.port,
@@ -104,24 +174,441 @@ def get_conn(cfg: DBConfig | None = None) -> PGConnection:
     )
 
 
+def get_conn(cfg: DBConfig | None = None) -> PGConnection:
+    """
+    Create a new psycopg2 connection.
+    Most callers should use db_cursor(), which borrows from the process-wide pool.
+
+    If the server rejects the cached password (e.g. after a secret rotation),
+    the secret is re-fetched once and the connection retried.
+    """
+    cfg = cfg or get_db_config()
+    password = _get_db_password(cfg.secret_arn, cfg.region)
+    try:
+        return _connect(cfg, password)
+    except psycopg2.OperationalError as exc:
+        if not _is_auth_failure(exc):
+            raise
+        logger.warning("db credentials | login rejected, refreshing secret and retrying once")
+        refreshed = _get_db_password(cfg.secret_arn, cfg.region, stale=password)
+        return _connect(cfg, refreshed)
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available within the acquire timeout."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    waiting: int
+    acquired: int
+    created: int
+    recycled: int
+    discarded: int
+    timeouts: int
+    avg_wait_ms: float
+
+
+@dataclass
+class _PooledConn:
+    conn: PGConnection
+    created_at: float
+    last_used_at: float
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe psycopg2 connection pool.
+
+    - At most ``max_size`` connections are open at once; extra callers block up to
+      ``acquire_timeout`` seconds and then get a PoolTimeoutError.
+    - Connections older than ``max_lifetime`` seconds are closed and replaced.
+    - Connections idle for longer than ``health_check_after`` seconds are pinged
+      with ``SELECT 1`` before reuse; broken ones are discarded transparently.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], PGConnection],
+        *,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        acquire_timeout: float = DEFAULT_POOL_ACQUIRE_TIMEOUT,
+        max_lifetime: float = DEFAULT_POOL_MAX_LIFETIME,
+        health_check_after: float = DEFAULT_POOL_HEALTHCHECK_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self._max_size = max_size
+        self._acquire_timeout = acquire_timeout
+        self._max_lifetime = max_lifetime
+        self._health_check_after = health_check_after
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._idle: deque[_PooledConn] = deque()
+        self._in_use: dict[int, _PooledConn] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._acquired = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+
+    def acquire(self) -> PGConnection:
+        """Borrow a healthy connection, opening a new one if the pool has room."""
+        started = self._clock()
+        deadline = started + self._acquire_timeout
+        while True:
+            candidate: _PooledConn | None = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed.")
+                    if self._idle:
+                        # LIFO keeps a small hot set warm and lets extras age out.
+                        candidate = self._idle.pop()
+                        break
+                    if self._size < self._max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self._acquire_timeout:.1f}s waiting for a "
+                            f"database connection (pool max_size={self._max_size})."
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            if candidate is not None and not self._is_reusable(candidate):
+                self._drop(candidate.conn)
+                continue
+
+            if candidate is None:
+                candidate = self._open()
+
+            with self._cond:
+                now = self._clock()
+                candidate.last_used_at = now
+                self._in_use[id(candidate.conn)] = candidate
+                self._acquired += 1
+                self._total_wait += now - started
+            return candidate.conn
+
+    def release(self, conn: PGConnection, *, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it when it is unusable."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            logger.warning("db pool | release() called with a connection the pool does not own")
+            _close_quietly(conn)
+            return
+
+        if discard or self._closed or conn.closed:
+            self._drop(conn)
+            return
+
+        with self._cond:
+            entry.last_used_at = self._clock()
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[PGConnection]:
+        """Borrow a connection for the duration of a ``with`` block."""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(
+                max_size=self._max_size,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                waiting=self._waiting,
+                acquired=self._acquired,
+                created=self._created,
+                recycled=self._recycled,
+                discarded=self._discarded,
+                timeouts=self._timeouts,
+                avg_wait_ms=round(self._total_wait / self._acquired * 1000.0, 3)
+                if self._acquired
+                else 0.0,
+            )
+
+    def close(self) -> None:
+        """Close idle connections now; borrowed ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            _close_quietly(entry.conn)
+
+    def _open(self) -> _PooledConn:
+        try:
+            conn = self._factory()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        now = self._clock()
+        with self._cond:
+            self._created += 1
+        return _PooledConn(conn=conn, created_at=now, last_used_at=now)
+
+    def _is_reusable(self, entry: _PooledConn) -> bool:
+        if entry.conn.closed:
+            return False
+        now = self._clock()
+        if now - entry.created_at >= self._max_lifetime:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if now - entry.last_used_at >= self._health_check_after:
+            try:
+                with entry.conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                entry.conn.rollback()
+            except Exception as exc:
+                logger.info("db pool | discarding stale connection: {}", exc)
+                return False
+        return True
+
+    def _drop(self, conn: PGConnection) -> None:
+        _close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+
+def _close_quietly(conn: PGConnection) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools: dict[DBConfig, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(_env(name, str(default)))
+
+
+def get_pool(cfg: DBConfig | None = None) -> ConnectionPool:
+    """Return the process-wide pool for *cfg*, creating it on first use."""
+    cfg = cfg or get_db_config()
+    pool = _pools.get(cfg)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(cfg)
+        if pool is None:
+            pool = ConnectionPool(
+                lambda: get_conn(cfg),
+                max_size=int(_env("DB_POOL_MAX_SIZE", str(DEFAULT_POOL_MAX_SIZE))),
+                acquire_timeout=_env_float("DB_POOL_TIMEOUT", DEFAULT_POOL_ACQUIRE_TIMEOUT),
+                max_lifetime=_env_float("DB_POOL_MAX_LIFETIME", DEFAULT_POOL_MAX_LIFETIME),
+                health_check_after=_env_float(
+                    "DB_POOL_HEALTHCHECK_AFTER", DEFAULT_POOL_HEALTHCHECK_AFTER
+                ),
+            )
+            _pools[cfg] = pool
+            logger.info(
+                "db pool | created for host={} db={} max_size={}",
+                cfg.host,
+                cfg.dbname,
+                pool.stats().max_size,
+            )
+    return pool
+
+
+def pool_stats() -> dict[str, PoolStats]:
+    """Snapshot of every live pool, keyed by ``host/dbname``."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {f"{cfg.host}/{cfg.dbname}": pool.stats() for cfg, pool in pools}
+
+
+def close_pools() -> None:
+    """Close all pooled connections (call on application shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 @contextmanager
 def db_cursor(cfg: DBConfig | None = None) -> Iterator[PGCursor]:
     """
-    Context manager that yields a cursor and handles commit/rollback/close safely.
+    Context manager that yields a cursor and handles commit/rollback safely.
+    The underlying connection is borrowed from the process-wide pool.
     """
-    conn: PGConnection | None = None
-    try:
-        conn = get_conn(cfg)
+    with get_pool(cfg).connection() as conn:
         cur = conn.cursor()
-        yield cur
-        conn.commit()
-    except Exception:
-        if conn is not None:
-            conn.rollback()
-        raise
-    finally:
-        if conn is not None:
-            conn.close()
+        try:
+            yield cur
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+# ---------------------------------------------------------------------------
+# Async pool (asyncpg) for the asyncio request path
+# ---------------------------------------------------------------------------
+
+_async_pools: dict[DBConfig, asyncpg.Pool] = {}
+_async_pools_lock: asyncio.Lock | None = None
+
+
+def _asyncpg_ssl(cfg: DBConfig) -> ssl.SSLContext | bool:
+    """Translate libpq sslmode/sslrootcert into an asyncpg ``ssl`` argument."""
+    if cfg.sslmode == "disable":
+        return False
+    if cfg.sslmode in {"verify-ca", "verify-full"}:
+        ctx = ssl.create_default_context(cafile=cfg.sslrootcert)
+        ctx.check_hostname = cfg.sslmode == "verify-full"
+        return ctx
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+class _PooledConnection(asyncpg.Connection):
+    """asyncpg connection that records when it was opened, for DB_POOL_MAX_LIFETIME."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.opened_at = time.monotonic()
+
+
+def _is_async_auth_failure(exc: Exception) -> bool:
+    return isinstance(
+        exc,
+        asyncpg.InvalidPasswordError | asyncpg.InvalidAuthorizationSpecificationError,
+    )
+
+
+async def _aconnect(cfg: DBConfig, *args: Any, **kwargs: Any) -> asyncpg.Connection:
+    """
+    asyncpg counterpart of connect(): a login rejected with 28P01/28000 forces one
+    Secrets Manager refresh (the password may have rotated) and one retry.
+    """
+    # Served from the TTL cache; only a miss touches Secrets Manager.
+    password = await asyncio.to_thread(_get_db_password, cfg.secret_arn, cfg.region)
+    try:
+        return await asyncpg.connect(*args, password=password, **kwargs)
+    except Exception as exc:
+        if not _is_async_auth_failure(exc):
+            raise
+        logger.warning("db credentials | async login rejected, refreshing secret and retrying once")
+        refreshed = await asyncio.to_thread(
+            _get_db_password, cfg.secret_arn, cfg.region, stale=password
+        )
+        return await asyncpg.connect(*args, password=refreshed, **kwargs)
+
+
+async def get_async_pool(cfg: DBConfig | None = None) -> asyncpg.Pool:
+    """Return the process-wide asyncpg pool for *cfg*, creating it on first use."""
+    global _async_pools_lock
+    cfg = cfg or get_db_config()
+    pool = _async_pools.get(cfg)
+    if pool is not None:
+        return pool
+    if _async_pools_lock is None:
+        _async_pools_lock = asyncio.Lock()
+    async with _async_pools_lock:
+        pool = _async_pools.get(cfg)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                host=cfg.host,
+                port=cfg.port,
+                database=cfg.dbname,
+                user=cfg.user,
+                ssl=_asyncpg_ssl(cfg),
+                connect=partial(_aconnect, cfg),
+                connection_class=_PooledConnection,
+                min_size=0,
+                max_size=int(_env("DB_POOL_MAX_SIZE", str(DEFAULT_POOL_MAX_SIZE))),
+                # asyncpg's own setting is an idle timeout; DB_POOL_MAX_LIFETIME is
+                # enforced on release in async_db_connection().
+                max_inactive_connection_lifetime=_env_float(
+                    "DB_POOL_MAX_IDLE", DEFAULT_POOL_MAX_IDLE
+                ),
+                timeout=8,
+            )
+            _async_pools[cfg] = pool
+            logger.info("db async pool | created for host={} db={}", cfg.host, cfg.dbname)
+    return pool
+
+
+@asynccontextmanager
+async def async_db_connection(cfg: DBConfig | None = None) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Async counterpart of db_cursor(): yields an asyncpg connection inside a
+    transaction that commits on success and rolls back on error.
+    Connections older than DB_POOL_MAX_LIFETIME are closed instead of reused.
+    """
+    pool = await get_async_pool(cfg)
+    timeout = _env_float("DB_POOL_TIMEOUT", DEFAULT_POOL_ACQUIRE_TIMEOUT)
+    max_lifetime = _env_float("DB_POOL_MAX_LIFETIME", DEFAULT_POOL_MAX_LIFETIME)
+    async with pool.acquire(timeout=timeout) as conn:
+        try:
+            async with conn.transaction():
+                yield conn
+        finally:
+            opened_at = getattr(conn, "opened_at", None)
+            if max_lifetime > 0 and opened_at is not None:
+                if time.monotonic() - opened_at >= max_lifetime:
+                    # The pool reconnects a closed holder on its next acquire.
+                    await conn.close()
+
+
+async def close_async_pools() -> None:
+    """Close all asyncpg pools (call on application shutdown)."""
+    pools = list(_async_pools.values())
+    _async_pools.clear()
+    for pool in pools:
+        await pool.close()
 
 
 def smoke_test() -> None:
@@ -0,0 +1,407 @@
+"""Versioned schema migrations, applied once at deploy/startup.
+
+Each migration is a numbered list of SQL statements. ``run_migrations()`` records
+applied versions in ``schema_migrations`` and applies anything newer, each version
+in its own transaction. A Postgres advisory lock serializes concurrent runners
+(several uvicorn workers starting at once), so each version is applied exactly once
+and request handlers never issue DDL.
+
+Run manually (deploy.sh does this before restarting the API):
+    uv run python -m backend.database.migrate
+    uv run python -m backend.database.migrate --status
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Final
+
+from loguru import logger
+
+from backend.database.connect import db_cursor
+
+# Arbitrary constant key for pg_advisory_xact_lock (fits in BIGINT).
+_ADVISORY_LOCK_KEY: Final[int] = 0x5645_4D49_4752  # "VEMIGR"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: Final[tuple[Migration, ...]] = (
+    # Repairs older history tables so the API can persist chats safely.
+    Migration(
+        1,
+        "history_schema",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS stored_chats (
+                id SERIAL PRIMARY KEY,
+                user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                agent_type TEXT CHECK (agent_type IN ('housing', 'market')),
+                title TEXT
+            );
+            """,
+            "ALTER TABLE stored_chats ADD COLUMN IF NOT EXISTS agent_type TEXT;",
+            "ALTER TABLE stored_chats ADD COLUMN IF NOT EXISTS title TEXT;",
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_name = 'stored_chats' AND column_name = 'users_id'
+                ) THEN
+                    ALTER TABLE stored_chats ALTER COLUMN users_id DROP NOT NULL;
+                END IF;
+            END
+            $$;
+            """,
+            "CREATE SEQUENCE IF NOT EXISTS stored_chats_id_seq;",
+            """
+            SELECT setval(
+                'stored_chats_id_seq',
+                COALESCE((SELECT MAX(id) FROM stored_chats), 0) + 1,
+                false
+            );
+            """,
+            "ALTER TABLE stored_chats ALTER COLUMN id SET DEFAULT nextval('stored_chats_id_seq');",
+            "ALTER TABLE stored_chats ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;",
+            """
+            CREATE TABLE IF NOT EXISTS stored_messages (
+                id SERIAL PRIMARY KEY,
+                chat_id INT NOT NULL REFERENCES stored_chats(id) ON DELETE CASCADE,
+                sender INT NOT NULL CHECK (sender IN (0, 1)),
+                message TEXT NOT NULL,
+                metadata JSONB NOT NULL DEFAULT '{}',
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            ALTER TABLE stored_messages
+            ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}';
+            """,
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_name = 'stored_messages' AND column_name = 'embedding'
+                ) THEN
+                    ALTER TABLE stored_messages ALTER COLUMN embedding DROP NOT NULL;
+                END IF;
+            END
+            $$;
+            """,
+            "CREATE SEQUENCE IF NOT EXISTS stored_messages_id_seq;",
+            """
+            SELECT setval(
+                'stored_messages_id_seq',
+                COALESCE((SELECT MAX(id) FROM stored_messages), 0) + 1,
+                false
+            );
+            """,
+            """
+            ALTER TABLE stored_messages
+            ALTER COLUMN id SET DEFAULT nextval('stored_messages_id_seq');
+            """,
+            "ALTER TABLE stored_messages ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;",
+        ),
+    ),
+    # Normalizes stock_data for the sync job and the screen_companies tool.
+    Migration(
+        2,
+        "stock_data_schema",
+        (
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            """
+            CREATE TABLE IF NOT EXISTS stock_data (
+                id SERIAL PRIMARY KEY,
+                embedding vector(1536),
+                metadata JSONB NOT NULL DEFAULT '{}',
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                stored_messages_id INT REFERENCES stored_messages(id) ON DELETE SET NULL
+            );
+            """,
+            "ALTER TABLE stock_data ADD COLUMN IF NOT EXISTS embedding vector(1536);",
+            "ALTER TABLE stock_data ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}';",
+            """
+            ALTER TABLE stock_data
+            ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+            """,
+            """
+            ALTER TABLE stock_data
+            ADD COLUMN IF NOT EXISTS stored_messages_id INT
+            REFERENCES stored_messages(id) ON DELETE SET NULL;
+            """,
+            "CREATE SEQUENCE IF NOT EXISTS stock_data_id_seq;",
+            """
+            SELECT setval(
+                'stock_data_id_seq',
+                COALESCE((SELECT MAX(id) FROM stock_data), 0) + 1,
+                false
+            );
+            """,
+            "ALTER SEQUENCE stock_data_id_seq OWNED BY stock_data.id;",
+            "ALTER TABLE stock_data ALTER COLUMN id SET DEFAULT nextval('stock_data_id_seq');",
+            "ALTER TABLE stock_data ALTER COLUMN embedding DROP NOT NULL;",
+            "ALTER TABLE stock_data ALTER COLUMN metadata SET DEFAULT '{}';",
+            "ALTER TABLE stock_data ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;",
+            "ALTER TABLE stock_data ALTER COLUMN stored_messages_id DROP NOT NULL;",
+            """
+            CREATE INDEX IF NOT EXISTS idx_stock_data_name_trgm
+            ON stock_data USING gin ((metadata->>'name') gin_trgm_ops);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_stock_data_sector
+            ON stock_data ((metadata->>'sector'));
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_stock_data_recommendation
+            ON stock_data ((metadata->>'recommendation'));
+            """,
+        ),
+    ),
+    # One row per ticker: drop older duplicates left by the pre-upsert writer,
+    # then key upserts on a generated ticker column.
+    Migration(
+        3,
+        "stock_data_ticker_key",
+        (
+            """
+            DELETE FROM stock_data AS older
+            USING stock_data AS newer
+            WHERE older.metadata->>'ticker' = newer.metadata->>'ticker'
+              AND older.id < newer.id;
+            """,
+            """
+            ALTER TABLE stock_data ADD COLUMN IF NOT EXISTS ticker TEXT
+            GENERATED ALWAYS AS (metadata->>'ticker') STORED;
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_data_ticker ON stock_data (ticker);",
+        ),
+    ),
+    # Keyset pagination for the history API: seek on (owner, created_at, id).
+    Migration(
+        4,
+        "history_keyset_indexes",
+        (
+            """
+            CREATE INDEX IF NOT EXISTS idx_stored_chats_user_created
+            ON stored_chats (user_id, created_at, id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_stored_messages_chat_created
+            ON stored_messages (chat_id, created_at, id);
+            """,
+        ),
+    ),
+    # Semantic answer cache (services/answer_cache.py): cosine search over Titan
+    # question embeddings, one row per cached answer.
+    Migration(
+        5,
+        "answer_cache",
+        (
+            "CREATE EXTENSION IF NOT EXISTS vector;",
+            """
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                id BIGSERIAL PRIMARY KEY,
+                agent_type TEXT NOT NULL,
+                question TEXT NOT NULL,
+                embedding vector(1536) NOT NULL,
+                response JSONB NOT NULL,
+                sources TEXT[] NOT NULL DEFAULT '{}',
+                latency_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+                hits INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                expires_at TIMESTAMPTZ NOT NULL
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_answer_cache_embedding
+            ON answer_cache USING hnsw (embedding vector_cosine_ops);
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_answer_cache_expires ON answer_cache (expires_at);",
+        ),
+    ),
+    # Local Census ACS place index (services/census_places.py), refreshed per state by
+    # scripts/sync_reference_data.py. text_pattern_ops serves both the = and
+    # the ~>=~/~<~ prefix-range probes lookup_places runs per query row.
+    Migration(
+        6,
+        "census_places",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS census_places (
+                state_fips CHAR(2) NOT NULL,
+                place_fips TEXT NOT NULL,
+                name TEXT NOT NULL,
+                place_key TEXT NOT NULL,
+                median_home_value TEXT,
+                median_gross_rent TEXT,
+                median_household_income TEXT,
+                population INT,
+                acs_year INT NOT NULL,
+                refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (state_fips, place_fips)
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_census_places_key
+            ON census_places (place_key text_pattern_ops, state_fips);
+            """,
+        ),
+    ),
+    # Local HUD Fair Market Rents per metro and fiscal year, plus the name/city/CBSA
+    # crosswalk they are looked up by (services/hud_fmr.py).
+    Migration(
+        7,
+        "hud_fmr",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS hud_fmr (
+                entity_id TEXT NOT NULL,
+                year INT NOT NULL,
+                cbsa_code TEXT,
+                metro_name TEXT NOT NULL,
+                fmr_0br INT,
+                fmr_1br INT,
+                fmr_2br INT,
+                fmr_3br INT,
+                fmr_4br INT,
+                refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (entity_id, year)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS hud_metro_aliases (
+                alias_key TEXT NOT NULL,
+                state_fips TEXT NOT NULL DEFAULT '',
+                entity_id TEXT NOT NULL,
+                position SMALLINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (alias_key, state_fips, entity_id)
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_hud_metro_aliases_entity
+            ON hud_metro_aliases (entity_id);
+            """,
+        ),
+    ),
+    # Local FRED observations, synced incrementally per series (services/fred_store.py).
+    # Values are kept as FRED returns them ('.' marks a missing observation).
+    Migration(
+        8,
+        "fred_observations",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS fred_observations (
+                series_id TEXT NOT NULL,
+                date DATE NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (series_id, date)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS fred_series_sync (
+                series_id TEXT PRIMARY KEY,
+                last_observation DATE,
+                synced_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                fresh_until TIMESTAMPTZ NOT NULL
+            );
+            """,
+        ),
+    ),
+    # Answer-cache hits must also match the question's entities (city, ticker,
+    # indicator, numbers); rows stored without them are dropped.
+    Migration(
+        9,
+        "answer_cache_slots",
+        (
+            "DELETE FROM answer_cache;",
+            "ALTER TABLE answer_cache ADD COLUMN IF NOT EXISTS question_slots TEXT NOT NULL;",
+            """
+            CREATE INDEX IF NOT EXISTS idx_answer_cache_slots
+            ON answer_cache (question_slots, expires_at);
+            """,
+        ),
+    ),
+)
+
+
+def _ensure_migrations_table() -> None:
+    with db_cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+
+
+def applied_versions() -> set[int]:
+    """Return the migration versions already recorded in the database."""
+    _ensure_migrations_table()
+    with db_cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations;")
+        return {row[0] for row in cur.fetchall()}
+
+
+def run_migrations(migrations: tuple[Migration, ...] = MIGRATIONS) -> list[int]:
+    """Apply every pending migration in version order; return the versions applied."""
+    applied = applied_versions()
+    pending = sorted((m for m in migrations if m.version not in applied), key=lambda m: m.version)
+    if not pending:
+        logger.info("db migrate | schema up to date at version={}", max(applied, default=0))
+        return []
+
+    done: list[int] = []
+    for migration in pending:
+        with db_cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (_ADVISORY_LOCK_KEY,))
+            # Another runner may have applied it while this one waited on the lock.
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (migration.version,))
+            if cur.fetchone() is not None:
+                continue
+            for statement in migration.statements:
+                cur.execute(statement)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                (migration.version, migration.name),
+            )
+        done.append(migration.version)
+        logger.info("db migrate | applied version={} name={}", migration.version, migration.name)
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending database schema migrations.")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="List migrations and whether each is applied, without changing anything.",
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        applied = applied_versions()
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:>4}  {migration.name:<28} {state}")
+        return
+
+    versions = run_migrations()
+    print(f"Applied {len(versions)} migration(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark: sharded Bedrock AsyncClients vs one large connection pool.
+
+Starts the local Bedrock Converse stub from ``bench_chat_concurrency`` and fires
+``--level`` concurrent ``_aconverse`` calls through two client layouts:
+
+  sharded  — ``_ASYNC_POOL_SHARDS`` clients of ``_ASYNC_POOL_SHARD_SIZE`` connections
+             (the layout ``bedrock._async_http_client`` uses)
+  single   — one AsyncClient whose pool holds the same number of connections
+
+Each layout runs in a fresh process with its connections opened by one warm-up
+burst, then ``--repeat`` measured bursts.
+
+Usage:
+    uv run python -m backend.scripts.bench_bedrock_clients
+    uv run python -m backend.scripts.bench_bedrock_clients --level 100 --latency 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+
+# Fake credentials so the SigV4 signer works against the stub.
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ.setdefault("AWS_EC2_METADATA_DISABLED", "true")
+
+from loguru import logger
+
+from backend.app.services import bedrock
+from backend.scripts.bench_chat_concurrency import _percentile, start_bedrock_stub
+
+_PAYLOAD = {"messages": [{"role": "user", "content": [{"text": "bench"}]}]}
+
+
+async def _burst(level: int) -> tuple[list[float], float]:
+    async def one() -> float:
+        started = time.perf_counter()
+        await bedrock._aconverse(bedrock.NOVA_PRO, _PAYLOAD)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(level)))
+    return list(latencies), time.perf_counter() - started
+
+
+async def _measure(level: int, repeat: int) -> list[tuple[list[float], float]]:
+    await bedrock.awarm_up()
+    await _burst(level)
+    try:
+        return [await _burst(level) for _ in range(repeat)]
+    finally:
+        await bedrock.aclose_clients()
+
+
+def _run_layout(
+    endpoint: str,
+    shards: int,
+    shard_size: int,
+    level: int,
+    repeat: int,
+    results: multiprocessing.Queue,
+) -> None:
+    logger.remove()
+    bedrock._ENDPOINT_URL = endpoint
+    bedrock._ASYNC_POOL_SHARDS = shards
+    bedrock._ASYNC_POOL_SHARD_SIZE = shard_size
+    results.put(asyncio.run(_measure(level, repeat)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds per call.")
+    parser.add_argument("--level", type=int, default=500, help="Concurrent calls per burst.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.remove()
+    endpoint, stub = start_bedrock_stub(args.latency)
+    connections = bedrock._ASYNC_POOL_SHARDS * bedrock._ASYNC_POOL_SHARD_SIZE
+    layouts = {
+        "sharded": (bedrock._ASYNC_POOL_SHARDS, bedrock._ASYNC_POOL_SHARD_SIZE),
+        "single": (1, connections),
+    }
+
+    print(f"Bedrock stub at {endpoint}, {args.latency:.2f}s per call, {args.level} concurrent\n")
+    print("| layout  | clients x conns | p50 (s) | p99 (s) | wall (s) |")
+    print("|---------|-----------------|---------|---------|----------|")
+    for name, (shards, shard_size) in layouts.items():
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_run_layout,
+            args=(endpoint, shards, shard_size, args.level, args.repeat, results),
+        )
+        process.start()
+        bursts = results.get()
+        process.join()
+        latencies = [latency for burst, _ in bursts for latency in burst]
+        wall = statistics.median(wall for _, wall in bursts)
+        print(
+            f"| {name:<7} | {f'{shards} x {shard_size}':>15} "
+            f"| {statistics.median(latencies):>7.2f} | {_percentile(latencies, 99):>7.2f} "
+            f"| {wall:>8.2f} |"
+        )
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
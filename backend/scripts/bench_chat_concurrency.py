@@ -0,0 +1,209 @@
+"""Load benchmark: threadpool (sync) vs asyncio chat request paths.
+
+Starts a local Bedrock Converse stub, then fires N concurrent chat requests at
+two in-process ASGI apps:
+
+  sync   — a ``def`` endpoint calling ``BaseAgent.run`` (the pre-async handler shape;
+           each request holds a Starlette threadpool worker for every Bedrock round)
+  async  — the real ``POST /api/chat/market`` route, which awaits ``BaseAgent.arun``
+
+Each chat is two Bedrock rounds (one tool call, then a final answer), each taking
+``--latency`` seconds at the stub. Every request asks a different question and the
+answer cache is off, so both paths make the same Bedrock calls. All levels run on
+one event loop, warmed up the way ``on_startup`` does, as a server process would.
+
+Usage:
+    uv run python -m backend.scripts.bench_chat_concurrency --latency 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from typing import Any
+
+# Fake credentials so both boto3 and the SigV4 signer work against the stub.
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ.setdefault("AWS_EC2_METADATA_DISABLED", "true")
+
+import httpx
+from fastapi import FastAPI
+from loguru import logger
+
+from backend.app.agents.base import BaseAgent
+from backend.app.api.routes import chat
+from backend.app.api.schemas import ChatRequest, ChatResponse
+from backend.app.services import bedrock
+from backend.app.services.answer_cache import AnswerCache, set_answer_cache
+
+# ---------------------------------------------------------------------------
+# Local Bedrock stub (minimal HTTP/1.1 keep-alive server)
+# ---------------------------------------------------------------------------
+
+
+def _stub_reply(payload: dict[str, Any]) -> dict[str, Any]:
+    if len(payload.get("messages", [])) == 1:
+        return {
+            "stopReason": "tool_use",
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {"toolUse": {"toolUseId": "t1", "name": "noop", "input": {"value": "x"}}}
+                    ],
+                }
+            },
+        }
+    return {
+        "stopReason": "end_turn",
+        "output": {"message": {"role": "assistant", "content": [{"text": "Stub answer."}]}},
+    }
+
+
+async def _handle(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    latency: float,
+) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            body = await reader.readexactly(length) if length else b"{}"
+            await asyncio.sleep(latency)
+            out = json.dumps(_stub_reply(json.loads(body))).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(out)}\r\n\r\n".encode()
+                + out
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+def _serve_stub(latency: float, port_queue: multiprocessing.Queue) -> None:
+    async def serve() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: _handle(r, w, latency), "127.0.0.1", 0, backlog=4096
+        )
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def start_bedrock_stub(latency: float) -> tuple[str, multiprocessing.Process]:
+    """Run the stub in its own process so it never competes for this process's GIL."""
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_stub, args=(latency, port_queue), daemon=True)
+    process.start()
+    return f"http://127.0.0.1:{port_queue.get(timeout=10)}", process
+
+
+# ---------------------------------------------------------------------------
+# Stub agent + apps
+# ---------------------------------------------------------------------------
+
+
+class _BenchAgent(BaseAgent):
+    def _get_system_prompt(self) -> str:
+        return "bench"
+
+    def _get_tools(self) -> list[dict[str, Any]]:
+        return [{"toolSpec": {"name": "noop", "inputSchema": {"json": {"type": "object"}}}}]
+
+    def _execute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        return {"ok": True}
+
+
+def _sync_app(agent: BaseAgent) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/chat/market", response_model=ChatResponse)
+    def market_chat(body: ChatRequest) -> ChatResponse:
+        result = agent.run(body.question)
+        return ChatResponse(answer=result.answer, agent_type="market", error=result.error)
+
+    return app
+
+
+def _async_app(agent: BaseAgent) -> FastAPI:
+    chat._market_agent = agent  # type: ignore[assignment]
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    return app
+
+
+async def _drive(app: FastAPI, concurrency: int) -> tuple[list[float], float, int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(index: int) -> tuple[float, bool]:
+            started = time.perf_counter()
+            question = f"Latest quote for ticker number {index}?"
+            resp = await client.post("/api/chat/market", json={"question": question})
+            ok = resp.status_code == 200 and resp.json().get("error") is None
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(index) for index in range(concurrency)))
+        wall = time.perf_counter() - started
+    return [latency for latency, _ in results], wall, sum(not ok for _, ok in results)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run(apps: dict[str, FastAPI], levels: list[int]) -> None:
+    await bedrock.awarm_up()
+    # Warm-up so one-off client construction is not attributed to either path.
+    for app in apps.values():
+        await _drive(app, 1)
+
+    print("| path  | concurrency | p50 (s) | p99 (s) | wall (s) | errors |")
+    print("|-------|-------------|---------|---------|----------|--------|")
+    for level in levels:
+        for name, app in apps.items():
+            latencies, wall, errors = await _drive(app, level)
+            print(
+                f"| {name:<5} | {level:>11} | {statistics.median(latencies):>7.2f} "
+                f"| {_percentile(latencies, 99):>7.2f} | {wall:>8.2f} | {errors:>6} |"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub seconds per round.")
+    parser.add_argument("--levels", default="10,100,500", help="Comma-separated concurrency.")
+    args = parser.parse_args()
+
+    logger.remove()
+    endpoint, stub = start_bedrock_stub(args.latency)
+    bedrock._ENDPOINT_URL = endpoint
+    bedrock._bedrock_client.cache_clear()
+    set_answer_cache(AnswerCache(enabled=False))
+
+    agent = _BenchAgent()
+    apps = {"sync": _sync_app(agent), "async": _async_app(agent)}
+    print(f"Bedrock stub at {endpoint}, {args.latency:.2f}s per round, 2 rounds per chat\n")
+    asyncio.run(_run(apps, [int(value) for value in args.levels.split(",")]))
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
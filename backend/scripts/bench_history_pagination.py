@@ -0,0 +1,135 @@
+"""Benchmark: OFFSET vs keyset paging over a synthetic million-message table.
+
+Builds a session-local TEMP ``stored_messages`` (which shadows the real table on
+this connection only — no real rows are read or written): ``--chats`` chats with
+``--per-chat`` messages each (default 100 x 10,000 = 1,000,000 rows), plus the
+(chat_id, created_at, id) index from migration 4. It then reads pages at
+increasing depth in one chat twice: with OFFSET, and through
+``history.get_chat_messages`` with ``before`` cursors.
+
+Keyset latency should stay flat with depth; OFFSET grows linearly with it.
+
+Usage (needs the DB_* environment of a dev database):
+    uv run python -m backend.scripts.bench_history_pagination
+    uv run python -m backend.scripts.bench_history_pagination --no-index
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+# One pooled connection, so the TEMP table is visible to the history service.
+os.environ["DB_POOL_MAX_SIZE"] = "1"
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from backend.app.services import history as hist
+from backend.database.connect import close_pools, db_cursor
+
+_PAGE = 100
+
+
+def _build_table(chats: int, per_chat: int, with_index: bool) -> None:
+    with db_cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS pg_temp.stored_messages;")
+        cur.execute(
+            """
+            CREATE TEMP TABLE stored_messages (
+                id BIGSERIAL PRIMARY KEY,
+                chat_id INT NOT NULL,
+                sender INT NOT NULL,
+                message TEXT NOT NULL,
+                metadata JSONB NOT NULL DEFAULT '{}',
+                created_at TIMESTAMP NOT NULL
+            );
+            """
+        )
+        # Interleave chats like real traffic; each turn's pair shares a timestamp.
+        cur.execute(
+            """
+            INSERT INTO stored_messages (chat_id, sender, message, metadata, created_at)
+            SELECT g %% %s + 1,
+                   g %% 2,
+                   'message ' || g,
+                   '{"rows_found": 1}'::jsonb,
+                   TIMESTAMP '2025-01-01' + (g / 2) * INTERVAL '1 second'
+            FROM generate_series(0, %s - 1) AS g;
+            """,
+            (chats, chats * per_chat),
+        )
+        if with_index:
+            cur.execute("CREATE INDEX ON stored_messages (chat_id, created_at, id);")
+        cur.execute("ANALYZE stored_messages;")
+
+
+def _timed(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def _offset_page(chat_id: int, depth: int) -> None:
+    with db_cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, chat_id, sender, message, metadata, created_at
+            FROM stored_messages
+            WHERE chat_id = %s
+            ORDER BY created_at DESC, id DESC
+            OFFSET %s LIMIT %s
+            """,
+            (chat_id, depth * _PAGE, _PAGE),
+        )
+        cur.fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--per-chat", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-index", action="store_true", help="Skip the composite index.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logger.remove()
+    total = args.chats * args.per_chat
+    print(f"Building TEMP stored_messages: {total:,} rows ({args.per_chat:,} per chat)...")
+    started = time.perf_counter()
+    _build_table(args.chats, args.per_chat, with_index=not args.no_index)
+    print(f"  built in {time.perf_counter() - started:.1f}s\n")
+
+    # Walk the cursors once so each keyset page can be fetched directly.
+    chat_id = 1
+    cursors: list[str | None] = [None]
+    page = hist.get_chat_messages(chat_id, limit=_PAGE)
+    while page.before:
+        cursors.append(page.before)
+        page = hist.get_chat_messages(chat_id, limit=_PAGE, before=page.before)
+
+    depths = sorted({0, 1, 10, len(cursors) // 2, len(cursors) - 1})
+    print(f"{_PAGE} rows/page, median of {args.repeats} runs, chat_id={chat_id}\n")
+    print("| page depth | OFFSET (ms) | keyset (ms) |")
+    print("|-----------:|------------:|------------:|")
+    for depth in depths:
+        offset_ms = _timed(lambda d=depth: _offset_page(chat_id, d), args.repeats)
+        keyset_ms = _timed(
+            lambda d=depth: hist.get_chat_messages(chat_id, limit=_PAGE, before=cursors[d]),
+            args.repeats,
+        )
+        print(f"| {depth:>10} | {offset_ms:>11.2f} | {keyset_ms:>11.2f} |")
+
+    with db_cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS pg_temp.stored_messages;")
+    close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Benchmark: NumPy OHLCV metrics vs the row-by-row implementation they replaced.
+
+Generates ``--symbols`` synthetic tickers with ``--years`` of daily bars each
+(default 5 x 10 years = 12,600 rows), with a dividend roughly every quarter
+and a split here and there. Each version gets the cursor rows its query returns
+for ``analyze_stock_performance``:
+
+  - before: numeric columns as Decimals, ``dict(zip(...))`` per row, then
+    ``_legacy_compute_performance_metrics`` (kept below) per ticker
+  - after:  the same values cast to float8 by the query, ``ohlcv_columns_by_ticker``
+    once, then ``MarketAgent._compute_performance_metrics`` per ticker
+
+The tool outputs of both versions must be identical. The unrounded figures are
+compared with a 1e-9 tolerance in tests/test_ohlcv_metrics.py.
+
+Usage:
+    uv run python -m backend.scripts.bench_ohlcv_metrics
+    uv run python -m backend.scripts.bench_ohlcv_metrics --symbols 5 --years 10 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import pairwise
+from typing import Any
+
+from backend.app.agents.market.agent import MarketAgent
+from backend.app.services.ohlcv_metrics import TRADING_DAYS_PER_YEAR, ohlcv_columns_by_ticker
+
+_COLUMNS = [
+    "ticker",
+    "trade_date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "dividends",
+    "stock_splits",
+]
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation
+# ---------------------------------------------------------------------------
+
+
+def _to_float(value: Any, *, default: float = 0.0) -> float:
+    if value in (None, ""):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _legacy_compute_performance_metrics(
+    rows: list[dict[str, Any]],
+    *,
+    risk_free_rate_pct: float,
+) -> dict[str, Any]:
+    if len(rows) < 2:
+        return {
+            "found": bool(rows),
+            "metrics_available": False,
+            "reason": "Not enough OHLCV rows to calculate returns.",
+        }
+
+    returns: list[float] = []
+    total_dividends = 0.0
+    split_events = 0
+
+    for previous, current in pairwise(rows):
+        previous_close = _to_float(previous.get("close"))
+        current_close = _to_float(current.get("close"))
+        dividend = _to_float(current.get("dividends"))
+        split_factor = _to_float(current.get("stock_splits"), default=1.0)
+
+        if previous_close <= 0 or current_close <= 0:
+            continue
+
+        if split_factor not in (0.0, 1.0):
+            split_events += 1
+
+        total_dividends += dividend
+        adjusted_previous_close = (
+            previous_close / split_factor if split_factor not in (0.0, 1.0) else previous_close
+        )
+        if adjusted_previous_close <= 0:
+            continue
+        returns.append(((current_close + dividend) / adjusted_previous_close) - 1.0)
+
+    if not returns:
+        return {
+            "found": True,
+            "metrics_available": False,
+            "reason": "No valid close-to-close return observations were available.",
+        }
+
+    mean_daily_return = sum(returns) / len(returns)
+    variance = (
+        sum((value - mean_daily_return) ** 2 for value in returns) / (len(returns) - 1)
+        if len(returns) > 1
+        else 0.0
+    )
+    daily_volatility = math.sqrt(max(variance, 0.0))
+    rf_daily = (risk_free_rate_pct / 100.0) / TRADING_DAYS_PER_YEAR
+    sharpe_ratio = None
+    if daily_volatility > 0:
+        sharpe_ratio = ((mean_daily_return - rf_daily) / daily_volatility) * math.sqrt(
+            TRADING_DAYS_PER_YEAR
+        )
+
+    cumulative_growth = 1.0
+    peak = 1.0
+    max_drawdown = 0.0
+    for daily_return in returns:
+        cumulative_growth *= 1.0 + daily_return
+        peak = max(peak, cumulative_growth)
+        max_drawdown = min(max_drawdown, (cumulative_growth / peak) - 1.0)
+
+    annualized_return = None
+    if cumulative_growth > 0:
+        annualized_return = cumulative_growth ** (TRADING_DAYS_PER_YEAR / len(returns)) - 1.0
+
+    highs = [_to_float(row.get("high")) for row in rows if row.get("high") is not None]
+    lows = [_to_float(row.get("low")) for row in rows if row.get("low") is not None]
+    volumes = [_to_float(row.get("volume")) for row in rows if row.get("volume") is not None]
+    latest_close = _to_float(rows[-1].get("close"))
+
+    return {
+        "found": True,
+        "metrics_available": True,
+        "start_date": rows[0].get("trade_date"),
+        "end_date": rows[-1].get("trade_date"),
+        "observations": len(rows),
+        "return_observations": len(returns),
+        "latest_close": round(latest_close, 4),
+        "total_return_pct": round((cumulative_growth - 1.0) * 100.0, 2),
+        "annualized_return_pct": (
+            round(annualized_return * 100.0, 2) if annualized_return is not None else None
+        ),
+        "annualized_volatility_pct": round(
+            daily_volatility * math.sqrt(TRADING_DAYS_PER_YEAR) * 100.0,
+            2,
+        ),
+        "sharpe_ratio": round(sharpe_ratio, 3) if sharpe_ratio is not None else None,
+        "max_drawdown_pct": round(max_drawdown * 100.0, 2),
+        "average_daily_return_pct": round(mean_daily_return * 100.0, 3),
+        "positive_days_pct": round(
+            (sum(value > 0 for value in returns) / len(returns)) * 100.0,
+            2,
+        ),
+        "highest_high": round(max(highs), 4) if highs else None,
+        "lowest_low": round(min(lows), 4) if lows else None,
+        "average_volume": round(sum(volumes) / len(volumes), 2) if volumes else None,
+        "total_dividends": round(total_dividends, 4),
+        "stock_split_events": split_events,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Data and timing
+# ---------------------------------------------------------------------------
+
+
+def _bars(symbols: int, days: int, seed: int) -> list[tuple]:
+    """Cursor rows ordered by ticker, then date, like ``_fetch_ohlcv_columns``'s query."""
+    rng = random.Random(seed)
+    records = []
+    for index in range(symbols):
+        ticker = f"SYM{index}"
+        close = rng.uniform(20.0, 400.0)
+        day = date(2016, 1, 4)
+        for offset in range(days):
+            split = 1.0
+            if rng.random() < 0.0005:
+                split = rng.choice((2.0, 3.0, 4.0))
+                close /= split
+            close = max(0.5, close * (1.0 + rng.gauss(0.0004, 0.018)))
+            dividend = round(close * 0.004, 4) if offset % 63 == 62 else 0.0
+            high = close * (1.0 + abs(rng.gauss(0.0, 0.01)))
+            low = close * (1.0 - abs(rng.gauss(0.0, 0.01)))
+            records.append(
+                (
+                    ticker,
+                    day,
+                    Decimal(f"{close:.4f}"),
+                    Decimal(f"{high:.4f}"),
+                    Decimal(f"{low:.4f}"),
+                    Decimal(f"{close:.4f}"),
+                    rng.randrange(1_000_000, 50_000_000),
+                    Decimal(f"{dividend:.4f}"),
+                    Decimal(f"{split:.1f}"),
+                )
+            )
+            day += timedelta(days=1 if day.weekday() < 4 else 3)
+    return records
+
+
+def _before(records: list[tuple], risk_free_rate_pct: float) -> dict[str, dict]:
+    by_ticker: dict[str, list[dict[str, Any]]] = {}
+    for record in records:
+        row = dict(zip(_COLUMNS, record, strict=False))
+        by_ticker.setdefault(row["ticker"], []).append(row)
+    return {
+        ticker: _legacy_compute_performance_metrics(rows, risk_free_rate_pct=risk_free_rate_pct)
+        for ticker, rows in by_ticker.items()
+    }
+
+
+def _after(agent: MarketAgent, records: list[tuple], risk_free_rate_pct: float) -> dict[str, dict]:
+    return {
+        ticker: agent._compute_performance_metrics(columns, risk_free_rate_pct=risk_free_rate_pct)
+        for ticker, columns in ohlcv_columns_by_ticker(records, _COLUMNS).items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    records = _bars(args.symbols, args.years * TRADING_DAYS_PER_YEAR, args.seed)
+    float_records = [
+        (ticker, day, *(float(value) for value in prices)) for ticker, day, *prices in records
+    ]
+    agent = MarketAgent()
+    expected = _before(records, 4.0)
+    actual = _after(agent, float_records, 4.0)
+    differing = [ticker for ticker in expected if expected[ticker] != actual.get(ticker)]
+
+    timings: dict[str, list[float]] = {"before": [], "after": []}
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        _before(records, 4.0)
+        timings["before"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        _after(agent, float_records, 4.0)
+        timings["after"].append(time.perf_counter() - started)
+
+    before = statistics.median(timings["before"]) * 1e3
+    after = statistics.median(timings["after"]) * 1e3
+    print(f"rows: {len(records):,} ({args.symbols} symbols x {args.years} years)\n")
+    print("| version | median ms | speedup | differing symbols |")
+    print("|---------|----------:|--------:|------------------:|")
+    print(f"| before  | {before:>9.2f} |         | {'':>17} |")
+    print(f"| after   | {after:>9.2f} | {before / after:>6.1f}x | {len(differing):>17} |")
+    for ticker in differing:
+        print(f"\n{ticker}:\n  before {expected[ticker]}\n  after  {actual.get(ticker)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Benchmark: compiled keyword matching vs the per-keyword scans it replaced.
+
+Builds a synthetic corpus (default 100,000 questions) from the labeled router
+questions in ``scripts/data/router_questions.jsonl`` with random typos, merged
+words and casing noise mixed in, then times each routing helper against the
+previous implementation kept below as ``_legacy_*``:
+
+  - ``_keyword_fallback``         ~90 ``re.search(rf"\\b{kw}\\b")`` calls vs 2 compiled sets
+  - ``_normalize_question_text``  difflib over the vocabulary vs the deletion index
+  - ``_keyword_override``         (includes its normalization pass)
+
+Outputs of both versions are compared per question. Keyword matching is exact;
+typo correction can differ where difflib's best word over the whole vocabulary
+lies outside the deletion neighbourhood (``--show-diffs`` lists the routing
+decisions that changed).
+
+Usage:
+    uv run python -m backend.scripts.bench_router_keywords
+    uv run python -m backend.scripts.bench_router_keywords --questions 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import random
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from backend.app.agents import router
+
+_DATA_PATH = Path(__file__).resolve().parent / "data" / "router_questions.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# Previous implementations
+# ---------------------------------------------------------------------------
+
+
+def _legacy_contains_keyword(text: str, keyword: str) -> bool:
+    return re.search(rf"\b{re.escape(keyword)}\b", text) is not None
+
+
+def _legacy_correct_domain_typos(text: str) -> str:
+    def is_confident_typo(word: str, replacement: str) -> bool:
+        if abs(len(replacement) - len(word)) > 1:
+            return False
+        if "".join(sorted(word)) == "".join(sorted(replacement)):
+            return True
+        return word[0] == replacement[0] and word[-1] == replacement[-1]
+
+    def replace(match: re.Match[str]) -> str:
+        word = match.group(0)
+        lower = word.lower()
+        if lower in router._TYPO_CORRECTION_WORDS:
+            return word
+        suggestions = difflib.get_close_matches(
+            lower, sorted(router._TYPO_CORRECTION_WORDS), n=1, cutoff=0.6
+        )
+        if not suggestions:
+            return word
+        replacement = suggestions[0]
+        if not is_confident_typo(lower, replacement):
+            return word
+        if word.isupper():
+            return replacement.upper()
+        if word[0].isupper():
+            return replacement.capitalize()
+        return replacement
+
+    return router._ALPHA_TOKEN_RE.sub(replace, text)
+
+
+def _legacy_normalize(question: str) -> str:
+    normalized = question.strip()
+    normalized = router._collapse_repeated_letters(normalized)
+    normalized = re.sub(r"(?i)\b([a-z]{3,})'s\b", r"\1", normalized)
+    normalized = router._MERGED_MARKET_TERM_RE.sub(r"\1 \2", normalized)
+    normalized = router._TRAILING_PLURAL_MARKET_RE.sub(r"\1 \2", normalized)
+    normalized = _legacy_correct_domain_typos(normalized)
+    return " ".join(normalized.split())
+
+
+def _legacy_override(question: str) -> str | None:
+    q = _legacy_normalize(question).lower()
+    market_hits = sum(_legacy_contains_keyword(q, kw) for kw in router._MARKET_OVERRIDE_KW)
+    housing_hits = sum(_legacy_contains_keyword(q, kw) for kw in router._HOUSING_OVERRIDE_KW)
+    if market_hits and not housing_hits:
+        return "market"
+    if housing_hits and not market_hits:
+        return "housing"
+    if (
+        not housing_hits
+        and router._TIME_WINDOW_RE.search(q) is not None
+        and any(_legacy_contains_keyword(q, term) for term in router._MARKET_METRIC_TERMS)
+    ):
+        return "market"
+    return None
+
+
+def _legacy_fallback(question: str) -> str:
+    q = question.lower()
+    if any(_legacy_contains_keyword(q, kw) for kw in router._HOUSING_FALLBACK_KW):
+        return "housing"
+    if any(_legacy_contains_keyword(q, kw) for kw in router._MARKET_FALLBACK_KW):
+        return "market"
+    return "out_of_scope"
+
+
+# ---------------------------------------------------------------------------
+# Corpus and timing
+# ---------------------------------------------------------------------------
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:  # transpose
+        return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+    if kind == 1:  # drop
+        return word[:i] + word[i + 1 :]
+    if kind == 2:  # double
+        return word[:i] + word[i] * 3 + word[i + 1 :]
+    return word[:i] + rng.choice("aeiourstn") + word[i + 1 :]  # substitute
+
+
+def _corpus(size: int, seed: int) -> list[str]:
+    rows = [json.loads(line) for line in _DATA_PATH.read_text().splitlines() if line.strip()]
+    base = [row["question"] for row in rows]
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choice(base).split()
+        noisy = [_typo(word, rng) if rng.random() < 0.15 else word for word in words]
+        if len(noisy) > 2 and rng.random() < 0.1:
+            i = rng.randrange(len(noisy) - 1)
+            noisy[i : i + 2] = [noisy[i] + noisy[i + 1]]
+        question = " ".join(noisy)
+        corpus.append(question.upper() if rng.random() < 0.02 else question)
+    return corpus
+
+
+def _time(func: Callable[[str], object], corpus: list[str]) -> tuple[float, list[object]]:
+    started = time.perf_counter()
+    results = [func(question) for question in corpus]
+    return time.perf_counter() - started, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--show-diffs", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+
+    corpus = _corpus(args.questions, args.seed)
+    normalized = [router._normalize_question_text(q) for q in corpus]
+    router._typo_replacement.cache_clear()
+
+    cases: list[tuple[str, Callable, Callable, list[str]]] = [
+        ("_keyword_fallback", _legacy_fallback, router._keyword_fallback, normalized),
+        ("_normalize_question_text", _legacy_normalize, router._normalize_question_text, corpus),
+        ("_keyword_override", _legacy_override, router._keyword_override, corpus),
+    ]
+    override_diffs: list[tuple[str, object, object]] = []
+    print(f"corpus: {len(corpus):,} questions ({len(set(corpus)):,} distinct)\n")
+    print("| helper                   | before us/q | after us/q | speedup | differs |")
+    print("|--------------------------|------------:|-----------:|--------:|--------:|")
+    for name, legacy, current, inputs in cases:
+        # Fresh typo cache for each helper: the "after" time includes filling it.
+        router._typo_replacement.cache_clear()
+        before, expected = _time(legacy, inputs)
+        after, actual = _time(current, inputs)
+        diffs = [
+            (question, a, b)
+            for question, a, b in zip(inputs, expected, actual, strict=True)
+            if a != b
+        ]
+        per_before = before / len(inputs) * 1e6
+        per_after = after / len(inputs) * 1e6
+        print(
+            f"| {name:<24} | {per_before:>11.1f} | {per_after:>10.1f} "
+            f"| {before / after:>6.1f}x | {len(diffs):>7} |"
+        )
+        if name == "_keyword_override":
+            override_diffs = diffs
+
+    if args.show_diffs:
+        print("\nrouting changes (before -> after):")
+        for question, before_label, after_label in override_diffs[: args.show_diffs]:
+            print(f"  {before_label!s:>8} -> {after_label!s:<8} {question!r}")
+
+
+if __name__ == "__main__":
+    main()
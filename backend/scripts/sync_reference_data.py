@@ -0,0 +1,133 @@
+"""Refresh the local reference-data tables the agents answer from.
+
+Datasets:
+  census  Census ACS 1-year estimates for every place in every state
+          (``census_places``, see services/census_places.py)
+  hud     HUD Fair Market Rents for every metro area, with the city/CBSA
+          crosswalk (``hud_fmr``, see services/hud_fmr.py)
+  fred    FRED observations of the agents' series, fetched incrementally from
+          the last stored date (``fred_observations``, see services/fred_store.py)
+  places  Offline gazetteer of U.S. places from the GeoNames cities1000 dump
+          (GAZETTEER_PATH, see services/gazetteer.py)
+
+Run periodically (the EC2 timers run it monthly, and ``fred`` daily); a dataset,
+state or series that fails to download keeps its previous rows.
+
+Usage:
+    uv run python -m backend.scripts.sync_reference_data
+    uv run python -m backend.scripts.sync_reference_data --datasets census --states 42,48
+    uv run python -m backend.scripts.sync_reference_data --datasets hud --hud-year 2025
+    uv run python -m backend.scripts.sync_reference_data --datasets fred --fred-series GS10,UNRATE
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import zipfile
+from collections.abc import Callable
+
+import httpx
+from dotenv import load_dotenv
+from loguru import logger
+
+from backend.app.services import live_apis
+from backend.app.services.census_places import ACS_YEAR, refresh_census_places
+from backend.app.services.fred_store import sync_fred_series
+from backend.app.services.gazetteer import DEFAULT_GAZETTEER_PATH, build_gazetteer, parse_geonames
+from backend.app.services.hud_fmr import HUD_FMR_YEAR, refresh_hud_fmr
+from backend.database.migrate import run_migrations
+
+
+def _sync_census(args: argparse.Namespace) -> int:
+    loaded = refresh_census_places(
+        args.states,
+        key=os.getenv("CENSUS_API_KEY", ""),
+        year=args.census_year,
+    )
+    return sum(loaded.values())
+
+
+def _sync_hud(args: argparse.Namespace) -> int:
+    abbrs = None
+    if args.states:
+        abbrs = [live_apis._STATE_FIPS_TO_ABBR.get(fips, fips) for fips in args.states]
+    return refresh_hud_fmr(abbrs, year=args.hud_year)
+
+
+def _sync_fred(args: argparse.Namespace) -> int:
+    return sum(sync_fred_series(args.fred_series).values())
+
+
+def _sync_places(args: argparse.Namespace) -> int:
+    resp = httpx.get(args.geonames_url, follow_redirects=True, timeout=300.0)
+    resp.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+        member = next(name for name in archive.namelist() if name.endswith(".txt"))
+        with archive.open(member) as handle:
+            lines = io.TextIOWrapper(handle, encoding="utf-8")
+            return build_gazetteer(
+                parse_geonames(lines), os.getenv("GAZETTEER_PATH") or DEFAULT_GAZETTEER_PATH
+            )
+
+
+_DATASETS: dict[str, Callable[[argparse.Namespace], int]] = {
+    "census": _sync_census,
+    "hud": _sync_hud,
+    "fred": _sync_fred,
+    "places": _sync_places,
+}
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh local reference-data tables.")
+    parser.add_argument(
+        "--datasets",
+        type=_csv,
+        default=list(_DATASETS),
+        help=f"Comma-separated datasets to refresh ({', '.join(_DATASETS)}). Defaults to all.",
+    )
+    parser.add_argument(
+        "--states",
+        type=_csv,
+        help="Comma-separated state FIPS codes to refresh. Defaults to every state.",
+    )
+    parser.add_argument("--census-year", type=int, default=ACS_YEAR, help="ACS 1-year vintage.")
+    parser.add_argument("--hud-year", type=int, default=HUD_FMR_YEAR, help="HUD FMR fiscal year.")
+    parser.add_argument(
+        "--fred-series",
+        type=_csv,
+        help="Comma-separated FRED series IDs. Defaults to the agents' indicator series.",
+    )
+    parser.add_argument(
+        "--geonames-url",
+        default="https://download.geonames.org/export/dump/cities1000.zip",
+        help="GeoNames dump the places gazetteer is built from.",
+    )
+    args = parser.parse_args()
+    unknown = sorted(set(args.datasets) - set(_DATASETS))
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(unknown)}")
+    return args
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    run_migrations()
+    for name in args.datasets:
+        try:
+            rows = _DATASETS[name](args)
+        except Exception as exc:
+            logger.error("reference sync | dataset={} failed: {}", name, exc)
+            continue
+        print(f"{name}: wrote {rows} rows.")
+
+
+if __name__ == "__main__":
+    main()
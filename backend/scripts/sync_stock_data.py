@@ -1,10 +1,28 @@
+"""Populate stock_data from live Finnhub APIs.
+
+Finnhub responses go through the live-API cache; run with the API's env
+(LIVE_API_CACHE_BACKEND=sqlite, same LIVE_API_CACHE_PATH) to share warmed
+entries with the uvicorn workers.
+
+Fetches run concurrently under a shared Finnhub calls/minute budget (--rate).
+Progress is checkpointed per ticker; after an interrupted or partially failed
+run, pass --resume to fetch only the remaining tickers.
+"""
+
 from __future__ import annotations
 
 import argparse
 
 from dotenv import load_dotenv
 
-from backend.app.services.stock_sync import DEFAULT_STARTER_TICKERS, sync_stock_data
+from backend.app.services.stock_sync import (
+    DEFAULT_CHECKPOINT_PATH,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE_PER_MINUTE,
+    DEFAULT_STARTER_TICKERS,
+    sync_stock_data,
+)
+from backend.database.migrate import run_migrations
 
 
 def parse_args() -> argparse.Namespace:
@@ -24,10 +42,26 @@ def parse_args() -> argparse.Namespace:
         help="Generate Titan embeddings for each stock snapshot.",
     )
     parser.add_argument(
-        "--delay-seconds",
+        "--rate",
         type=float,
-        default=1.0,
-        help="Delay between symbols to reduce Finnhub rate-limit risk.",
+        default=DEFAULT_RATE_PER_MINUTE,
+        help="Finnhub calls per minute across all workers (match your plan's limit).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of tickers fetched in parallel.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip tickers already recorded in the checkpoint file.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=str(DEFAULT_CHECKPOINT_PATH),
+        help="Checkpoint file path (removed after a run with no failures).",
     )
     return parser.parse_args()
 
@@ -40,11 +74,15 @@ def main() -> None:
         if args.tickers
         else DEFAULT_STARTER_TICKERS
     )
+    run_migrations()
     written = sync_stock_data(
         tickers,
         with_embeddings=args.with_embeddings,
         truncate=args.truncate,
-        delay_seconds=args.delay_seconds,
+        rate_per_minute=args.rate,
+        concurrency=args.concurrency,
+        resume=args.resume,
+        checkpoint_path=args.checkpoint,
     )
     print(f"Wrote {written} stock snapshot rows.")
 
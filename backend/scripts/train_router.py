@@ -0,0 +1,224 @@
+"""Train, evaluate and export the local question router (agents/local_router.py).
+
+Training data:
+  - the hand-labeled questions in ``scripts/data/router_questions.jsonl``
+  - synthetic questions built from the router's keyword sets and a few templates
+
+Confidence threshold: 5-fold out-of-fold predictions on the hand-labeled
+questions (folds by question hash, synthetic questions always in training) give
+the lowest threshold at which the model's confident answers reach
+``--precision-target`` accuracy (default 99%). It is stored in the artifact;
+anything less confident is escalated to Titan.
+
+Evaluation: ``scripts/data/router_eval_questions.jsonl``, hand-labeled questions
+that are never trained on (misspellings, shorthand and topic look-alikes
+included). The script reports accuracy, how often the local model answers at
+the threshold and how accurate those answers are, and per-question latency,
+then refits on all training data and writes the artifact.
+
+Usage:
+    uv run python -m backend.scripts.train_router
+    uv run python -m backend.scripts.train_router --precision-target 0.995
+    uv run python -m backend.scripts.train_router --eval-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from backend.app.agents import router
+from backend.app.agents.local_router import (
+    DEFAULT_MODEL_PATH,
+    LABELS,
+    LocalRouterModel,
+)
+
+_SCRIPTS = Path(__file__).resolve().parent
+_DATA_PATH = _SCRIPTS / "data" / "router_questions.jsonl"
+_EVAL_PATH = _SCRIPTS / "data" / "router_eval_questions.jsonl"
+_FOLDS = 5
+
+_CITIES = ("Austin", "Denver", "Miami", "Seattle", "Phoenix", "Chicago", "Boston", "Atlanta")
+_COMPANIES = ("Apple", "Nvidia", "Tesla", "Microsoft", "Amazon", "AMD", "Netflix", "Oracle")
+_HOUSING_TEMPLATES = (
+    "what is the {kw} in {place}",
+    "how is the {kw} in {place}",
+    "{kw} {place}",
+    "tell me about {kw} for {place}",
+)
+_MARKET_TEMPLATES = (
+    "what is the {kw} of {place}",
+    "show me {place} {kw}",
+    "{place} {kw}",
+    "how is the {kw} for {place}",
+)
+
+
+def _labeled_examples(path: Path = _DATA_PATH) -> list[tuple[str, str]]:
+    rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    return [(row["question"], row["label"]) for row in rows]
+
+
+def _synthetic_examples() -> list[tuple[str, str]]:
+    examples: list[tuple[str, str]] = []
+    keyword_sets = (
+        ("housing", router._HOUSING_OVERRIDE_KW, _CITIES, _HOUSING_TEMPLATES),
+        ("market", router._MARKET_OVERRIDE_KW, _COMPANIES, _MARKET_TEMPLATES),
+    )
+    for label, keywords, places, templates in keyword_sets:
+        for index, keyword in enumerate(sorted(keywords)):
+            template = templates[index % len(templates)]
+            place = places[index % len(places)]
+            examples.append((template.format(kw=keyword, place=place), label))
+    return examples
+
+
+def _normalized(examples: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Train on the text the router actually classifies."""
+    return [(router._normalize_question_text(question), label) for question, label in examples]
+
+
+def _fold(question: str) -> int:
+    return zlib.crc32(question.encode()) % _FOLDS
+
+
+def _out_of_fold_predictions(
+    labeled: list[tuple[str, str]],
+    synthetic: list[tuple[str, str]],
+    epochs: int,
+) -> list[tuple[float, bool]]:
+    """(confidence, correct) for every labeled question, from a model that never saw it."""
+    results = []
+    for fold in range(_FOLDS):
+        train = [example for example in labeled if _fold(example[0]) != fold] + synthetic
+        model = LocalRouterModel.train(_normalized(train), epochs=epochs)
+        for question, label in labeled:
+            if _fold(question) == fold:
+                prediction = model.predict(router._normalize_question_text(question))
+                results.append((prediction.confidence, prediction.label == label))
+    return results
+
+
+def _calibrated_threshold(predictions: list[tuple[float, bool]], target: float) -> float:
+    """Lowest threshold whose confident predictions are at least ``target`` accurate.
+
+    Every threshold above it must meet the target too, so one lucky band of
+    low-confidence answers cannot pull it down. Returns 1.0 (never answer
+    locally) when no threshold qualifies.
+    """
+    ranked = sorted(predictions, key=lambda item: item[0], reverse=True)
+    threshold = 1.0
+    correct = 0
+    for answered, (confidence, is_correct) in enumerate(ranked, start=1):
+        correct += is_correct
+        if correct / answered < target:
+            break
+        # Ties are answered together, so only move to the end of a run of equal scores.
+        if answered == len(ranked) or ranked[answered][0] < confidence:
+            threshold = confidence
+    return threshold
+
+
+def _evaluate(
+    model: LocalRouterModel,
+    cases: list[tuple[str, str]],
+    threshold: float,
+) -> dict[str, float]:
+    confident = correct = confident_correct = 0
+    confusion: Counter[tuple[str, str]] = Counter()
+    for question, label in cases:
+        prediction = model.predict(router._normalize_question_text(question))
+        confusion[(label, prediction.label)] += 1
+        correct += prediction.label == label
+        if prediction.confidence >= threshold:
+            confident += 1
+            confident_correct += prediction.label == label
+    return {
+        "cases": len(cases),
+        "accuracy": correct / len(cases),
+        "local_answered": confident / len(cases),
+        "local_accuracy": confident_correct / confident if confident else 0.0,
+        "confusion": confusion,  # type: ignore[dict-item]
+    }
+
+
+def _latency_us(model: LocalRouterModel, questions: list[str], repeats: int = 200) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for question in questions:
+            model.predict(question)
+        samples.append((time.perf_counter() - started) / len(questions) * 1e6)
+    return statistics.median(samples)
+
+
+def _report(name: str, result: dict) -> None:
+    print(
+        f"| {name:<18} | {result['cases']:>5} | {result['accuracy']:>8.1%} "
+        f"| {result['local_answered']:>14.1%} | {result['local_accuracy']:>14.1%} |"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--precision-target", type=float, default=0.99)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument(
+        "--eval-only",
+        action="store_true",
+        help="Evaluate the existing artifact instead of training a new one.",
+    )
+    args = parser.parse_args()
+
+    labeled = _labeled_examples()
+    synthetic = _synthetic_examples()
+    evaluation = _labeled_examples(_EVAL_PATH)
+    overlap = {q.lower() for q, _ in labeled} & {q.lower() for q, _ in evaluation}
+    if overlap:
+        raise SystemExit(f"evaluation questions also in training data: {sorted(overlap)}")
+    counts = Counter(label for _, label in labeled + synthetic)
+    print(f"training: {len(labeled)} labeled + {len(synthetic)} synthetic {dict(counts)}")
+    print(f"evaluation: {len(evaluation)} {dict(Counter(label for _, label in evaluation))}\n")
+
+    if args.eval_only:
+        model = LocalRouterModel.load(args.output)
+        print(f"artifact threshold {model.threshold:.3f}\n")
+    else:
+        predictions = _out_of_fold_predictions(labeled, synthetic, args.epochs)
+        threshold = _calibrated_threshold(predictions, args.precision_target)
+        answered = [correct for confidence, correct in predictions if confidence >= threshold]
+        print(
+            f"threshold {threshold:.3f} for {args.precision_target:.1%} local accuracy "
+            f"(out-of-fold: {len(answered)}/{len(predictions)} answered locally, "
+            f"{sum(answered) / max(1, len(answered)):.1%} correct)\n"
+        )
+        model = LocalRouterModel.train(_normalized(labeled + synthetic), epochs=args.epochs)
+        model.threshold = threshold
+
+    print("| eval set           | cases | accuracy | answered local | local accuracy |")
+    print("|--------------------|------:|---------:|---------------:|---------------:|")
+    result = _evaluate(model, evaluation, model.threshold)
+    _report("held-out", result)
+
+    questions = [router._normalize_question_text(q) for q, _ in evaluation]
+    print(f"\nlatency: {_latency_us(model, questions):.1f} us/question (median, predict only)")
+    print("\nconfusion (expected -> predicted):")
+    for (expected, predicted), count in sorted(result["confusion"].items()):
+        if expected != predicted:
+            print(f"  {expected:>12} -> {predicted:<12} {count}")
+
+    if not args.eval_only:
+        model.save(args.output)
+        size_kb = args.output.stat().st_size / 1024
+        print(f"\nwrote {args.output} ({size_kb:.0f} KiB, labels={list(LABELS)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,39 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[2]
 
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _clear_live_api_cache():
+    """Keep cached live-API responses from leaking between tests."""
+    from backend.app.services.cache import clear_cache
+
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def _disable_answer_cache():
+    """Keep chat-route tests from embedding questions or querying answer_cache."""
+    from backend.app.services.answer_cache import AnswerCache, set_answer_cache
+
+    set_answer_cache(AnswerCache(enabled=False))
+    yield
+    set_answer_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def _disable_gazetteer():
+    """Resolve cities through the (faked) geocoder, not a locally built place index."""
+    from backend.app.services.gazetteer import Gazetteer, set_gazetteer
+
+    set_gazetteer(Gazetteer(None))
+    yield
+    set_gazetteer(None)
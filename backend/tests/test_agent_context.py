@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.app.agents.context import build_context_messages
+from backend.app.services.history import SENDER_AGENT, SENDER_USER, MessageRecord
+from test_base_agent import _FakeAgent
+
+
+def _records(*turns: tuple[str, str, list | None]) -> list[MessageRecord]:
+    start = datetime(2026, 3, 1, 9, 0)
+    records = []
+    for index, (question, answer, tool_context) in enumerate(turns):
+        for sender, text, metadata in (
+            (SENDER_USER, question, {}),
+            (SENDER_AGENT, answer, {"tool_context": tool_context}),
+        ):
+            records.append(
+                MessageRecord(
+                    id=len(records) + 1,
+                    chat_id=1,
+                    sender=sender,
+                    sender_label="user" if sender == SENDER_USER else "agent",
+                    message=text,
+                    metadata=metadata,
+                    created_at=start + timedelta(minutes=index),
+                )
+            )
+    return records
+
+
+def test_context_keeps_recent_turns_verbatim_and_summarizes_older_ones() -> None:
+    records = _records(
+        ("What does Apple make?", "Phones and computers. " * 40, None),
+        (
+            "Apple stock price?",
+            "AAPL trades at $200.",
+            [{"tool": "get_stock_quote", "input": {"symbol": "AAPL"}, "result": {"price": 200}}],
+        ),
+    )
+
+    messages = build_context_messages(records, "and its volatility?", token_budget=200)
+
+    assert [m["role"] for m in messages] == ["user", "assistant", "user"]
+    summary, question = messages[0]["content"]
+    assert summary["text"].startswith("Earlier in this conversation:\n- Q: What does Apple make?")
+    assert summary["text"].endswith("…")
+    assert question == {"text": "Apple stock price?"}
+    tool_results, answer = messages[1]["content"]
+    assert '- get_stock_quote({"symbol":"AAPL"}): {"price":200}' in tool_results["text"]
+    assert answer == {"text": "AAPL trades at $200."}
+    assert messages[2] == {"role": "user", "content": [{"text": "and its volatility?"}]}
+
+    # Nothing fits: only the question is sent.
+    assert build_context_messages(records, "hi", token_budget=0) == [
+        {"role": "user", "content": [{"text": "hi"}]}
+    ]
+
+
+def test_follow_up_reuses_stored_tool_results_in_one_round(monkeypatch) -> None:
+    calls: list[list[dict]] = []
+
+    async def fake_aconverse_with_tools(**kwargs):
+        calls.append(kwargs["messages"])
+        return {
+            "stopReason": "end_turn",
+            "output": {"message": {"role": "assistant", "content": [{"text": "Volatile."}]}},
+        }
+
+    monkeypatch.setattr(
+        "backend.app.agents.base.aconverse_with_tools",
+        fake_aconverse_with_tools,
+    )
+    context = _records(
+        ("Echo apple", "apple", [{"tool": "echo_tool", "input": {}, "result": {"echo": "x"}}]),
+    )
+
+    result = asyncio.run(_FakeAgent().arun("and its volatility?", context=context))
+
+    assert result.answer == "Volatile."
+    assert result.tool_context is None
+    [messages] = calls
+    assert [m["role"] for m in messages[:3]] == ["user", "assistant", "user"]
+    assert "echo_tool" in messages[1]["content"][0]["text"]
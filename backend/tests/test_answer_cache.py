@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+import httpx
+import pytest
+from backend.app.agents.base import AgentResult
+from backend.app.api.routes import chat
+from backend.app.middleware.auth import get_current_user_id
+from backend.app.services import answer_cache
+from backend.app.services.answer_cache import (
+    AnswerCache,
+    answer_ttl,
+    question_slots,
+    set_answer_cache,
+)
+from fastapi import FastAPI
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.row: dict | None = None
+        self.executed: list[tuple] = []
+
+    async def fetchrow(self, sql: str, *args):
+        self.executed.append(("fetchrow", *args))
+        _vector, slots, _agent_type = args
+        if self.row is not None and self.row["question_slots"] != slots:
+            return None
+        return self.row
+
+    async def execute(self, sql: str, *args) -> None:
+        self.executed.append((sql.split()[0], *args))
+
+
+@pytest.fixture
+def conn(monkeypatch: pytest.MonkeyPatch) -> _FakeConn:
+    fake = _FakeConn()
+
+    @asynccontextmanager
+    async def fake_async_db_connection():
+        yield fake
+
+    async def embed(text: str) -> list[float]:
+        return [0.5, 0.25]
+
+    monkeypatch.setattr(answer_cache, "async_db_connection", fake_async_db_connection)
+    set_answer_cache(AnswerCache(threshold=0.9, embed=embed))
+    return fake
+
+
+def _post(body: dict) -> dict:
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    app.dependency_overrides[get_current_user_id] = lambda: None
+
+    async def run() -> dict:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/chat", json=body)
+        # Let the background store() finish.
+        await asyncio.gather(*answer_cache.get_answer_cache()._tasks)
+        return response.json()
+
+    return asyncio.run(run())
+
+
+def test_answer_ttl_follows_the_most_volatile_source() -> None:
+    assert answer_ttl(["get_city_demographics", "get_stock_quote"]) == 60.0
+    assert answer_ttl(["get_city_demographics"]) == 7 * 24 * 3600.0
+    assert answer_ttl(["some_new_tool"]) == 300.0
+    assert answer_ttl([]) == 24 * 3600.0
+
+
+def test_miss_runs_the_agent_and_stores_with_source_ttl(monkeypatch, conn) -> None:
+    conn.row = {
+        "id": 1,
+        "agent_type": "market",
+        "question_slots": "aapl price",
+        "response": "{}",
+        "latency_ms": 0,
+        "similarity": 0.5,
+    }  # nearest neighbour is below the threshold
+
+    async def fake_route(question: str, *, context=None):
+        return "market", AgentResult(
+            answer="AAPL is $200.",
+            tool_trace=[{"tool": "get_stock_quote", "status": "success"}],
+        )
+
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+
+    assert _post({"question": " AAPL price? "})["answer"] == "AAPL is $200."
+
+    insert = next(call for call in conn.executed if call[0] == "INSERT")
+    agent_type, question, slots, vector, response, sources, _latency, ttl = insert[1:]
+    assert (agent_type, question, vector) == ("market", "AAPL price?", "[0.5,0.25]")
+    assert slots == "aapl price"
+    assert json.loads(response)["answer"] == "AAPL is $200."
+    assert (sources, ttl) == (["get_stock_quote"], 60.0)
+    stats = answer_cache.get_answer_cache().stats()
+    assert (stats.lookups, stats.hits, stats.stores) == (1, 0, 1)
+
+
+def test_hit_skips_routing_and_counts_saved_time(monkeypatch, conn) -> None:
+    cached = AgentResult(answer="Median home value in Austin is $550k.", rows_found=1)
+    conn.row = {
+        "id": 7,
+        "agent_type": "housing",
+        "question_slots": "austin home median value",
+        "response": json.dumps(asdict(cached)),
+        "latency_ms": 4000.0,
+        "similarity": 0.97,
+    }
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("a cache hit must not route the question")
+
+    monkeypatch.setattr(chat, "aroute_question", fail)
+
+    data = _post({"question": "median home value in austin"})
+
+    assert (data["answer"], data["agent_type"]) == (cached.answer, "housing")
+    assert ("UPDATE", 7) in conn.executed
+    stats = answer_cache.get_answer_cache().stats()
+    assert (stats.hits, stats.hit_rate, stats.stores) == (1, 1.0, 0)
+    assert 3.5 < stats.saved_seconds <= 4.0
+
+
+def test_question_slots_keep_subject_and_drop_filler() -> None:
+    assert question_slots("What's the median rent in Austin, TX?") == "austin median rent texas"
+    assert question_slots("median rent in austin texas") == "austin median rent texas"
+    assert question_slots("30-year mortgage rate") == question_slots("mortgage rate 30 year")
+    assert question_slots("AAPL price") != question_slots("MSFT price")
+
+
+def test_similar_question_about_another_city_misses(monkeypatch, conn) -> None:
+    cached = AgentResult(answer="Median rent in Austin is $1,600.", rows_found=1)
+    conn.row = {
+        "id": 3,
+        "agent_type": "housing",
+        "question_slots": question_slots("median rent in Austin"),
+        "response": json.dumps(asdict(cached)),
+        "latency_ms": 3000.0,
+        "similarity": 0.99,
+    }
+
+    async def fake_route(question: str, *, context=None):
+        return "housing", AgentResult(answer="Median rent in Dallas is $1,450.")
+
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+
+    assert _post({"question": "median rent in Dallas"})["answer"] == (
+        "Median rent in Dallas is $1,450."
+    )
+    stats = answer_cache.get_answer_cache().stats()
+    assert (stats.lookups, stats.hits, stats.stores) == (1, 0, 1)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 from typing import Any
 
+from backend.app.agents import base
 from backend.app.agents.base import BaseAgent
+from backend.app.services import bedrock
 
 
 class _FakeAgent(BaseAgent):
@@ -107,3 +112,334 @@ def test_base_agent_runs_tool_loop_and_collects_trace(monkeypatch) -> None:
             {"date": "2026-03-02", "close": 101.5},
         ],
     }
+    assert result.tool_context == [
+        {
+            "tool": "echo_tool",
+            "input": {"value": "apple"},
+            "result": {"echo": "apple", "row_count": 2, "rows": [{"value": "apple"}]},
+        }
+    ]
+
+
+def test_base_agent_arun_awaits_bedrock_and_tools(monkeypatch) -> None:
+    responses = [
+        {
+            "stopReason": "tool_use",
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {
+                            "toolUse": {
+                                "toolUseId": "tool-1",
+                                "name": "echo_tool",
+                                "input": {"value": "apple"},
+                            }
+                        }
+                    ],
+                }
+            },
+        },
+        {
+            "stopReason": "end_turn",
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [{"text": "Async answer."}],
+                }
+            },
+        },
+    ]
+    seen_messages: list[int] = []
+
+    async def fake_aconverse_with_tools(**kwargs):
+        seen_messages.append(len(kwargs["messages"]))
+        return responses.pop(0)
+
+    def fail_sync(**kwargs):
+        raise AssertionError("sync Bedrock client must not be used by arun()")
+
+    monkeypatch.setattr("backend.app.agents.base.aconverse_with_tools", fake_aconverse_with_tools)
+    monkeypatch.setattr("backend.app.agents.base.converse_with_tools", fail_sync)
+
+    result = asyncio.run(_FakeAgent().arun("Test question"))
+
+    assert result.answer == "Async answer."
+    assert result.error is None
+    assert result.sql_used == "SELECT 1"
+    assert result.tool_trace is not None
+    assert result.tool_trace[0]["status"] == "success"
+    assert seen_messages == [1, 3]
+
+
+# Delays are inverted so later toolUse blocks finish first.
+_TOOL_DELAYS = {"a": 0.3, "b": 0.2, "c": 0.1, "hang": 1.5}
+
+
+class _SlowAgent(_FakeAgent):
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _tool_timeout(self) -> float:
+        return 0.5
+
+    def _execute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(_TOOL_DELAYS[input_data["value"]])
+        finally:
+            with self._lock:
+                self.active -= 1
+        if input_data["value"] == "c":
+            raise ValueError("c failed")
+        return {"echo": input_data["value"], "sql": f"SELECT '{input_data['value']}'"}
+
+
+def _multi_tool_responses(*values: str) -> list[dict[str, Any]]:
+    return [
+        {
+            "stopReason": "tool_use",
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {
+                            "toolUse": {
+                                "toolUseId": f"tool-{value}",
+                                "name": "echo_tool",
+                                "input": {"value": value},
+                            }
+                        }
+                        for value in values
+                    ],
+                }
+            },
+        },
+        {
+            "stopReason": "end_turn",
+            "output": {"message": {"role": "assistant", "content": [{"text": "Done."}]}},
+        },
+    ]
+
+
+def test_base_agent_runs_round_tools_concurrently_in_order(monkeypatch) -> None:
+    responses = _multi_tool_responses("a", "b", "c")
+    sent: list[list[dict[str, Any]]] = []
+
+    def fake_converse_with_tools(**kwargs):
+        sent.append(list(kwargs["messages"]))
+        return responses.pop(0)
+
+    monkeypatch.setattr("backend.app.agents.base.converse_with_tools", fake_converse_with_tools)
+    agent = _SlowAgent()
+
+    started = time.perf_counter()
+    result = agent.run("Test question")
+    elapsed = time.perf_counter() - started
+
+    assert result.answer == "Done."
+    assert elapsed < 0.5
+    assert agent.peak == 3
+    assert [entry["input"]["value"] for entry in result.tool_trace] == ["a", "b", "c"]
+    assert [entry["status"] for entry in result.tool_trace] == ["success", "success", "error"]
+    assert result.sql_used == "SELECT 'a'\n\nSELECT 'b'"
+    tool_results = sent[1][-1]["content"]
+    assert [block["toolResult"]["toolUseId"] for block in tool_results] == [
+        "tool-a",
+        "tool-b",
+        "tool-c",
+    ]
+
+
+def test_base_agent_caps_tool_concurrency_and_times_out(monkeypatch) -> None:
+    responses = _multi_tool_responses("hang", "c", "b")
+    monkeypatch.setattr(
+        "backend.app.agents.base.converse_with_tools",
+        lambda **kwargs: responses.pop(0),
+    )
+    agent = _SlowAgent()
+    monkeypatch.setattr(agent, "_max_parallel_tools", lambda: 2)
+
+    started = time.perf_counter()
+    result = agent.run("Test question")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert agent.peak == 2
+    assert result.tool_trace[0] == {
+        "tool": "echo_tool",
+        "status": "error",
+        "input": {"value": "hang"},
+        "error": "echo_tool timed out after 0.5s",
+    }
+    assert [entry["status"] for entry in result.tool_trace[1:]] == ["error", "success"]
+
+
+class _BedrockCallingAgent(_FakeAgent):
+    def _execute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        bedrock._count_call()
+        return {"echo": input_data["value"]}
+
+
+def test_base_agent_tool_threads_share_the_callers_context(monkeypatch) -> None:
+    responses = _multi_tool_responses("a", "b", "c")
+    monkeypatch.setattr(
+        "backend.app.agents.base.converse_with_tools",
+        lambda **kwargs: responses.pop(0),
+    )
+
+    with bedrock.count_bedrock_calls() as counter:
+        result = _BedrockCallingAgent().run("Test question")
+
+    assert [entry["status"] for entry in result.tool_trace] == ["success"] * 3
+    assert counter[0] == 3
+
+
+def test_base_agent_timed_out_rounds_reuse_the_shared_tool_pool(monkeypatch) -> None:
+    agent = _SlowAgent()
+    monkeypatch.setattr(agent, "_tool_timeout", lambda: 0.05)
+
+    responses = _multi_tool_responses("hang") * 3
+    monkeypatch.setattr(
+        "backend.app.agents.base.converse_with_tools",
+        lambda **kwargs: responses.pop(0),
+    )
+    for _ in range(3):
+        result = agent.run("Test question")
+        assert result.tool_trace[0]["status"] == "error"
+
+    workers = [t for t in threading.enumerate() if t.name.startswith("agent-tool")]
+    assert 3 <= len(workers) <= base._TOOL_WORKERS
+    assert not [t for t in threading.enumerate() if t.name.startswith("_SlowAgent-tool")]
+
+
+def test_base_agent_arun_runs_round_tools_concurrently(monkeypatch) -> None:
+    responses = _multi_tool_responses("hang", "a", "b", "c")
+
+    async def fake_aconverse_with_tools(**kwargs):
+        return responses.pop(0)
+
+    monkeypatch.setattr("backend.app.agents.base.aconverse_with_tools", fake_aconverse_with_tools)
+    agent = _SlowAgent()
+
+    async def timed_run():
+        started = time.perf_counter()
+        result = await agent.arun("Test question")
+        return result, time.perf_counter() - started
+
+    # Timed inside the loop: asyncio.run() waits for the abandoned "hang" thread on exit.
+    result, elapsed = asyncio.run(timed_run())
+
+    assert result.answer == "Done."
+    assert elapsed < 1.0
+    assert agent.peak == 4
+    assert [entry["input"]["value"] for entry in result.tool_trace] == ["hang", "a", "b", "c"]
+    assert [entry["status"] for entry in result.tool_trace] == [
+        "error",
+        "success",
+        "success",
+        "error",
+    ]
+    assert result.tool_trace[0]["error"] == "echo_tool timed out after 0.5s"
+
+
+def _delta(index: int, **delta: Any) -> dict[str, Any]:
+    return {"contentBlockDelta": {"delta": delta, "contentBlockIndex": index}}
+
+
+def test_base_agent_arun_streams_tokens_and_tool_events(monkeypatch) -> None:
+    rounds = [
+        [
+            _delta(0, text="<think"),
+            _delta(0, text="ing>plan</thinking>"),
+            {
+                "contentBlockStart": {
+                    "start": {"toolUse": {"toolUseId": "tool-1", "name": "echo_tool"}},
+                    "contentBlockIndex": 1,
+                }
+            },
+            _delta(1, toolUse={"input": '{"val'}),
+            _delta(1, toolUse={"input": 'ue": "apple"}'}),
+            {"contentBlockStop": {"contentBlockIndex": 1}},
+            {"messageStop": {"stopReason": "tool_use"}},
+        ],
+        [
+            _delta(0, text="Apple is "),
+            _delta(0, text="up."),
+            {"messageStop": {"stopReason": "end_turn"}},
+        ],
+    ]
+    sent: list[list[dict[str, Any]]] = []
+
+    async def fake_stream(**kwargs):
+        sent.append(list(kwargs["messages"]))
+        for event in rounds.pop(0):
+            yield event
+
+    monkeypatch.setattr("backend.app.agents.base.aconverse_stream_with_tools", fake_stream)
+    events: list[tuple[str, dict[str, Any]]] = []
+
+    result = asyncio.run(
+        _FakeAgent().arun("Test question", emit=lambda name, data: events.append((name, data)))
+    )
+
+    assert result.answer == "Apple is up."
+    assert sent[1][1] == {
+        "role": "assistant",
+        "content": [
+            {"text": "<thinking>plan</thinking>"},
+            {"toolUse": {"toolUseId": "tool-1", "name": "echo_tool", "input": {"value": "apple"}}},
+        ],
+    }
+    assert [name for name, _ in events] == ["tool_start", "tool_finish", "chart", "token", "token"]
+    assert events[0][1] == {"index": 0, "tool": "echo_tool", "input": {"value": "apple"}}
+    assert events[1][1]["status"] == "success"
+    assert events[1][1]["output_preview"] == result.tool_trace[0]["output_preview"]
+    assert events[2][1] == result.chart_data
+    assert "".join(data["text"] for name, data in events if name == "token") == "Apple is up."
+
+
+def test_base_agent_arun_keeps_tool_round_text_out_of_the_answer(monkeypatch) -> None:
+    rounds = [
+        [
+            _delta(0, text="Let me check "),
+            _delta(0, text="the quote."),
+            {
+                "contentBlockStart": {
+                    "start": {"toolUse": {"toolUseId": "tool-1", "name": "echo_tool"}},
+                    "contentBlockIndex": 1,
+                }
+            },
+            _delta(1, toolUse={"input": '{"value": "apple"}'}),
+            {"messageStop": {"stopReason": "tool_use"}},
+        ],
+        [
+            _delta(0, text="Apple is up. <thi"),
+            {"messageStop": {"stopReason": "end_turn"}},
+        ],
+    ]
+
+    async def fake_stream(**kwargs):
+        for event in rounds.pop(0):
+            yield event
+
+    monkeypatch.setattr("backend.app.agents.base.aconverse_stream_with_tools", fake_stream)
+    events: list[tuple[str, dict[str, Any]]] = []
+
+    asyncio.run(
+        _FakeAgent().arun("Test question", emit=lambda name, data: events.append((name, data)))
+    )
+
+    text_events = [(name, data["text"]) for name, data in events if "text" in data]
+    # A trailing fragment that never became a <thinking> tag is released at round end.
+    assert text_events == [
+        ("token", "Let me check "),
+        ("token", "the quote."),
+        ("preamble", "Let me check the quote."),
+        ("token", "Apple is up. "),
+        ("token", "<thi"),
+    ]
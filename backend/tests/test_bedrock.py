@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import zlib
+
+import httpx
+import pytest
+from backend.app.services import bedrock
+
+
+@pytest.fixture
+def aws_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    monkeypatch.delenv("AWS_SESSION_TOKEN", raising=False)
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    monkeypatch.setattr(bedrock, "_frozen_credentials", None)
+    bedrock._aws_session.cache_clear()
+    yield
+    bedrock._aws_session.cache_clear()
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_aconverse_with_tools_sends_signed_converse_request(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "stopReason": "end_turn",
+                "output": {"message": {"role": "assistant", "content": [{"text": "hi"}]}},
+            },
+        )
+
+    async def run() -> dict:
+        client = _mock_client(handler)
+        monkeypatch.setattr(bedrock, "_async_http_client", lambda: client)
+        try:
+            return await bedrock.aconverse_with_tools(
+                messages=[{"role": "user", "content": [{"text": "hello"}]}],
+                tools=[{"toolSpec": {"name": "noop"}}],
+                system="be brief",
+                model_id=bedrock.NOVA_PRO,
+                max_tokens=64,
+            )
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(run())
+
+    assert response["stopReason"] == "end_turn"
+    request = seen[0]
+    assert request.url.raw_path == b"/model/amazon.nova-pro-v1%3A0/converse"
+    assert request.headers["authorization"].startswith("AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/")
+    assert "x-amz-date" in request.headers
+    body = json.loads(request.content)
+    assert body["system"] == [{"text": "be brief"}]
+    assert body["toolConfig"] == {"tools": [{"toolSpec": {"name": "noop"}}]}
+    assert body["inferenceConfig"]["maxTokens"] == 64
+
+
+def test_aconverse_retries_throttling_then_raises_client_errors(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    statuses = [429, 200, 400]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses.pop(0)
+        if status == 200:
+            return httpx.Response(200, json={"output": {"message": {"content": [{"text": "ok"}]}}})
+        return httpx.Response(status, json={"message": "nope"})
+
+    async def run() -> tuple[str, Exception | None]:
+        client = _mock_client(handler)
+        monkeypatch.setattr(bedrock, "_async_http_client", lambda: client)
+        monkeypatch.setattr(bedrock._aconverse.retry, "sleep", _no_sleep)
+        try:
+            text = await bedrock.ainvoke_claude("hello")
+            try:
+                await bedrock.ainvoke_claude("hello again")
+            except bedrock.BedrockHTTPError as exc:
+                return text, exc
+            return text, None
+        finally:
+            await client.aclose()
+
+    text, error = asyncio.run(run())
+
+    assert text == "ok"
+    assert isinstance(error, bedrock.BedrockHTTPError)
+    assert error.status_code == 400
+    assert statuses == []
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
+
+
+def _event_message(headers: dict[str, str], payload: dict) -> bytes:
+    """Encode one application/vnd.amazon.eventstream message."""
+    encoded_headers = b""
+    for name, value in headers.items():
+        raw_name, raw_value = name.encode(), value.encode()
+        encoded_headers += (
+            bytes([len(raw_name)])
+            + raw_name
+            + b"\x07"
+            + len(raw_value).to_bytes(2, "big")
+            + raw_value
+        )
+    body = json.dumps(payload).encode()
+    total = 12 + len(encoded_headers) + len(body) + 4
+    prelude = total.to_bytes(4, "big") + len(encoded_headers).to_bytes(4, "big")
+    prelude += zlib.crc32(prelude).to_bytes(4, "big")
+    message = prelude + encoded_headers + body
+    return message + zlib.crc32(message).to_bytes(4, "big")
+
+
+class _ChunkedStream(httpx.AsyncByteStream):
+    """Deliver the body in small chunks so messages straddle chunk boundaries."""
+
+    def __init__(self, data: bytes, *, size: int) -> None:
+        self._data = data
+        self._size = size
+
+    async def __aiter__(self):
+        for start in range(0, len(self._data), self._size):
+            yield self._data[start : start + self._size]
+
+
+def _stream_event(event_type: str, payload: dict) -> bytes:
+    return _event_message({":event-type": event_type, ":message-type": "event"}, payload)
+
+
+def test_aconverse_stream_with_tools_decodes_event_stream(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    stream = b"".join(
+        [
+            _stream_event("messageStart", {"role": "assistant"}),
+            _stream_event("contentBlockDelta", {"delta": {"text": "Hel"}, "contentBlockIndex": 0}),
+            _stream_event("contentBlockDelta", {"delta": {"text": "lo"}, "contentBlockIndex": 0}),
+            _stream_event("messageStop", {"stopReason": "end_turn"}),
+        ]
+    )
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, stream=_ChunkedStream(stream, size=7))
+
+    async def run() -> list[dict]:
+        client = _mock_client(handler)
+        monkeypatch.setattr(bedrock, "_async_http_client", lambda: client)
+        try:
+            return [
+                event
+                async for event in bedrock.aconverse_stream_with_tools(
+                    messages=[{"role": "user", "content": [{"text": "hello"}]}],
+                    tools=[{"toolSpec": {"name": "noop"}}],
+                )
+            ]
+        finally:
+            await client.aclose()
+
+    events = asyncio.run(run())
+
+    assert seen[0].url.raw_path == b"/model/amazon.nova-pro-v1%3A0/converse-stream"
+    assert seen[0].headers["accept"] == "application/vnd.amazon.eventstream"
+    assert events == [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"delta": {"text": "Hel"}, "contentBlockIndex": 0}},
+        {"contentBlockDelta": {"delta": {"text": "lo"}, "contentBlockIndex": 0}},
+        {"messageStop": {"stopReason": "end_turn"}},
+    ]
+
+
+def test_aconverse_stream_with_tools_raises_exception_events(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    stream = _stream_event("messageStart", {"role": "assistant"}) + _event_message(
+        {":message-type": "exception", ":exception-type": "throttlingException"},
+        {"message": "slow down"},
+    )
+
+    async def run() -> None:
+        client = _mock_client(lambda request: httpx.Response(200, content=stream))
+        monkeypatch.setattr(bedrock, "_async_http_client", lambda: client)
+        try:
+            async for _ in bedrock.aconverse_stream_with_tools(messages=[], tools=[]):
+                pass
+        finally:
+            await client.aclose()
+
+    with pytest.raises(bedrock.BedrockStreamError, match="throttlingException: slow down"):
+        asyncio.run(run())
+
+
+def test_credentials_resolve_off_the_event_loop_and_are_reused(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    threads: list[threading.Thread] = []
+    resolve = bedrock._resolve_credentials
+
+    def counting_resolve():
+        threads.append(threading.current_thread())
+        return resolve()
+
+    monkeypatch.setattr(bedrock, "_resolve_credentials", counting_resolve)
+
+    async def run() -> None:
+        for _ in range(3):
+            await bedrock._signed_request(bedrock.TITAN_EMBED, "invoke", {"inputText": "hi"})
+
+    asyncio.run(run())
+
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
+
+
+def test_aembed_text_counts_one_call_across_retries(
+    monkeypatch: pytest.MonkeyPatch,
+    aws_env: None,
+) -> None:
+    statuses = [503, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"embedding": [0.5, 0.25]} if status == 200 else {})
+
+    async def run() -> tuple[list[float], int]:
+        client = _mock_client(handler)
+        monkeypatch.setattr(bedrock, "_async_http_client", lambda: client)
+        monkeypatch.setattr(bedrock._aembed.retry, "sleep", _no_sleep)
+        try:
+            with bedrock.count_bedrock_calls() as calls:
+                embedding = await bedrock.aembed_text("hello")
+            return embedding, calls[0]
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == ([0.5, 0.25], 1)
+    assert statuses == []
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
+
+
+def test_aclose_clients_closes_the_running_loops_clients() -> None:
+    async def run() -> list[httpx.AsyncClient]:
+        bedrock._async_http_client()
+        clients = list(bedrock._async_clients[asyncio.get_running_loop()][0])
+        await bedrock.aclose_clients()
+        assert asyncio.get_running_loop() not in bedrock._async_clients
+        return clients
+
+    clients = asyncio.run(run())
+
+    assert len(clients) == bedrock._ASYNC_POOL_SHARDS
+    assert all(client.is_closed for client in clients)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import astuple
+
+import pytest
+from backend.app.agents.housing.agent import HousingAgent
+from backend.app.services import census_places, live_apis
+
+_PHILADELPHIA = census_places.CensusPlace(
+    "42", "60000", "Philadelphia city, Pennsylvania", "231400", "1285", "60302", 1567258
+)
+
+
+def test_place_key_strips_state_and_place_type() -> None:
+    assert census_places.place_key("Philadelphia city, Pennsylvania") == "philadelphia"
+    assert census_places.place_key("Boise City city, Idaho") == "boise city"
+    assert (
+        census_places.place_key("Nashville-Davidson metropolitan government (balance), Tennessee")
+        == "nashville davidson"
+    )
+    assert census_places.place_key("Urban Honolulu CDP, Hawaii") == "urban honolulu"
+
+
+def test_parse_place_rows_reads_columns_by_header() -> None:
+    rows = [
+        ["NAME", "B25077_001E", "B25064_001E", "B19013_001E", "B01003_001E", "state", "place"],
+        ["Philadelphia city, Pennsylvania", "231400", "1285", "60302", "1567258", "42", "60000"],
+        ["Nowhere town, Pennsylvania", None, None, None, None, "42", ""],
+    ]
+
+    assert census_places.parse_place_rows(rows) == [_PHILADELPHIA]
+
+
+def test_lookup_places_resolves_a_batch_in_one_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    executed: list[tuple] = []
+    statements: list[str] = []
+
+    class _Cursor:
+        def execute(self, sql: str, params: tuple) -> None:
+            executed.append(params)
+            statements.append(sql)
+
+        def fetchall(self) -> list[tuple]:
+            return [(1, *astuple(_PHILADELPHIA))]
+
+    @contextmanager
+    def fake_db_cursor():
+        yield _Cursor()
+
+    monkeypatch.setattr(census_places, "db_cursor", fake_db_cursor)
+
+    found = census_places.lookup_places([("Atlantis", ""), ("Philadelphia City", "42")])
+
+    assert found == [None, _PHILADELPHIA]
+    assert len(executed) == 1
+    indexes, keys, alt_keys, states = executed[0]
+    assert indexes == [0, 1]
+    assert keys == ["atlantis", "philadelphia city"]
+    assert alt_keys == ["atlantis", "philadelphia"]
+    assert states == ["", "42"]
+    # A LIKE pattern built per row cannot use the text_pattern_ops index.
+    assert "LIKE" not in statements[0]
+
+
+def test_census_snapshot_is_served_from_the_index_without_http(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def no_http():
+        raise AssertionError("the index hit should not call the Census API")
+
+    monkeypatch.setattr(live_apis, "_http_client", no_http)
+    monkeypatch.setattr(
+        census_places, "lookup_places", lambda queries: [_PHILADELPHIA] * len(queries)
+    )
+
+    assert live_apis.census_city_snapshot("Philadelphia, PA") == _PHILADELPHIA.snapshot()
+
+
+def test_get_census_cities_data_falls_back_to_live_api_for_misses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lookups: list[list[tuple[str, str]]] = []
+
+    def fake_lookup(queries):
+        lookups.append(list(queries))
+        return [_PHILADELPHIA, None]
+
+    monkeypatch.setattr(census_places, "lookup_places", fake_lookup)
+    monkeypatch.setattr(
+        live_apis, "_live_census_city_snapshot", lambda city: {"place_name": f"live {city}"}
+    )
+
+    data = live_apis.get_census_cities_data(["Philadelphia, Pennsylvania", "Smallville, KS"])
+
+    assert lookups == [[("Philadelphia", "42"), ("Smallville", "20")]]
+    assert data == [_PHILADELPHIA.snapshot(), {"place_name": "live Smallville, KS"}]
+
+
+def test_housing_agent_compares_several_cities_in_one_call(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_cities_data(cities: list[str]) -> list[dict]:
+        calls.append(cities)
+        return [_PHILADELPHIA.snapshot(), {}]
+
+    monkeypatch.setattr("backend.app.agents.housing.agent.get_census_cities_data", fake_cities_data)
+
+    result = HousingAgent()._execute_tool(
+        "get_city_demographics", {"cities": ["Philadelphia, PA", "Atlantis"]}
+    )
+
+    assert calls == [["Philadelphia, PA", "Atlantis"]]
+    assert [item["found"] for item in result["cities"]] == [True, False]
+    assert result["cities"][0]["median_gross_rent"] == "1285"
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+
+import httpx
+from backend.app.agents.base import AgentResult
+from backend.app.api.routes import chat
+from backend.app.middleware.auth import get_current_user_id
+from backend.app.services import bedrock
+from backend.app.services.coalesce import SingleFlight
+from backend.app.services.history_writer import (
+    HistoryWriter,
+    get_history_writer,
+    set_history_writer,
+)
+from fastapi import FastAPI
+
+
+def test_identical_questions_share_one_run_and_persist_per_user(monkeypatch, tmp_path) -> None:
+    runs: list[str] = []
+    saved: list = []
+    chat_ids = itertools.count(100)
+
+    async def fake_route(question: str, *, context=None):
+        runs.append(question)
+        bedrock._count_call()  # classifier
+        await asyncio.sleep(0.05)
+        bedrock._count_call()  # one agent round
+        return "market", AgentResult(answer="Stocks fell on the news.")
+
+    async def fake_reserve_chat_id() -> int:
+        return next(chat_ids)
+
+    async def save(batch: list) -> None:
+        saved.extend(batch)
+
+    flight = SingleFlight("test")
+    monkeypatch.setattr(chat, "question_flight", flight)
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+    monkeypatch.setattr(chat.hist, "areserve_chat_id", fake_reserve_chat_id)
+    set_history_writer(HistoryWriter(save, spool_path=tmp_path / "spool.jsonl"))
+
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    app.dependency_overrides[get_current_user_id] = lambda: 7
+    questions = ["Why did stocks fall today?"] * 4 + ["why did stocks fall today"]
+
+    async def run() -> list[dict]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(client.post("/api/chat", json={"question": q}) for q in questions)
+            )
+        await get_history_writer().flush()
+        return [response.json() for response in responses]
+
+    try:
+        bodies = asyncio.run(run())
+    finally:
+        set_history_writer(None)
+
+    assert len(runs) == 1
+    assert {body["answer"] for body in bodies} == {"Stocks fell on the news."}
+    assert sorted(body["conversation_id"] for body in bodies) == list(range(100, 105))
+    assert sorted(turn.question for turn in saved) == sorted(questions)
+    stats = flight.stats()
+    assert (stats.executions, stats.coalesced, stats.in_flight) == (1, 4, 0)
+    assert (stats.bedrock_calls, stats.bedrock_calls_saved) == (2, 8)
+
+
+def test_followers_retry_when_the_leader_is_cancelled() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    calls: list[str] = []
+
+    async def slow() -> str:
+        calls.append("leader")
+        await asyncio.sleep(10)
+        return "never"
+
+    async def fast() -> str:
+        calls.append("follower")
+        return "answer"
+
+    async def run() -> tuple[str, bool]:
+        leader = asyncio.create_task(flight.run("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == ("answer", False)
+    assert calls == ["leader", "follower"]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+from backend.app.agents.base import AgentResult, BaseAgent
+from backend.app.api.routes import chat
+from backend.app.middleware.auth import get_current_user_id
+from backend.app.services.history_writer import (
+    HistoryWriter,
+    get_history_writer,
+    set_history_writer,
+)
+from fastapi import FastAPI
+
+
+def _parse_sse(text: str) -> list[tuple[str, Any]]:
+    events = []
+    for frame in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _app(user_id: int | None) -> FastAPI:
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    return app
+
+
+def _post_stream(app: FastAPI, body: dict[str, Any]) -> str:
+    async def run() -> str:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/chat/stream", json=body)
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+        await get_history_writer().flush()
+        return response.text
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def saved_turns(tmp_path) -> list:
+    turns: list = []
+
+    async def save(batch: list) -> None:
+        turns.extend(batch)
+
+    set_history_writer(HistoryWriter(save, spool_path=tmp_path / "spool.jsonl"))
+    yield turns
+    set_history_writer(None)
+
+
+def test_stream_chat_emits_events_then_persists_after_close(
+    monkeypatch: pytest.MonkeyPatch,
+    saved_turns: list,
+) -> None:
+
+    async def fake_route(question: str, *, emit, context=None):
+        emit("route", {"agent_type": "market"})
+        emit("tool_start", {"index": 0, "tool": "get_stock_quote", "input": {"symbol": "AAPL"}})
+        emit("tool_finish", {"index": 0, "tool": "get_stock_quote", "status": "success"})
+        emit("token", {"text": "AAPL is $200."})
+        return "market", AgentResult(answer="AAPL is $200.", tool_trace=[{"tool": "q"}])
+
+    async def fake_reserve_chat_id() -> int:
+        return 42
+
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+    monkeypatch.setattr(chat.hist, "areserve_chat_id", fake_reserve_chat_id)
+
+    events = _parse_sse(_post_stream(_app(user_id=7), {"question": "AAPL price?"}))
+
+    assert [name for name, _ in events] == ["route", "tool_start", "tool_finish", "token", "done"]
+    done = events[-1][1]
+    assert done["answer"] == "AAPL is $200."
+    assert done["agent_type"] == "market"
+    assert done["conversation_id"] == 42
+    [turn] = saved_turns
+    assert (turn.user_id, turn.chat_id, turn.new_chat) == (7, 42, True)
+    assert (turn.agent_type, turn.title) == ("market", "AAPL price?")
+    assert (turn.question, turn.answer) == ("AAPL price?", "AAPL is $200.")
+    assert turn.metadata["tool_trace"] == [{"tool": "q"}]
+    assert turn.asked_at <= turn.answered_at
+
+
+def test_stream_chat_skips_persistence_for_anonymous_users(
+    monkeypatch: pytest.MonkeyPatch,
+    saved_turns: list,
+) -> None:
+    async def fake_route(question: str, *, emit, context=None):
+        emit("route", {"agent_type": None})
+        return None, AgentResult(answer="Out of scope.")
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("anonymous turns must not be persisted")
+
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+    monkeypatch.setattr(chat.hist, "areserve_chat_id", fail)
+
+    events = _parse_sse(_post_stream(_app(user_id=None), {"question": "Tell me a joke"}))
+
+    assert events[0] == ("route", {"agent_type": None})
+    assert events[-1][0] == "done"
+    assert events[-1][1]["conversation_id"] is None
+    assert saved_turns == []
+
+
+class _StreamingAgent(BaseAgent):
+    def _get_system_prompt(self) -> str:
+        return "system"
+
+    def _get_tools(self) -> list[dict[str, Any]]:
+        return []
+
+    def _execute_tool(self, name: str, input_data: dict[str, Any]) -> dict[str, Any]:
+        raise AssertionError("no tools in this test")
+
+
+def test_stream_chat_forwards_answer_tokens_as_bedrock_streams_them(
+    monkeypatch: pytest.MonkeyPatch,
+    saved_turns: list,
+) -> None:
+    async def fake_stream(**kwargs):
+        for text in ("AAPL ", "is ", "$200."):
+            yield {"contentBlockDelta": {"delta": {"text": text}, "contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+    async def fake_route(question: str, *, emit, context=None):
+        emit("route", {"agent_type": "market"})
+        return "market", await _StreamingAgent().arun(question, emit=emit)
+
+    monkeypatch.setattr("backend.app.agents.base.aconverse_stream_with_tools", fake_stream)
+    monkeypatch.setattr(chat, "aroute_question", fake_route)
+
+    events = _parse_sse(_post_stream(_app(user_id=None), {"question": "AAPL price?"}))
+
+    assert [name for name, _ in events] == ["route", "token", "token", "token", "done"]
+    assert [data["text"] for name, data in events if name == "token"] == ["AAPL ", "is ", "$200."]
+    assert events[-1][1]["answer"] == "AAPL is $200."
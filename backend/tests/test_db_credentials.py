@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import asyncpg
+import psycopg2
+import pytest
+from backend.database import connect
+
+
+class _FakeSecretsManager:
+    def __init__(self, passwords: list[str]) -> None:
+        self._passwords = passwords
+        self.fetches = 0
+
+    def get_secret_value(self, SecretId: str) -> dict[str, str]:
+        password = self._passwords[min(self.fetches, len(self._passwords) - 1)]
+        self.fetches += 1
+        return {"SecretString": json.dumps({"username": "app", "password": password})}
+
+
+class _FakeBoto3:
+    def __init__(self, sm: _FakeSecretsManager) -> None:
+        self._sm = sm
+
+    def client(self, service: str, region_name: str) -> _FakeSecretsManager:
+        assert service == "secretsmanager"
+        return self._sm
+
+
+class _FakeCursor:
+    def execute(self, sql: str, params: object = None) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeConn:
+    closed = 0
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor()
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+class _FakeDatabase:
+    """Accepts exactly one password; counts connection attempts."""
+
+    def __init__(self, password: str) -> None:
+        self.password = password
+        self.attempts = 0
+
+    def connect(self, **kwargs: object) -> _FakeConn:
+        self.attempts += 1
+        if kwargs["password"] != self.password:
+            raise psycopg2.OperationalError('FATAL:  password authentication failed for user "app"')
+        return _FakeConn()
+
+
+@pytest.fixture
+def stub_db(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("DB_HOST", "db.local")
+    monkeypatch.setenv("DB_NAME", "app")
+    monkeypatch.setenv("DB_USER", "app")
+    monkeypatch.setenv("DB_SECRET_ARN", "arn:aws:secretsmanager:test")
+    # Recycle every connection so each db_cursor() call opens a fresh one.
+    monkeypatch.setenv("DB_POOL_MAX_LIFETIME", "0")
+
+    def install(passwords: list[str], accepted: str) -> tuple[_FakeSecretsManager, _FakeDatabase]:
+        sm = _FakeSecretsManager(passwords)
+        db = _FakeDatabase(accepted)
+        monkeypatch.setattr(connect, "boto3", _FakeBoto3(sm))
+        monkeypatch.setattr(connect.psycopg2, "connect", db.connect)
+        return sm, db
+
+    connect.get_db_config.cache_clear()
+    connect._credentials.clear()
+    connect.close_pools()
+    yield install
+    connect.close_pools()
+    connect._credentials.clear()
+    connect.get_db_config.cache_clear()
+
+
+def test_secret_fetched_once_across_many_connections(stub_db) -> None:
+    sm, db = stub_db(["s3cret"], accepted="s3cret")
+
+    for _ in range(1000):
+        with connect.db_cursor() as cur:
+            cur.execute("SELECT 1")
+
+    assert db.attempts == 1000
+    assert sm.fetches == 1
+
+
+def test_rejected_login_refetches_secret_once_and_retries(stub_db) -> None:
+    sm, db = stub_db(["old-password", "new-password"], accepted="new-password")
+
+    for _ in range(50):
+        with connect.db_cursor() as cur:
+            cur.execute("SELECT 1")
+
+    assert sm.fetches == 2
+    assert db.attempts == 51
+
+
+def test_persistent_auth_failure_is_not_retried_in_a_loop(stub_db) -> None:
+    sm, db = stub_db(["wrong"], accepted="right")
+
+    with pytest.raises(psycopg2.OperationalError), connect.db_cursor():
+        pass
+
+    assert sm.fetches == 2
+    assert db.attempts == 2
+
+
+def test_credential_cache_refreshes_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [0.0]
+    fetched: list[str] = []
+
+    def fetch(secret_arn: str, region: str) -> str:
+        fetched.append(secret_arn)
+        return f"pw-{len(fetched)}"
+
+    monkeypatch.setenv("DB_SECRET_TTL", "60")
+    cache = connect._CredentialCache(fetch, clock=lambda: now[0])
+
+    assert cache.get("arn", "us-east-1") == "pw-1"
+    now[0] = 59.0
+    assert cache.get("arn", "us-east-1") == "pw-1"
+    now[0] = 61.0
+    assert cache.get("arn", "us-east-1") == "pw-2"
+    assert len(fetched) == 2
+
+
+def test_async_rejected_login_refetches_secret_once_and_retries(
+    stub_db,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sm, _ = stub_db(["old-password", "new-password"], accepted="new-password")
+    attempts: list[str] = []
+
+    async def fake_connect(*args: object, password: str, **kwargs: object) -> str:
+        attempts.append(password)
+        if password != "new-password":
+            raise asyncpg.InvalidPasswordError('password authentication failed for user "app"')
+        return "connection"
+
+    monkeypatch.setattr(connect.asyncpg, "connect", fake_connect)
+    cfg = connect.get_db_config()
+
+    async def run() -> list[str]:
+        return [await connect._aconnect(cfg, host=cfg.host) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["connection"] * 3
+    assert attempts == ["old-password", "new-password", "new-password", "new-password"]
+    assert sm.fetches == 2
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import psycopg2
+import pytest
+from backend.database import connect
+
+
+class _FakeCursor:
+    def __init__(self, conn: _FakeConn) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> _FakeCursor:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def execute(self, sql: str, params: object = None) -> None:
+        if self._conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self._conn.executed.append(sql)
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.broken = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.executed: list[str] = []
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        if self.broken:
+            raise psycopg2.InterfaceError("connection already closed")
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(clock: _Clock | None = None, **kwargs) -> tuple[connect.ConnectionPool, list[_FakeConn]]:
+    created: list[_FakeConn] = []
+
+    def factory() -> _FakeConn:
+        conn = _FakeConn()
+        created.append(conn)
+        return conn
+
+    options = {"max_size": 2, "acquire_timeout": 0.05, **kwargs}
+    if clock is not None:
+        options["clock"] = clock
+    return connect.ConnectionPool(factory, **options), created
+
+
+def test_pool_reuses_released_connections() -> None:
+    pool, created = _pool()
+
+    for _ in range(5):
+        with pool.connection():
+            pass
+
+    stats = pool.stats()
+    assert len(created) == 1
+    assert stats.acquired == 5
+    assert stats.created == 1
+    assert stats.idle == 1
+    assert stats.in_use == 0
+
+
+def test_pool_times_out_when_exhausted() -> None:
+    pool, _ = _pool(max_size=1)
+    held = pool.acquire()
+
+    with pytest.raises(connect.PoolTimeoutError):
+        pool.acquire()
+
+    pool.release(held)
+    assert pool.stats().timeouts == 1
+    assert pool.acquire() is held
+
+
+def test_pool_wakes_waiter_on_release() -> None:
+    pool, created = _pool(max_size=1, acquire_timeout=2.0)
+    held = pool.acquire()
+    acquired: list[object] = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(timeout=2.0)
+
+    assert acquired == [held]
+    assert len(created) == 1
+
+
+def test_pool_recycles_connections_past_max_lifetime() -> None:
+    clock = _Clock()
+    pool, created = _pool(clock, max_lifetime=60.0, health_check_after=1000.0)
+
+    first = pool.acquire()
+    pool.release(first)
+    clock.now += 61.0
+    second = pool.acquire()
+
+    assert second is not first
+    assert first.closed
+    assert len(created) == 2
+    assert pool.stats().recycled == 1
+
+
+def test_pool_health_checks_idle_connections_and_discards_broken_ones() -> None:
+    clock = _Clock()
+    pool, created = _pool(clock, health_check_after=30.0)
+
+    first = pool.acquire()
+    pool.release(first)
+    first.broken = True
+    clock.now += 31.0
+    second = pool.acquire()
+
+    assert second is not first
+    assert first.closed
+    assert len(created) == 2
+    assert pool.stats().discarded == 1
+
+
+def test_pool_discards_connection_after_operational_error() -> None:
+    pool, created = _pool()
+
+    with pytest.raises(psycopg2.OperationalError), pool.connection():
+        raise psycopg2.OperationalError("network hiccup")
+
+    assert created[0].closed
+    assert pool.stats().size == 0
+
+
+def test_db_cursor_borrows_from_shared_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[_FakeConn] = []
+
+    def fake_get_conn(cfg: connect.DBConfig | None = None) -> _FakeConn:
+        conn = _FakeConn()
+        created.append(conn)
+        return conn
+
+    cfg = connect.DBConfig(
+        host="db.local",
+        port=5432,
+        dbname="app",
+        user="app",
+        secret_arn="secret",
+        region="us-east-1",
+    )
+    monkeypatch.setattr(connect, "get_conn", fake_get_conn)
+    connect.close_pools()
+
+    try:
+        for _ in range(3):
+            with connect.db_cursor(cfg) as cur:
+                cur.execute("SELECT 1")
+        with pytest.raises(ValueError), connect.db_cursor(cfg):
+            raise ValueError("boom")
+
+        assert len(created) == 1
+        assert created[0].commits == 3
+        assert created[0].rollbacks == 1
+        assert connect.pool_stats()["db.local/app"].acquired == 4
+    finally:
+        connect.close_pools()
+
+
+class _FakeAsyncConn:
+    def __init__(self, opened_at: float) -> None:
+        self.opened_at = opened_at
+        self.closed = False
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _FakeAsyncPool:
+    def __init__(self, conn: _FakeAsyncConn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self, timeout: float) -> AsyncIterator[_FakeAsyncConn]:
+        yield self.conn
+
+
+@pytest.mark.parametrize(("age", "closed"), [(10.0, False), (1800.0, True)])
+def test_async_connection_closed_after_max_lifetime(
+    monkeypatch: pytest.MonkeyPatch,
+    age: float,
+    closed: bool,
+) -> None:
+    conn = _FakeAsyncConn(opened_at=time.monotonic() - age)
+
+    async def fake_get_async_pool(cfg: connect.DBConfig | None = None) -> _FakeAsyncPool:
+        return _FakeAsyncPool(conn)
+
+    monkeypatch.setattr(connect, "get_async_pool", fake_get_async_pool)
+    monkeypatch.setenv("DB_POOL_MAX_LIFETIME", "1800")
+    # The idle timeout is a separate setting and must not shorten the lifetime.
+    monkeypatch.setenv("DB_POOL_MAX_IDLE", "5")
+
+    async def run() -> None:
+        async with connect.async_db_connection() as borrowed:
+            assert borrowed is conn
+
+    asyncio.run(run())
+
+    assert conn.closed is closed
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from backend.app.agents.housing.agent import HousingAgent
+from backend.app.services import fred_store, live_apis
+
+
+class _Response:
+    def __init__(self, payload: dict) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def _stored(series_ids) -> dict[str, dict]:
+    return {
+        sid: {"date": "2026-03-05", "value": "6.3"}
+        for sid in series_ids
+        if sid in {"MORTGAGE30US", "UNRATE", "FEDFUNDS"}
+    }
+
+
+def test_snapshot_reads_the_store_and_fetches_missing_series_concurrently(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Both live fetches must be in flight at once to get past the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_fred_series(series_id: str, limit: int = 5) -> list[dict]:
+        barrier.wait()
+        return [{"date": "2026-01-01", "value": series_id.lower()}]
+
+    monkeypatch.setattr(fred_store, "latest_observations", _stored)
+    monkeypatch.setattr(live_apis, "fred_series", fake_fred_series)
+
+    snapshot = live_apis.get_fred_macro_snapshot()
+
+    assert list(snapshot) == list(live_apis.DEFAULT_FRED_SERIES)
+    assert snapshot["MORTGAGE30US"] == {"date": "2026-03-05", "value": "6.3"}
+    assert snapshot["GDP"] == {"date": "2026-01-01", "value": "gdp"}
+    assert snapshot["CPIAUCSL"]["value"] == "cpiaucsl"
+
+
+def test_async_snapshot_falls_back_to_live_fetches_when_store_is_down(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fetched: list[str] = []
+
+    async def store_down(series_ids):
+        raise OSError("connection refused")
+
+    async def fake_afred_series(series_id: str, limit: int = 5) -> list[dict]:
+        fetched.append(series_id)
+        return [{"date": "2026-01-01", "value": "1"}]
+
+    monkeypatch.setattr(fred_store, "alatest_observations", store_down)
+    monkeypatch.setattr(live_apis, "afred_series", fake_afred_series)
+
+    snapshot = asyncio.run(live_apis.aget_fred_macro_snapshot(["UNRATE", "GDP"]))
+
+    assert fetched == ["UNRATE", "GDP"]
+    assert set(snapshot) == {"UNRATE", "GDP"}
+
+
+def test_sync_fetches_only_observations_since_the_last_stored_date(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    requests: list[dict] = []
+
+    class _Client:
+        def get(self, url: str, params: dict) -> _Response:
+            requests.append(params)
+            return _Response(
+                {
+                    "observations": [
+                        {"date": "2026-02-26", "value": "6.4"},
+                        {"date": "2026-03-05", "value": "6.3"},
+                    ]
+                }
+            )
+
+    stored: list[tuple] = []
+    monkeypatch.setenv("FRED_API_KEY", "test")
+    monkeypatch.setattr(live_apis, "_http_client", lambda: _Client())
+    monkeypatch.setattr(fred_store, "_last_stored_date", lambda series_id: "2026-02-26")
+    monkeypatch.setattr(fred_store, "_fred_series_ttl", lambda series_id: 3600.0)
+    monkeypatch.setattr(
+        fred_store,
+        "store_observations",
+        lambda series_id, observations, fresh_for: (
+            stored.append((series_id, observations, fresh_for)) or len(observations)
+        ),
+    )
+
+    assert fred_store.sync_fred_series(["MORTGAGE30US"]) == {"MORTGAGE30US": 2}
+    assert requests[0]["observation_start"] == "2026-02-26"
+    assert requests[0]["sort_order"] == "asc"
+    assert stored[0][0] == "MORTGAGE30US"
+    assert stored[0][2] == 3600.0
+
+
+def test_history_comes_from_the_store_or_is_downsampled_from_fred(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        fred_store,
+        "month_end_history",
+        lambda series_id, start: (
+            [{"date": "2016-04-28", "value": "3.66"}] if series_id == "MORTGAGE30US" else None
+        ),
+    )
+    monkeypatch.setattr(live_apis, "_fred_series_ttl", lambda series_id: 3600.0)
+    monkeypatch.setattr(
+        live_apis,
+        "fred_observations_since",
+        lambda series_id, start: [
+            {"date": "2026-01-05", "value": "4.0"},
+            {"date": "2026-01-26", "value": "4.1"},
+            {"date": "2026-02-02", "value": "."},
+            {"date": "2026-02-09", "value": "4.2"},
+        ],
+    )
+
+    assert live_apis.get_fred_series_history("MORTGAGE30US") == [
+        {"date": "2016-04-28", "value": "3.66"}
+    ]
+    assert live_apis.get_fred_series_history("DGS10", years=1) == [
+        {"date": "2026-01-26", "value": "4.1"},
+        {"date": "2026-02-09", "value": "4.2"},
+    ]
+
+
+_HISTORY = [{"date": "2016-04-28", "value": "3.66"}]
+
+
+def test_indicator_tool_attaches_history_when_asked(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        "backend.app.agents.housing.agent.get_fred_macro_snapshot",
+        lambda series_ids: {"MORTGAGE30US": {"date": "2026-03-05", "value": "6.3"}},
+    )
+    monkeypatch.setattr(
+        "backend.app.agents.housing.agent.get_fred_series_histories",
+        lambda series_ids, years: dict.fromkeys(series_ids, _HISTORY),
+    )
+    agent = HousingAgent()
+
+    plain = agent._execute_tool("get_economic_indicators", {"indicators": ["mortgage_rate"]})
+    with_history = agent._execute_tool(
+        "get_economic_indicators", {"indicators": ["mortgage_rate"], "history_years": 10}
+    )
+
+    assert "history" not in plain["series"]["mortgage_rate"]
+    assert with_history["history_years"] == 10
+    assert with_history["series"]["mortgage_rate"]["history"][0]["value"] == "3.66"
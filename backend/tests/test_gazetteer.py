@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from backend.app.services import gazetteer, live_apis
+
+# GeoNames cities1000 columns: id, name, ascii name, alternate names, lat, lon, feature
+# class/code, country, cc2, admin1..4, population, elevation, dem, timezone, modified.
+_GEONAMES = [
+    "5746545\tPortland\tPortland\t\t45.52345\t-122.67621\tP\tPPLA2\tUS\t\tOR\t051\t\t\t652503"
+    "\t15\t50\tAmerica/Los_Angeles\t2019-09-05",
+    "4975802\tPortland\tPortland\t\t43.66147\t-70.25533\tP\tPPLA2\tUS\t\tME\t005\t\t\t68408"
+    "\t19\t21\tAmerica/New_York\t2017-05-23",
+    "5746547\tPortland Heights\tPortland Heights\t\t45.5\t-122.7\tP\tPPL\tUS\t\tOR\t051\t\t\t900"
+    "\t0\t100\tAmerica/Los_Angeles\t2019-09-05",
+    "2988507\tParis\tParis\t\t48.85341\t2.3488\tP\tPPLC\tFR\t\t11\t75\t\t\t2138551"
+    "\t\t42\tEurope/Paris\t2023-01-01",
+]
+
+
+class _GeocodeClient:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    def get(self, url: str, params: dict) -> object:
+        assert "geocoding-api.open-meteo.com" in url
+        self.calls.append(params)
+        payload = {
+            "results": [
+                {
+                    "name": "Smallville",
+                    "admin1": "Kansas",
+                    "country_code": "US",
+                    "timezone": "America/Chicago",
+                    "latitude": 39.0,
+                    "longitude": -98.0,
+                    "feature_code": "PPL",
+                }
+            ]
+        }
+
+        class _Response:
+            def raise_for_status(self) -> None:
+                return None
+
+            def json(self) -> dict:
+                return payload
+
+        return _Response()
+
+
+@pytest.fixture
+def places(tmp_path: Path) -> gazetteer.Gazetteer:
+    count = gazetteer.build_gazetteer(gazetteer.parse_geonames(_GEONAMES), tmp_path)
+    assert count == 3
+    index = gazetteer.Gazetteer(tmp_path)
+    gazetteer.set_gazetteer(index)
+    return index
+
+
+def test_lookup_ranks_like_the_geocoder_and_breaks_ties_by_population(
+    places: gazetteer.Gazetteer,
+) -> None:
+    best = places.lookup("Portland")
+    assert (best["admin1"], best["timezone"]) == ("Oregon", "America/Los_Angeles")
+    assert places.lookup("Portland", "Maine")["latitude"] == pytest.approx(43.66147)
+    assert places.lookup("portland heights")["name"] == "Portland Heights"
+    assert places.lookup("Paris") is None
+
+
+def test_weather_geocode_is_local_and_misses_are_written_back(
+    places: gazetteer.Gazetteer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = _GeocodeClient()
+    monkeypatch.setattr(live_apis, "_http_client", lambda: client)
+
+    assert live_apis.open_meteo_geocode_city("Portland, Oregon")["name"] == "Portland"
+    assert client.calls == []
+
+    assert live_apis.open_meteo_geocode_city("Smallville, KS")["timezone"] == "America/Chicago"
+    assert live_apis.open_meteo_geocode_city("Smallville, KS")["admin1"] == "Kansas"
+    assert len(client.calls) == 1
+
+    overlay = [json.loads(line) for line in (tmp_path / "overlay.jsonl").read_text().splitlines()]
+    assert [entry["query"] for entry in overlay] == ["smallville|kansas"]
+    # A worker started later sees the written-back answer too.
+    assert gazetteer.Gazetteer(tmp_path).lookup("Smallville", "Kansas")["name"] == "Smallville"
+    assert places.stats().written_back == 1
+
+
+def test_overlay_answers_repeat_lookups_without_an_index(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    path = tmp_path / "us_places"
+    index = gazetteer.Gazetteer(path)
+    gazetteer.set_gazetteer(index)
+    client = _GeocodeClient()
+    monkeypatch.setattr(live_apis, "_http_client", lambda: client)
+
+    assert not index.loaded
+    for _ in range(3):
+        assert live_apis.open_meteo_geocode_city("Smallville, KS")["name"] == "Smallville"
+
+    assert len(client.calls) == 1
+    assert (index.stats().misses, index.stats().overlay_hits) == (1, 2)
+    assert gazetteer.Gazetteer(path).lookup("Smallville", "Kansas")["admin1"] == "Kansas"
+
+
+def test_overlay_reads_only_lines_other_workers_appended(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    first, second = gazetteer.Gazetteer(tmp_path), gazetteer.Gazetteer(tmp_path)
+    parsed: list[str] = []
+    loads = json.loads
+    monkeypatch.setattr(gazetteer.json, "loads", lambda line: parsed.append(line) or loads(line))
+    smallville = {"name": "Smallville", "admin1": "Kansas"}
+
+    for n in range(5):
+        first.remember(f"Town {n}", "Kansas", smallville)
+        assert first.lookup(f"Town {n}", "Kansas") == smallville
+    assert parsed == []
+
+    second.remember("Smallville", "Kansas", smallville)
+    assert first.lookup("Smallville", "Kansas") == smallville
+    assert len(parsed) == 1
+    # The second worker catches up on all six lines once, then is current too.
+    assert second.lookup("Town 4", "Kansas") == smallville
+    assert second.lookup("Town 0", "Kansas") == smallville
+    assert len(parsed) == 7
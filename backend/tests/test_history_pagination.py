@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from backend.app.api.routes import history as history_routes
+from backend.app.middleware.auth import get_current_user_id
+from backend.app.services import history as hist
+from fastapi import FastAPI
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> sqlite3.Connection:
+    """In-memory stand-in for the history tables (sqlite supports row-value seeks)."""
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.executescript(
+        """
+        CREATE TABLE stored_chats (
+            id INTEGER PRIMARY KEY, user_id INT, agent_type TEXT, title TEXT,
+            created_at TIMESTAMP
+        );
+        CREATE TABLE stored_messages (
+            id INTEGER PRIMARY KEY, chat_id INT, sender INT, message TEXT, metadata TEXT,
+            created_at TIMESTAMP
+        );
+        """
+    )
+
+    class _Cursor:
+        def __init__(self) -> None:
+            self._cur = conn.cursor()
+
+        def execute(self, sql: str, params: tuple = ()) -> None:
+            self._cur.execute(sql.replace("%s", "?"), params)
+
+        def fetchall(self) -> list[tuple]:
+            return self._cur.fetchall()
+
+        def fetchone(self) -> tuple | None:
+            return self._cur.fetchone()
+
+    @contextmanager
+    def fake_db_cursor():
+        yield _Cursor()
+
+    monkeypatch.setattr(hist, "db_cursor", fake_db_cursor)
+    return conn
+
+
+def _seed_messages(conn: sqlite3.Connection, count: int) -> None:
+    start = datetime(2026, 3, 1, 9, 0)
+    # Pairs share a timestamp (a turn written in one transaction) to exercise the id tiebreak.
+    conn.executemany(
+        "INSERT INTO stored_messages VALUES (?, 1, ?, ?, '{}', ?)",
+        [(i, i % 2, f"m{i}", start + timedelta(seconds=i // 2)) for i in range(1, count + 1)],
+    )
+
+
+def test_cursor_round_trips_and_rejects_garbage() -> None:
+    created_at = datetime(2026, 3, 1, 9, 0, 0, 123456)
+    token = hist.encode_cursor(created_at, 42)
+
+    assert hist.decode_cursor(token) == (created_at, 42)
+    with pytest.raises(hist.InvalidCursorError):
+        hist.decode_cursor("not-a-cursor")
+
+
+def test_chat_messages_page_backwards_then_forwards_without_gaps(db) -> None:
+    _seed_messages(db, 250)
+
+    latest = hist.get_chat_messages(1, limit=100)
+    assert [m.id for m in latest.items] == list(range(151, 251))
+    assert latest.after is None
+
+    seen = [m.id for m in latest.items]
+    page = latest
+    while page.before:
+        page = hist.get_chat_messages(1, limit=100, before=page.before)
+        seen = [m.id for m in page.items] + seen
+    assert seen == list(range(1, 251))
+    assert [m.id for m in page.items] == list(range(1, 51))
+    assert page.after is not None
+
+    newer = hist.get_chat_messages(1, limit=100, after=page.after)
+    assert [m.id for m in newer.items] == list(range(51, 151))
+    assert newer.before is not None
+    assert newer.after is not None
+
+    with pytest.raises(hist.InvalidCursorError):
+        hist.get_chat_messages(1, before=newer.before, after=newer.after)
+
+
+def test_user_chats_page_newest_first(db) -> None:
+    start = datetime(2026, 3, 1)
+    db.executemany(
+        "INSERT INTO stored_chats VALUES (?, ?, 'market', ?, ?)",
+        [(i, 7 if i != 3 else 8, f"chat {i}", start + timedelta(hours=i)) for i in range(1, 8)],
+    )
+
+    first = hist.get_user_chats(7, limit=4)
+    assert [c.id for c in first.items] == [7, 6, 5, 4]
+    assert first.after is None
+
+    second = hist.get_user_chats(7, limit=4, before=first.before)
+    assert [c.id for c in second.items] == [2, 1]
+    assert second.before is None
+
+    back = hist.get_user_chats(7, limit=4, after=second.after)
+    assert [c.id for c in back.items] == [7, 6, 5, 4]
+
+
+def test_message_details_extracts_only_heavy_keys(db) -> None:
+    metadata = {"rows_found": 3, "tool_trace": [{"tool": "quote"}], "chart_data": {"x": [1]}}
+    db.execute(
+        "INSERT INTO stored_messages VALUES (5, 1, 1, 'a', ?, ?)",
+        (json.dumps(metadata), datetime(2026, 3, 1)),
+    )
+
+    assert hist.get_message_details(1, 5) == {
+        "tool_trace": [{"tool": "quote"}],
+        "chart_data": {"x": [1]},
+    }
+    assert hist.get_message_details(1, 5, ("chart_data",)) == {"chart_data": {"x": [1]}}
+    assert hist.get_message_details(2, 5) is None
+    with pytest.raises(ValueError):
+        hist.get_message_details(1, 5, ("metadata",))
+
+
+def test_history_routes_pass_view_and_404_missing_details(monkeypatch) -> None:
+    chat = hist.ChatSummary(
+        id=1, user_id=7, agent_type="market", title="t", created_at=datetime(2026, 3, 1)
+    )
+    views: list[str] = []
+
+    def fake_messages(chat_id, limit, *, before, after, view):
+        views.append(view)
+        return hist.Page(items=[])
+
+    monkeypatch.setattr(hist, "get_chat_by_id", lambda chat_id, user_id: chat)
+    monkeypatch.setattr(hist, "get_chat_messages", fake_messages)
+    monkeypatch.setattr(hist, "get_message_details", lambda chat_id, message_id: None)
+    app = FastAPI()
+    app.include_router(history_routes.router, prefix="/api")
+    app.dependency_overrides[get_current_user_id] = lambda: 7
+
+    async def run() -> list[int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            urls = (
+                "/api/history/chats/1/messages?view=summary",
+                "/api/history/chats/1/messages?view=everything",
+                "/api/history/chats/1/messages/9/details",
+            )
+            return [(await client.get(url)).status_code for url in urls]
+
+    assert asyncio.run(run()) == [200, 422, 404]
+    assert views == ["summary"]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import asyncpg
+from backend.app.services.history import TurnRecord
+from backend.app.services.history_writer import HistoryWriter
+
+
+def _turn(chat_id: int, question: str = "q", *, new_chat: bool = False) -> TurnRecord:
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+    return TurnRecord(
+        user_id=7,
+        chat_id=chat_id,
+        question=question,
+        answer=f"answer to {question}",
+        metadata={"rows_found": 1},
+        asked_at=now,
+        answered_at=now,
+        new_chat=new_chat,
+        agent_type="market" if new_chat else None,
+        title=question if new_chat else None,
+    )
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+        self.down = False
+        self.bad_chats: set[int] = set()
+
+    async def save(self, turns: list[TurnRecord]) -> None:
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ConnectionRefusedError("db unreachable")
+        if any(turn.chat_id in self.bad_chats for turn in turns):
+            raise asyncpg.ForeignKeyViolationError("stored_messages_chat_id_fkey")
+        self.batches.append([turn.chat_id for turn in turns])
+
+
+def test_writer_batches_queued_turns_in_order(tmp_path) -> None:
+    store = _FakeStore()
+    writer = HistoryWriter(store.save, batch_size=3, spool_path=tmp_path / "spool.jsonl")
+
+    async def run() -> None:
+        for chat_id in range(1, 8):
+            writer.submit(_turn(chat_id))
+        await writer.flush()
+        await writer.aclose()
+
+    asyncio.run(run())
+
+    # The worker takes the first turn immediately, then drains what accumulated.
+    assert [chat for batch in store.batches for chat in batch] == list(range(1, 8))
+    assert max(len(batch) for batch in store.batches) == 3
+    stats = writer.stats()
+    assert (stats.written, stats.spooled, stats.spool_pending) == (7, 0, False)
+
+
+async def _until_spool_drained(writer: HistoryWriter) -> None:
+    for _ in range(100):
+        if not writer.stats().spool_pending:
+            return
+        await asyncio.sleep(0.02)
+
+
+def test_writer_spools_when_db_is_down_and_replays_after_restart(tmp_path) -> None:
+    store = _FakeStore()
+    store.down = True
+    spool = tmp_path / "spool.jsonl"
+    writer = HistoryWriter(store.save, retry_interval=0.05, spool_path=spool)
+
+    async def run() -> None:
+        writer.submit(_turn(1, "first", new_chat=True))
+        writer.submit(_turn(1, "second"))
+        await writer.flush()
+        await writer.aclose()
+
+    asyncio.run(run())
+
+    assert store.batches == []
+    assert len(spool.read_text().splitlines()) == 2
+
+    # A fresh process (DB back up) replays the spool on start-up.
+    store.down = False
+    restarted = HistoryWriter(store.save, spool_path=spool)
+
+    async def restart() -> None:
+        restarted.start()
+        await _until_spool_drained(restarted)
+        await restarted.aclose()
+
+    asyncio.run(restart())
+
+    assert store.batches == [[1, 1]]
+    assert not spool.exists()
+    assert restarted.stats().replayed == 2
+
+
+def test_writer_spills_to_spool_when_queue_is_full(tmp_path) -> None:
+    store = _FakeStore()
+    spool = tmp_path / "spool.jsonl"
+    writer = HistoryWriter(store.save, max_queue=2, spool_path=spool)
+
+    async def run() -> None:
+        for chat_id in range(1, 6):
+            writer.submit(_turn(chat_id))  # the worker has not run yet; the queue holds 2
+        assert len(spool.read_text().splitlines()) == 3
+        await writer.flush()
+        await _until_spool_drained(writer)
+        await writer.aclose()
+
+    asyncio.run(run())
+
+    # Queued (older) turns land before the overflow replayed from the spool.
+    assert store.batches == [[1, 2], [3, 4, 5]]
+    stats = writer.stats()
+    assert (stats.submitted, stats.spooled, stats.replayed, stats.written) == (5, 3, 3, 5)
+
+
+def test_writer_isolates_and_eventually_drops_constraint_violations(tmp_path) -> None:
+    store = _FakeStore()
+    store.bad_chats = {2}
+    writer = HistoryWriter(store.save, retry_interval=0.01, spool_path=tmp_path / "s.jsonl")
+
+    async def run() -> None:
+        for chat_id in (1, 2, 3):
+            writer.submit(_turn(chat_id))
+        await writer.flush()
+        await _until_spool_drained(writer)
+        await writer.aclose()
+
+    asyncio.run(run())
+
+    assert sorted(chat for batch in store.batches for chat in batch) == [1, 3]
+    stats = writer.stats()
+    assert (stats.written, stats.dropped, stats.spool_pending) == (2, 1, False)
+
+
+def test_two_writers_sharing_a_spool_save_every_turn_once(tmp_path) -> None:
+    store = _FakeStore()
+    store.down = True
+    spool = tmp_path / "spool.jsonl"
+    crashed = HistoryWriter(store.save, spool_path=spool)
+
+    async def fill() -> None:
+        for chat_id in range(1, 21):
+            crashed.submit(_turn(chat_id))
+        await crashed.flush()
+        await crashed.aclose()
+
+    asyncio.run(fill())
+    store.down = False
+    # Two uvicorn workers on one host: both replay at start-up while one keeps spilling.
+    first = HistoryWriter(store.save, batch_size=4, retry_interval=0.02, spool_path=spool)
+    second = HistoryWriter(
+        store.save, max_queue=1, batch_size=4, retry_interval=0.02, spool_path=spool
+    )
+
+    async def run() -> None:
+        first.start()
+        second.start()
+        await asyncio.sleep(0)  # both workers find the leftover spool before new traffic
+        for chat_id in range(21, 41):
+            second.submit(_turn(chat_id))
+            await asyncio.sleep(0.005)
+        await second.flush()
+        for writer in (first, second):
+            await _until_spool_drained(writer)
+        await first.aclose()
+        await second.aclose()
+
+    asyncio.run(run())
+
+    saved = sorted(chat for batch in store.batches for chat in batch)
+    assert saved == list(range(1, 41))
+    assert not spool.exists()
+    assert first.stats().replayed + second.stats().replayed == 20 + second.stats().spooled
@@ -126,6 +126,7 @@ def test_census_city_snapshot_retries_without_invalid_key(
 
     monkeypatch.setenv("CENSUS_API_KEY", "bad-key")
     monkeypatch.setattr(live_apis, "_http_client", lambda: fake_client)
+    monkeypatch.setattr(live_apis, "_indexed_census_snapshots", lambda cities: [None])
     monkeypatch.setattr(
         live_apis,
         "_parse_city_state",
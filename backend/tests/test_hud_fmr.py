@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import astuple
+
+import pytest
+from backend.app.agents.housing.agent import HousingAgent
+from backend.app.services import hud_fmr, live_apis
+
+_PORTLAND_OR = hud_fmr.FairMarketRent(
+    "METRO38900M38900",
+    "38900",
+    "Portland-Vancouver-Hillsboro, OR-WA MSA",
+    2024,
+    1573,
+    1687,
+    1946,
+    2735,
+    3229,
+)
+
+# HUD lists metros alphabetically by state, so the Maine Portland comes first.
+_METRO_LIST = [
+    {
+        "metro_name": "Portland-South Portland, ME HUD Metro FMR Area",
+        "cbsa_code": "METRO38860M38860",
+    },
+    {"metro_name": "Portland-Vancouver-Hillsboro, OR-WA MSA", "cbsa_code": "METRO38900M38900"},
+]
+
+
+def test_metro_aliases_cover_principal_cities_states_and_cbsa() -> None:
+    aliases = hud_fmr.metro_aliases(_PORTLAND_OR.metro_name, _PORTLAND_OR.entity_id)
+
+    assert ("portland", "41", 0) in aliases
+    assert ("portland", "53", 0) in aliases
+    assert ("hillsboro", "41", 2) in aliases
+    assert ("portland vancouver hillsboro", "41", 0) in aliases
+    assert ("38900", "", 0) in aliases
+
+
+def test_parse_state_metros_reads_statedata_payload() -> None:
+    payload = {
+        "data": {
+            "year": "2024",
+            "metroareas": [
+                {
+                    "metro_name": _PORTLAND_OR.metro_name,
+                    "code": _PORTLAND_OR.entity_id,
+                    "Efficiency": 1573,
+                    "One-Bedroom": "1,687",
+                    "Two-Bedroom": 1946,
+                    "Three-Bedroom": 2735,
+                    "Four-Bedroom": 3229,
+                },
+                {"metro_name": "", "code": "METRO00000M00000"},
+            ],
+            "counties": [{"county_name": "Wheeler County", "fips_code": "4106999999"}],
+        }
+    }
+
+    assert hud_fmr.parse_state_metros(payload) == [_PORTLAND_OR]
+
+
+def test_best_metro_does_not_take_the_first_substring_hit() -> None:
+    assert hud_fmr.best_metro("Portland", "41", _METRO_LIST) is _METRO_LIST[1]
+    assert hud_fmr.best_metro("South Portland", "", _METRO_LIST) is _METRO_LIST[0]
+    assert hud_fmr.best_metro("Atlantis", "", _METRO_LIST) is None
+
+
+def test_lookup_fair_market_rents_resolves_a_batch_in_one_query(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    executed: list[tuple] = []
+
+    class _Cursor:
+        def execute(self, sql: str, params: tuple) -> None:
+            executed.append(params)
+
+        def fetchall(self) -> list[tuple]:
+            return [(0, *astuple(_PORTLAND_OR))]
+
+    @contextmanager
+    def fake_db_cursor():
+        yield _Cursor()
+
+    monkeypatch.setattr(hud_fmr, "db_cursor", fake_db_cursor)
+
+    found = hud_fmr.lookup_fair_market_rents([("Portland", ""), ("Atlantis", "32")])
+
+    assert found == [_PORTLAND_OR, None]
+    assert len(executed) == 1
+    indexes, keys, alt_keys, states, *year = executed[0]
+    assert indexes == [0, 1]
+    assert keys == alt_keys == ["portland", "atlantis"]
+    assert states == ["", "32"]
+    assert year == [None, None]
+
+
+def test_get_hud_fmr_for_cities_serves_index_hits_without_http(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fetched: list[str] = []
+
+    monkeypatch.setattr(hud_fmr, "lookup_fair_market_rents", lambda queries: [_PORTLAND_OR, None])
+    monkeypatch.setattr(live_apis, "_hud_metro_list", lambda: _METRO_LIST)
+
+    def fake_fmr_data(entity_id: str, year: int = 2024) -> dict:
+        fetched.append(entity_id)
+        return {"year": 2024, "data": {"basicdata": {"Two-Bedroom": 1713}}}
+
+    monkeypatch.setattr(live_apis, "hud_fmr_data", fake_fmr_data)
+
+    rents = live_apis.get_hud_fmr_for_cities(["Portland, Oregon", "South Portland, ME"])
+
+    assert rents[0] == _PORTLAND_OR.snapshot()
+    assert fetched == ["METRO38860M38860"]
+    assert rents[1]["metro_name"] == _METRO_LIST[0]["metro_name"]
+    assert rents[1]["fmr_2br"] == 1713
+
+
+def test_housing_agent_compares_fair_market_rents_in_one_call(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_rents(cities: list[str]) -> list[dict | None]:
+        calls.append(cities)
+        return [_PORTLAND_OR.snapshot(), None]
+
+    monkeypatch.setattr("backend.app.agents.housing.agent.get_hud_fmr_for_cities", fake_rents)
+
+    result = HousingAgent()._execute_tool(
+        "get_fair_market_rent", {"cities": ["Portland, OR", "Atlantis"]}
+    )
+
+    assert calls == [["Portland, OR", "Atlantis"]]
+    assert [item["found"] for item in result["cities"]] == [True, False]
+    assert result["cities"][0]["cbsa_code"] == "38900"
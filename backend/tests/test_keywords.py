@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import re
+
+from backend.app.services.keywords import KeywordSet, TypoIndex, edit_distance
+
+KEYWORDS = {"stock", "stocks", "stock price", "s&p", "risk-adjusted", "rent", "rental", "ipo"}
+
+
+def test_keyword_set_matches_exactly_like_per_keyword_regexes() -> None:
+    matcher = KeywordSet(KEYWORDS)
+    texts = [
+        "what is the stock price of apple",
+        "how did the s&p do",
+        "risk-adjusted returns",
+        "current prices",  # "rent" inside a word
+        "stockholders meeting",
+        "rentals in austin",
+        "the ipo's first day",
+        "",
+    ]
+
+    for text in texts:
+        expected = any(re.search(rf"\b{re.escape(kw)}\b", text) for kw in KEYWORDS)
+        assert matcher.search(text) == expected, text
+
+
+def test_typo_index_finds_transpositions_and_drops() -> None:
+    index = TypoIndex({"stock", "change", "chart", "volatility", "apple"})
+
+    assert index.candidates("stcko") >= {"stock"}
+    assert index.closest("sotkc") == "stock"
+    assert index.closest("chnage") == "change"
+    assert index.closest("volatilty") == "volatility"
+    assert index.closest("zebra") is None
+    assert "apple" in index
+
+
+def test_edit_distance_counts_adjacent_transpositions_once() -> None:
+    assert edit_distance("chnage", "change") == 1
+    assert edit_distance("recat", "rent") == 2
+    assert edit_distance("stock", "stock") == 0
+    assert edit_distance("", "ipo") == 3
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from backend.app.services import cache, live_apis
+from backend.app.services.cache import MemoryCache, SqliteCache, cache_stats, ttl_cached
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(cache, "_backend", MemoryCache(clock=fake))
+    return fake
+
+
+def test_memory_cache_evicts_least_recently_used_by_bytes() -> None:
+    store = MemoryCache(max_bytes=10)
+    store.set("a", b"aaaa", 60)
+    store.set("b", b"bbbb", 60)
+    assert store.get("a") == b"aaaa"  # refresh "a"; "b" is now least recent
+
+    store.set("c", b"cccc", 60)
+
+    assert store.get("b") is None
+    assert store.get("a") == b"aaaa"
+    assert store.stats()["bytes"] == 8
+    assert store.stats()["evictions"] == 1
+
+
+def test_ttl_cached_counts_hits_and_expires(clock: _Clock) -> None:
+    calls: list[str] = []
+
+    @ttl_cached("quote", ttl=15)
+    def quote(symbol: str) -> dict:
+        calls.append(symbol)
+        return {"symbol": symbol, "c": len(calls)}
+
+    first = quote("AAPL")
+    first["c"] = "mutated by caller"
+    assert quote(symbol="AAPL") == {"symbol": "AAPL", "c": 1}
+
+    clock.now += 16
+    assert quote("AAPL") == {"symbol": "AAPL", "c": 2}
+    assert calls == ["AAPL", "AAPL"]
+    stats = cache_stats()["namespaces"]["quote"]
+    assert (stats.hits, stats.misses, stats.stores) == (1, 2, 2)
+
+
+def test_ttl_cached_single_flights_concurrent_sync_misses(clock: _Clock) -> None:
+    calls = 0
+    release = threading.Event()
+
+    @ttl_cached("profile", ttl=60)
+    def profile(symbol: str) -> dict:
+        nonlocal calls
+        calls += 1
+        release.wait(timeout=5)
+        return {"symbol": symbol}
+
+    results: list[dict] = []
+    threads = [threading.Thread(target=lambda: results.append(profile("MSFT"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == 1
+    assert results == [{"symbol": "MSFT"}] * 8
+    assert cache_stats()["namespaces"]["profile"].coalesced == 7
+
+
+def test_ttl_cached_single_flights_async_misses_and_shares_errors(clock: _Clock) -> None:
+    calls = 0
+
+    @ttl_cached("recs", ttl=60)
+    async def recs(symbol: str) -> list:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        if symbol == "BAD":
+            raise RuntimeError("429 Too Many Requests")
+        return [{"buy": 3}]
+
+    async def run() -> tuple[list, list]:
+        good = await asyncio.gather(*(recs("AAPL") for _ in range(10)))
+        bad = await asyncio.gather(*(recs("BAD") for _ in range(3)), return_exceptions=True)
+        return good, bad
+
+    good, bad = asyncio.run(run())
+
+    assert calls == 2
+    assert good == [[{"buy": 3}]] * 10
+    assert all(isinstance(item, RuntimeError) for item in bad)
+    assert cache.get_backend().get('recs:["BAD"]') is None
+
+
+def test_sync_and_async_finnhub_quote_share_entries(
+    monkeypatch: pytest.MonkeyPatch,
+    clock: _Clock,
+) -> None:
+    monkeypatch.setattr(live_apis, "_finnhub_get", lambda path, **params: {"c": 201.5})
+
+    async def fail(path: str, **params: str) -> dict:
+        raise AssertionError("async quote should be served from the cache")
+
+    monkeypatch.setattr(live_apis, "_afinnhub_get", fail)
+
+    assert live_apis.finnhub_quote("AAPL") == {"c": 201.5}
+    assert asyncio.run(live_apis.afinnhub_quote("AAPL")) == {"c": 201.5}
+
+    clock.now += live_apis._QUOTE_TTL + 1
+    with pytest.raises(AssertionError):
+        asyncio.run(live_apis.afinnhub_quote("AAPL"))
+
+
+def test_ttl_until_release_tracks_fred_schedule() -> None:
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=live_apis._FRED_TZ)
+
+    assert live_apis._ttl_until_release("2026-03-12", now) == 36 * 3600
+    assert live_apis._ttl_until_release("2026-03-10", now) == live_apis._FRED_RELEASE_DAY_TTL
+    assert live_apis._ttl_until_release("2026-06-01", now) == live_apis._FRED_MAX_TTL
+    assert live_apis._ttl_until_release(None, now) == live_apis._FRED_FALLBACK_TTL
+
+
+def test_fred_series_is_cached_until_next_release(
+    monkeypatch: pytest.MonkeyPatch,
+    clock: _Clock,
+) -> None:
+    fetches: list[str] = []
+
+    class _Response:
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict:
+            return {"observations": [{"date": "2026-02-01", "value": "4.4"}]}
+
+    class _Client:
+        def get(self, url: str, params: dict) -> _Response:
+            fetches.append(params["series_id"])
+            return _Response()
+
+    monkeypatch.setenv("FRED_API_KEY", "test")
+    monkeypatch.setattr(live_apis, "_http_client", lambda: _Client())
+    monkeypatch.setattr(live_apis, "_fred_next_release_date", lambda series_id, today: None)
+
+    assert live_apis.fred_series("UNRATE", limit=1) == [{"date": "2026-02-01", "value": "4.4"}]
+    clock.now += live_apis._FRED_FALLBACK_TTL - 1
+    assert live_apis.fred_series("UNRATE", 1) == [{"date": "2026-02-01", "value": "4.4"}]
+    clock.now += 2
+    live_apis.fred_series("UNRATE", 1)
+
+    assert fetches == ["UNRATE", "UNRATE"]
+
+
+def test_sqlite_cache_expires_evicts_and_clears_by_prefix(tmp_path) -> None:
+    clock = _Clock()
+    store = SqliteCache(tmp_path / "cache.sqlite3", max_bytes=10, clock=clock, prune_every=1)
+
+    store.set("a:1", b"aaaa", 60)
+    clock.now += 61
+    store.set("b:1", b"bbbb", 60)
+    clock.now += 61
+    store.set("b:2", b"cccc", 120)
+    assert store.get("a:1") is None
+    assert store.get("b:1") is None
+    assert store.get("b:2") == b"cccc"
+
+    clock.now += 1
+    store.set("c:1", b"dddddd", 120)  # 10 bytes fit
+    clock.now += 1
+    store.set("c:2", b"ee", 120)  # over budget: least recently read ("b:2") goes
+    assert store.get("b:2") is None
+    assert store.stats()["bytes"] == 8
+
+    store.clear("c:")
+    assert store.stats()["entries"] == 0
+
+
+def test_sqlite_cache_is_shared_across_processes(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+) -> None:
+    path = tmp_path / "shared.sqlite3"
+    monkeypatch.setenv("LIVE_API_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("LIVE_API_CACHE_PATH", str(path))
+    monkeypatch.setattr(cache, "_backend", None)
+    assert isinstance(cache.get_backend(), SqliteCache)
+
+    calls: list[str] = []
+
+    @ttl_cached("finnhub_search_ticker", ttl=60)
+    def search(company: str) -> str:
+        calls.append(company)
+        return "AAPL"
+
+    assert search("Apple") == "AAPL"
+
+    # Another worker (a separate interpreter) reads the warmed entry and adds its own.
+    script = (
+        "from backend.app.services.cache import SqliteCache;"
+        f"store = SqliteCache({str(path)!r});"
+        "assert store.get('finnhub_search_ticker:[\"Apple\"]') == b'\"AAPL\"';"
+        "store.set('finnhub_search_ticker:[\"Microsoft\"]', b'\"MSFT\"', 60)"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+
+    assert search("Microsoft") == "MSFT"
+    assert calls == ["Apple"]
+    search.cache_clear()
+    assert cache.get_backend().stats()["entries"] == 0
+
+
+def test_async_wrapper_keeps_sqlite_calls_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+) -> None:
+    threads: list[tuple[str, threading.Thread]] = []
+
+    class _RecordingSqliteCache(SqliteCache):
+        def get(self, key: str) -> bytes | None:
+            threads.append(("get", threading.current_thread()))
+            return super().get(key)
+
+        def set(self, key: str, payload: bytes, ttl: float) -> None:
+            threads.append(("set", threading.current_thread()))
+            super().set(key, payload, ttl)
+
+    monkeypatch.setattr(cache, "_backend", _RecordingSqliteCache(tmp_path / "cache.sqlite3"))
+
+    @ttl_cached("profile", ttl=60)
+    async def profile(symbol: str) -> dict:
+        return {"symbol": symbol}
+
+    async def run() -> list[dict]:
+        return [await profile("MSFT"), await profile("MSFT")]
+
+    assert asyncio.run(run()) == [{"symbol": "MSFT"}] * 2
+    assert [op for op, _ in threads] == ["get", "set", "get"]
+    assert all(thread is not threading.main_thread() for _, thread in threads)
+    assert cache_stats()["namespaces"]["profile"].hits >= 1
@@ -5,6 +5,7 @@ from typing import Any, Literal
 import pytest
 from backend.app.agents.market.agent import MarketAgent
 from backend.app.services import live_apis
+from backend.app.services.ohlcv_metrics import ohlcv_columns
 
 
 def test_finnhub_search_ticker_normalizes_company_name(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -218,10 +219,6 @@ def test_market_agent_screen_companies_builds_structured_sql(
     agent = MarketAgent()
     cursor = _FakeCursor()
 
-    monkeypatch.setattr(
-        "backend.app.agents.market.agent.ensure_stock_data_table",
-        lambda: None,
-    )
     monkeypatch.setattr(
         "backend.app.agents.market.agent.db_cursor",
         lambda: _FakeDBContext(cursor),
@@ -313,55 +310,57 @@ def test_market_agent_performance_tool_calculates_risk_metrics(
 
     monkeypatch.setattr(
         agent,
-        "_fetch_ohlcv_rows",
-        lambda symbol, **kwargs: {
-            "sql": "SELECT ... FROM stock_ohlcv",
-            "rows": [
-                {
-                    "ticker": symbol,
-                    "trade_date": "2026-03-01",
-                    "open": 100.0,
-                    "high": 101.0,
-                    "low": 99.0,
-                    "close": 100.0,
-                    "volume": 1000000,
-                    "dividends": 0.0,
-                    "stock_splits": 1.0,
-                },
-                {
-                    "ticker": symbol,
-                    "trade_date": "2026-03-02",
-                    "open": 100.0,
-                    "high": 106.0,
-                    "low": 99.5,
-                    "close": 105.0,
-                    "volume": 1100000,
-                    "dividends": 0.0,
-                    "stock_splits": 1.0,
-                },
-                {
-                    "ticker": symbol,
-                    "trade_date": "2026-03-03",
-                    "open": 105.0,
-                    "high": 107.0,
-                    "low": 101.0,
-                    "close": 102.0,
-                    "volume": 900000,
-                    "dividends": 0.0,
-                    "stock_splits": 1.0,
-                },
-                {
-                    "ticker": symbol,
-                    "trade_date": "2026-03-04",
-                    "open": 102.0,
-                    "high": 109.0,
-                    "low": 101.5,
-                    "close": 108.0,
-                    "volume": 950000,
-                    "dividends": 0.25,
-                    "stock_splits": 1.0,
-                },
-            ],
+        "_fetch_ohlcv_columns",
+        lambda symbols, **kwargs: {
+            symbol: ohlcv_columns(
+                [
+                    {
+                        "ticker": symbol,
+                        "trade_date": "2026-03-01",
+                        "open": 100.0,
+                        "high": 101.0,
+                        "low": 99.0,
+                        "close": 100.0,
+                        "volume": 1000000,
+                        "dividends": 0.0,
+                        "stock_splits": 1.0,
+                    },
+                    {
+                        "ticker": symbol,
+                        "trade_date": "2026-03-02",
+                        "open": 100.0,
+                        "high": 106.0,
+                        "low": 99.5,
+                        "close": 105.0,
+                        "volume": 1100000,
+                        "dividends": 0.0,
+                        "stock_splits": 1.0,
+                    },
+                    {
+                        "ticker": symbol,
+                        "trade_date": "2026-03-03",
+                        "open": 105.0,
+                        "high": 107.0,
+                        "low": 101.0,
+                        "close": 102.0,
+                        "volume": 900000,
+                        "dividends": 0.0,
+                        "stock_splits": 1.0,
+                    },
+                    {
+                        "ticker": symbol,
+                        "trade_date": "2026-03-04",
+                        "open": 102.0,
+                        "high": 109.0,
+                        "low": 101.5,
+                        "close": 108.0,
+                        "volume": 950000,
+                        "dividends": 0.25,
+                        "stock_splits": 1.0,
+                    },
+                ]
+            )
+            for symbol in symbols
         },
     )
 
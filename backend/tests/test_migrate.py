@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+from backend.database import migrate
+from backend.database.migrate import Migration
+
+
+class _FakeDB:
+    """Records statements; ``schema_migrations`` is simulated as a set of versions."""
+
+    def __init__(self, applied: set[int]) -> None:
+        self.applied = set(applied)
+        self.executed: list[str] = []
+        self.transactions = 0
+        self._result: list[tuple] = []
+
+    @contextmanager
+    def cursor(self):
+        self.transactions += 1
+        yield self
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        sql = " ".join(sql.split())
+        self.executed.append(sql)
+        if sql.startswith("SELECT version FROM schema_migrations"):
+            self._result = [(version,) for version in sorted(self.applied)]
+        elif sql.startswith("SELECT 1 FROM schema_migrations"):
+            self._result = [(1,)] if params[0] in self.applied else []
+        elif sql.startswith("INSERT INTO schema_migrations"):
+            self.applied.add(params[0])
+
+    def fetchall(self) -> list[tuple]:
+        return self._result
+
+    def fetchone(self) -> tuple | None:
+        return self._result[0] if self._result else None
+
+
+_MIGRATIONS = (
+    Migration(2, "second", ("CREATE INDEX two;",)),
+    Migration(1, "first", ("CREATE TABLE one;",)),
+    Migration(3, "third", ("ALTER TABLE three;", "CREATE INDEX three;")),
+)
+
+
+def test_run_migrations_applies_pending_versions_in_order(monkeypatch) -> None:
+    db = _FakeDB(applied={1})
+    monkeypatch.setattr(migrate, "db_cursor", db.cursor)
+
+    assert migrate.run_migrations(_MIGRATIONS) == [2, 3]
+
+    ddl = [sql for sql in db.executed if "schema_migrations" not in sql and "advisory" not in sql]
+    assert ddl == ["CREATE INDEX two;", "ALTER TABLE three;", "CREATE INDEX three;"]
+    assert db.applied == {1, 2, 3}
+    assert sum("pg_advisory_xact_lock" in sql for sql in db.executed) == 2
+
+
+def test_run_migrations_is_a_no_op_when_up_to_date(monkeypatch) -> None:
+    db = _FakeDB(applied={1, 2, 3})
+    monkeypatch.setattr(migrate, "db_cursor", db.cursor)
+
+    assert migrate.run_migrations(_MIGRATIONS) == []
+    assert not any(sql.startswith(("CREATE INDEX", "ALTER")) for sql in db.executed)
+
+
+def test_run_migrations_skips_versions_applied_while_waiting_for_lock(monkeypatch) -> None:
+    db = _FakeDB(applied=set())
+    monkeypatch.setattr(migrate, "db_cursor", db.cursor)
+    read = migrate.applied_versions
+
+    def racing_read() -> set[int]:
+        versions = read()
+        db.applied.add(1)  # another worker applies version 1 before we take the lock
+        return versions
+
+    monkeypatch.setattr(migrate, "applied_versions", racing_read)
+
+    assert migrate.run_migrations(_MIGRATIONS) == [2, 3]
+    assert "CREATE TABLE one;" not in db.executed
+
+
+def test_registered_migrations_have_unique_increasing_versions() -> None:
+    versions = [migration.version for migration in migrate.MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert all(migration.statements for migration in migrate.MIGRATIONS)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+import random
+from decimal import Decimal
+from itertools import pairwise
+from typing import Any
+
+import numpy as np
+import pytest
+from backend.app.agents.market.agent import MarketAgent
+from backend.app.services.ohlcv_metrics import (
+    ohlcv_columns,
+    ohlcv_columns_by_ticker,
+    performance_metrics,
+    price_range,
+)
+
+_COLUMNS = [
+    "ticker",
+    "trade_date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "dividends",
+    "stock_splits",
+]
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    return default if value in (None, "") else float(value)
+
+
+def _reference(rows: list[dict[str, Any]], risk_free_rate_pct: float) -> dict[str, float]:
+    """The row-by-row computation the agent used before the NumPy engine, unrounded."""
+    returns: list[float] = []
+    total_dividends = 0.0
+    split_events = 0
+    for previous, current in pairwise(rows):
+        previous_close = _to_float(previous.get("close"))
+        current_close = _to_float(current.get("close"))
+        dividend = _to_float(current.get("dividends"))
+        split_factor = _to_float(current.get("stock_splits"), 1.0)
+        if previous_close <= 0 or current_close <= 0:
+            continue
+        split = split_factor not in (0.0, 1.0)
+        split_events += split
+        total_dividends += dividend
+        adjusted = previous_close / split_factor if split else previous_close
+        if adjusted <= 0:
+            continue
+        returns.append(((current_close + dividend) / adjusted) - 1.0)
+
+    mean = sum(returns) / len(returns)
+    variance = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+    volatility = math.sqrt(variance)
+    growth, peak, drawdown = 1.0, 1.0, 0.0
+    for daily_return in returns:
+        growth *= 1.0 + daily_return
+        peak = max(peak, growth)
+        drawdown = min(drawdown, growth / peak - 1.0)
+    return {
+        "return_observations": len(returns),
+        "mean_daily_return": mean,
+        "daily_volatility": volatility,
+        "sharpe_ratio": (mean - risk_free_rate_pct / 100.0 / 252) / volatility * math.sqrt(252),
+        "total_return": growth - 1.0,
+        "annualized_return": growth ** (252 / len(returns)) - 1.0,
+        "max_drawdown": drawdown,
+        "positive_day_ratio": sum(r > 0 for r in returns) / len(returns),
+        "total_dividends": total_dividends,
+        "split_events": split_events,
+    }
+
+
+def _random_rows(seed: int, days: int = 2520) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    close = 100.0
+    rows = []
+    for day in range(days):
+        close *= 1.0 + rng.gauss(0.0003, 0.02)
+        row: dict[str, Any] = {
+            "trade_date": f"d{day:04d}",
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": Decimal(f"{close:.4f}"),
+            "volume": rng.randrange(1_000, 1_000_000),
+            "dividends": 0.5 if day % 63 == 62 else 0.0,
+            "stock_splits": 1.0,
+        }
+        roll = rng.random()
+        if roll < 0.002:
+            row["stock_splits"] = 2.0
+        elif roll < 0.004:
+            row["close"] = None
+        elif roll < 0.005:
+            row["close"] = 0
+        elif roll < 0.007:
+            row["dividends"] = None
+            row["stock_splits"] = None
+        elif roll < 0.009:
+            row["high"] = row["low"] = row["volume"] = None
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_performance_metrics_match_row_by_row_reference(seed: int) -> None:
+    rows = _random_rows(seed)
+    expected = _reference(rows, 4.0)
+
+    metrics = performance_metrics(ohlcv_columns(rows), risk_free_rate_pct=4.0)
+
+    assert metrics is not None
+    assert metrics.split_events > 0
+    for field, value in expected.items():
+        assert getattr(metrics, field) == pytest.approx(value, rel=1e-9, abs=1e-9), field
+
+
+def test_performance_metrics_none_without_valid_returns() -> None:
+    rows = [{"close": 10.0}, {"close": None}, {"close": 0.0}]
+
+    assert performance_metrics(ohlcv_columns(rows), risk_free_rate_pct=4.0) is None
+
+
+def test_price_range_skips_missing_values() -> None:
+    rows = [
+        {"close": None, "high": None, "low": 4.0, "volume": 10, "dividends": None},
+        {"close": 5.0, "high": 6.0, "low": None, "volume": None, "dividends": 0.25},
+        {"close": 7.0, "high": 8.0, "low": 6.5, "volume": 30, "dividends": 0.0},
+        {"close": None, "high": None, "low": None, "volume": None, "dividends": None},
+    ]
+
+    prices = price_range(ohlcv_columns(rows))
+
+    assert (prices.first_close, prices.latest_close) == (5.0, 7.0)
+    assert (prices.highest_high, prices.lowest_low) == (8.0, 4.0)
+    assert prices.average_volume == 20.0
+    assert prices.total_dividends == 0.25
+
+
+def test_ohlcv_columns_by_ticker_splits_sorted_result() -> None:
+    records = [
+        ("AAPL", "2026-03-02", 1.0, 2.0, 0.5, 1.5, 100, 0.0, 1.0),
+        ("AAPL", "2026-03-03", 1.5, 2.5, 1.0, 2.0, 200, None, None),
+        ("MSFT", "2026-03-02", 10.0, 11.0, 9.0, 10.5, 300, 0.1, 1.0),
+    ]
+
+    columns = ohlcv_columns_by_ticker(records, _COLUMNS)
+
+    assert list(columns) == ["AAPL", "MSFT"]
+    assert columns["AAPL"].trade_dates == ["2026-03-02", "2026-03-03"]
+    assert columns["AAPL"].close.tolist() == [1.5, 2.0]
+    assert np.isnan(columns["AAPL"].dividends[1])
+    assert len(columns["MSFT"]) == 1
+    assert ohlcv_columns_by_ticker([], _COLUMNS) == {}
+
+
+class _FakeCursor:
+    def __init__(self) -> None:
+        self.description = [(name,) for name in _COLUMNS]
+        self.calls: list[tuple[str, tuple]] = []
+
+    def execute(self, sql: str, params: tuple) -> None:
+        self.calls.append((sql, params))
+
+    def fetchall(self) -> list[tuple]:
+        return [
+            ("AAPL", "2026-03-02", 1.0, 2.0, 0.5, 100.0, 100, 0.0, 1.0),
+            ("AAPL", "2026-03-03", 1.5, 2.5, 1.0, 110.0, 200, 0.0, 1.0),
+            ("MSFT", "2026-03-02", 10.0, 11.0, 9.0, 10.5, 300, 0.0, 1.0),
+        ]
+
+
+class _FakeDBContext:
+    def __init__(self, cursor: _FakeCursor) -> None:
+        self.cursor = cursor
+
+    def __enter__(self) -> _FakeCursor:
+        return self.cursor
+
+    def __exit__(self, *args: object) -> None:
+        return None
+
+
+def test_performance_tool_fetches_every_symbol_in_one_query(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    agent = MarketAgent()
+    cursor = _FakeCursor()
+    monkeypatch.setattr(
+        agent,
+        "_stock_ohlcv_columns",
+        lambda: {name: name for name in ("ticker", "date", *_COLUMNS[2:])},
+    )
+    monkeypatch.setattr(
+        "backend.app.agents.market.agent.db_cursor",
+        lambda: _FakeDBContext(cursor),
+    )
+
+    result = agent._execute_tool(
+        "analyze_stock_performance",
+        {"symbols": ["aapl", "MSFT", "NVDA"], "lookback_days": 30},
+    )
+
+    assert len(cursor.calls) == 1
+    sql, params = cursor.calls[0]
+    assert "= ANY(%s)" in sql and "row_number() OVER" in sql
+    assert params == (["AAPL", "MSFT", "NVDA"], 30)
+    by_symbol = {metrics["symbol"]: metrics for metrics in result["metrics"]}
+    assert by_symbol["AAPL"]["total_return_pct"] == 10.0
+    assert by_symbol["MSFT"]["metrics_available"] is False
+    assert by_symbol["NVDA"]["found"] is False
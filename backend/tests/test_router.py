@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import UTC, datetime
+from pathlib import Path
+
 import pytest
 from backend.app.agents import router
+from backend.app.agents.base import AgentResult
+from backend.app.agents.local_router import LocalRouterModel, Prediction
+from backend.app.services.history import SENDER_AGENT, SENDER_USER, MessageRecord
 
 
 def test_macro_market_questions_use_keyword_override(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -160,3 +167,106 @@ def test_route_question_returns_scope_message_for_unrelated_query(
 
     assert agent_type is None
     assert "U.S. housing/city questions and stock/market questions" in result.answer
+
+
+class _FixedModel:
+    threshold = 0.85
+
+    def __init__(self, prediction: Prediction) -> None:
+        self.prediction = prediction
+
+    def predict(self, question: str) -> Prediction:
+        return self.prediction
+
+
+def test_confident_local_prediction_skips_titan(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        router, "get_local_router", lambda: _FixedModel(Prediction("out_of_scope", 0.97))
+    )
+    monkeypatch.setattr(
+        router,
+        "invoke_claude",
+        lambda *args, **kwargs: (_ for _ in ()).throw(
+            AssertionError("Titan should not be called for a confident local prediction")
+        ),
+    )
+
+    assert router.classify_question("Write me a haiku about pizza.") == "out_of_scope"
+
+
+def test_uncertain_local_prediction_escalates_to_titan(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(router, "get_local_router", lambda: _FixedModel(Prediction("housing", 0.6)))
+    monkeypatch.setattr(router, "invoke_claude", lambda *args, **kwargs: "MARKET")
+
+    assert router.classify_question("Is now a good time to buy?") == "market"
+
+
+def test_local_router_model_round_trips(tmp_path: Path) -> None:
+    examples = [
+        ("is austin a good place to buy a house", "housing"),
+        ("how expensive are apartments in denver", "housing"),
+        ("how is nvidia doing this quarter", "market"),
+        ("should i buy shares of tesla", "market"),
+        ("write me a poem about the ocean", "out_of_scope"),
+        ("help me debug my python code", "out_of_scope"),
+    ]
+    model = LocalRouterModel.train(examples, epochs=20, n_features=1 << 12)
+    path = tmp_path / "router.npz"
+    model.save(path)
+    loaded = LocalRouterModel.load(path)
+
+    for question, label in examples:
+        assert loaded.predict(question).label == label
+    assert loaded.threshold == model.threshold
+    prediction = loaded.predict("write me a poem about the ocean")
+    assert (
+        abs(prediction.confidence - model.predict("write me a poem about the ocean").confidence)
+        < 1e-2
+    )
+
+
+def _housing_turn(agent_metadata: dict) -> list[MessageRecord]:
+    now = datetime.now(UTC)
+    return [
+        MessageRecord(1, 9, SENDER_USER, "user", "What is the median rent in Austin?", {}, now),
+        MessageRecord(
+            2, 9, SENDER_AGENT, "agent", "Median rent in Austin is $1,600.", agent_metadata, now
+        ),
+    ]
+
+
+@pytest.mark.parametrize("agent_metadata", [{"agent_type": "housing"}, {}])
+def test_follow_up_routes_with_the_previous_turn(
+    monkeypatch: pytest.MonkeyPatch, agent_metadata: dict
+) -> None:
+    out_of_scope = _FixedModel(Prediction("out_of_scope", 0.99))
+    monkeypatch.setattr(router, "get_local_router", lambda: out_of_scope)
+    monkeypatch.setattr(
+        router,
+        "ainvoke_claude",
+        lambda *args, **kwargs: (_ for _ in ()).throw(
+            AssertionError("a follow-up of a housing turn needs no classifier call")
+        ),
+    )
+    asked: list[tuple[str, object]] = []
+
+    async def fake_arun(question: str, **kwargs) -> AgentResult:
+        asked.append((question, kwargs["context"]))
+        return AgentResult(answer="Median rent in Dallas is $1,450.")
+
+    monkeypatch.setattr(router._AGENTS["housing"], "arun", fake_arun)
+    context = _housing_turn(agent_metadata)
+
+    agent_type, result = asyncio.run(router.aroute_question("what about Dallas?", context=context))
+
+    assert agent_type == "housing"
+    assert asked == [("what about Dallas?", context)]
+    assert result.answer == "Median rent in Dallas is $1,450."
+
+
+def test_follow_up_that_changes_topic_follows_the_keywords() -> None:
+    context = _housing_turn({"agent_type": "housing"})
+
+    assert router._context_label("and what is AAPL's stock price?", context) is None
+    assert router._context_label("what about Dallas?", context) == "housing"
+    assert router._context_label("what about Dallas?", None) is None
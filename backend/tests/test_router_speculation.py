@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from backend.app.agents import router
+from backend.app.agents.speculation import SpeculationBudget, set_speculation_budget
+from backend.app.services import bedrock
+
+# No keyword override applies; _keyword_fallback predicts "market" ("dow").
+QUESTION = "Is the dow doing well lately"
+
+
+def _final_message(text: str) -> dict[str, Any]:
+    return {
+        "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+        "stopReason": "end_turn",
+    }
+
+
+@pytest.fixture
+def budget(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(router, "get_local_router", lambda: None)
+    budget = SpeculationBudget(enabled=True, budget=0.1)
+    budget.record_routed_calls(100)
+    set_speculation_budget(budget)
+    yield budget
+    set_speculation_budget(None)
+
+
+def _classifier(label: str, delay: float):
+    async def fake_ainvoke_claude(**kwargs) -> str:
+        await asyncio.sleep(delay)
+        return label
+
+    return fake_ainvoke_claude
+
+
+def test_confirmed_speculation_reuses_first_round(monkeypatch, budget) -> None:
+    rounds: list[str] = []
+
+    async def fake_aconverse_with_tools(**kwargs):
+        rounds.append(kwargs["system"])
+        await asyncio.sleep(0.01)
+        return _final_message("The Dow is up 2% this month.")
+
+    monkeypatch.setattr(router, "ainvoke_claude", _classifier("MARKET", 0.05))
+    monkeypatch.setattr("backend.app.agents.base.aconverse_with_tools", fake_aconverse_with_tools)
+    events: list[tuple[str, dict]] = []
+
+    agent_type, result = asyncio.run(
+        router.aroute_question(QUESTION, emit=lambda name, data: events.append((name, data)))
+    )
+
+    assert agent_type == "market"
+    assert result.answer == "The Dow is up 2% this month."
+    assert len(rounds) == 1
+    assert events == [
+        ("route", {"agent_type": "market"}),
+        ("token", {"text": "The Dow is up 2% this month."}),
+    ]
+    stats = budget.stats()
+    assert (stats.started, stats.hits, stats.misses, stats.in_flight) == (1, 1, 0, 0)
+    assert 0.0 < stats.saved_seconds <= 0.05
+
+
+def test_rejected_speculation_is_cancelled(monkeypatch, budget) -> None:
+    cancelled: list[bool] = []
+
+    async def fake_afirst_round(question: str, *, context=None):
+        bedrock._count_call()  # the in-flight Sonnet call
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fake_housing_arun(question: str, **kwargs):
+        assert kwargs["first_round"] is None
+        return router.AgentResult(answer="Dow, Florida has a median rent of $1,100.")
+
+    monkeypatch.setattr(router, "ainvoke_claude", _classifier("HOUSING", 0.01))
+    monkeypatch.setattr(router._market_agent, "afirst_round", fake_afirst_round)
+    monkeypatch.setattr(router._housing_agent, "arun", fake_housing_arun)
+
+    agent_type, result = asyncio.run(router.aroute_question(QUESTION))
+
+    assert agent_type == "housing"
+    assert "median rent" in result.answer
+    assert cancelled == [True]
+    stats = budget.stats()
+    assert (stats.hits, stats.misses, stats.wasted_calls) == (0, 1, 1)
+    assert stats.extra_spend == pytest.approx(0.01)
+
+
+def test_speculation_stays_within_budget() -> None:
+    budget = SpeculationBudget(enabled=True, budget=0.1)
+    budget.record_routed_calls(25)
+
+    assert budget.try_start()
+    assert budget.try_start()
+    assert not budget.try_start()  # a third miss would exceed 10% of 25 calls
+    budget.record_miss(1)
+    budget.record_hit(0.2)
+
+    stats = budget.stats()
+    assert (stats.started, stats.skipped_budget, stats.wasted_calls) == (2, 1, 1)
+    assert stats.hit_rate == 0.5
+    assert not SpeculationBudget(enabled=False).try_start()
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import csv
+from contextlib import contextmanager
+
+import httpx
+import pytest
 from backend.app.services import stock_sync
 
 
@@ -56,3 +61,144 @@ def test_build_snapshot_shapes_metadata(monkeypatch) -> None:
     assert snapshot.metadata["industry"] == "Technology"
     assert snapshot.metadata["recommendation"] == "Buy"
     assert snapshot.metadata["ownership_data_status"] == "unavailable_on_current_finnhub_plan"
+
+
+class _FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_paces_calls_and_honours_pause() -> None:
+    fake = _FakeTime()
+    bucket = stock_sync.TokenBucket(60, capacity=2, clock=fake.clock, sleep=fake.sleep)
+
+    for _ in range(4):
+        bucket.acquire()
+    assert fake.now == pytest.approx(2.0)  # 2-token burst, then one call per second
+
+    bucket.pause(30)
+    bucket.acquire()
+    assert fake.now == pytest.approx(33.0)  # pause, then a token refills from empty
+
+
+def test_retry_after_parses_seconds_and_http_dates() -> None:
+    def response(value: str | None) -> httpx.Response:
+        headers = {"Retry-After": value} if value is not None else {}
+        return httpx.Response(429, headers=headers)
+
+    assert stock_sync._retry_after_seconds(response("12"), default=5) == 12
+    assert stock_sync._retry_after_seconds(response(None), default=5) == 5
+    assert stock_sync._retry_after_seconds(response("soon"), default=5) == 5
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert stock_sync._retry_after_seconds(response(past), default=5) == 0
+
+
+def _fake_snapshot(symbol: str, *, with_embeddings: bool = False) -> stock_sync.StockSnapshot:
+    return stock_sync.StockSnapshot(ticker=symbol, metadata={"ticker": symbol})
+
+
+def test_sync_retries_429_and_resumes_from_checkpoint(monkeypatch, tmp_path) -> None:
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    persisted: list[list[str]] = []
+    pauses: list[float] = []
+    attempts: dict[str, int] = {}
+    monkeypatch.setattr(
+        stock_sync,
+        "persist_snapshots",
+        lambda snapshots, truncate: (
+            persisted.append([s.ticker for s in snapshots]) or len(snapshots)
+        ),
+    )
+    monkeypatch.setattr(
+        stock_sync.TokenBucket, "pause", lambda self, seconds: pauses.append(seconds)
+    )
+
+    def flaky(symbol: str, *, with_embeddings: bool = False) -> stock_sync.StockSnapshot:
+        attempts[symbol] = attempts.get(symbol, 0) + 1
+        if symbol == "MSFT" and attempts[symbol] == 1:
+            request = httpx.Request("GET", "https://finnhub.io/api/v1/stock/profile2")
+            raise httpx.HTTPStatusError(
+                "429",
+                request=request,
+                response=httpx.Response(429, headers={"Retry-After": "7"}, request=request),
+            )
+        if symbol == "NVDA":
+            raise RuntimeError("upstream down")
+        return _fake_snapshot(symbol)
+
+    monkeypatch.setattr(stock_sync, "build_snapshot", flaky)
+    written = stock_sync.sync_stock_data(
+        ["aapl", "MSFT", "NVDA", "AAPL"], rate_per_minute=6000, checkpoint_path=checkpoint
+    )
+
+    assert written == 2
+    assert persisted == [["AAPL", "MSFT"]]
+    assert pauses == [7.0]
+    assert checkpoint.exists()  # NVDA failed, so the run can be resumed
+
+    monkeypatch.setattr(stock_sync, "build_snapshot", _fake_snapshot)
+    calls: list[str] = []
+    monkeypatch.setattr(
+        stock_sync,
+        "_build_snapshot_with_backoff",
+        lambda ticker, bucket, with_embeddings: calls.append(ticker) or _fake_snapshot(ticker),
+    )
+    written = stock_sync.sync_stock_data(
+        ["AAPL", "MSFT", "NVDA"], rate_per_minute=6000, resume=True, checkpoint_path=checkpoint
+    )
+
+    assert calls == ["NVDA"]
+    assert persisted[-1] == ["AAPL", "MSFT", "NVDA"]
+    assert written == 3
+    assert not checkpoint.exists()
+
+
+class _RecordingCursor:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.copied: list[list[list[str]]] = []
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        self.statements.append(" ".join(sql.split()))
+
+    def copy_expert(self, sql: str, file) -> None:
+        self.statements.append(sql)
+        self.copied.append(list(csv.reader(file)))
+
+
+def test_persist_snapshots_copies_batches_and_upserts_once(monkeypatch) -> None:
+    cursor = _RecordingCursor()
+
+    @contextmanager
+    def fake_db_cursor():
+        yield cursor
+
+    monkeypatch.setattr(stock_sync, "db_cursor", fake_db_cursor)
+    monkeypatch.setattr(stock_sync, "_COPY_BATCH_SIZE", 2)
+
+    snapshots = [
+        stock_sync.StockSnapshot("AAPL", {"ticker": "AAPL", "name": 'Apple, "Inc"'}, [0.5, 1.0]),
+        stock_sync.StockSnapshot("MSFT", {"ticker": "MSFT"}),
+        stock_sync.StockSnapshot("NVDA", {"ticker": "NVDA"}),
+        stock_sync.StockSnapshot("MSFT", {"ticker": "MSFT", "name": "Microsoft"}),
+    ]
+
+    assert stock_sync.persist_snapshots(snapshots, truncate=True) == 3
+
+    assert cursor.statements[0] == "TRUNCATE TABLE stock_data RESTART IDENTITY;"
+    assert [len(batch) for batch in cursor.copied] == [2, 1]
+    rows = [row for batch in cursor.copied for row in batch]
+    assert rows[0] == ["[0.5, 1.0]", '{"ticker": "AAPL", "name": "Apple, \\"Inc\\""}']
+    assert rows[1] == ["", '{"ticker": "MSFT", "name": "Microsoft"}']
+    upserts = [sql for sql in cursor.statements if sql.startswith("INSERT")]
+    assert len(upserts) == 1
+    assert "ON CONFLICT (ticker) DO UPDATE" in upserts[0]
+    assert not any(sql.startswith("DELETE") for sql in cursor.statements)
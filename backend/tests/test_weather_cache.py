@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from backend.app.services import live_apis
+from backend.app.services.forecast_prefetch import ForecastPrefetcher
+
+
+class _Response:
+    def __init__(self, payload: dict) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class _ForecastClient:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    def get(self, url: str, params: dict) -> _Response:
+        assert "api.open-meteo.com/v1/forecast" in url
+        self.calls.append(params)
+        days = params["forecast_days"]
+        return _Response(
+            {
+                "timezone": params["timezone"],
+                "current": {"time": "2026-03-10T14:00", "temperature_2m": 72.5},
+                "daily_units": {"temperature_2m_max": "°F"},
+                "daily": {
+                    "time": [f"2026-03-{10 + day}" for day in range(days)],
+                    "temperature_2m_max": [70.0 + day for day in range(days)],
+                },
+            }
+        )
+
+
+def test_forecast_cells_and_update_cadence() -> None:
+    assert live_apis.forecast_bucket(30.2672, -97.7431) == (30.3, -97.7)
+    assert live_apis.forecast_bucket(30.2849, -97.7341) == (30.3, -97.7)
+    hour = 3600 * 490_000
+    assert live_apis.seconds_until_forecast_update(hour + 300) == 3600
+    assert live_apis.seconds_until_forecast_update(hour + 299) == 1
+    assert live_apis.seconds_until_forecast_update(hour + 1200) == 2700
+
+
+def test_nearby_cities_and_shorter_ranges_share_one_fetch(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _ForecastClient()
+    monkeypatch.setattr(live_apis, "_http_client", lambda: client)
+
+    three = live_apis.cached_weather_forecast(30.2672, -97.7431, timezone="America/Chicago", days=3)
+    five = live_apis.cached_weather_forecast(30.2849, -97.7341, timezone="America/Chicago", days=5)
+
+    assert len(client.calls) == 1
+    assert client.calls[0]["forecast_days"] == live_apis.FORECAST_CACHE_DAYS
+    assert (client.calls[0]["latitude"], client.calls[0]["longitude"]) == (30.3, -97.7)
+    assert three["daily"]["time"] == five["daily"]["time"][:3]
+    assert len(five["daily"]["temperature_2m_max"]) == 5
+    assert five["daily_units"] == {"temperature_2m_max": "°F"}
+
+    live_apis.cached_weather_forecast(30.2672, -97.7431, timezone="America/New_York", days=3)
+    assert len(client.calls) == 2
+
+
+def test_prefetcher_refreshes_the_most_asked_cells_and_decays_demand() -> None:
+    fetched: list[tuple[float, float, str]] = []
+    prefetcher = ForecastPrefetcher(top_n=2, fetch=lambda *cell: fetched.append(cell))
+
+    for _ in range(3):
+        prefetcher.record(30.2672, -97.7431, "America/Chicago")
+    prefetcher.record(47.6062, -122.3321, "America/Los_Angeles")
+    prefetcher.record(47.6101, -122.3421, "America/Los_Angeles")
+    prefetcher.record(25.7617, -80.1918, "America/New_York")
+
+    assert asyncio.run(prefetcher.refresh()) == 2
+    assert fetched == [(30.3, -97.7, "America/Chicago"), (47.6, -122.3, "America/Los_Angeles")]
+
+    asyncio.run(prefetcher.refresh())
+    asyncio.run(prefetcher.refresh())
+    stats = prefetcher.stats()
+    assert (stats.cycles, stats.prefetched, stats.failed) == (3, 6, 0)
+    # A single ask decays below the threshold after three cycles.
+    assert stats.tracked_cells == 2
+    assert (25.8, -80.2, "America/New_York") not in prefetcher.top()
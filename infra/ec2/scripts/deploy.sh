@@ -9,6 +9,9 @@ cd "$APP_DIR"
 echo "Syncing Python dependencies..."
 uv --project backend sync
 
+echo "Applying database migrations..."
+uv --project backend run python -m backend.database.migrate
+
 echo "Installing auth dependencies..."
 cd "$APP_DIR/backend"
 npm ci